@@ -91,6 +91,8 @@ class Config:
     EXTRACT_JSON_EXTENSION: str = os.getenv('EXTRACT_JSON_EXTENSION', '_extracted.json')
     PARSER_LOG_FOLDER: str = os.getenv('PARSER_LOG_FOLDER', 'logs')
     PARSER_PREPROCESSED_FOLDER: str = os.getenv('PARSER_PREPROCESSED_FOLDER', 'preprocessed')
+    # auto - бэкенд, объявленный экстрактором (html_backend), bs4 - всегда BeautifulSoup
+    EXTRACTOR_HTML_BACKEND: str = os.getenv('EXTRACTOR_HTML_BACKEND', 'auto')
     PARSER_DEFAULT_CHROME_PORT: int = int(os.getenv('PARSER_DEFAULT_CHROME_PORT', '9222'))
     PARSER_DEFAULT_CHROME_HOST: str = os.getenv('PARSER_DEFAULT_CHROME_HOST', 'localhost')
     PARSER_DEFAULT_MAX_PAGES_PER_SITE: int = int(os.getenv('PARSER_DEFAULT_MAX_PAGES_PER_SITE', '300'))
@@ -102,5 +104,92 @@ class Config:
     PARSER_DEFAULT_MAX_NO_RECIPE_PAGES: int = int(os.getenv('PARSER_DEFAULT_MAX_NO_RECIPE_PAGES', '50'))
     PARSER_DEFAULT_MAX_FAILED_PARSING_ATTEMPTS: int = int(os.getenv('PARSER_DEFAULT_MAX_FAILED_PARSING_ATTEMPTS', '3'))
     PARSER_DEFAULT_SUCCESS_PAGE_COUNT_THRESHOLD: int = int(os.getenv('PARSER_DEFAULT_SUCCESS_PAGE_COUNT_THRESHOLD', '15'))
+    # изолированное извлечение: бюджет времени (с) и памяти (МБ) на страницу, карантин после N превышений подряд
+    PARSER_EXTRACT_ISOLATION: bool = os.getenv('PARSER_EXTRACT_ISOLATION', '1') == '1'
+    PARSER_EXTRACT_TIME_BUDGET: float = float(os.getenv('PARSER_EXTRACT_TIME_BUDGET', '30'))
+    PARSER_EXTRACT_MEMORY_BUDGET_MB: int = int(os.getenv('PARSER_EXTRACT_MEMORY_BUDGET_MB', '2048'))
+    PARSER_EXTRACT_QUARANTINE_AFTER: int = int(os.getenv('PARSER_EXTRACT_QUARANTINE_AFTER', '3'))
+    # пропуск извлечения для страниц без признаков рецепта в сыром HTML (src/stages/extract/recipe_prescreen.py)
+    PARSER_RECIPE_PRESCREEN: bool = os.getenv('PARSER_RECIPE_PRESCREEN', '1') == '1'
+    # универсальный экстрактор schema.org (JSON-LD) перед экстрактором сайта (src/stages/extract/schema_org_extractor.py)
+    PARSER_GENERIC_EXTRACTOR: bool = os.getenv('PARSER_GENERIC_EXTRACTOR', '1') == '1'
+    # минимальная полнота универсального результата (0..1), при которой экстрактор сайта не запускается
+    PARSER_GENERIC_MIN_COMPLETENESS: float = float(os.getenv('PARSER_GENERIC_MIN_COMPLETENESS', '0.8'))
+    # валидация экстракторов в workflow: процессы извлечения (0 - по числу CPU) и кеш вердиктов GPT (пусто - без кеша)
+    PARSER_VALIDATION_WORKERS: int = int(os.getenv('PARSER_VALIDATION_WORKERS', '0'))
+    PARSER_VALIDATION_CACHE: str = os.getenv('PARSER_VALIDATION_CACHE', 'logs/validation_cache.json')
+    # облегчение HTML (без скриптов, стилей, SVG, комментариев и рекламы) перед сохранением и извлечением
+    PARSER_HTML_SLIMMING: bool = os.getenv('PARSER_HTML_SLIMMING', '1') == '1'
+    # пропуск извлечения и записи в БД для повторно обойденных страниц без изменений (utils/content_hash.py)
+    PARSER_CHANGE_DETECTION: bool = os.getenv('PARSER_CHANGE_DETECTION', '1') == '1'
+    # планировщик повторного обхода (src/stages/parse/recrawl_scheduler.py): очередь сайтов по скорости появления рецептов
+    PARSER_RECRAWL_SCHEDULING: bool = os.getenv('PARSER_RECRAWL_SCHEDULING', '1') == '1'
+    PARSER_RECRAWL_SCHEDULE: str = os.getenv('PARSER_RECRAWL_SCHEDULE', os.path.join(os.getenv('PARSER_DIR', 'parsed'), 'recrawl_schedule.json'))
+    PARSER_RECRAWL_MIN_HOURS: float = float(os.getenv('PARSER_RECRAWL_MIN_HOURS', '24'))
+    PARSER_RECRAWL_MAX_DAYS: float = float(os.getenv('PARSER_RECRAWL_MAX_DAYS', '30'))
+    # сколько новых рецептов должно накопиться на сайте к следующему визиту
+    PARSER_RECRAWL_TARGET_RECIPES: float = float(os.getenv('PARSER_RECRAWL_TARGET_RECIPES', '20'))
+    # распределение портов run_parallel по отдаче (src/stages/parse/yield_scheduler.py): квант в минутах (0 - без вытеснения),
+    # порог снятия сайта и априорная отдача нового сайта (рецептов в минуту)
+    PARSER_SCHEDULER_SLICE_MINUTES: float = float(os.getenv('PARSER_SCHEDULER_SLICE_MINUTES', '20'))
+    PARSER_SCHEDULER_MIN_YIELD: float = float(os.getenv('PARSER_SCHEDULER_MIN_YIELD', '0.05'))
+    PARSER_SCHEDULER_PRIOR_YIELD: float = float(os.getenv('PARSER_SCHEDULER_PRIOR_YIELD', '1'))
+    # пул Chrome для run_parallel (src/common/chrome_pool.py): запуск, проверка через /json/version, перезапуск упавших
+    # и разросшихся (суммарный RSS, МБ; 0 - без ограничения) экземпляров; только для локального Chrome
+    PARSER_CHROME_POOL: bool = os.getenv('PARSER_CHROME_POOL', '0') == '1'
+    PARSER_CHROME_BINARY: str = os.getenv('PARSER_CHROME_BINARY', 'google-chrome')
+    PARSER_CHROME_MAX_RSS_MB: float = float(os.getenv('PARSER_CHROME_MAX_RSS_MB', '4096'))
+    PARSER_CHROME_HEALTH_INTERVAL: float = float(os.getenv('PARSER_CHROME_HEALTH_INTERVAL', '60'))
+    PARSER_CHROME_MAX_RESTARTS: int = int(os.getenv('PARSER_CHROME_MAX_RESTARTS', '3'))
+    # логи потоков parse/prepare_site через очередь и один поток-писатель (utils/async_logging.py), уровень логов потоков
+    # и лимит отладочных сообщений с одного места вызова в секунду (0 - без лимита)
+    PARSER_ASYNC_LOGGING: bool = os.getenv('PARSER_ASYNC_LOGGING', '1') == '1'
+    PARSER_LOG_LEVEL: str = os.getenv('PARSER_LOG_LEVEL', 'INFO').upper()
+    PARSER_LOG_DEBUG_PER_SECOND: float = float(os.getenv('PARSER_LOG_DEBUG_PER_SECOND', '2'))
+    # отчет о времени этапов обхода по сайтам в конце run_parallel (utils/stage_timing.py; пусто - только в лог)
+    PARSER_TIMING_REPORT: str = os.getenv('PARSER_TIMING_REPORT', 'logs/crawl_timing.json')
+    # отбор сайтов-кандидатов по HTTP перед подготовкой в браузере (src/stages/parse/site_prescreen.py): параллельные запросы,
+    # проверяемые страницы на сайт, таймаут запроса (секунды) и минимальная оценка сайта (0..1)
+    PARSER_SITE_PRESCREEN: bool = os.getenv('PARSER_SITE_PRESCREEN', '1') == '1'
+    PARSER_SITE_PRESCREEN_CONCURRENCY: int = int(os.getenv('PARSER_SITE_PRESCREEN_CONCURRENCY', '32'))
+    PARSER_SITE_PRESCREEN_SAMPLE_PAGES: int = int(os.getenv('PARSER_SITE_PRESCREEN_SAMPLE_PAGES', '5'))
+    PARSER_SITE_PRESCREEN_TIMEOUT: float = float(os.getenv('PARSER_SITE_PRESCREEN_TIMEOUT', '20'))
+    PARSER_SITE_PRESCREEN_MIN_SCORE: float = float(os.getenv('PARSER_SITE_PRESCREEN_MIN_SCORE', '0.2'))
+    # поиск новых сайтов в DuckDuckGo (src/stages/parse/duckduckgo_search.py): http - HTML-версия без браузера
+    # (Selenium для запросов без выдачи), selenium - только браузер; параллельные запросы, запросов в минуту, таймаут (секунды)
+    PARSER_SEARCH_BACKEND: str = os.getenv('PARSER_SEARCH_BACKEND', 'http')
+    PARSER_SEARCH_URL: str = os.getenv('PARSER_SEARCH_URL', 'https://html.duckduckgo.com/html/')
+    PARSER_SEARCH_CONCURRENCY: int = int(os.getenv('PARSER_SEARCH_CONCURRENCY', '4'))
+    PARSER_SEARCH_QUERIES_PER_MINUTE: float = float(os.getenv('PARSER_SEARCH_QUERIES_PER_MINUTE', '20'))
+    PARSER_SEARCH_TIMEOUT: float = float(os.getenv('PARSER_SEARCH_TIMEOUT', '20'))
+    # отсев похожих поисковых запросов (src/stages/parse/query_dedupe.py): локальная модель эмбеддингов (пусто - n-граммы),
+    # порог косинусной близости и файл индекса с новизной выдачи семейств запросов
+    PARSER_QUERY_DEDUPE: bool = os.getenv('PARSER_QUERY_DEDUPE', '1') == '1'
+    PARSER_QUERY_EMBEDDING_MODEL: str = os.getenv('PARSER_QUERY_EMBEDDING_MODEL', 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2')
+    PARSER_QUERY_SIMILARITY_THRESHOLD: float = float(os.getenv('PARSER_QUERY_SIMILARITY_THRESHOLD', '0.9'))
+    PARSER_QUERY_INDEX: str = os.getenv('PARSER_QUERY_INDEX', os.path.join(os.getenv('PARSER_DIR', 'parsed'), 'query_index.json'))
+    # локальный вывод regex паттерна URL рецептов (src/stages/analyse/url_pattern_induction.py): GPT спрашивается,
+    # только если точность на страницах-не рецептах или полнота на рецептах (на отложенных URL) ниже порогов;
+    # максимум паттернов и страниц-не рецептов, минимум URL рецептов для вывода
+    PARSER_PATTERN_INDUCTION: bool = os.getenv('PARSER_PATTERN_INDUCTION', '1') == '1'
+    PARSER_PATTERN_MIN_PRECISION: float = float(os.getenv('PARSER_PATTERN_MIN_PRECISION', '0.95'))
+    PARSER_PATTERN_MIN_RECALL: float = float(os.getenv('PARSER_PATTERN_MIN_RECALL', '0.9'))
+    PARSER_PATTERN_MAX_PATTERNS: int = int(os.getenv('PARSER_PATTERN_MAX_PATTERNS', '5'))
+    PARSER_PATTERN_MAX_NEGATIVES: int = int(os.getenv('PARSER_PATTERN_MAX_NEGATIVES', '5000'))
+    PARSER_PATTERN_MIN_URLS: int = int(os.getenv('PARSER_PATTERN_MIN_URLS', '12'))
+    # анализ страниц в RecipeAnalyzer (src/stages/analyse/title_classifier.py): одновременные запросы к GPT, размер порции
+    # страниц из БД, батчи заголовков по оценке токенов и числу страниц; локальный пре-фильтр (ключевые слова,
+    # классификатор заголовков с порогом уверенности) решает очевидные случаи без GPT
+    PARSER_ANALYSE_CONCURRENCY: int = int(os.getenv('PARSER_ANALYSE_CONCURRENCY', '8'))
+    PARSER_ANALYSE_CHUNK_SIZE: int = int(os.getenv('PARSER_ANALYSE_CHUNK_SIZE', '500'))
+    PARSER_ANALYSE_TITLE_BATCH_TOKENS: int = int(os.getenv('PARSER_ANALYSE_TITLE_BATCH_TOKENS', '2000'))
+    PARSER_ANALYSE_TITLE_BATCH_SIZE: int = int(os.getenv('PARSER_ANALYSE_TITLE_BATCH_SIZE', '60'))
+    PARSER_ANALYSE_PREFILTER: bool = os.getenv('PARSER_ANALYSE_PREFILTER', '1') == '1'
+    PARSER_ANALYSE_PREFILTER_CONFIDENCE: float = float(os.getenv('PARSER_ANALYSE_PREFILTER_CONFIDENCE', '0.97'))
+    PARSER_ANALYSE_CLASSIFIER_EXAMPLES: int = int(os.getenv('PARSER_ANALYSE_CLASSIFIER_EXAMPLES', '20000'))
+    # кэш селекторов кнопок согласия на cookies по доменам и CMP-платформам (src/stages/parse/consent_cache.py; пусто - без кэша)
+    # и число неудачных проб подряд, после которого селектор домена забывается
+    PARSER_CONSENT_CACHE: str = os.getenv('PARSER_CONSENT_CACHE', os.path.join(os.getenv('PARSER_DIR', 'parsed'), 'consent_selectors.json'))
+    PARSER_CONSENT_MAX_FAILURES: int = int(os.getenv('PARSER_CONSENT_MAX_FAILURES', '2'))
 # единый экземпляр конфигурации
 config = Config()
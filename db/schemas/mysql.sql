@@ -37,6 +37,11 @@ CREATE TABLE IF NOT EXISTS pages (
     -- Оценка
     confidence_score DECIMAL(5,2) DEFAULT 0.00,
     is_recipe BOOLEAN DEFAULT FALSE,
+
+    -- Хеши для обнаружения изменений при повторном обходе (sha256 HTML и извлеченного рецепта)
+    -- в существующую БД добавляются при подключении (ADDED_COLUMNS в src/common/db/mysql.py)
+    html_hash CHAR(64),
+    content_hash CHAR(64),
     
     -- Метаданные
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -52,7 +57,7 @@ CREATE TABLE IF NOT EXISTS search_query (
     id INT AUTO_INCREMENT PRIMARY KEY,
     query VARCHAR(500) NOT NULL,
     language VARCHAR(10),
-    url_count INT DEFAULT 0, -- число полученных ссылок из этого запроса
+    url_count INT DEFAULT 0, -- число полученных ссылок из этого запроса (-1 - пропущен как похожий на уже найденные)
     recipe_url_count INT DEFAULT 0, -- число уникальных сайтов, признанных рецептами
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     UNIQUE KEY unique_query (query(191))
@@ -15,6 +15,7 @@ from extractor.base import BaseRecipeExtractor, process_directory
 
 class AllRecipesExtractor(BaseRecipeExtractor):
     """Экстрактор для allrecipes.com"""
+    html_slimming = False
     
     @staticmethod
     def parse_iso_duration(duration: str) -> Optional[str]:
@@ -27,28 +28,7 @@ class AllRecipesExtractor(BaseRecipeExtractor):
         Returns:
             Время в минутах, например "90"
         """
-        if not duration or not duration.startswith('PT'):
-            return None
-        
-        duration = duration[2:]  # Убираем "PT"
-        
-        hours = 0
-        minutes = 0
-        
-        # Извлекаем часы
-        hour_match = re.search(r'(\d+)H', duration)
-        if hour_match:
-            hours = int(hour_match.group(1))
-        
-        # Извлекаем минуты
-        min_match = re.search(r'(\d+)M', duration)
-        if min_match:
-            minutes = int(min_match.group(1))
-        
-        # Конвертируем все в минуты
-        total_minutes = hours * 60 + minutes
-        
-        return str(total_minutes) if total_minutes > 0 else None
+        return BaseRecipeExtractor.format_minutes(BaseRecipeExtractor.iso_duration_to_minutes(duration), 'number')
     
     def extract_dish_name(self) -> Optional[str]:
         """Извлечение названия блюда"""
@@ -122,43 +102,18 @@ class AllRecipesExtractor(BaseRecipeExtractor):
         steps = []
         
         # Сначала пробуем извлечь из JSON-LD (самый надежный способ)
-        json_ld_scripts = self.soup.find_all('script', type='application/ld+json')
-        
-        for script in json_ld_scripts:
-            try:
-                data = json.loads(script.string)
-                
-                # Функция для проверки типа (может быть строкой или списком)
-                def is_recipe(item):
-                    item_type = item.get('@type', '')
-                    if isinstance(item_type, list):
-                        return 'Recipe' in item_type
-                    return item_type == 'Recipe'
-                
-                # Ищем recipeInstructions в данных
-                recipe_data = None
-                if isinstance(data, list):
-                    for item in data:
-                        if is_recipe(item):
-                            recipe_data = item
-                            break
-                elif isinstance(data, dict) and is_recipe(data):
-                    recipe_data = data
-                
-                if recipe_data and 'recipeInstructions' in recipe_data:
-                    instructions = recipe_data['recipeInstructions']
-                    if isinstance(instructions, list):
-                        for idx, step in enumerate(instructions, 1):
-                            if isinstance(step, dict) and 'text' in step:
-                                steps.append(f"{idx}. {step['text']}")
-                            elif isinstance(step, str):
-                                steps.append(f"{idx}. {step}")
-                
-                if steps:
-                    return ' '.join(steps)
-                    
-            except (json.JSONDecodeError, KeyError):
-                continue
+        recipe_data = self.get_structured_recipe()
+        if recipe_data and 'recipeInstructions' in recipe_data:
+            instructions = recipe_data['recipeInstructions']
+            if isinstance(instructions, list):
+                for idx, step in enumerate(instructions, 1):
+                    if isinstance(step, dict) and 'text' in step:
+                        steps.append(f"{idx}. {step['text']}")
+                    elif isinstance(step, str):
+                        steps.append(f"{idx}. {step}")
+        
+        if steps:
+            return ' '.join(steps)
         
         # Если JSON-LD не помог, ищем в HTML
         instructions_containers = [
@@ -195,73 +150,26 @@ class AllRecipesExtractor(BaseRecipeExtractor):
     def extract_nutrition_info(self) -> Optional[str]:
         """Извлечение информации о питательности в формате: 202 kcal; 2/11/27"""
         
-        # Сначала пробуем извлечь из JSON-LD
-        json_ld_scripts = self.soup.find_all('script', type='application/ld+json')
+        recipe_data = self.get_structured_recipe()
+        nutrition = recipe_data.get('nutrition') if recipe_data else None
+        if not isinstance(nutrition, dict):
+            return None
         
-        for script in json_ld_scripts:
-            try:
-                data = json.loads(script.string)
-                
-                # Функция для проверки типа Recipe
-                def is_recipe(item):
-                    item_type = item.get('@type', '')
-                    if isinstance(item_type, list):
-                        return 'Recipe' in item_type
-                    return item_type == 'Recipe'
-                
-                # Ищем nutrition в данных
-                recipe_data = None
-                if isinstance(data, list):
-                    for item in data:
-                        if is_recipe(item):
-                            recipe_data = item
-                            break
-                elif isinstance(data, dict) and is_recipe(data):
-                    recipe_data = data
-                
-                if recipe_data and 'nutrition' in recipe_data:
-                    nutrition = recipe_data['nutrition']
-                    
-                    # Извлекаем калории
-                    calories = None
-                    if 'calories' in nutrition:
-                        cal_text = nutrition['calories']
-                        # Извлекаем только число
-                        cal_match = re.search(r'(\d+)', str(cal_text))
-                        if cal_match:
-                            calories = cal_match.group(1)
-                    
-                    # Извлекаем БЖУ (белки/жиры/углеводы)
-                    protein = None
-                    fat = None
-                    carbs = None
-                    
-                    if 'proteinContent' in nutrition:
-                        prot_text = nutrition['proteinContent']
-                        prot_match = re.search(r'(\d+)', str(prot_text))
-                        if prot_match:
-                            protein = prot_match.group(1)
-                    
-                    if 'fatContent' in nutrition:
-                        fat_text = nutrition['fatContent']
-                        fat_match = re.search(r'(\d+)', str(fat_text))
-                        if fat_match:
-                            fat = fat_match.group(1)
-                    
-                    if 'carbohydrateContent' in nutrition:
-                        carb_text = nutrition['carbohydrateContent']
-                        carb_match = re.search(r'(\d+)', str(carb_text))
-                        if carb_match:
-                            carbs = carb_match.group(1)
-                    
-                    # Форматируем: "202 kcal; 2/11/27"
-                    if calories and protein and fat and carbs:
-                        return f"{calories} kcal; {protein}/{fat}/{carbs}"
-                    elif calories:
-                        return f"{calories} kcal"
-                    
-            except (json.JSONDecodeError, KeyError):
-                continue
+        def first_number(key: str) -> Optional[str]:
+            match = re.search(r'(\d+)', str(nutrition.get(key, '')))
+            return match.group(1) if match else None
+        
+        calories = first_number('calories')
+        # БЖУ (белки/жиры/углеводы)
+        protein = first_number('proteinContent')
+        fat = first_number('fatContent')
+        carbs = first_number('carbohydrateContent')
+        
+        # Форматируем: "202 kcal; 2/11/27"
+        if calories and protein and fat and carbs:
+            return f"{calories} kcal; {protein}/{fat}/{carbs}"
+        elif calories:
+            return f"{calories} kcal"
         
         return None
     
@@ -289,44 +197,18 @@ class AllRecipesExtractor(BaseRecipeExtractor):
             time_type: Тип времени ('prep', 'cook', 'total')
         """
         # Сначала пробуем извлечь из JSON-LD
-        json_ld_scripts = self.soup.find_all('script', type='application/ld+json')
-        
-        for script in json_ld_scripts:
-            try:
-                data = json.loads(script.string)
-                
-                # Функция для проверки типа Recipe
-                def is_recipe(item):
-                    item_type = item.get('@type', '')
-                    if isinstance(item_type, list):
-                        return 'Recipe' in item_type
-                    return item_type == 'Recipe'
-                
-                # Ищем время в данных
-                recipe_data = None
-                if isinstance(data, list):
-                    for item in data:
-                        if is_recipe(item):
-                            recipe_data = item
-                            break
-                elif isinstance(data, dict) and is_recipe(data):
-                    recipe_data = data
-                
-                if recipe_data:
-                    # Маппинг типов времени на ключи JSON-LD
-                    time_keys = {
-                        'prep': 'prepTime',
-                        'cook': 'cookTime',
-                        'total': 'totalTime'
-                    }
-                    
-                    key = time_keys.get(time_type)
-                    if key and key in recipe_data:
-                        iso_time = recipe_data[key]
-                        return self.parse_iso_duration(iso_time)
-                        
-            except (json.JSONDecodeError, KeyError):
-                continue
+        recipe_data = self.get_structured_recipe()
+        if recipe_data:
+            # Маппинг типов времени на ключи JSON-LD
+            time_keys = {
+                'prep': 'prepTime',
+                'cook': 'cookTime',
+                'total': 'totalTime'
+            }
+            
+            key = time_keys.get(time_type)
+            if key and key in recipe_data:
+                return self.parse_iso_duration(recipe_data[key])
         
         # Если JSON-LD не помог, ищем в HTML
         time_patterns = {
@@ -545,11 +427,8 @@ class AllRecipesExtractor(BaseRecipeExtractor):
             urls.append(twitter_image['content'])
         
         # 2. Ищем в JSON-LD
-        scripts = self.soup.find_all('script', type='application/ld+json')
-        for script in scripts:
+        for data in self.get_json_ld_documents():
             try:
-                data = json.loads(script.string)
-                
                 # Если data - это список, обрабатываем каждый элемент
                 if isinstance(data, list):
                     for item in data:
@@ -601,7 +480,7 @@ class AllRecipesExtractor(BaseRecipeExtractor):
                         elif 'contentUrl' in img:
                             urls.append(img['contentUrl'])
             
-            except (json.JSONDecodeError, KeyError):
+            except KeyError:
                 continue
         
         # Убираем дубликаты, сохраняя порядок, берем первые 3
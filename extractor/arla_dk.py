@@ -14,6 +14,7 @@ from extractor.base import BaseRecipeExtractor, process_directory
 
 class ArlaDkExtractor(BaseRecipeExtractor):
     """Экстрактор для arla.dk"""
+    html_slimming = False
     
     def _get_json_ld_data(self) -> Optional[dict]:
         """Извлечение данных JSON-LD из страницы"""
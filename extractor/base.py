@@ -6,22 +6,89 @@
 Для поиска все наследники должны иметь имя вида <SiteName>Extractor, например AllRecipesExtractor (ищем класс с "Extractor" в имени при импорте модуля)
 """
 
-import html
 import json
 import sys
+import inspect
 from pathlib import Path
-import re
-from bs4 import BeautifulSoup
-from typing import Optional, Type
+from functools import lru_cache
+from typing import Any, Optional, Type
 from abc import ABC, abstractmethod
 
 # Добавление корневой директории в PYTHONPATH
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from utils.structured_data import (
+    RECIPE_TYPE,
+    find_json_ld_node,
+    parse_json_ld,
+    parse_microdata_item,
+    parse_rdfa_item,
+)
+from utils import recipe_parsing, text_cleaning
+from utils.fast_html import BS4_BACKEND, parse_html
+from utils.html_slimming import MIN_SLIM_SIZE, slim_html
+from config.config import config
+
+# поля, без которых страница не считается рецептом
+REQUIRED_FIELDS = ('dish_name', 'ingredients', 'instructions')
+# методы существующих экстракторов, из которых extract_all берет обязательные поля (по порядку предпочтения)
+REQUIRED_FIELD_METHODS = {
+    'dish_name': ('extract_dish_name',),
+    'ingredients': ('extract_ingredients',),
+    'instructions': ('extract_instructions', 'extract_steps'),
+}
+
+
+def is_recipe_data(data: Optional[dict]) -> bool:
+    """Все обязательные поля присутствуют и не пустые"""
+    return bool(data) and all(data.get(field) for field in REQUIRED_FIELDS)
+
+
+@lru_cache(maxsize=None)
+def _required_field_methods(extractor_class: type) -> Optional[dict[str, str]]:
+    """
+    Адаптер для существующих экстракторов: методы обязательных полей, которые extract_all вызывает напрямую
+    
+    Подходят только методы без параметров: extract_all может передавать в метод с параметрами по умолчанию
+    данные (например, JSON-LD), без которых вызов без аргументов дает другой результат.
+    
+    Returns:
+        {поле: имя метода} или None, если хотя бы одно поле извлекается иначе (тогда только полное извлечение)
+    """
+    used_names = set(extractor_class.extract_all.__code__.co_names)
+    methods = {}
+    for field, candidates in REQUIRED_FIELD_METHODS.items():
+        for method_name in candidates:
+            method = getattr(extractor_class, method_name, None)
+            if method_name not in used_names or not callable(method):
+                continue
+            if len(inspect.signature(method).parameters) == 1:  # только self
+                methods[field] = method_name
+                break
+        else:
+            return None
+    return methods
+
+
+def _memoized_call(method, value):
+    """Вызов без аргументов возвращает уже извлеченное значение, с аргументами - вызывает метод"""
+    def call(*args, **kwargs):
+        return method(*args, **kwargs) if args or kwargs else value
+    return call
+
 
 class BaseRecipeExtractor(ABC):
     """базовый эксрактор данных рецептов"""
     
+    # структурированные данные разбираются один раз на документ (False - только для сравнения в бенчмарке)
+    structured_data_cache: bool = True
+    # HTML бэкенд: "bs4" или "lxml" (utils/fast_html.py, подмножество API BeautifulSoup).
+    # "lxml" объявляется только после проверки scripts/check_html_backend.py на preprocessed данных
+    html_backend: str = BS4_BACKEND
+    # облегчение HTML перед разбором (utils/html_slimming.py): False, если экстрактор читает встроенные
+    # скрипты, стили, SVG или сырую разметку
+    html_slimming: bool = True
+    
     def __init__(self, html_path: str):
         """
         Args:
@@ -29,29 +96,119 @@ class BaseRecipeExtractor(ABC):
         """
         self.html_path = html_path
         with open(html_path, 'r', encoding='utf-8') as f:
-            self.soup = BeautifulSoup(f.read(), 'lxml')
+            self.soup = parse_html(self.prepare_markup(f.read()), self.get_html_backend())
+    
+    @classmethod
+    def prepare_markup(cls, markup: str) -> str:
+        """HTML перед разбором: облегчается, если это не отключено экстрактором или PARSER_HTML_SLIMMING"""
+        if cls.html_slimming and config.PARSER_HTML_SLIMMING:
+            return slim_html(markup, min_size=MIN_SLIM_SIZE)
+        return markup
+    
+    @classmethod
+    def get_html_backend(cls) -> str:
+        """Бэкенд разбора HTML с учетом EXTRACTOR_HTML_BACKEND (bs4 - принудительно BeautifulSoup)"""
+        if config.EXTRACTOR_HTML_BACKEND == BS4_BACKEND:
+            return BS4_BACKEND
+        return cls.html_backend
+    
+    # общее ядро очистки текста (utils/text_cleaning.py): clean_texts очищает список значений поля целиком
+    clean_text = staticmethod(text_cleaning.clean_text)
+    clean_texts = staticmethod(text_cleaning.clean_texts)
+    
+    # общие скомпилированные функции разбора (utils/recipe_parsing.py), результаты кешируются
+    iso_duration_to_minutes = staticmethod(recipe_parsing.iso_duration_to_minutes)
+    time_text_to_minutes = staticmethod(recipe_parsing.time_text_to_minutes)
+    format_minutes = staticmethod(recipe_parsing.format_minutes)
+    quantity_to_float = staticmethod(recipe_parsing.quantity_to_float)
+    normalize_unit = staticmethod(recipe_parsing.normalize_unit)
+    split_ingredient = staticmethod(recipe_parsing.split_ingredient)
+    
+    def _cached_structured_data(self, key: str, factory):
+        """Значение из кеша структурированных данных документа (вычисляется при первом обращении)"""
+        if not self.structured_data_cache:
+            return factory()
+        cache = self.__dict__.setdefault('_structured_data', {})
+        if key not in cache:
+            cache[key] = factory()
+        return cache[key]
     
-    @staticmethod
-    def clean_text(text: str) -> str:
-        """Очистка текста от нечитаемых символов и нормализация"""
-        if not text:
-            return text
+    def get_json_ld_documents(self) -> list[Any]:
+        """Все разобранные JSON-LD блоки страницы (orjson, один разбор на документ)"""
+        return self._cached_structured_data('json_ld', lambda: parse_json_ld(self.soup))
+    
+    def get_json_ld_node(self, type_name: str = RECIPE_TYPE) -> Optional[dict]:
+        """
+        Первый узел JSON-LD заданного типа (с обходом списков и @graph)
+        
+        Args:
+            type_name: тип schema.org, например "Recipe", "Article", "BreadcrumbList"
+        """
+        return self._cached_structured_data(
+            f'json_ld:{type_name}',
+            lambda: find_json_ld_node(self.get_json_ld_documents(), type_name)
+        )
+    
+    def get_structured_recipe(self) -> Optional[dict]:
+        """
+        Нормализованный узел Recipe в формате JSON-LD
         
-        # Декодируем HTML entities (&#039; -> ', &quot; -> ", etc.)
-        text = html.unescape(text)
+        Источники по приоритету: JSON-LD, microdata (itemtype), RDFa (typeof).
+        Результат вычисляется один раз на документ, экстракторы могут вызывать метод в каждом поле.
         
-        # Удаляем Unicode символы типа ▢, □, ✓ и другие специальные символы
-        text = re.sub(r'[▢□✓✔▪▫●○■]', '', text)
-        # Удаляем лишние пробелы
-        text = re.sub(r'\s+', ' ', text)
-        # Убираем пробелы в начале и конце
-        text = text.strip()
-        return text
+        Returns:
+            dict с ключами schema.org (name, recipeIngredient, recipeInstructions, ...) или None
+        """
+        def find_recipe() -> Optional[dict]:
+            return (self.get_json_ld_node(RECIPE_TYPE)
+                    or parse_microdata_item(self.soup, RECIPE_TYPE)
+                    or parse_rdfa_item(self.soup, RECIPE_TYPE))
+        
+        return self._cached_structured_data('recipe', find_recipe)
     
     @abstractmethod
     def extract_all(self) -> dict:
         """Извлечение всех данных рецепта из HTML"""
         raise NotImplementedError("Метод extract_all должен быть реализован в подклассе")
+    
+    def extract_required(self) -> Optional[dict]:
+        """
+        Первый этап: только обязательные поля (dish_name, ingredients, instructions)
+        
+        Экстрактор может переопределить метод. По умолчанию работает адаптер: вызываются методы
+        extract_dish_name/extract_ingredients/extract_instructions (extract_steps), а их результаты
+        запоминаются на экземпляре, чтобы extract_all не вычислял их повторно.
+        
+        Returns:
+            dict обязательных полей или None, если разделить извлечение нельзя
+        """
+        methods = _required_field_methods(type(self))
+        if methods is None:
+            return None
+        
+        required = {}
+        for field, method_name in methods.items():
+            try:
+                value = getattr(self, method_name)()
+            except Exception:
+                # ошибку обработает (или выбросит) сам extract_all
+                return None
+            self.__dict__[method_name] = _memoized_call(getattr(self, method_name), value)
+            required[field] = value
+        return required
+    
+    def extract_staged(self) -> dict:
+        """
+        Извлечение с ранним выходом: остальные поля (описание, теги, время, изображения...)
+        извлекаются только если обязательные поля найдены
+        
+        Returns:
+            Полные данные рецепта или только обязательные поля, если страница не рецепт
+        """
+        required = self.extract_required()
+        if required is not None and not is_recipe_data(required):
+            return required
+        return self.extract_all()
 
 
 def process_html_file(extractor_class: Type[BaseRecipeExtractor], 
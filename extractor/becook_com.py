@@ -19,6 +19,7 @@ logger = logging.getLogger(__name__)
 
 class BecookComExtractor(BaseRecipeExtractor):
     """Экстрактор для becook.com"""
+    html_slimming = False
 
     def _get_base_url(self) -> str:
         """Извлечение базового URL из тега <base>"""
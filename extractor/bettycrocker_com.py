@@ -16,21 +16,8 @@ class BettyCrockerExtractor(BaseRecipeExtractor):
     """Экстрактор для bettycrocker.com"""
     
     def _get_recipe_json_ld(self) -> Optional[dict]:
-        """Извлечение структурированных данных Recipe из JSON-LD"""
-        json_ld_scripts = self.soup.find_all('script', type='application/ld+json')
-        
-        for script in json_ld_scripts:
-            try:
-                data = json.loads(script.string)
-                
-                # Проверяем, является ли это Recipe
-                if isinstance(data, dict) and data.get('@type') == 'Recipe':
-                    return data
-                    
-            except (json.JSONDecodeError, KeyError, AttributeError):
-                continue
-        
-        return None
+        """Извлечение структурированных данных Recipe из JSON-LD (разбирается один раз на документ)"""
+        return self.get_structured_recipe()
     
     def extract_dish_name(self) -> Optional[str]:
         """Извлечение названия блюда"""
@@ -43,6 +43,7 @@ PURPOSE_PREFIXES = ('untuk ', 'sebagai ', 'sebagai bahan ')
 
 class BriliofoodNetExtractor(BaseRecipeExtractor):
     """Экстрактор для briliofood.net"""
+    html_slimming = False
 
     # ------------------------------------------------------------------ helpers
 
@@ -10,6 +10,7 @@ from extractor.base import BaseRecipeExtractor, process_directory
 
 class ChefkochDeExtractor(BaseRecipeExtractor):
     """Extractor for chefkoch.de recipe pages"""
+    html_slimming = False
     
     def __init__(self, html_path: str):
         super().__init__(html_path)
@@ -14,6 +14,7 @@ from extractor.base import BaseRecipeExtractor, process_directory
 
 class CookaroundExtractor(BaseRecipeExtractor):
     """Экстрактор для cookaround.com"""
+    html_slimming = False
     
     @staticmethod
     def parse_iso_duration(duration: str) -> Optional[str]:
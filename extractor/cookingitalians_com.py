@@ -14,6 +14,7 @@ from extractor.base import BaseRecipeExtractor, process_directory
 
 class CookingItaliansExtractor(BaseRecipeExtractor):
     """Экстрактор для cookingitalians.com"""
+    html_slimming = False
     
     def __init__(self, html_path: str):
         super().__init__(html_path)
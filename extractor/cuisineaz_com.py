@@ -14,6 +14,7 @@ from extractor.base import BaseRecipeExtractor, process_directory
 
 class CuisineazExtractor(BaseRecipeExtractor):
     """Экстрактор для cuisineaz.com"""
+    html_slimming = False
     
     @staticmethod
     def parse_iso_duration(duration: str) -> Optional[str]:
@@ -21,6 +21,7 @@ logger = logging.getLogger(__name__)
 
 class DeliciasSaudaveisComExtractor(BaseRecipeExtractor):
     """Экстрактор для deliciassaudaveis.com"""
+    html_slimming = False
 
     # ── ISO 8601 duration ─────────────────────────────────────────────────────
 
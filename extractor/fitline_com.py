@@ -17,6 +17,7 @@ logger = logging.getLogger(__name__)
 
 class FitlineComExtractor(BaseRecipeExtractor):
     """Экстрактор для fitline.com"""
+    html_slimming = False
 
     # Unicode дроби → строковые представления
     _FRACTION_MAP = {
@@ -14,6 +14,8 @@ from extractor.base import BaseRecipeExtractor, process_directory
 
 class GastronomRuExtractor(BaseRecipeExtractor):
     
+    html_slimming = False
+
     def extract_from_json_ld(self) -> dict:
         """Извлечение данных из JSON-LD схемы (наиболее надежный способ)"""
         # Ищем script с type="application/ld+json"
@@ -14,6 +14,7 @@ from extractor.base import BaseRecipeExtractor, process_directory
 
 class KidarilightExtractor(BaseRecipeExtractor):
     """Экстрактор для kidarilight.com"""
+    html_slimming = False
     
     # Константы
     MAX_IMAGES = 5
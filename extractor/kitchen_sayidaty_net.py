@@ -14,6 +14,7 @@ from extractor.base import BaseRecipeExtractor, process_directory
 
 class KitchenSayidatyNetExtractor(BaseRecipeExtractor):
     """Экстрактор для kitchen.sayidaty.net"""
+    html_slimming = False
     
     @staticmethod
     def parse_iso_duration(duration: str) -> Optional[str]:
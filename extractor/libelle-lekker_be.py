@@ -15,6 +15,7 @@ from extractor.base import BaseRecipeExtractor, process_directory
 
 class LibelleLekkerExtractor(BaseRecipeExtractor):
     """Экстрактор для libelle-lekker.be"""
+    html_slimming = False
     
     def _get_rmg_recipe_data(self) -> Optional[dict]:
         """Извлечение данных из JavaScript переменной rmg_recipe_data"""
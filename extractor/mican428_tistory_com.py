@@ -14,6 +14,7 @@ from extractor.base import BaseRecipeExtractor, process_directory
 
 class Mican428TistoryComExtractor(BaseRecipeExtractor):
     """Экстрактор для mican428.tistory.com"""
+    html_slimming = False
     
     def extract_dish_name(self) -> Optional[str]:
         """Извлечение названия блюда"""
@@ -15,6 +15,7 @@ from extractor.base import BaseRecipeExtractor, process_directory
 
 class MindmegetteExtractor(BaseRecipeExtractor):
     """Экстрактор для mindmegette.hu"""
+    html_slimming = False
     
     @staticmethod
     def parse_iso_duration(duration: str) -> Optional[str]:
@@ -14,6 +14,7 @@ from extractor.base import BaseRecipeExtractor, process_directory
 
 class ParkAjinomotoCoJpExtractor(BaseRecipeExtractor):
     """Экстрактор для park.ajinomoto.co.jp"""
+    html_slimming = False
     
     @staticmethod
     def parse_iso_duration(duration: str) -> Optional[str]:
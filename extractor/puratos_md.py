@@ -14,6 +14,7 @@ from extractor.base import BaseRecipeExtractor, process_directory
 
 class PuratosMdExtractor(BaseRecipeExtractor):
     """Экстрактор для puratos.md"""
+    html_slimming = False
     
     def extract_dish_name(self) -> Optional[str]:
         """Извлечение названия блюда"""
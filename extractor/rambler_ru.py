@@ -17,6 +17,7 @@ logger = logging.getLogger(__name__)
 
 class RamblerRuExtractor(BaseRecipeExtractor):
     """Экстрактор для rambler.ru"""
+    html_slimming = False
 
     # ---------------------------------------------------------------------------
     # Внутренние хелперы
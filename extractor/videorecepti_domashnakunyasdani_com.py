@@ -29,6 +29,7 @@ logger = logging.getLogger(__name__)
 
 class VideoReceptiDomashnakunyasdaniComExtractor(BaseRecipeExtractor):
     """Экстрактор для videorecepti.domashnakunyasdani.com"""
+    html_slimming = False
 
     # ------------------------------------------------------------------ helpers
 
@@ -0,0 +1,89 @@
+"""
+бенчмарк и проверка регрессий производительности экстракторов (офлайн, на preprocessed/<module>)
+
+Результаты пишутся в --output, сравниваются с --baseline; при регрессиях код выхода 1.
+
+Примеры:
+    python scripts/benchmark_extractors.py --save-baseline              # записать baseline
+    python scripts/benchmark_extractors.py --modules allrecipes_com     # сравнить с baseline
+    python scripts/benchmark_extractors.py --threshold 0.5 --repeat 10
+"""
+
+import sys
+import shutil
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.config import config
+from src.stages.extract.extractor_registry import ExtractorRegistry
+from src.stages.extract.extractor_benchmark import benchmark_module, find_regressions, load_results, save_results
+
+DEFAULT_OUTPUT = 'benchmarks/extractors_latest.json'
+DEFAULT_BASELINE = 'benchmarks/extractors_baseline.json'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк экстракторов и поиск регрессий')
+    parser.add_argument('--modules', type=str, nargs='+', default=None,
+                        help='Модули экстракторов (по умолчанию: все, для которых есть preprocessed данные)')
+    parser.add_argument('--repeat', type=int, default=5, help='Количество прогонов на страницу')
+    parser.add_argument('--output', type=str, default=DEFAULT_OUTPUT, help='Файл результатов')
+    parser.add_argument('--baseline', type=str, default=DEFAULT_BASELINE, help='Файл baseline')
+    parser.add_argument('--save-baseline', action='store_true', help='Сохранить результаты как новый baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Допустимое относительное ухудшение метрики (0.25 = +25%%)')
+    args = parser.parse_args()
+
+    registry = ExtractorRegistry()
+    preprocessed_dir = Path(config.PARSER_PREPROCESSED_FOLDER)
+    modules = args.modules or [name for name in registry.names() if (preprocessed_dir / name).is_dir()]
+    if not modules:
+        print(f"Нет модулей с тестовыми данными в {preprocessed_dir}")
+        return
+
+    print(f"{'module':<40} {'pages':>5} {'p50 ms':>8} {'p95 ms':>8} {'peak KB':>9} {'nodes':>7}")
+    print("=" * 82)
+    results = []
+    for module_name in modules:
+        try:
+            result = benchmark_module(registry, module_name, preprocessed_dir, args.repeat)
+        except Exception as e:
+            print(f"{module_name:<40} ошибка: {e}")
+            continue
+        if not result.pages and not result.errors:
+            continue
+        results.append(result)
+        print(f"{module_name:<40} {result.pages:>5} {result.p50_ms:>8.1f} {result.p95_ms:>8.1f} "
+              f"{result.peak_memory_kb:>9.0f} {result.soup_nodes:>7}")
+        for error in result.errors[:3]:
+            print(f"    ✗ {error[:200]}")
+
+    output_path = Path(args.output)
+    save_results(results, output_path, args.repeat)
+    print(f"\nРезультаты сохранены: {output_path}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(output_path, baseline_path)
+        print(f"Baseline обновлен: {baseline_path}")
+        return
+
+    baseline = load_results(baseline_path)
+    if not baseline:
+        print(f"Baseline не найден ({baseline_path}), сравнение пропущено")
+        return
+
+    regressions = find_regressions(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n✗ Регрессии (порог +{args.threshold:.0%}):")
+        for regression in regressions:
+            print(f"    {regression}")
+        sys.exit(1)
+    print(f"\n✓ Регрессий относительно {baseline_path} нет")
+
+
+if __name__ == "__main__":
+    main()
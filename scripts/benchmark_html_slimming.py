@@ -0,0 +1,61 @@
+"""
+бенчмарк облегчения HTML (utils/html_slimming.py)
+
+Для сохраненных страниц измеряет размер до и после облегчения, время облегчения
+и время разбора BeautifulSoup исходной и облегченной разметки.
+
+Пример:
+    python scripts/benchmark_html_slimming.py --dir parsed --limit 500
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bs4 import BeautifulSoup
+
+from config.config import config
+from utils.html_slimming import slim_html
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк облегчения HTML')
+    parser.add_argument('--dir', type=str, default=config.PARSER_DIR, help='Папка со страницами (рекурсивно *.html)')
+    parser.add_argument('--limit', type=int, default=300, help='Максимум страниц')
+    args = parser.parse_args()
+
+    paths = sorted(Path(args.dir).rglob('*.html'))[:args.limit]
+    if not paths:
+        print(f"В {args.dir} нет HTML файлов")
+        return
+
+    size_before = size_after = 0
+    slim_time = parse_before = parse_after = 0.0
+    for path in paths:
+        markup = path.read_text(encoding='utf-8', errors='replace')
+        slimmed, elapsed = timed(slim_html, markup)
+        slim_time += elapsed
+        parse_before += timed(BeautifulSoup, markup, 'lxml')[1]
+        parse_after += timed(BeautifulSoup, slimmed, 'lxml')[1]
+        size_before += len(markup.encode('utf-8'))
+        size_after += len(slimmed.encode('utf-8'))
+
+    pages = len(paths)
+    print(f"страниц: {pages}")
+    print(f"размер: {size_before / 1024 / pages:,.1f} КБ -> {size_after / 1024 / pages:,.1f} КБ на страницу "
+          f"({100 * (1 - size_after / size_before):.0f}% меньше)")
+    print(f"облегчение: {1000 * slim_time / pages:.1f} мс на страницу")
+    print(f"разбор BeautifulSoup: {1000 * parse_before / pages:.1f} мс -> {1000 * parse_after / pages:.1f} мс на страницу")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+бенчмарк общих функций разбора (utils/recipe_parsing.py) и очистки текста (utils/text_cleaning.py)
+
+Измеряет пропускную способность (строк/с) на синтетическом наборе строк времени и ингредиентов:
+холодный кеш (каждая строка разбирается впервые) и теплый кеш (повторные строки, как на страницах одного сайта).
+clean_text сравнивается с прежней реализацией на re.sub, clean_texts - очистка списков по 20 значений.
+С --legacy сравнивает с parse_ingredient/parse_iso_duration существующего экстрактора.
+
+Пример:
+    python scripts/benchmark_parsing.py --lines 20000 --legacy allrecipes_com
+"""
+
+import re
+import sys
+import html
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import recipe_parsing, text_cleaning
+from src.stages.extract.extractor_registry import ExtractorRegistry
+
+AMOUNTS = ['1', '2', '1/2', '1 1/2', '½', '2-3', '200', '1,5', '3/4', '10']
+UNITS = ['cup', 'cups', 'g', 'tbsp', 'tsp', 'ml', 'cloves', 'oz', 'ст. л.', 'EL', '']
+NAMES = ['flour', 'sugar', 'olive oil', 'garlic, minced', 'chicken breast', 'salt', 'butter, softened', 'мука']
+MARKERS = ['', '', '▢ ', '✓ ', '  ']
+TIMES = ['PT20M', 'PT1H30M', 'P1DT2H', '1 hr 30 mins', '45 minutes', '1h30', '1 час 20 мин', '25']
+
+
+def build_lines(count: int, seed: int = 0) -> tuple[list[str], list[str]]:
+    """Синтетические строки ингредиентов и времени"""
+    rng = random.Random(seed)
+    ingredients = [f"{rng.choice(AMOUNTS)} {rng.choice(UNITS)} {rng.choice(NAMES)}".replace('  ', ' ')
+                   for _ in range(count)]
+    times = [rng.choice(TIMES) for _ in range(count)]
+    return ingredients, times
+
+
+def legacy_clean_text(text: str) -> str:
+    """Прежняя BaseRecipeExtractor.clean_text (re.sub без компиляции, unescape на каждой строке)"""
+    if not text:
+        return text
+    text = html.unescape(text)
+    text = re.sub(r'[▢□✓✔▪▫●○■]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def build_text_lines(ingredients: list[str], seed: int = 0) -> list[str]:
+    """Строки с маркерами списков, сущностями и лишними пробелами, как в get_text() страниц"""
+    rng = random.Random(seed)
+    return [f"{rng.choice(MARKERS)}{line.replace(' ', rng.choice([' ', '  ', chr(10) + ' ']))}"
+            f"{rng.choice([''] * 8 + [' &amp; salt', '&nbsp;'])}" for line in ingredients]
+
+
+def measure(func: Callable, lines: list[str], clear_cache: Callable = None) -> float:
+    """Строк в секунду"""
+    if clear_cache:
+        clear_cache()
+    start = time.perf_counter()
+    for line in lines:
+        func(line)
+    elapsed = time.perf_counter() - start
+    return len(lines) / elapsed if elapsed else 0.0
+
+
+def clear_caches():
+    recipe_parsing.iso_duration_to_minutes.cache_clear()
+    recipe_parsing.time_text_to_minutes.cache_clear()
+    recipe_parsing.quantity_to_float.cache_clear()
+    recipe_parsing._split_ingredient.cache_clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк общих функций разбора рецептов')
+    parser.add_argument('--lines', type=int, default=10000, help='Количество строк каждого вида')
+    parser.add_argument('--legacy', type=str, default=None,
+                        help='Модуль экстрактора для сравнения с его parse_ingredient/parse_iso_duration')
+    args = parser.parse_args()
+
+    ingredients, times = build_lines(args.lines)
+    # уникальные строки - все промахи кеша
+    unique_ingredients = [f"{line} {i}" for i, line in enumerate(ingredients)]
+
+    text_lines = build_text_lines(ingredients)
+    # списки значений одного поля (ингредиенты страницы)
+    text_batches = [text_lines[i:i + 20] for i in range(0, len(text_lines), 20)]
+    batch_rate = measure(text_cleaning.clean_texts, text_batches) * 20
+
+    rows = [
+        ('split_ingredient (cold, unique)', measure(recipe_parsing.split_ingredient, unique_ingredients, clear_caches)),
+        ('split_ingredient (warm)', measure(recipe_parsing.split_ingredient, ingredients)),
+        ('time_text_to_minutes (cold)', measure(recipe_parsing.time_text_to_minutes, times, clear_caches)),
+        ('time_text_to_minutes (warm)', measure(recipe_parsing.time_text_to_minutes, times)),
+        ('clean_text (legacy re.sub)', measure(legacy_clean_text, text_lines)),
+        ('clean_text', measure(text_cleaning.clean_text, text_lines)),
+        ('clean_texts (batches of 20)', batch_rate),
+    ]
+
+    if args.legacy:
+        extractor_class = ExtractorRegistry().get_class(args.legacy)
+        # методы разбора не используют soup, поэтому экземпляр создается без чтения HTML
+        extractor = extractor_class.__new__(extractor_class)
+        if hasattr(extractor, 'parse_ingredient'):
+            rows.append((f'{args.legacy}.parse_ingredient (legacy)', measure(extractor.parse_ingredient, unique_ingredients)))
+        if hasattr(extractor, 'parse_iso_duration'):
+            iso_times = [line for line in times if line.startswith('P')]
+            rows.append((f'{args.legacy}.parse_iso_duration', measure(extractor.parse_iso_duration, iso_times)))
+
+    print(f"{'function':<50} {'lines/s':>12}")
+    print("=" * 63)
+    for name, rate in rows:
+        print(f"{name:<50} {rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
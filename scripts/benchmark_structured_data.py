@@ -0,0 +1,91 @@
+"""
+бенчмарк кеширования структурированных данных (JSON-LD/microdata/RDFa) в экстракторах
+
+Для каждого HTML из preprocessed/<module> измеряет время extract_all без кеша
+(каждый вызов get_structured_recipe заново разбирает JSON-LD, как в старых экстракторах)
+и с кешем на документ. Разбор HTML в BeautifulSoup в замер не входит.
+
+Пример:
+    python scripts/benchmark_structured_data.py --modules allrecipes_com bettycrocker_com --repeat 20
+"""
+
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.config import config
+from src.stages.extract.extractor_registry import ExtractorRegistry
+
+
+def time_extract_all(extractor, use_cache: bool, repeat: int) -> float:
+    """Медианное время extract_all (мс) для уже разобранного документа"""
+    extractor.structured_data_cache = use_cache
+    timings = []
+    for _ in range(repeat):
+        extractor.__dict__.pop('_structured_data', None)
+        start = time.perf_counter()
+        extractor.extract_all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def benchmark_module(registry: ExtractorRegistry, module_name: str, repeat: int) -> tuple[float, float, int]:
+    """
+    Returns:
+        (суммарное время без кеша, суммарное время с кешем, количество страниц)
+    """
+    extractor_class = registry.get_class(module_name)
+    html_files = sorted((Path(config.PARSER_PREPROCESSED_FOLDER) / module_name).glob('*.html'))
+    before_total = after_total = 0.0
+    for html_file in html_files:
+        extractor = extractor_class(str(html_file))
+        before_total += time_extract_all(extractor, use_cache=False, repeat=repeat)
+        after_total += time_extract_all(extractor, use_cache=True, repeat=repeat)
+    return before_total, after_total, len(html_files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк кеша структурированных данных в экстракторах')
+    parser.add_argument('--modules', type=str, nargs='+', default=None,
+                        help='Модули экстракторов (по умолчанию: все, для которых есть preprocessed данные)')
+    parser.add_argument('--repeat', type=int, default=10, help='Количество повторов extract_all на страницу')
+    args = parser.parse_args()
+
+    registry = ExtractorRegistry()
+    preprocessed_dir = Path(config.PARSER_PREPROCESSED_FOLDER)
+    modules = args.modules or [name for name in registry.names() if (preprocessed_dir / name).is_dir()]
+    if not modules:
+        print(f"Нет модулей с тестовыми данными в {preprocessed_dir}")
+        return
+
+    print(f"{'module':<40} {'pages':>5} {'before ms/page':>15} {'after ms/page':>14} {'speedup':>8}")
+    print("=" * 86)
+    total_before = total_after = 0.0
+    total_pages = 0
+    for module_name in modules:
+        try:
+            before, after, pages = benchmark_module(registry, module_name, args.repeat)
+        except Exception as e:
+            print(f"{module_name:<40} ошибка: {e}")
+            continue
+        if pages == 0:
+            continue
+        total_before += before
+        total_after += after
+        total_pages += pages
+        speedup = before / after if after else 0.0
+        print(f"{module_name:<40} {pages:>5} {before / pages:>15.2f} {after / pages:>14.2f} {speedup:>7.2f}x")
+
+    if total_pages:
+        print("=" * 86)
+        speedup = total_before / total_after if total_after else 0.0
+        print(f"{'TOTAL':<40} {total_pages:>5} {total_before / total_pages:>15.2f} "
+              f"{total_after / total_pages:>14.2f} {speedup:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
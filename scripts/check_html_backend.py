@@ -0,0 +1,116 @@
+"""
+проверка совместимости экстракторов с быстрым HTML бэкендом (utils/fast_html.py)
+
+Для каждого HTML из preprocessed/<module> запускает extract_all с BeautifulSoup и с lxml бэкендом
+и сравнивает результаты. Экстрактор можно перевести на lxml (html_backend = "lxml" в классе),
+только если результаты совпали на всех страницах.
+
+Примеры:
+    python scripts/check_html_backend.py --modules allrecipes_com
+    python scripts/check_html_backend.py --declared   # проверка уже переведенных экстракторов (код выхода 1 при расхождении)
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from dataclasses import dataclass, field
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.config import config
+from utils.fast_html import BS4_BACKEND, LXML_BACKEND
+from src.stages.extract.extractor_registry import ExtractorRegistry
+
+
+@dataclass
+class ConformanceResult:
+    """Результат сравнения бэкендов для одного модуля"""
+    module: str
+    pages: int = 0
+    mismatches: list[str] = field(default_factory=list)
+    bs4_seconds: float = 0.0
+    lxml_seconds: float = 0.0
+
+    @property
+    def compatible(self) -> bool:
+        return self.pages > 0 and not self.mismatches
+
+
+def run_extractor(extractor_class, html_path: Path, backend: str) -> tuple[str, float]:
+    """extract_all с заданным бэкендом: (результат JSON или текст ошибки, время в секундах)"""
+    original = extractor_class.__dict__.get('html_backend')
+    extractor_class.html_backend = backend
+    start = time.perf_counter()
+    try:
+        result = json.dumps(extractor_class(str(html_path)).extract_all(), ensure_ascii=False, sort_keys=True,
+                            default=str)
+    except Exception as e:
+        result = f"ошибка: {type(e).__name__}: {e}"
+    finally:
+        if original is None:
+            del extractor_class.html_backend
+        else:
+            extractor_class.html_backend = original
+    return result, time.perf_counter() - start
+
+
+def check_module(registry: ExtractorRegistry, module_name: str) -> ConformanceResult:
+    extractor_class = registry.get_class(module_name)
+    result = ConformanceResult(module=module_name)
+    for html_path in sorted((Path(config.PARSER_PREPROCESSED_FOLDER) / module_name).glob('*.html')):
+        expected, bs4_seconds = run_extractor(extractor_class, html_path, BS4_BACKEND)
+        actual, lxml_seconds = run_extractor(extractor_class, html_path, LXML_BACKEND)
+        result.pages += 1
+        result.bs4_seconds += bs4_seconds
+        result.lxml_seconds += lxml_seconds
+        if expected != actual:
+            result.mismatches.append(html_path.name if not actual.startswith('ошибка') else f"{html_path.name}: {actual}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Проверка экстракторов на совместимость с lxml бэкендом')
+    parser.add_argument('--modules', type=str, nargs='+', default=None,
+                        help='Модули экстракторов (по умолчанию: все, для которых есть preprocessed данные)')
+    parser.add_argument('--declared', action='store_true',
+                        help='Проверить только экстракторы с html_backend = "lxml"')
+    args = parser.parse_args()
+
+    registry = ExtractorRegistry()
+    preprocessed_dir = Path(config.PARSER_PREPROCESSED_FOLDER)
+    modules = args.modules or [name for name in registry.names() if (preprocessed_dir / name).is_dir()]
+    if args.declared:
+        modules = [name for name in modules if registry.get_class(name).html_backend == LXML_BACKEND]
+    if not modules:
+        print(f"Нет модулей для проверки (данные в {preprocessed_dir})")
+        return
+
+    print(f"{'module':<40} {'pages':>5} {'bs4 ms':>9} {'lxml ms':>9} {'status':>12}")
+    print("=" * 79)
+    failed = []
+    for module_name in modules:
+        try:
+            result = check_module(registry, module_name)
+        except Exception as e:
+            print(f"{module_name:<40} ошибка: {e}")
+            failed.append(module_name)
+            continue
+        if result.pages == 0:
+            continue
+        status = 'compatible' if result.compatible else f'{len(result.mismatches)} mismatch'
+        print(f"{module_name:<40} {result.pages:>5} {result.bs4_seconds * 1000 / result.pages:>9.1f} "
+              f"{result.lxml_seconds * 1000 / result.pages:>9.1f} {status:>12}")
+        for mismatch in result.mismatches[:3]:
+            print(f"    {mismatch[:200]}")
+        if not result.compatible:
+            failed.append(module_name)
+
+    if args.declared and failed:
+        print(f"\n✗ Экстракторы с html_backend = 'lxml' расходятся с BeautifulSoup: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
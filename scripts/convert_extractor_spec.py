@@ -0,0 +1,137 @@
+"""
+конвертация экстракторов в декларативные спецификации (extractor/specs/<module>.json) и проверка эквивалентности
+
+Для каждого модуля строится черновик спецификации (src/stages/extract/spec_converter.py), затем модуль и
+спецификация запускаются на всех HTML из preprocessed/<module> и сравниваются по полям. С --write
+сохраняется спецификация только из полей, совпавших на всех страницах. --check сравнивает уже
+сохраненные спецификации с модулями (код выхода 1 при расхождении).
+
+Сайт переходит на спецификацию, когда его модуль удален: при наличии обоих реестр использует модуль.
+
+Примеры:
+    python scripts/convert_extractor_spec.py --modules allrecipes_com
+    python scripts/convert_extractor_spec.py --modules allrecipes_com --write
+    python scripts/convert_extractor_spec.py --check
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from dataclasses import dataclass, field
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.config import config
+from src.stages.extract.extractor_registry import ExtractorRegistry
+from src.stages.extract.extractor_spec import SPEC_DIRNAME, CompiledSpec, ExtractorSpecError, SpecExtractor
+from src.stages.extract.spec_converter import compare_results, convert_extractor_source
+
+
+@dataclass
+class EquivalenceResult:
+    """Результат сравнения модуля и спецификации"""
+    module: str
+    spec: dict
+    pages: int = 0
+    mismatched_fields: set[str] = field(default_factory=set)
+    module_seconds: float = 0.0
+    spec_seconds: float = 0.0
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def matched_fields(self) -> list[str]:
+        return [name for name in self.spec['fields'] if name not in self.mismatched_fields]
+
+
+def run(extractor_class, html_path: Path) -> tuple[dict, float]:
+    start = time.perf_counter()
+    data = extractor_class(str(html_path)).extract_all()
+    return data, time.perf_counter() - start
+
+
+def check_equivalence(registry: ExtractorRegistry, module_name: str, spec: dict) -> EquivalenceResult:
+    result = EquivalenceResult(module=module_name, spec=spec)
+    if not spec['fields']:
+        return result
+    spec_class = type('CheckedSpecExtractor', (SpecExtractor,), {'compiled_spec': CompiledSpec(spec, module_name)})
+    module_class = registry.get_class(module_name)
+
+    for html_path in sorted((Path(config.PARSER_PREPROCESSED_FOLDER) / module_name).glob('*.html')):
+        try:
+            expected, module_seconds = run(module_class, html_path)
+        except Exception as e:
+            result.errors.append(f"{html_path.name}: ошибка модуля {type(e).__name__}: {e}")
+            continue
+        try:
+            actual, spec_seconds = run(spec_class, html_path)
+        except Exception as e:
+            result.errors.append(f"{html_path.name}: ошибка спецификации {type(e).__name__}: {e}")
+            continue
+        result.pages += 1
+        result.module_seconds += module_seconds
+        result.spec_seconds += spec_seconds
+        matches = compare_results(expected, actual, fields=spec['fields'])
+        result.mismatched_fields.update(name for name, matched in matches.items() if not matched)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Конвертация экстракторов в спецификации и проверка эквивалентности')
+    parser.add_argument('--modules', type=str, nargs='+', default=None,
+                        help='Модули экстракторов (по умолчанию: все, для которых есть preprocessed данные)')
+    parser.add_argument('--write', action='store_true', help='Сохранить спецификации из совпавших полей')
+    parser.add_argument('--check', action='store_true', help='Проверить сохраненные спецификации')
+    args = parser.parse_args()
+
+    registry = ExtractorRegistry()
+    extractor_dir = Path(registry.extractor_dir)
+    spec_dir = extractor_dir / SPEC_DIRNAME
+    preprocessed_dir = Path(config.PARSER_PREPROCESSED_FOLDER)
+    modules = args.modules or [name for name in registry.names()
+                               if (preprocessed_dir / name).is_dir() and (extractor_dir / f"{name}.py").exists()]
+    if args.check:
+        modules = [name for name in modules if (spec_dir / f"{name}.json").exists()]
+    if not modules:
+        print(f"Нет модулей для проверки (данные в {preprocessed_dir})")
+        return
+
+    print(f"{'module':<40} {'pages':>5} {'fields':>7} {'matched':>8} {'module ms':>10} {'spec ms':>8}")
+    print("=" * 83)
+    failed = []
+    for module_name in modules:
+        try:
+            if args.check:
+                spec = json.loads((spec_dir / f"{module_name}.json").read_text(encoding='utf-8'))
+            else:
+                spec = convert_extractor_source((extractor_dir / f"{module_name}.py").read_text(encoding='utf-8'))
+            result = check_equivalence(registry, module_name, spec)
+        except (ExtractorSpecError, SyntaxError, ValueError) as e:
+            print(f"{module_name:<40} ошибка: {e}")
+            failed.append(module_name)
+            continue
+
+        pages = max(result.pages, 1)
+        print(f"{module_name:<40} {result.pages:>5} {len(spec['fields']):>7} {len(result.matched_fields):>8} "
+              f"{result.module_seconds * 1000 / pages:>10.1f} {result.spec_seconds * 1000 / pages:>8.1f}")
+        if result.mismatched_fields:
+            print(f"    расходятся: {', '.join(sorted(result.mismatched_fields))}")
+        for error in result.errors[:3]:
+            print(f"    {error[:200]}")
+        if result.mismatched_fields or result.errors or not result.pages:
+            failed.append(module_name)
+
+        if args.write and result.pages and result.matched_fields:
+            spec_dir.mkdir(parents=True, exist_ok=True)
+            matched = {'fields': {name: spec['fields'][name] for name in result.matched_fields}}
+            (spec_dir / f"{module_name}.json").write_text(
+                json.dumps(matched, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+
+    if args.check and failed:
+        print(f"\n✗ Спецификации расходятся с модулями: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
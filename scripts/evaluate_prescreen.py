@@ -0,0 +1,119 @@
+"""
+оценка пре-скрина сырого HTML (src/stages/extract/recipe_prescreen.py) на размеченных страницах из БД
+
+Для страниц с сохраненным HTML считает:
+- долю ложных отрицаний: рецепты (is_recipe=True), которые пре-скрин пропустил бы;
+- долю пропуска: не-рецепты, на которых извлечение не запускалось бы.
+
+Примеры:
+    python scripts/evaluate_prescreen.py
+    python scripts/evaluate_prescreen.py --site-id 12 --no-url   # только признаки в HTML, без паттерна URL
+"""
+
+import re
+import sys
+import argparse
+from pathlib import Path
+from dataclasses import dataclass, field
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.config import config
+from src.repositories.page import PageRepository
+from src.repositories.site import SiteRepository
+from src.stages.extract.recipe_prescreen import RecipePrescreen
+
+
+@dataclass
+class PrescreenStats:
+    """Статистика пре-скрина по одному сайту"""
+    site: str
+    recipes: int = 0
+    false_negatives: int = 0
+    non_recipes: int = 0
+    skipped: int = 0
+    missing_html: int = 0
+    missed_urls: list[str] = field(default_factory=list)
+
+    @property
+    def false_negative_rate(self) -> float:
+        return self.false_negatives / self.recipes if self.recipes else 0.0
+
+    @property
+    def skip_rate(self) -> float:
+        return self.skipped / self.non_recipes if self.non_recipes else 0.0
+
+
+def build_prescreen(site, use_url: bool) -> RecipePrescreen:
+    url_regex = None
+    if use_url and site.pattern:
+        try:
+            url_regex = re.compile(site.pattern)
+        except re.error:
+            url_regex = None
+    return RecipePrescreen.for_extractor(Path(config.EXTRACTOR_FOLDER) / f"{site.name}.py", url_regex=url_regex)
+
+
+def evaluate(site_id: int = None, limit: int = None, use_url: bool = True) -> dict[int, PrescreenStats]:
+    page_repository = PageRepository()
+    site_repository = SiteRepository()
+    stats: dict[int, PrescreenStats] = {}
+    prescreens: dict[int, RecipePrescreen] = {}
+
+    for page in page_repository.get_labeled_pages(site_id=site_id, limit=limit):
+        if page.site_id not in stats:
+            site = site_repository.get_by_id(page.site_id)
+            stats[page.site_id] = PrescreenStats(site=site.name if site else str(page.site_id))
+            prescreens[page.site_id] = build_prescreen(site, use_url) if site else RecipePrescreen()
+        site_stats = stats[page.site_id]
+
+        try:
+            html = Path(page.html_path).read_bytes()
+        except OSError:
+            site_stats.missing_html += 1
+            continue
+
+        has_signal = prescreens[page.site_id].check(html, page.url).has_signal
+        if page.is_recipe:
+            site_stats.recipes += 1
+            if not has_signal:
+                site_stats.false_negatives += 1
+                site_stats.missed_urls.append(page.url)
+        else:
+            site_stats.non_recipes += 1
+            if not has_signal:
+                site_stats.skipped += 1
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Оценка пре-скрина HTML на размеченных страницах")
+    parser.add_argument('--site-id', type=int, default=None, help="Только один сайт")
+    parser.add_argument('--limit', type=int, default=None, help="Максимум страниц")
+    parser.add_argument('--no-url', action='store_true', help="Не учитывать паттерн URL рецептов сайта")
+    parser.add_argument('--show-missed', type=int, default=3, help="Сколько пропущенных рецептов показать на сайт")
+    args = parser.parse_args()
+
+    stats = evaluate(site_id=args.site_id, limit=args.limit, use_url=not args.no_url)
+    total = PrescreenStats(site='ИТОГО')
+
+    print(f"{'сайт':<35} {'рецептов':>9} {'ложн.отр.':>10} {'FNR':>7} {'не-рецептов':>12} {'пропуск':>8}")
+    for site_stats in sorted(stats.values(), key=lambda s: (-s.false_negative_rate, s.site)):
+        print(f"{site_stats.site:<35} {site_stats.recipes:>9} {site_stats.false_negatives:>10} "
+              f"{site_stats.false_negative_rate:>7.1%} {site_stats.non_recipes:>12} {site_stats.skip_rate:>8.1%}")
+        for url in site_stats.missed_urls[:args.show_missed]:
+            print(f"    пропущен: {url}")
+        total.recipes += site_stats.recipes
+        total.false_negatives += site_stats.false_negatives
+        total.non_recipes += site_stats.non_recipes
+        total.skipped += site_stats.skipped
+        total.missing_html += site_stats.missing_html
+
+    print(f"{total.site:<35} {total.recipes:>9} {total.false_negatives:>10} {total.false_negative_rate:>7.1%} "
+          f"{total.non_recipes:>12} {total.skip_rate:>8.1%}")
+    if total.missing_html:
+        print(f"HTML не найден для {total.missing_html} страниц")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@
 """
 
 import sys
+import time
 import logging
 from pathlib import Path
 import argparse
@@ -11,11 +12,16 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 import queue
 from typing import Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 # Добавление корневой директории в PYTHONPATH
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.stages.parse.parse import RecipeParserRunner
+from src.stages.parse.parse import ParseRunResult, RecipeParserRunner
+from src.stages.parse.recrawl_scheduler import RecrawlScheduler
+from src.stages.parse.yield_scheduler import YieldScheduler
+from src.common.chrome_pool import ChromePool
+from utils.async_logging import attach_handlers, release_handlers
+from utils.stage_timing import efficiency_report
 from config.config import config
 
 # Создаем директорию для логов
@@ -68,7 +74,7 @@ def setup_thread_logger(module_name: str, port: int) -> logging.Logger:
     # Уникальное имя логгера для потока
     logger_name = f"parser.{module_name}.{port}"
     thread_logger = logging.getLogger(logger_name)
-    thread_logger.setLevel(logging.INFO)
+    thread_logger.setLevel(config.PARSER_LOG_LEVEL)
     
     # Убираем наследование handlers от root logger
     thread_logger.propagate = False
@@ -77,8 +83,9 @@ def setup_thread_logger(module_name: str, port: int) -> logging.Logger:
     log_file = LOGS_DIR / f"{module_name}_{port}.log"
     
     # FileHandler для записи в файл
-    file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
-    file_handler.setLevel(logging.INFO)
+    # delay: при записи через очередь файл открывает поток-писатель
+    file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8', delay=True)
+    file_handler.setLevel(config.PARSER_LOG_LEVEL)
     
     # StreamHandler для консоли (опционально)
     console_handler = logging.StreamHandler()
@@ -91,13 +98,13 @@ def setup_thread_logger(module_name: str, port: int) -> logging.Logger:
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
     
-    # Добавляем handlers
-    thread_logger.addHandler(file_handler)
-    thread_logger.addHandler(console_handler)
+    # Добавляем handlers (PARSER_ASYNC_LOGGING - через очередь, запись в файл и консоль в отдельном потоке)
+    attach_handlers(thread_logger, [file_handler, console_handler])
     
     return thread_logger
 
-def run_parser_thread(module_name: str, port: int, parser_config: RecipeParserConfig) -> tuple[int, bool]:
+def run_parser_thread(module_name: str, port: int, parser_config: RecipeParserConfig,
+                      max_seconds: Optional[float] = None) -> ParseRunResult:
     """
     Запуск парсера в отдельном потоке с собственным логгером
     
@@ -108,9 +115,10 @@ def run_parser_thread(module_name: str, port: int, parser_config: RecipeParserCo
         max_depth: Максимальная глубина обхода
         max_no_recipe_pages: Максимальное количество страниц без рецептов перед остановкой
         success_page_count_threshold: Минимальное количество страниц с рецептами, чтобы считать сайт успешным (по умолчанию: 15)
+        max_seconds: Квант времени (None = без ограничения), после него проход продолжается с сохраненной очереди
 
     Returns:
-        tuple[bool, bool]: (кол-во полученных новых рецептов, фатальная ли это ошибка)
+        ParseRunResult: кол-во полученных новых рецептов, фатальная ли это ошибка, статистика прохода
     """
     # Создаем отдельный логгер для этого потока
     thread_logger = setup_thread_logger(module_name, port)
@@ -131,17 +139,16 @@ def run_parser_thread(module_name: str, port: int, parser_config: RecipeParserCo
             custom_logger=thread_logger,
             max_no_recipe_pages=parser_config.max_no_recipe_pages,
             success_page_count_threshold=parser_config.success_page_count_threshold, # если собрано больше 15 рецептов, то сайт считается успешным
-            debug_host=config.PARSER_DEFAULT_CHROME_HOST
+            debug_host=config.PARSER_DEFAULT_CHROME_HOST,
+            max_seconds=max_seconds
         )
     except Exception as e:
         thread_logger.error(f"✗ Ошибка при парсинге {module_name}: {e}", exc_info=True)
-        return False, False
+        return ParseRunResult()
     
     finally:
         # Закрываем handlers
-        for handler in thread_logger.handlers[:]:
-            handler.close()
-            thread_logger.removeHandler(handler)
+        release_handlers(thread_logger)
 
 
 def main(module_name: str = "24kitchen_nl", port: int = 9222):
@@ -181,23 +188,37 @@ def run_parallel(ports: list[int], modules: Optional[list[str]], parser_config:
                                                        min_recipes=parser_config.min_recipes_per_module, 
                                                        maximum_parsing_failures=parser_config.max_failed_parsing_attempts)
 
+    # сайты из БД - в порядке планировщика: сначала новые и просроченные (по скорости появления рецептов),
+    # сайты, время повторного обхода которых не наступило, пропускаются
+    recrawl_scheduler = RecrawlScheduler() if config.PARSER_RECRAWL_SCHEDULING else None
     if not modules:
         modules = [site_name for site_name in site_names if site_name in parser.available_extractors]
+        if recrawl_scheduler is not None:
+            modules = recrawl_scheduler.prioritize(modules)
     else:
         extractors = [site_name for site_name in site_names if (site_name not in modules and site_name in parser.available_extractors)]
+        if recrawl_scheduler is not None:
+            extractors = recrawl_scheduler.prioritize(extractors)
         modules.extend(extractors)
     
     logger.info(f"\nВсего модулей: {len(modules)}, Портов: {len(ports)}")
     
-    # Очередь свободных портов
+    # Очередь свободных портов (или пул Chrome, который перезапускает упавшие экземпляры вместо отключения порта)
     free_ports = queue.Queue()
     for port in ports:
         free_ports.put(port)
+    chrome_pool = None
+    if config.PARSER_CHROME_POOL:
+        chrome_pool = ChromePool(ports, host=config.PARSER_DEFAULT_CHROME_HOST)
+        chrome_pool.start()
+
+    def take_port(wait: bool) -> Optional[int]:
+        if chrome_pool is not None:
+            return chrome_pool.acquire(timeout=None if wait else 0)
+        return None if free_ports.empty() else free_ports.get()
     
-    # Очередь модулей для обработки
-    module_queue = queue.Queue()
-    for module in modules:
-        module_queue.put(module)
+    # Порты получают сайты с наибольшей ожидаемой отдачей на квант времени
+    scheduler = YieldScheduler(modules, max_urls=parser_config.max_urls)
     
     # Счетчики результатов
     results = {
@@ -206,67 +227,96 @@ def run_parallel(ports: list[int], modules: Optional[list[str]], parser_config:
         "lock": threading.Lock()
     }
         
-    with ThreadPoolExecutor(max_workers=(len(ports))) as executor:
+    try:
+        with ThreadPoolExecutor(max_workers=(len(ports))) as executor:
+
+            futures = {}
 
-        futures = {}
-        # Создаем futures
-        while not free_ports.empty() and not module_queue.empty():
-            port = free_ports.get()
-            module = module_queue.get()
-            
-            future = executor.submit(
-                run_parser_thread,
-                module,
-                port,
-                parser_config
-            )
-            futures[future] = (module, port)
-            logger.info(f"▶ Запущен: {module} → port {port}")
+            def launch_on_free_ports():
+                """Запуск следующих по отдаче сайтов на всех свободных портах"""
+                while scheduler.has_pending():
+                    # без запущенных задач ждем порт пула (он может быть занят проверкой здоровья)
+                    port = take_port(wait=not futures)
+                    if port is None:
+                        break
+                    module = scheduler.next_site()
+                    stats = scheduler.sites[module]
+                    # лимиты - на весь запуск: кванты сайта делят лимит URL и порог успешности
+                    slice_config = replace(
+                        parser_config,
+                        max_urls=scheduler.remaining_urls(module),
+                        success_page_count_threshold=(
+                            None if parser_config.success_page_count_threshold is None
+                            else max(parser_config.success_page_count_threshold - stats.new_recipes, 0)
+                        )
+                    )
+                    future = executor.submit(
+                        run_parser_thread,
+                        module,
+                        port,
+                        slice_config,
+                        scheduler.slice_seconds
+                    )
+                    futures[future] = (module, port, time.time())
+                    resumed = f" (продолжение, квант {stats.slices + 1})" if stats.slices else ""
+                    logger.info(f"▶ Запущен: {module} → port {port}{resumed}")
+
+            launch_on_free_ports()
     
-        # Обрабатываем завершенные задачи и запускаем новые на освободившихся портах
-        while futures:
-            # Ждем завершения хотя бы одной задачи            
-            for future in as_completed(futures.keys()):
-                module, port = futures.pop(future)
+            # Обрабатываем завершенные кванты и запускаем следующие сайты на освободившихся портах
+            while futures:
+                # Ждем завершения хотя бы одной задачи            
+                for future in as_completed(futures.keys()):
+                    module, port, started_at = futures.pop(future)
                 
-                recipes_count, is_fatal = future.result()
+                    result: ParseRunResult = future.result()
+                    stats = scheduler.record(module, result, time.time() - started_at)
+                    if stats.finished and result.preempted:
+                        # сайт снят планировщиком после прерванного кванта (низкая отдача или лимит URL):
+                        # run_parser порог не проверял - проверяем по рецептам всех квантов
+                        site_orm = parser.site_repository.get_by_name(module)
+                        if site_orm is not None:
+                            parser.check_success_threshold(site_orm.id, stats.new_recipes,
+                                                           parser_config.success_page_count_threshold, logger)
 
-                if recipes_count > 0:
-                    with results["lock"]:
-                        results["success"] += 1
-                        success_count = results["success"]
-                    logger.info(f"✓ Завершен [{success_count}/{len(modules)}]: {module}:{port}")
-                else:
-                    with results["lock"]:
-                        results["failed"] += 1
-                        failed_count = results["failed"]
-                    logger.error(f"✗ Неудача [{failed_count}/{len(modules)}]: {module}:{port}")
+                    if result.preempted and not stats.finished:
+                        logger.info(f"⏸ Квант завершен: {module}:{port}, {stats.new_recipes} рецептов "
+                                    f"({stats.recipes_per_minute:.2f}/мин)")
+                    elif stats.finished and stats.new_recipes > 0:
+                        with results["lock"]:
+                            results["success"] += 1
+                            success_count = results["success"]
+                        logger.info(f"✓ Завершен [{success_count}/{len(modules)}]: {module}:{port}")
+                    elif stats.finished:
+                        with results["lock"]:
+                            results["failed"] += 1
+                            failed_count = results["failed"]
+                        logger.error(f"✗ Неудача [{failed_count}/{len(modules)}]: {module}:{port}")
                 
-                if is_fatal:
-                    logger.error(f"Фатальная ошибка при парсинге {module} на порту {port}. Больше не подключаемся к этому порту.")
-                    module_queue.put(module)  # возвращаем модуль в очередь, чтобы попытаться запустить его на другом порту
-                    continue  # не возвращаем порт в очередь, просто пропускаем этот модуль в будущем
-
-                # Порт освободился → возвращаем в очередь
-                free_ports.put(port)
+                    if chrome_pool is not None:
+                        # после фатальной ошибки экземпляр перезапускается и остается в пуле
+                        chrome_pool.release(port, failed=result.is_fatal)
+                    elif result.is_fatal:
+                        # сайт остается в планировщике и продолжится на другом порту
+                        logger.error(f"Фатальная ошибка при парсинге {module} на порту {port}. Больше не подключаемся к этому порту.")
+                    else:
+                        # Порт освободился → возвращаем в очередь
+                        free_ports.put(port)
                 
-                # Если есть необработанные модули → запускаем на освободившемся порту
-                if not module_queue.empty():
-                    freed_port = free_ports.get()  # берем освободившийся порт
-                    next_module = module_queue.get()
-                    
-                    new_future = executor.submit(
-                        run_parser_thread,
-                        next_module,
-                        freed_port,
-                        parser_config
-                    )
-                    futures[new_future] = (next_module, freed_port)
-                    logger.info(f"▶ Запущен: {next_module} → port {freed_port} (после {module})")
+                    launch_on_free_ports()
                 
-                # Обрабатываем только одну завершенную задачу за итерацию
-                break
+                    # Обрабатываем только одну завершенную задачу за итерацию
+                    break
+    finally:
+        if chrome_pool is not None:
+            chrome_pool.close()
     
+    for line in scheduler.summary():
+        logger.info(f"  {line}")
+    # стоимость нового рецепта по сайтам и узкие места (utils/stage_timing.py)
+    logger.info("Время обхода по сайтам (от самого дорогого нового рецепта):")
+    for line in efficiency_report(config.PARSER_TIMING_REPORT):
+        logger.info(f"  {line}")
     logger.info(f"\n{'='*60}")
     logger.info("ВСЕ ПАРСЕРЫ ЗАВЕРШЕНЫ")
     logger.info(f"Успешно: {results['success']}, Ошибок: {results['failed']}")
@@ -12,6 +12,8 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from src.stages.parse.auto_scraper import AutoScraper
 from src.stages.workflow.copilot_workflow import CopilotWorkflow
+from config.config import config
+from utils.async_logging import attach_handlers, release_handlers
 
 # Создаем директорию для логов
 LOGS_DIR = Path(__file__).parent.parent / "logs"
@@ -52,7 +54,7 @@ def setup_thread_logger(port: int) -> logging.Logger:
     """
     logger_name = f"prepare_site.port_{port}"
     thread_logger = logging.getLogger(logger_name)
-    thread_logger.setLevel(logging.INFO)
+    thread_logger.setLevel(config.PARSER_LOG_LEVEL)
     
     # Убираем наследование handlers от root logger
     thread_logger.propagate = False
@@ -61,8 +63,9 @@ def setup_thread_logger(port: int) -> logging.Logger:
     log_file = LOGS_DIR / f"prepare_site_{port}.log"
     
     # FileHandler для записи в файл
-    file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
-    file_handler.setLevel(logging.INFO)
+    # delay: при записи через очередь файл открывает поток-писатель
+    file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8', delay=True)
+    file_handler.setLevel(config.PARSER_LOG_LEVEL)
     
     # StreamHandler для консоли
     console_handler = logging.StreamHandler()
@@ -75,9 +78,8 @@ def setup_thread_logger(port: int) -> logging.Logger:
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
     
-    # Добавляем handlers
-    thread_logger.addHandler(file_handler)
-    thread_logger.addHandler(console_handler)
+    # Добавляем handlers (PARSER_ASYNC_LOGGING - через очередь, запись в файл и консоль в отдельном потоке)
+    attach_handlers(thread_logger, [file_handler, console_handler])
     
     return thread_logger
 
@@ -123,9 +125,7 @@ def run_one_site_thread(port: int, sites_q: queue.Queue, max_pages: int =60):
     
     finally:
         # Закрываем handlers
-        for handler in thread_logger.handlers[:]:
-            handler.close()
-            thread_logger.removeHandler(handler)
+        release_handlers(thread_logger)
 
 
 def prepare(port: int = 9222, min_unprocessed_sites: int = 150, generate_from_recipes: bool = True, generate_with_gpt: bool = False):
@@ -136,8 +136,8 @@ def prepare(port: int = 9222, min_unprocessed_sites: int = 150, generate_from_re
         target_sites_count=min_unprocessed_sites,
         generate_with_gpt=generate_with_gpt
     )
-    sites = auto_scraper.site_repository.get_unprocessed_sites()
-    for site in sites:
+    sites = [s.to_pydantic() for s in auto_scraper.site_repository.get_unprocessed_sites()]
+    for site in auto_scraper.prescreen_sites(sites):
         auto_scraper.process_one_site(site)
 
 
@@ -177,6 +177,8 @@ def run_parallel_preparation(
     # получаем необходимое количество сайтов для подготовки
     sites = auto_scraper.site_repository.get_unprocessed_sites(random_order=True, limit=target_sites_count)
     sites = [s.to_pydantic() for s in sites]
+    # быстрый отбор по HTTP: в браузер идут только сайты с признаками рецептов
+    sites = auto_scraper.prescreen_sites(sites)
 
     logger.info(f"Всего необработанных сайтов для подготовки: {len(sites)}")
 
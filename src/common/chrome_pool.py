@@ -0,0 +1,331 @@
+"""
+Пул экземпляров Chrome с отладочными портами для параллельного парсинга
+
+Пул сам запускает Chrome (как scripts_bash/run_chrome.sh), проверяет каждый экземпляр через
+отладочный endpoint /json/version и перезапускает упавшие экземпляры и экземпляры, суммарный RSS
+которых (браузер и рендереры) превысил PARSER_CHROME_MAX_RSS_MB. Порты выдаются потокам через аренду:
+acquire()/release() или контекстный менеджер lease(). Порт, на котором воркер получил фатальную
+ошибку, возвращается с failed=True и перезапускается, а не выбывает до конца запуска. Если Chrome на
+порту не поднимается PARSER_CHROME_MAX_RESTARTS раз подряд, экземпляр переезжает на свободный порт,
+так что число рабочих экземпляров остается равным числу запрошенных портов.
+
+Уже запущенный на порту Chrome (например, run_chrome.sh) подхватывается: процесс находится по
+--remote-debugging-port в командной строке. Пул работает только с локальным Chrome.
+"""
+
+import time
+import logging
+import tempfile
+import threading
+import subprocess
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+import psutil
+import requests
+
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+HEALTH_TIMEOUT = 2  # секунды на запрос /json/version
+STARTUP_TIMEOUT = 30  # секунды ожидания готовности после запуска
+PORT_MOVES = 2  # сколько раз экземпляр переезжает на новый порт, прежде чем убирается из пула
+CHROME_ARGS = ('--no-default-browser-check', '--no-sandbox', '--no-first-run')
+
+
+@dataclass
+class ChromeInstance:
+    """Экземпляр Chrome пула"""
+    port: int
+    process: Optional[subprocess.Popen] = None  # None - подхваченный извне экземпляр
+    leased: bool = False
+    restarts: int = 0
+    failed_starts: int = 0  # неудачные запуски подряд
+    started_at: float = field(default_factory=time.time)
+
+
+def find_chrome_process(port: int) -> Optional[psutil.Process]:
+    """Корневой процесс Chrome с указанным отладочным портом"""
+    flag = f'--remote-debugging-port={port}'
+    for process in psutil.process_iter(['cmdline']):
+        try:
+            cmdline = process.info['cmdline'] or []
+            # у рендереров тот же флаг не передается, но на всякий случай берем самый верхний процесс
+            if flag in cmdline and not any(arg.startswith('--type=') for arg in cmdline):
+                return process
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return None
+
+
+def process_tree_rss_mb(process: psutil.Process) -> float:
+    """Суммарный RSS процесса и его потомков (МБ)"""
+    total = 0
+    try:
+        for member in [process] + process.children(recursive=True):
+            try:
+                total += member.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return 0.0
+    return total / (1024 * 1024)
+
+
+def terminate_tree(process: psutil.Process, timeout: float = 10):
+    """Остановка процесса вместе с потомками"""
+    try:
+        members = [process] + process.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return
+    for member in members:
+        try:
+            member.terminate()
+        except psutil.NoSuchProcess:
+            continue
+    _, alive = psutil.wait_procs(members, timeout=timeout)
+    for member in alive:
+        try:
+            member.kill()
+        except psutil.NoSuchProcess:
+            continue
+
+
+class ChromePool:
+    """Аренда портов Chrome с проверкой здоровья и перезапуском"""
+
+    def __init__(self, ports: list[int], chrome_binary: Optional[str] = None, max_rss_mb: Optional[float] = None,
+                 health_interval: Optional[float] = None, max_restarts: Optional[int] = None,
+                 host: str = 'localhost', user_data_root: Optional[str] = None):
+        """
+        Args:
+            ports: порты экземпляров (их число - целевой уровень параллельности)
+            chrome_binary: исполняемый файл Chrome
+            max_rss_mb: порог суммарного RSS экземпляра для перезапуска (0 - без ограничения)
+            health_interval: период фоновой проверки свободных экземпляров (секунды, 0 - без фоновой проверки)
+            max_restarts: неудачных запусков подряд, после которых экземпляр переезжает на другой порт
+            user_data_root: каталог профилей (--user-data-dir=<root>/chrome-debug_<port>)
+        """
+        self.chrome_binary = chrome_binary or config.PARSER_CHROME_BINARY
+        self.max_rss_mb = max_rss_mb if max_rss_mb is not None else config.PARSER_CHROME_MAX_RSS_MB
+        self.health_interval = health_interval if health_interval is not None else config.PARSER_CHROME_HEALTH_INTERVAL
+        self.max_restarts = max_restarts if max_restarts is not None else config.PARSER_CHROME_MAX_RESTARTS
+        self.host = host
+        self.user_data_root = Path(user_data_root or tempfile.gettempdir())
+        self.instances: dict[int, ChromeInstance] = {port: ChromeInstance(port=port) for port in ports}
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+
+    # --- запуск и проверка экземпляров ---
+
+    def is_healthy(self, port: int) -> bool:
+        """Отладочный endpoint отвечает"""
+        try:
+            response = requests.get(f"http://{self.host}:{port}/json/version", timeout=HEALTH_TIMEOUT)
+            return response.status_code == 200
+        except requests.RequestException:
+            return False
+
+    @staticmethod
+    def _process(instance: ChromeInstance) -> Optional[psutil.Process]:
+        """Корневой процесс экземпляра (запущенный пулом или найденный по порту)"""
+        if instance.process is None:
+            return find_chrome_process(instance.port)
+        try:
+            return psutil.Process(instance.process.pid)
+        except psutil.NoSuchProcess:
+            return None
+
+    def rss_mb(self, instance: ChromeInstance) -> float:
+        process = self._process(instance)
+        return process_tree_rss_mb(process) if process is not None else 0.0
+
+    def _launch(self, instance: ChromeInstance) -> bool:
+        """Запуск Chrome на порту экземпляра и ожидание готовности"""
+        user_data_dir = self.user_data_root / f"chrome-debug_{instance.port}"
+        try:
+            instance.process = subprocess.Popen(
+                [self.chrome_binary, f'--remote-debugging-port={instance.port}',
+                 f'--user-data-dir={user_data_dir}', *CHROME_ARGS],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+            )
+        except OSError as e:
+            logger.error(f"Не удалось запустить {self.chrome_binary} на порту {instance.port}: {e}")
+            instance.process = None
+            return False
+        deadline = time.time() + STARTUP_TIMEOUT
+        while time.time() < deadline:
+            if self.is_healthy(instance.port):
+                instance.started_at = time.time()
+                return True
+            if instance.process.poll() is not None:
+                break
+            time.sleep(0.5)
+        logger.error(f"Chrome на порту {instance.port} не ответил за {STARTUP_TIMEOUT}с")
+        return False
+
+    def _stop_instance(self, instance: ChromeInstance):
+        process = self._process(instance)
+        if process is not None:
+            terminate_tree(process)
+        instance.process = None
+
+    def _free_port(self, after: int) -> int:
+        """Первый порт после after, не занятый пулом и не отвечающий"""
+        port = after + 1
+        while port in self.instances or self.is_healthy(port):
+            port += 1
+        return port
+
+    def _restart(self, instance: ChromeInstance, reason: str) -> Optional[ChromeInstance]:
+        """
+        Перезапуск экземпляра (при повторных неудачах - на новом порту)
+
+        Returns:
+            Рабочий экземпляр или None, если Chrome не запустился и на новых портах (экземпляр убран из пула)
+        """
+        logger.warning(f"Перезапуск Chrome на порту {instance.port}: {reason}")
+        try:
+            self._stop_instance(instance)
+        except (psutil.Error, OSError) as e:
+            logger.warning(f"Не удалось остановить Chrome на порту {instance.port}: {e}")
+        for port_move in range(PORT_MOVES + 1):
+            for attempt in range(self.max_restarts):
+                instance.restarts += 1
+                if self._launch(instance):
+                    instance.failed_starts = 0
+                    return instance
+                instance.failed_starts += 1
+                if self._stop.is_set():
+                    return instance
+                time.sleep(min(2 ** attempt, 30))
+            with self._condition:
+                del self.instances[instance.port]
+                if port_move == PORT_MOVES:
+                    break
+                new_port = self._free_port(max(self.instances, default=instance.port))
+                logger.error(f"Chrome на порту {instance.port} не поднимается, переносим на порт {new_port}")
+                instance = ChromeInstance(port=new_port, leased=instance.leased, restarts=instance.restarts)
+                self.instances[new_port] = instance
+        logger.error(f"Chrome не запускается ({self.chrome_binary}), экземпляр убран из пула")
+        return None
+
+    def _check_memory(self, instance: ChromeInstance) -> Optional[ChromeInstance]:
+        """Перезапуск экземпляра, разросшегося сверх max_rss_mb"""
+        if not self.max_rss_mb:
+            return instance
+        rss = self.rss_mb(instance)
+        if rss > self.max_rss_mb:
+            return self._restart(instance, f"RSS {rss:.0f} МБ > {self.max_rss_mb:.0f} МБ")
+        return instance
+
+    def _check(self, instance: ChromeInstance) -> Optional[ChromeInstance]:
+        """Проверка здоровья и памяти, перезапуск при необходимости"""
+        if not self.is_healthy(instance.port):
+            return self._restart(instance, "не отвечает")
+        return self._check_memory(instance)
+
+    def start(self):
+        """Запуск (или подхват уже запущенных) экземпляров и фоновой проверки"""
+        for instance in list(self.instances.values()):
+            if self.is_healthy(instance.port):
+                logger.info(f"Chrome на порту {instance.port} уже запущен, подхватываем")
+            elif not self._launch(instance):
+                self._restart(instance, "не запустился")
+        if self.health_interval:
+            self._monitor = threading.Thread(target=self._monitor_loop, name="chrome-pool", daemon=True)
+            self._monitor.start()
+        logger.info(f"Пул Chrome: {len(self.instances)} экземпляров на портах {sorted(self.instances)}")
+
+    def _monitor_loop(self):
+        while not self._stop.wait(self.health_interval):
+            with self._condition:
+                idle = [instance for instance in self.instances.values() if not instance.leased]
+                # на время проверки экземпляр недоступен для аренды
+                for instance in idle:
+                    instance.leased = True
+            for instance in idle:
+                checked = self._check(instance)
+                with self._condition:
+                    if checked is not None:
+                        checked.leased = False
+                    self._condition.notify_all()
+
+    def close(self):
+        """Остановка фоновой проверки и запущенных пулом экземпляров"""
+        self._stop.set()
+        if self._monitor is not None:
+            self._monitor.join(timeout=HEALTH_TIMEOUT * len(self.instances) + 1)
+        for instance in self.instances.values():
+            if instance.process is not None:
+                self._stop_instance(instance)
+
+    # --- аренда ---
+
+    def _idle_count(self) -> int:
+        return sum(1 for instance in self.instances.values() if not instance.leased)
+
+    def available(self) -> int:
+        """Число свободных экземпляров"""
+        with self._condition:
+            return self._idle_count()
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[int]:
+        """
+        Аренда порта здорового экземпляра
+
+        Args:
+            timeout: ожидание свободного экземпляра (None - без ограничения, 0 - не ждать)
+
+        Returns:
+            Порт или None, если свободного экземпляра не появилось (или в пуле не осталось экземпляров)
+        """
+        while True:
+            with self._condition:
+                if not self._condition.wait_for(lambda: self._idle_count() > 0 or not self.instances, timeout=timeout):
+                    return None
+                if not self.instances:
+                    return None
+                instance = next(instance for instance in self.instances.values() if not instance.leased)
+                instance.leased = True
+            instance = self._check(instance)
+            if instance is not None:
+                return instance.port
+
+    def release(self, port: int, failed: bool = False):
+        """
+        Возврат порта в пул
+
+        Args:
+            port: арендованный порт
+            failed: воркер получил фатальную ошибку браузера - экземпляр перезапускается
+        """
+        instance = self.instances.get(port)
+        if instance is None:
+            return
+        if failed:
+            instance = self._restart(instance, "фатальная ошибка воркера")
+        else:
+            instance = self._check_memory(instance)
+        with self._condition:
+            if instance is not None:
+                instance.leased = False
+            self._condition.notify_all()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[Optional[int]]:
+        """Порт на время блока; исключение внутри блока возвращает порт с перезапуском"""
+        port = self.acquire(timeout=timeout)
+        failed = False
+        try:
+            yield port
+        except Exception:
+            failed = True
+            raise
+        finally:
+            if port is not None:
+                self.release(port, failed=failed)
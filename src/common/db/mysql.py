@@ -10,6 +10,12 @@ from sqlalchemy.exc import SQLAlchemyError
 from config.db_config import MySQLConfig
 logger = logging.getLogger(__name__)
 
+# колонки, добавленные в db/schemas/mysql.sql после создания таблиц: CREATE TABLE IF NOT EXISTS
+# их в существующую БД не добавит, поэтому при подключении они добавляются через ALTER TABLE
+ADDED_COLUMNS: dict[str, list[tuple[str, str]]] = {
+    'pages': [('html_hash', 'CHAR(64) NULL'), ('content_hash', 'CHAR(64) NULL')],
+}
+
 
 class MySQlManager:
     """Менеджер для работы с MySQL"""
@@ -93,12 +99,33 @@ class MySQlManager:
                 conn.commit()
                 
             logger.info("Таблицы созданы или уже существуют")
-            return True
+            return self.add_missing_columns()
         except SQLAlchemyError as e:
             logger.error(f"Ошибка создания таблиц: {e}")
 
         return False
     
+    def add_missing_columns(self) -> bool:
+        """Добавление колонок ADDED_COLUMNS, которых нет в существующих таблицах"""
+        try:
+            inspector = sqlalchemy.inspect(self.engine)
+            tables = set(inspector.get_table_names())
+            with self.engine.connect() as conn:
+                for table, columns in ADDED_COLUMNS.items():
+                    if table not in tables:
+                        continue
+                    existing = {column['name'] for column in inspector.get_columns(table)}
+                    for name, definition in columns:
+                        if name not in existing:
+                            conn.execute(sqlalchemy.text(f"ALTER TABLE {table} ADD COLUMN {name} {definition}"))
+                            logger.info(f"Добавлена колонка {table}.{name}")
+                conn.commit()
+            return True
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка добавления колонок: {e}")
+
+        return False
+
     def get_session(self) -> Session:
         """Получение сессии БД"""
         if not self.local_session and not self.connect():
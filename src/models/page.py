@@ -45,6 +45,10 @@ class PageORM(Base):
     confidence_score = Column(DECIMAL(5, 2), default=0.00)
     is_recipe = Column(Boolean, default=False)
     
+    # Хеши для обнаружения изменений при повторном обходе (utils/content_hash.py)
+    html_hash = Column(String(64))
+    content_hash = Column(String(64))
+    
     # Метаданные
     created_at = Column(TIMESTAMP, server_default=text('CURRENT_TIMESTAMP'))
     
@@ -93,6 +97,8 @@ class PageORM(Base):
             tags=self.tags,
             confidence_score=float(self.confidence_score) if self.confidence_score is not None else None,
             is_recipe=self.is_recipe,
+            html_hash=self.html_hash,
+            content_hash=self.content_hash,
             created_at=self.created_at
         )
     
@@ -185,6 +191,10 @@ class Page(BaseModel):
     confidence_score: Optional[float] = Field(default=float('0.00'))
     is_recipe: Optional[bool] = False
     
+    # Хеши HTML и извлеченного рецепта (utils/content_hash.py)
+    html_hash: Optional[str] = None
+    content_hash: Optional[str] = None
+    
     # Метаданные
     created_at: Optional[datetime] = None
 
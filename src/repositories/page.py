@@ -420,6 +420,33 @@ class PageRepository(BaseRepository[PageORM]):
         finally:
             session.close()
 
+    def update_html_hash(self, page_id: int, html_hash: str, html_path: Optional[str] = None) -> bool:
+        """
+        Обновить только хеш HTML (и путь к файлу) страницы, рецепт которой не изменился
+
+        Args:
+            page_id: ID страницы
+            html_hash: Новый хеш HTML
+            html_path: Новый путь к HTML файлу (None - не менять)
+
+        Returns:
+            True при успехе
+        """
+        values = {PageORM.html_hash: html_hash}
+        if html_path is not None:
+            values[PageORM.html_path] = html_path
+        session = self.get_session()
+        try:
+            session.query(PageORM).filter(PageORM.id == page_id).update(values)
+            session.commit()
+            return True
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Ошибка обновления хеша HTML страницы {page_id}: {e}")
+            return False
+        finally:
+            session.close()
+
     def update_page_language_by_site(self, site_id: int, language: str) -> int:
         """
         Обновить язык для всех страниц определенного сайта
@@ -579,4 +606,131 @@ class PageRepository(BaseRepository[PageORM]):
             existing_page_ids = {row[0] for row in session.query(PageORM.id).filter(PageORM.id.in_(page_ids)).all()}
             return  set(page_ids) - existing_page_ids
         finally:
-            session.close()
\ No newline at end of file
+            session.close()
+
+    def get_labeled_pages(self, site_id: Optional[int] = None, limit: Optional[int] = None) -> List[PageORM]:
+        """
+        Получить страницы с сохраненным HTML и известной разметкой is_recipe (для оценки пре-скрина)
+        
+        Args:
+            site_id: ID сайта (None - все сайты)
+            limit: максимальное количество страниц
+            
+        Returns:
+            Список PageORM
+        """
+        session = self.get_session()
+        try:
+            query = session.query(PageORM).filter(PageORM.html_path != None, PageORM.is_recipe != None)
+            if site_id is not None:
+                query = query.filter(PageORM.site_id == site_id)
+            query = query.order_by(PageORM.id.asc())
+            if limit:
+                query = query.limit(limit)
+            return query.all()
+        finally:
+            session.close()
+
+    def get_non_recipe_urls(self, site_id: int, limit: Optional[int] = None) -> List[str]:
+        """
+        Получить URL страниц сайта, размеченных как не рецепты (is_recipe = FALSE после анализа)
+        
+        Страницы, сохраненные без анализа, имеют confidence_score = 0 и не учитываются.
+        
+        Args:
+            site_id: ID сайта
+            limit: максимальное количество URL
+            
+        Returns:
+            Список URL
+        """
+        session = self.get_session()
+        try:
+            query = session.query(PageORM.url).filter(
+                PageORM.site_id == site_id,
+                PageORM.is_recipe == False,
+                PageORM.confidence_score > 0
+            ).order_by(PageORM.id.asc())
+            if limit:
+                query = query.limit(limit)
+            return [row[0] for row in query.all()]
+        finally:
+            session.close()
+
+    def get_for_title_analysis(self, last_id: int, site_id: Optional[int] = None, limit: int = 500) -> List[PageORM]:
+        """
+        Следующая порция неразмеченных страниц с заголовками (курсор по id, без OFFSET)
+        
+        Args:
+            last_id: id последней обработанной страницы
+            site_id: ID сайта (опционально)
+            limit: размер порции
+            
+        Returns:
+            Список PageORM по возрастанию id
+        """
+        session = self.get_session()
+        try:
+            query = session.query(PageORM).filter(
+                PageORM.id > last_id,
+                PageORM.title.isnot(None),
+                PageORM.is_recipe == False,
+                PageORM.confidence_score == 0,
+                PageORM.pattern != '/'
+            )
+            if site_id:
+                query = query.filter(PageORM.site_id == site_id)
+            return query.order_by(PageORM.id.asc()).limit(limit).all()
+        finally:
+            session.close()
+
+    def get_for_analysis(self, last_id: int, site_id: Optional[int] = None, page_ids: Optional[List[int]] = None,
+                         limit: int = 500) -> List[PageORM]:
+        """
+        Следующая порция страниц с сохраненным HTML для полного анализа (курсор по id, без OFFSET)
+        
+        Args:
+            last_id: id последней обработанной страницы
+            site_id: ID сайта (опционально)
+            page_ids: только эти страницы (опционально)
+            limit: размер порции
+            
+        Returns:
+            Список PageORM по возрастанию id
+        """
+        session = self.get_session()
+        try:
+            query = session.query(PageORM).filter(
+                PageORM.id > last_id,
+                PageORM.html_path.isnot(None),
+                PageORM.pattern != '/'
+            )
+            if page_ids is not None:
+                query = query.filter(PageORM.id.in_(page_ids))
+            if site_id:
+                query = query.filter(PageORM.site_id == site_id)
+            return query.order_by(PageORM.id.asc()).limit(limit).all()
+        finally:
+            session.close()
+
+    def get_labeled_titles(self, limit: Optional[int] = None) -> List[tuple]:
+        """
+        Заголовки и URL страниц, размеченных анализом (confidence_score > 0), для обучения классификатора
+        
+        Args:
+            limit: максимальное количество страниц (последние по id)
+            
+        Returns:
+            Список (title, url, is_recipe)
+        """
+        session = self.get_session()
+        try:
+            query = session.query(PageORM.title, PageORM.url, PageORM.is_recipe).filter(
+                PageORM.title.isnot(None),
+                PageORM.confidence_score > 0
+            ).order_by(PageORM.id.desc())
+            if limit:
+                query = query.limit(limit)
+            return [tuple(row) for row in query.all()]
+        finally:
+            session.close()
@@ -146,3 +146,30 @@ class SearchQueryRepository(BaseRepository[SearchQueryORM]):
             logger.error(f"Ошибка обновления статистики запроса: {e}")
             return False
     
+
+    def mark_as_skipped(self, query_ids: List[int]) -> int:
+        """
+        Пометить запросы как пропущенные (похожи на уже найденные): url_count = -1,
+        такие запросы не считаются неиспользованными и не выбираются для поиска
+        
+        Args:
+            query_ids: ID запросов
+        
+        Returns:
+            Количество обновленных запросов
+        """
+        if not query_ids:
+            return 0
+        session = self.get_session()
+        try:
+            updated = (session.query(SearchQueryORM)
+                       .filter(SearchQueryORM.id.in_(query_ids))
+                       .update({SearchQueryORM.url_count: -1}, synchronize_session=False))
+            session.commit()
+            return updated
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Ошибка пометки запросов {query_ids} как пропущенных: {e}")
+            return 0
+        finally:
+            session.close()
@@ -2,10 +2,11 @@
 Анализ HTML страниц с использованием ChatGPT API для определения полноты данных рецепта
 """
 
+import re
 import json
 import os
+import asyncio
 import logging
-import time
 from pathlib import Path
 from typing import Optional, Any
 from urllib.parse import urlparse
@@ -20,6 +21,9 @@ from src.models.page import PageORM
 from src.repositories.page import PageRepository
 from src.repositories.site import SiteRepository
 from src.common.gpt.client import GPTClient
+from src.stages.analyse.url_pattern_induction import induce_pattern
+from src.stages.analyse.title_classifier import TitleNaiveBayes, TitlePrefilter, pack_batches
+from config.config import config
 from utils.html import extract_text_from_html
 
 # Загрузка переменных окружения
@@ -41,23 +45,11 @@ class RecipeAnalyzer:
         self.gpt_client = GPTClient()
         self.page_repository = PageRepository()
         self.site_repository = SiteRepository()
+        self._title_classifier: Optional[TitleNaiveBayes] = None
         logger.info("RecipeAnalyzer инициализирован")
     
-    def analyze_titles_with_gpt(self, pages: dict[int, dict[str, str]]) -> list[int]:
-        """
-        Быстрый анализ заголовков страниц для определения вероятности рецепта
-        
-        Args:
-            pages: Словарь формата {page_id: {"url": url, "title": title}}
-            
-        Returns:
-            Список page_id, которые вероятно являются рецептами
-        """
-        if not pages:
-            logger.warning("Пустой список страниц для анализа")
-            return []
-    
-        
+    def _titles_prompts(self, pages: dict[int, dict[str, str]]) -> tuple[str, str]:
+        """Промпты анализа заголовков: (system_prompt, user_prompt)"""
         # Создаем текст для анализа (построчно для лучшей читаемости)
         pages_text = json.dumps(pages, indent=2, ensure_ascii=False)
         
@@ -94,15 +86,34 @@ class RecipeAnalyzer:
 - Возвращай массив чисел (ID)
 - Если НЕТ рецептов - верни пустой массив []
 - НЕ включай списки рецептов, категории, служебные страницы"""
+        return system_prompt, user_prompt
+
+    async def async_analyze_titles_with_gpt(self, pages: dict[int, dict[str, str]]) -> list[int]:
+        """
+        Быстрый анализ заголовков страниц для определения вероятности рецепта
+        
+        Args:
+            pages: Словарь формата {page_id: {"url": url, "title": title}}
+            
+        Returns:
+            Список page_id, которые вероятно являются рецептами
+        """
+        if not pages:
+            logger.warning("Пустой список страниц для анализа")
+            return []
 
+        system_prompt, user_prompt = self._titles_prompts(pages)
         try:
-            result = self.gpt_client.request(
+            result = await self.gpt_client.async_request(
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
-                temperature=0.1
+                temperature=0.1,
+                request_timeout=60
             )
             
-            recipe_ids = result.get("recipe_ids", [])
+            # только id из батча (GPT может вернуть id строками)
+            recipe_ids = [int(page_id) for page_id in result.get("recipe_ids", [])
+                          if str(page_id).isdigit() and int(page_id) in pages]
             logger.info(f"GPT определил {len(recipe_ids)} рецептов из {len(pages)} страниц: {recipe_ids}")
             
             return recipe_ids
@@ -110,18 +121,13 @@ class RecipeAnalyzer:
         except Exception as e:
             logger.error(f"Ошибка анализа заголовков: {e}")
             return []
+
+    def analyze_titles_with_gpt(self, pages: dict[int, dict[str, str]]) -> list[int]:
+        """Синхронная обертка над async_analyze_titles_with_gpt"""
+        return asyncio.run(self.async_analyze_titles_with_gpt(pages))
     
-    def analyze_with_gpt(self, page_text: str, url: str) -> dict[str, Any]:
-        """
-        Анализ страницы с использованием ChatGPT API
-        
-        Args:
-            page_text: Текст страницы
-            url: URL страницы (для контекста)
-            
-        Returns:
-            Словарь с результатами анализа
-        """
+    def _page_prompts(self, page_text: str, url: str) -> tuple[str, str]:
+        """Промпты полного анализа страницы: (system_prompt, user_prompt)"""
         system_prompt = "Ты эксперт по анализу веб-страниц с рецептами. Возвращаешь только валидный JSON."
         
         user_prompt = f"""Проанализируй HTML страницу и определи, является ли это страницей рецепта.
@@ -154,7 +160,42 @@ URL: {url}
 - confidence_score зависит от полноты данных (100 = все поля заполнены полностью и это является рецептом)
 - Для времени используй единицы измерения из текста (minutes, hours и т.д.)
 - Возвращай ТОЛЬКО валидный JSON без комментариев, если каких=то полей нет - ставь null в этом поле"""
+        return system_prompt, user_prompt
+
+    async def async_analyze_with_gpt(self, page_text: str, url: str) -> dict[str, Any]:
+        """Асинхронный вариант analyze_with_gpt"""
+        system_prompt, user_prompt = self._page_prompts(page_text, url)
+        try:
+            result = await self.gpt_client.async_request(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                request_timeout=120
+            )
+            
+            logger.info(f"GPT анализ завершен: is_recipe={result.get('is_recipe')}, confidence={result.get('confidence_score')}%")
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Ошибка запроса к GPT: {e}")
+            return {
+                "is_recipe": False,
+                "confidence_score": 0,
+                "error": str(e)
+            }
 
+    def analyze_with_gpt(self, page_text: str, url: str) -> dict[str, Any]:
+        """
+        Анализ страницы с использованием ChatGPT API
+        
+        Args:
+            page_text: Текст страницы
+            url: URL страницы (для контекста)
+            
+        Returns:
+            Словарь с результатами анализа
+        """
+        system_prompt, user_prompt = self._page_prompts(page_text, url)
         try:
             result = self.gpt_client.request(
                 system_prompt=system_prompt,
@@ -244,10 +285,59 @@ URL: {url}
         # Обновление БД
         return self.update_page_analysis(page_id, analysis)
     
+    async def async_analyze_page(self, page_id: int, html_path: str, url: str) -> Optional[bool]:
+        """
+        Полный цикл анализа страницы (асинхронно)
+        
+        Returns:
+            is_recipe после анализа или None, если страницу не удалось проанализировать
+        """
+        if not os.path.exists(html_path):
+            logger.warning(f"Файл не найден: {html_path}")
+            return None
+
+        logger.info(f"Анализ страницы ID {page_id}: {url}")
+        page_text = await asyncio.to_thread(extract_text_from_html, html_path, 30000)
+        if not page_text:
+            logger.warning(f"Не удалось извлечь текст из {html_path}")
+            return None
+
+        analysis = await self.async_analyze_with_gpt(page_text, url)
+        if not await asyncio.to_thread(self.update_page_analysis, page_id, analysis):
+            return None
+        analysis_page = await asyncio.to_thread(self.page_repository.get_by_id, page_id)
+        return bool(analysis_page and analysis_page.is_recipe)
+
+    def get_title_classifier(self) -> Optional[TitleNaiveBayes]:
+        """Классификатор заголовков, обученный на размеченных страницах (один раз на анализатор)"""
+        if self._title_classifier is None:
+            try:
+                examples = self.page_repository.get_labeled_titles(limit=config.PARSER_ANALYSE_CLASSIFIER_EXAMPLES)
+                self._title_classifier = TitleNaiveBayes().fit(examples)
+                logger.info(f"Классификатор заголовков обучен: {self._title_classifier.doc_counts[True]} рецептов, "
+                            f"{self._title_classifier.doc_counts[False]} не рецептов")
+            except Exception as e:
+                logger.warning(f"Классификатор заголовков не обучен: {e}")
+                return None
+        return self._title_classifier
+
+    def _site_regex(self, site_id: Optional[int]) -> Optional[re.Pattern]:
+        site_orm = self.site_repository.get_by_id(site_id) if site_id else None
+        if not site_orm or not site_orm.pattern:
+            return None
+        try:
+            return re.compile(site_orm.pattern)
+        except re.error:
+            return None
+
     def filter_pages_by_titles(self, site_id: Optional[int] = None, limit: Optional[int] = None) -> tuple[list[int], list[int]]:
         """
         Предварительная фильтрация страниц по заголовкам
         
+        Страницы читаются из БД порциями по id. Очевидные случаи решает локальный пре-фильтр
+        (title_classifier.py), остальные заголовки упаковываются в батчи по токенам и
+        отправляются в GPT параллельно (не больше PARSER_ANALYSE_CONCURRENCY запросов).
+        
         Args:
             site_id: ID сайта (опционально)
             limit: Максимальное количество страниц для анализа
@@ -255,50 +345,57 @@ URL: {url}
             Список page_id, которые вероятно являются рецептами, которые не являются рецептами
         
         """
-        session = self.page_repository.get_session()
-        
+        return asyncio.run(self._filter_pages_by_titles_async(site_id=site_id, limit=limit))
+
+    async def _filter_pages_by_titles_async(self, site_id: Optional[int], limit: Optional[int]) -> tuple[list[int], list[int]]:
+        prefilter = None
+        if config.PARSER_ANALYSE_PREFILTER:
+            prefilter = TitlePrefilter(self.get_title_classifier(), url_regex=self._site_regex(site_id))
+        semaphore = asyncio.Semaphore(config.PARSER_ANALYSE_CONCURRENCY)
+        recipe_ids, not_recipe_ids = [], []
+        pending = set()
+        total = local_decided = 0
+
+        async def classify(batch: dict[int, dict[str, str]]):
+            async with semaphore:
+                ids = await self.async_analyze_titles_with_gpt(batch)
+            recipe_ids.extend(ids)
+            not_recipe_ids.extend(set(batch) - set(ids))
+
         try:
-            # Получение всех страниц с заголовками
-            query = session.query(PageORM).filter(
-                PageORM.title.isnot(None),
-                PageORM.is_recipe == False,
-                PageORM.confidence_score == 0,
-                PageORM.pattern != '/'
-            )
-            
-            if site_id:
-                query = query.filter(PageORM.site_id == site_id)
-            
-            if limit:
-                query = query.limit(limit)
+            last_id = 0
+            while not limit or total < limit:
+                chunk_size = config.PARSER_ANALYSE_CHUNK_SIZE if not limit else min(config.PARSER_ANALYSE_CHUNK_SIZE, limit - total)
+                pages = await asyncio.to_thread(self.page_repository.get_for_title_analysis, last_id, site_id, chunk_size)
+                if not pages:
+                    break
+                last_id = pages[-1].id
+                total += len(pages)
+
+                rows = [(page.id, page.title, page.url) for page in pages]
+                if prefilter is not None:
+                    local_recipes, local_not_recipes, rows = prefilter.split(rows)
+                    recipe_ids.extend(local_recipes)
+                    not_recipe_ids.extend(local_not_recipes)
+                    local_decided += len(local_recipes) + len(local_not_recipes)
+
+                for batch in pack_batches(rows, config.PARSER_ANALYSE_TITLE_BATCH_TOKENS,
+                                          config.PARSER_ANALYSE_TITLE_BATCH_SIZE):
+                    pending.add(asyncio.create_task(classify(batch)))
+                # следующую порцию читаем, когда очередь батчей почти разобрана
+                while len(pending) > config.PARSER_ANALYSE_CONCURRENCY:
+                    _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if pending:
+                await asyncio.wait(pending)
 
-            pages: list[PageORM] = query.all()
-            
-            total = len(pages)
-            logger.info(f"Найдено {total} страниц для анализа заголовков")
-
-            pages_to_analyze = {}
-            recipe_ids = []
-            not_recipe_ids = set()
-
-            for num, page in enumerate(pages):
-                not_recipe_ids.add(page.id)
-                pages_to_analyze[page.id] = {"title": page.title, "url": page.url}
-                if len(pages_to_analyze) >= 15 or num == len(pages)-1: # анализируем загоовки батчами по 15 штук
-                    ids = self.analyze_titles_with_gpt(pages_to_analyze)
-                    recipe_ids.extend(ids)
-                    not_recipe_ids.difference_update(ids)
-                    pages_to_analyze = {}
-
-            logger.info(f"После фильтрации по заголовкам осталось {len(recipe_ids)} вероятных рецептов")
-            return recipe_ids, list(not_recipe_ids)
-            
         except Exception as e:
             logger.error(f"Ошибка при анализе заголовков: {e}")
-        finally:
-            session.close()
+            for task in pending:
+                task.cancel()
 
-        return [], list(not_recipe_ids)
+        logger.info(f"Проанализировано {total} заголовков, без GPT решено {local_decided}")
+        logger.info(f"После фильтрации по заголовкам осталось {len(recipe_ids)} вероятных рецептов")
+        return recipe_ids, not_recipe_ids
 
     def analyze_all_pages(self, site_id: Optional[int] = None, limit: Optional[int] = None, 
                           filter_by_title: bool = False, page_ids: list = None, 
@@ -306,17 +403,18 @@ URL: {url}
         """
         Анализ всех страниц (или только указанного сайта)
         
+        Страницы читаются из БД порциями по id и анализируются параллельно
+        (не больше PARSER_ANALYSE_CONCURRENCY запросов к GPT одновременно).
+        
         Args:
             site_id: ID сайта (опционально)
             limit: Максимальное количество страниц для анализа
             filter_by_title: Если True, сначала фильтрует по заголовкам
-            recalculate: Если True, пересчитывает анализ для уже обработанных страниц
             page_ids: Список конкретных page_id для анализа (опционально)
             stop_analyse: Максимальное количество страниц c цептами для анализа, после которых можно прекратить анализ (опционально)
         Returns:
             Количество страниц с рецептами после анализа
         """
-        session = self.page_repository.get_session()
         recipe_page_ids = []
         no_recipe_ids = []
         if filter_by_title:
@@ -328,80 +426,85 @@ URL: {url}
             self.page_repository.mark_as_non_recipes(no_recipe_ids)
             return 0  # Нет страниц для анализа после фильтрации по заголовкам
 
-        
-        try:
-            # Получение страниц для анализа (где еще не проводился анализ)
-            query = session.query(PageORM).filter(
-                PageORM.html_path.isnot(None), PageORM.pattern != '/'
-            )
-
-            if page_ids is not None:
-                query = query.filter(PageORM.id.in_(page_ids))
-            
-            if site_id:
-                query = query.filter(PageORM.site_id == site_id)
-            
-            if limit and not recipe_page_ids and not page_ids:
-                query = query.limit(limit)
+        if limit and (recipe_page_ids or page_ids):
+            limit = None  # лимит только для анализа без списка страниц
+        if recipe_page_ids:
+            allowed = set(page_ids) if page_ids is not None else None
+            page_ids = [page_id for page_id in recipe_page_ids if allowed is None or page_id in allowed]
 
-            if filter_by_title and recipe_page_ids: # фильтрация по ID из заголовков если не удаось получить из заголовка хоть 1 рецепт, то првоеряем все подярд
-                query = query.filter(PageORM.id.in_(recipe_page_ids))
-            
-            pages: list[PageORM] = query.all()
-            
-            total = len(pages)
-            logger.info(f"Найдено {total} страниц для анализа")
-            
-            success_count = 0
-            recipe_count = 0
-            
-            for idx, (page) in enumerate(pages, 1):
-                logger.info(f"\n[{idx}/{total}] Обработка страницы {page.id}")
-                
-                # Проверка существования файла
-                if not os.path.exists(page.html_path):
-                    logger.warning(f"Файл не найден: {page.html_path}")
-                    continue
-                
-                # Анализ страницы
-                if self.analyze_page(page.id, page.html_path, page.url):
-                    success_count += 1
-                    
-                    session.commit()
-                    analysis_page = self.page_repository.get_by_id(page.id)                    
-                    if analysis_page.is_recipe:
-                        recipe_count += 1
-                        if page.id in no_recipe_ids:
-                            no_recipe_ids.remove(page.id) # удаляем из списка не рецептов если успешно проанализировали
-                    else:
-                        if page.id not in no_recipe_ids:
-                            no_recipe_ids.append(page.id) # добавляем в список не рецептов если успешно проанализировали и определили что не рецепт
-
-                    if stop_analyse and recipe_count >= stop_analyse:
-                        logger.info(f"Достигнуто максимальное количество рецептов для анализа: {stop_analyse}. Прекращение анализа.")
-                        break
-                
-                # Пауза между запросами к API
-                if idx < total:
-                    time.sleep(2)  # 2 секунды между запросами
-            
-            self.page_repository.mark_as_non_recipes(no_recipe_ids)
-            logger.info(f"\n{'='*60}")
-            logger.info(f"  Обработано: {success_count}/{total}")
-            logger.info(f"  Найдено рецептов: {recipe_count}")
-            logger.info(f"{'='*60}")
-            return recipe_count
-            
+        try:
+            return asyncio.run(self._analyze_pages_async(site_id=site_id, limit=limit, page_ids=page_ids,
+                                                         stop_analyse=stop_analyse, no_recipe_ids=no_recipe_ids))
         except Exception as e:
             logger.error(f"Ошибка при анализе страниц: {e}")
-        finally:
-            session.close()
         
         return 0
 
+    async def _analyze_pages_async(self, site_id: Optional[int], limit: Optional[int], page_ids: Optional[list],
+                                   stop_analyse: Optional[int], no_recipe_ids: list[int]) -> int:
+        semaphore = asyncio.Semaphore(config.PARSER_ANALYSE_CONCURRENCY)
+        stop = asyncio.Event()
+        no_recipe = set(no_recipe_ids)
+        counts = {'success': 0, 'recipes': 0}
+
+        async def analyse(page: PageORM):
+            async with semaphore:
+                if stop.is_set():
+                    return
+                is_recipe = await self.async_analyze_page(page.id, page.html_path, page.url)
+            if is_recipe is None:
+                return
+            counts['success'] += 1
+            if is_recipe:
+                counts['recipes'] += 1
+                no_recipe.discard(page.id) # удаляем из списка не рецептов если успешно проанализировали
+                if stop_analyse and counts['recipes'] >= stop_analyse and not stop.is_set():
+                    logger.info(f"Достигнуто максимальное количество рецептов для анализа: {stop_analyse}. Прекращение анализа.")
+                    stop.set()
+            else:
+                no_recipe.add(page.id) # добавляем в список не рецептов если успешно проанализировали и определили что не рецепт
+
+        pending = set()
+        total = 0
+        last_id = 0
+        while not stop.is_set() and (not limit or total < limit):
+            chunk_size = config.PARSER_ANALYSE_CHUNK_SIZE if not limit else min(config.PARSER_ANALYSE_CHUNK_SIZE, limit - total)
+            pages = await asyncio.to_thread(self.page_repository.get_for_analysis, last_id, site_id, page_ids, chunk_size)
+            if not pages:
+                break
+            last_id = pages[-1].id
+            total += len(pages)
+            for page in pages:
+                pending.add(asyncio.create_task(analyse(page)))
+            # следующую порцию читаем, когда очередь страниц почти разобрана
+            while len(pending) > config.PARSER_ANALYSE_CONCURRENCY:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        if pending:
+            await asyncio.wait(pending)
+
+        await asyncio.to_thread(self.page_repository.mark_as_non_recipes, list(no_recipe))
+        logger.info(f"\n{'='*60}")
+        logger.info(f"  Обработано: {counts['success']}/{total}")
+        logger.info(f"  Найдено рецептов: {counts['recipes']}")
+        logger.info(f"{'='*60}")
+        return counts['recipes']
+
+    def _save_site_pattern(self, site_id: int, pattern: str):
+        """Сохранение паттерна сайта в БД"""
+        site_orm = self.site_repository.get_by_id(site_id)
+        if site_orm:
+            site_orm.pattern = pattern
+            self.site_repository.update(site_orm)
+            logger.info(f"Паттерн сохранён в БД для сайта ID {site_id}")
+        else:
+            logger.error(f"Сайт ID {site_id} не найден в БД")
+
     def analyse_recipe_page_pattern(self, site_id: int, recalculate: bool = False) -> str:
         """
-        Анализ URL страниц с рецептами и создание regex паттерна с помощью GPT
+        Анализ URL страниц с рецептами и создание regex паттерна
+        
+        Паттерн выводится локально по URL рецептов и страниц-не рецептов сайта
+        (url_pattern_induction.py), GPT используется, если точность или полнота ниже порогов.
         
         Args:
             site_id: ID сайта
@@ -431,6 +534,18 @@ URL: {url}
             urls = [page.url for page in recipe_pages]
             logger.info(f"Найдено {len(urls)} URL с рецептами для анализа паттерна")
             
+            # Сначала локальный вывод паттерна по размеченным страницам, GPT - только если он неточен
+            if config.PARSER_PATTERN_INDUCTION:
+                non_recipe_urls = self.page_repository.get_non_recipe_urls(
+                    site_id, limit=config.PARSER_PATTERN_MAX_NEGATIVES)
+                induced = induce_pattern(urls, non_recipe_urls)
+                if induced.is_reliable():
+                    logger.info(f"Паттерн выведен локально: {induced.summary()}")
+                    pattern = induced.pattern
+                    self._save_site_pattern(site_id, pattern)
+                    return pattern
+                logger.info(f"Локальный паттерн неточен, запрос к GPT: {induced.summary()}")
+            
             # Извлечение только path из URL (без домена)
             paths = []
             for url in urls: 
@@ -496,13 +611,7 @@ URL: {url}
             logger.info(f"\nИтоговый паттерн (комбинированный): {pattern}")
             
             # Сохранение паттерна в БД через репозиторий
-            site_orm = self.site_repository.get_by_id(site_id)
-            if site_orm:
-                site_orm.pattern = pattern
-                self.site_repository.update(site_orm)
-                logger.info(f"Паттерн сохранён в БД для сайта ID {site_id}")
-            else:
-                logger.error(f"Сайт ID {site_id} не найден в БД")
+            self._save_site_pattern(site_id, pattern)
             
         except Exception as e:
             logger.error(f"Ошибка при анализе шаблона страниц с рецептами: {e}")
@@ -0,0 +1,184 @@
+"""
+Локальная классификация страниц по заголовку и URL перед запросами к GPT
+
+Очевидные случаи решаются без GPT:
+- ключевые слова: служебные разделы в URL (/category/, /tag/, /about, ...) и заголовки
+  служебных страниц и подборок ("10 Best Dessert Recipes", "Contact Us") - не рецепт; URL по паттерну
+  рецептов сайта или заголовок со словом "рецепт" в единственном числе - рецепт;
+- наивный байесовский классификатор по словам заголовка и пути URL, обученный на страницах,
+  уже размеченных анализом (PARSER_ANALYSE_PREFILTER_CONFIDENCE - порог уверенности).
+
+Остальные страницы упаковываются в батчи по оценке числа токенов (pack_batches) и отправляются в GPT.
+"""
+
+import re
+import math
+import logging
+from collections import Counter
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+# служебные сегменты пути: страницы с ними не рецепты
+NON_RECIPE_SEGMENTS = {
+    'category', 'categories', 'tag', 'tags', 'author', 'authors', 'about', 'about-us', 'contact', 'contact-us',
+    'contacts', 'privacy', 'privacy-policy', 'terms', 'terms-of-use', 'search', 'login', 'register', 'account',
+    'cart', 'shop', 'feed', 'wp-admin', 'wp-login.php', 'newsletter', 'subscribe', 'sitemap', 'advertise',
+    'kategorie', 'categorie', 'categoria', 'kategoria', 'rubrika', 'tegi', 'avtor',
+}
+_PAGINATION_RE = re.compile(r'/(?:page|seite|pagina|strona)/\d+/?$')
+_NON_RECIPE_TITLE_RE = re.compile(
+    # подборки "10 Best Dessert Recipes", "25 рецептов ...": число в начале и дальше слово списка во множественном числе
+    # ("15 Minute Garlic Noodles Recipe" - рецепт)
+    r'^\s*\d+\b.*\b(?:recipes|ideas|ways|dishes|meals|рецептов|рецепта|идей|блюд|способов|recetas'
+    r'|recettes|idées|rezepte|ideen|ricette|idee|przepisów|pomysłów)\b'
+    r'|\b(?:about us|contact us|privacy policy|terms of (?:use|service)|page not found|search results'
+    r'|о нас|контакты|политика конфиденциальности|страница не найдена)\b',
+    re.IGNORECASE
+)
+# "рецепт" в единственном числе (множественное - обычно категория или подборка)
+_RECIPE_TITLE_RE = re.compile(r'\b(?:recipe|рецепт|receta|recette|rezept|ricetta|przepis|recept|tarifi)\b',
+                              re.IGNORECASE)
+_LIST_TITLE_RE = re.compile(r'\b(?:recipes|рецепты|рецептов|recetas|recettes|rezepte|ricette|przepisy|recepten)\b',
+                            re.IGNORECASE)
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+# оценка токенов GPT без токенизатора: ~4 байта UTF-8 на токен
+BYTES_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text.encode('utf-8')) // BYTES_PER_TOKEN)
+
+
+def page_tokens(title: str, url: str) -> int:
+    """Оценка токенов одной страницы в промпте (JSON с title и url)"""
+    return estimate_tokens(title or '') + estimate_tokens(url or '') + 12
+
+
+def pack_batches(pages: Iterable[tuple[int, str, str]], max_tokens: int, max_items: int) -> list[dict[int, dict]]:
+    """
+    Упаковка страниц в батчи для GPT по оценке токенов
+
+    Args:
+        pages: (page_id, title, url)
+        max_tokens: максимум токенов страниц в батче
+        max_items: максимум страниц в батче
+
+    Returns:
+        Батчи формата {page_id: {"title": title, "url": url}}
+    """
+    batches, batch, batch_tokens = [], {}, 0
+    for page_id, title, url in pages:
+        tokens = page_tokens(title, url)
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_items):
+            batches.append(batch)
+            batch, batch_tokens = {}, 0
+        batch[page_id] = {"title": title, "url": url}
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def keyword_decision(title: str, url: str, url_regex: Optional[re.Pattern] = None) -> Optional[bool]:
+    """
+    Решение по ключевым словам
+
+    Returns:
+        True - рецепт, False - не рецепт, None - неясно
+    """
+    path = urlparse(url).path.lower() if url else ''
+    segments = [segment for segment in path.strip('/').split('/') if segment]
+    if url and not segments:
+        return False  # главная страница
+    if any(segment in NON_RECIPE_SEGMENTS for segment in segments) or _PAGINATION_RE.search(path):
+        return False
+    title = title or ''
+    if _NON_RECIPE_TITLE_RE.search(title):
+        return False
+    if url_regex is not None and url_regex.search(path):
+        return True
+    if _RECIPE_TITLE_RE.search(title) and not _LIST_TITLE_RE.search(title):
+        return True
+    return None
+
+
+def title_features(title: str, url: str) -> list[str]:
+    """Слова заголовка и сегментов пути (с префиксом u:) для классификатора"""
+    words = [word.lower() for word in _TOKEN_RE.findall(title or '')]
+    path = urlparse(url).path if url else ''
+    words.extend(f"u:{word.lower()}" for word in _TOKEN_RE.findall(path) if not word.isdigit())
+    words.append(f"depth:{min(len([s for s in path.split('/') if s]), 5)}")
+    return words
+
+
+class TitleNaiveBayes:
+    """Мультиномиальный наивный байес по словам заголовка и URL"""
+
+    def __init__(self, min_examples: int = 50):
+        self.min_examples = min_examples
+        self.word_counts = {True: Counter(), False: Counter()}
+        self.doc_counts = {True: 0, False: 0}
+
+    def fit(self, examples: Iterable[tuple[str, str, bool]]) -> 'TitleNaiveBayes':
+        for title, url, is_recipe in examples:
+            label = bool(is_recipe)
+            self.doc_counts[label] += 1
+            self.word_counts[label].update(title_features(title, url))
+        return self
+
+    @property
+    def is_trained(self) -> bool:
+        return min(self.doc_counts.values()) >= self.min_examples
+
+    def predict_proba(self, title: str, url: str) -> float:
+        """Вероятность, что страница - рецепт"""
+        vocabulary = len(set(self.word_counts[True]) | set(self.word_counts[False])) or 1
+        total_docs = sum(self.doc_counts.values())
+        log_scores = {}
+        for label in (True, False):
+            total_words = sum(self.word_counts[label].values())
+            score = math.log((self.doc_counts[label] + 1) / (total_docs + 2))
+            for word in title_features(title, url):
+                score += math.log((self.word_counts[label][word] + 1) / (total_words + vocabulary))
+            log_scores[label] = score
+        difference = max(min(log_scores[False] - log_scores[True], 700), -700)
+        return 1 / (1 + math.exp(difference))
+
+
+class TitlePrefilter:
+    """Ключевые слова, затем классификатор; неясные страницы остаются для GPT"""
+
+    def __init__(self, classifier: Optional[TitleNaiveBayes] = None, confidence: Optional[float] = None,
+                 url_regex: Optional[re.Pattern] = None):
+        self.classifier = classifier
+        self.confidence = confidence if confidence is not None else config.PARSER_ANALYSE_PREFILTER_CONFIDENCE
+        self.url_regex = url_regex
+
+    def decide(self, title: str, url: str) -> Optional[bool]:
+        decision = keyword_decision(title, url, self.url_regex)
+        if decision is not None or self.classifier is None or not self.classifier.is_trained:
+            return decision
+        probability = self.classifier.predict_proba(title, url)
+        if probability >= self.confidence:
+            return True
+        if probability <= 1 - self.confidence:
+            return False
+        return None
+
+    def split(self, pages: Iterable[tuple[int, str, str]]) -> tuple[list[int], list[int], list[tuple[int, str, str]]]:
+        """
+        Returns:
+            (id рецептов, id не рецептов, страницы для GPT)
+        """
+        recipe_ids, non_recipe_ids, undecided = [], [], []
+        for page in pages:
+            decision = self.decide(page[1], page[2])
+            if decision is None:
+                undecided.append(page)
+            else:
+                (recipe_ids if decision else non_recipe_ids).append(page[0])
+        return recipe_ids, non_recipe_ids, undecided
@@ -0,0 +1,251 @@
+"""
+Локальный вывод regex паттерна URL рецептов по размеченным страницам сайта
+
+Пути URL рецептов разбиваются на сегменты и группируются по структуре: число сегментов и сегменты,
+повторяющиеся у нескольких рецептов (разделы вроде recipes/, категории). Для каждой группы строится
+паттерн: общие сегменты остаются литералами, остальные обобщаются в класс символов (\\d+, [a-z0-9-]+, ...)
+с общими словами в начале/конце (например [a-z0-9-]+-recipe-\\d+) и общим расширением (.html).
+Из паттернов групп жадно выбирается минимальный набор, покрывающий рецепты, у которого точность
+на страницах, размеченных как не рецепты, не ниже PARSER_PATTERN_MIN_PRECISION.
+
+Чтобы паттерн не запоминал обучающие URL, литерал и общие слова требуют нескольких значений
+(MIN_LITERAL_SUPPORT, MIN_AFFIX_VALUES), паттерн выводится только при PARSER_PATTERN_MIN_URLS
+рецептах и больше, а точность и полнота считаются на отложенной части URL (каждый HOLDOUT_EVERY-й),
+не участвовавшей в выводе.
+
+Паттерны строятся для path без домена (как их проверяет SiteExplorer.is_recipe_url), например
+^/recipes/[a-z0-9-]+/?$. Если точность или полнота ниже порогов, RecipeAnalyzer спрашивает GPT.
+"""
+
+import re
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+# паттерн должен покрывать хотя бы столько рецептов
+MIN_SUPPORT = 2
+# сегмент остается литералом (и выделяет группу путей), только если встречается хотя бы в стольких рецептах
+MIN_LITERAL_SUPPORT = 3
+# общие слова сегмента берутся, только если различных значений не меньше
+# (три URL /recipes/*-soup еще не значат, что все рецепты сайта - супы)
+MIN_AFFIX_VALUES = 5
+# каждый HOLDOUT_EVERY-й URL откладывается для оценки паттерна
+HOLDOUT_EVERY = 4
+EXTENSION_RE = re.compile(r'(.+?)(\.[a-z0-9]{2,5})')
+SEGMENT_CLASSES = (
+    (re.compile(r'\d+'), r'\d+'),
+    (re.compile(r'[a-z0-9-]+'), r'[a-z0-9-]+'),
+    (re.compile(r'[\w-]+'), r'[\w-]+'),
+)
+
+
+def path_segments(url: str) -> list[str]:
+    """Сегменты path URL (без домена, query и крайних слэшей)"""
+    path = urlparse(url).path if '://' in url else url.split('?', 1)[0]
+    return [segment for segment in path.strip('/').split('/') if segment]
+
+
+def segment_class(values: Iterable[str]) -> str:
+    """Самый узкий класс символов, которому соответствуют все значения"""
+    values = list(values)
+    for pattern, regex in SEGMENT_CLASSES:
+        if all(pattern.fullmatch(value) for value in values):
+            return regex
+    return r'[^/]+'
+
+
+def _word(word: str) -> str:
+    return r'\d+' if word.isdigit() else re.escape(word)
+
+
+def _common_words(word_lists: list[list[str]], reverse: bool = False) -> list[str]:
+    common = []
+    for words in zip(*(reversed(words) if reverse else words for words in word_lists)):
+        normalized = {_word(word) for word in words}
+        if len(normalized) != 1:
+            break
+        common.append(normalized.pop())
+    return common[::-1] if reverse else common
+
+
+def generalize_segment(values: list[str]) -> str:
+    """
+    Обобщение значений одной позиции пути
+
+    Общее расширение и общие слова (через '-') в начале и конце сохраняются,
+    середина заменяется классом символов.
+    """
+    if len(set(values)) == 1 and len(values) >= MIN_LITERAL_SUPPORT:
+        return re.escape(values[0])
+    if all(value.isdigit() for value in values):
+        return r'\d+'
+
+    extension = ''
+    matches = [EXTENSION_RE.fullmatch(value) for value in values]
+    if all(matches) and len({match.group(2) for match in matches}) == 1:
+        extension = re.escape(matches[0].group(2))
+        values = [match.group(1) for match in matches]
+
+    prefix, suffix = [], []
+    word_lists = [value.split('-') for value in values]
+    if len(set(values)) >= MIN_AFFIX_VALUES:
+        prefix = _common_words(word_lists)
+        suffix = _common_words(word_lists, reverse=True)
+        # у каждого значения должна остаться непустая середина
+        shortest = min(len(words) for words in word_lists)
+        while prefix and len(prefix) + len(suffix) >= shortest:
+            prefix.pop()
+        while suffix and len(prefix) + len(suffix) >= shortest:
+            suffix.pop(0)
+    middles = ['-'.join(words[len(prefix):len(words) - len(suffix)]) for words in word_lists]
+    parts = prefix + [segment_class(middles)] + suffix
+    return '-'.join(parts) + extension
+
+
+def cluster_pattern(paths: list[list[str]]) -> str:
+    """Паттерн группы путей с одинаковым числом сегментов"""
+    segments = [generalize_segment(list(values)) for values in zip(*paths)]
+    return '^/' + '/'.join(segments) + '/?$'
+
+
+def structural_clusters(paths: list[list[str]]) -> list[list[list[str]]]:
+    """
+    Группы путей по структуре: сначала по числу сегментов, затем по сегментам,
+    которые повторяются у MIN_LITERAL_SUPPORT путей этой длины (разделы, категории)
+    """
+    by_depth: dict[int, list[list[str]]] = defaultdict(list)
+    for segments in paths:
+        by_depth[len(segments)].append(segments)
+
+    clusters = []
+    for group in by_depth.values():
+        clusters.append(group)
+        counts = [Counter(values) for values in zip(*group)]
+        by_key: dict[tuple, list[list[str]]] = defaultdict(list)
+        for segments in group:
+            key = tuple(value if counts[index][value] >= MIN_LITERAL_SUPPORT else None
+                        for index, value in enumerate(segments))
+            by_key[key].append(segments)
+        if len(by_key) > 1:
+            clusters.extend(by_key.values())
+    return clusters
+
+
+@dataclass
+class InducedPattern:
+    """Результат вывода паттерна и его качество на отложенных размеченных страницах"""
+    pattern: str = ''
+    patterns: list[str] = field(default_factory=list)
+    precision: float = 0.0
+    recall: float = 0.0
+    positives: int = 0
+    negatives: int = 0
+    holdout: int = 0  # отложенных рецептов, на которых посчитаны точность и полнота
+
+    def is_reliable(self, min_precision: Optional[float] = None, min_recall: Optional[float] = None) -> bool:
+        min_precision = min_precision if min_precision is not None else config.PARSER_PATTERN_MIN_PRECISION
+        min_recall = min_recall if min_recall is not None else config.PARSER_PATTERN_MIN_RECALL
+        return bool(self.pattern) and self.precision >= min_precision and self.recall >= min_recall
+
+    def summary(self) -> str:
+        return (f"{self.pattern or '-'} (точность {self.precision:.2f}, полнота {self.recall:.2f} "
+                f"на {self.holdout} отложенных, рецептов {self.positives}, не рецептов {self.negatives})")
+
+
+def _match_path(segments: list[str]) -> str:
+    return '/' + '/'.join(segments)
+
+
+def _split_holdout(paths: list[str]) -> tuple[list[str], list[str]]:
+    """Обучающая и отложенная части (каждый HOLDOUT_EVERY-й путь по алфавиту - в отложенную)"""
+    paths = sorted(paths)
+    held_out = paths[HOLDOUT_EVERY - 1::HOLDOUT_EVERY]
+    return [path for index, path in enumerate(paths) if (index + 1) % HOLDOUT_EVERY], held_out
+
+
+def select_patterns(positive_paths: list[str], negative_paths: Iterable[str], min_precision: float,
+                    max_patterns: int) -> list[str]:
+    """Жадный выбор паттернов групп, покрывающих рецепты с точностью не ниже min_precision"""
+    positives = [path_segments(path) for path in positive_paths]
+    negative_paths = list(negative_paths)
+
+    # кандидаты: паттерн -> (покрытые рецепты, число совпавших не рецептов)
+    candidates: dict[str, tuple[set[str], int]] = {}
+    for cluster in structural_clusters(positives):
+        pattern = cluster_pattern(cluster)
+        if pattern in candidates:
+            continue
+        regex = re.compile(pattern)
+        covered = {path for path in positive_paths if regex.search(path)}
+        false_positives = sum(1 for path in negative_paths if regex.search(path))
+        candidates[pattern] = (covered, false_positives)
+
+    uncovered = set(positive_paths)
+    chosen: list[str] = []
+    while uncovered and len(chosen) < max_patterns:
+        best, best_gain = None, 0
+        for pattern, (covered, false_positives) in candidates.items():
+            if pattern in chosen or len(covered) < MIN_SUPPORT:
+                continue
+            if len(covered) / (len(covered) + false_positives) < min_precision:
+                continue
+            gain = len(covered & uncovered)
+            # при равном покрытии - более короткий (более общий по структуре) паттерн
+            if gain > best_gain or (gain == best_gain and gain and len(pattern) < len(best)):
+                best, best_gain = pattern, gain
+        if best is None:
+            break
+        chosen.append(best)
+        uncovered -= candidates[best][0]
+    return chosen
+
+
+def induce_pattern(recipe_urls: Iterable[str], non_recipe_urls: Iterable[str] = (),
+                   min_precision: Optional[float] = None, max_patterns: Optional[int] = None,
+                   min_urls: Optional[int] = None) -> InducedPattern:
+    """
+    Вывод минимального набора паттернов, отделяющего URL рецептов от остальных
+
+    Паттерн выводится на обучающей части URL, точность и полнота считаются на отложенной.
+
+    Args:
+        recipe_urls: URL страниц с рецептами
+        non_recipe_urls: URL страниц, размеченных как не рецепты
+        min_precision: минимальная точность каждого паттерна
+        max_patterns: максимум паттернов в наборе
+        min_urls: минимум различных URL рецептов (меньше - паттерн не выводится)
+
+    Returns:
+        InducedPattern с объединенным паттерном (через |) и его точностью/полнотой
+    """
+    min_precision = min_precision if min_precision is not None else config.PARSER_PATTERN_MIN_PRECISION
+    max_patterns = max_patterns or config.PARSER_PATTERN_MAX_PATTERNS
+    min_urls = min_urls if min_urls is not None else config.PARSER_PATTERN_MIN_URLS
+
+    positive_paths = {_match_path(segments) for segments in map(path_segments, recipe_urls) if segments}
+    negative_paths = {_match_path(path_segments(url)) for url in non_recipe_urls} - positive_paths
+    result = InducedPattern(positives=len(positive_paths), negatives=len(negative_paths))
+    if len(positive_paths) < max(min_urls, HOLDOUT_EVERY):
+        return result
+
+    train_positives, holdout_positives = _split_holdout(list(positive_paths))
+    train_negatives, holdout_negatives = _split_holdout(list(negative_paths))
+    chosen = select_patterns(train_positives, train_negatives, min_precision, max_patterns)
+    if not chosen:
+        return result
+
+    result.patterns = chosen
+    result.pattern = '|'.join(f'({pattern})' for pattern in chosen) if len(chosen) > 1 else chosen[0]
+    combined = re.compile(result.pattern)
+    true_positives = sum(1 for path in holdout_positives if combined.search(path))
+    false_positives = sum(1 for path in holdout_negatives if combined.search(path))
+    result.holdout = len(holdout_positives)
+    result.recall = true_positives / len(holdout_positives)
+    result.precision = true_positives / (true_positives + false_positives) if true_positives else 0.0
+    return result
@@ -0,0 +1,199 @@
+"""
+Бенчмарк экстракторов на preprocessed/<module> и сравнение с сохраненным baseline
+
+Для каждого модуля: p50/p95 времени построения дерева + extract_all, пиковая память (tracemalloc)
+и размер дерева (количество тегов). Сеть во время замеров заблокирована - бенчмарк полностью офлайн.
+"""
+
+import gc
+import json
+import time
+import socket
+import logging
+import tracemalloc
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Iterator, Optional, Type
+
+from extractor.base import BaseRecipeExtractor
+from src.stages.extract.extractor_registry import ExtractorRegistry
+
+logger = logging.getLogger(__name__)
+
+# метрики, по которым ищутся регрессии, и минимальное абсолютное изменение (шум измерений)
+REGRESSION_METRICS = {
+    'p50_ms': 1.0,
+    'p95_ms': 2.0,
+    'peak_memory_kb': 512.0,
+}
+
+
+@dataclass
+class ExtractorBenchmark:
+    """Результат бенчмарка одного экстрактора"""
+    module: str
+    pages: int = 0
+    runs: int = 0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    max_ms: float = 0.0
+    peak_memory_kb: float = 0.0
+    soup_nodes: int = 0
+    html_kb: float = 0.0
+    errors: list[str] = field(default_factory=list)
+
+
+@dataclass
+class Regression:
+    """Ухудшение метрики относительно baseline"""
+    module: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float('inf')
+
+    def __str__(self) -> str:
+        return f"{self.module}: {self.metric} {self.baseline:.1f} -> {self.current:.1f} ({self.ratio:.2f}x)"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Перцентиль с линейной интерполяцией (pct от 0 до 100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+@contextmanager
+def network_disabled() -> Iterator[None]:
+    """Запрещает сетевые соединения (экстракторы должны работать только с локальным HTML)"""
+    def blocked(*args, **kwargs):
+        raise OSError("Сеть отключена во время бенчмарка экстракторов")
+
+    original_connect = socket.socket.connect
+    original_create_connection = socket.create_connection
+    socket.socket.connect = blocked
+    socket.create_connection = blocked
+    try:
+        yield
+    finally:
+        socket.socket.connect = original_connect
+        socket.create_connection = original_create_connection
+
+
+def _count_tags(soup) -> int:
+    return len(soup.find_all(True))
+
+
+def benchmark_page(extractor_class: Type[BaseRecipeExtractor], html_path: Path,
+                   repeat: int) -> tuple[list[float], float, int]:
+    """
+    Замер одной страницы
+
+    Returns:
+        (время каждого прогона в мс, пиковая память в КБ, количество тегов в дереве)
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extractor_class(str(html_path)).extract_all()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # память меряется отдельным прогоном: tracemalloc заметно замедляет выполнение
+    gc.collect()
+    tracemalloc.start()
+    try:
+        extractor = extractor_class(str(html_path))
+        extractor.extract_all()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return timings, peak / 1024, _count_tags(extractor.soup)
+
+
+def benchmark_module(registry: ExtractorRegistry, module_name: str, preprocessed_dir: Path,
+                     repeat: int = 5) -> ExtractorBenchmark:
+    """Бенчмарк экстрактора на всех HTML из preprocessed_dir/<module_name>"""
+    result = ExtractorBenchmark(module=module_name)
+    html_files = sorted((preprocessed_dir / module_name).glob('*.html'))
+    if not html_files:
+        return result
+
+    extractor_class = registry.get_class(module_name)
+    timings: list[float] = []
+    soup_nodes = []
+    with network_disabled():
+        for html_path in html_files:
+            try:
+                page_timings, peak_kb, nodes = benchmark_page(extractor_class, html_path, repeat)
+            except Exception as e:
+                result.errors.append(f"{html_path.name}: {type(e).__name__}: {e}")
+                continue
+            timings.extend(page_timings)
+            soup_nodes.append(nodes)
+            result.peak_memory_kb = max(result.peak_memory_kb, peak_kb)
+            result.html_kb = max(result.html_kb, html_path.stat().st_size / 1024)
+            result.pages += 1
+
+    result.runs = len(timings)
+    result.p50_ms = percentile(timings, 50)
+    result.p95_ms = percentile(timings, 95)
+    result.max_ms = max(timings, default=0.0)
+    result.soup_nodes = max(soup_nodes, default=0)
+    return result
+
+
+def save_results(results: list[ExtractorBenchmark], path: Path, repeat: int):
+    """Сохраняет результаты в JSON: {"created_at", "repeat", "modules": {module: метрики}}"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'repeat': repeat,
+        'modules': {result.module: asdict(result) for result in results},
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def load_results(path: Path) -> dict[str, ExtractorBenchmark]:
+    """Результаты из файла (пустой dict, если файла нет)"""
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {module: ExtractorBenchmark(**values) for module, values in data.get('modules', {}).items()}
+
+
+def find_regressions(current: list[ExtractorBenchmark], baseline: dict[str, ExtractorBenchmark],
+                     threshold: float = 0.25, min_deltas: Optional[dict[str, float]] = None) -> list[Regression]:
+    """
+    Сравнение с baseline
+
+    Args:
+        current: текущие результаты
+        baseline: результаты baseline по модулям
+        threshold: допустимое относительное ухудшение (0.25 = +25%)
+        min_deltas: минимальное абсолютное ухудшение по метрикам (по умолчанию REGRESSION_METRICS)
+
+    Returns:
+        Список регрессий (модули без baseline или без страниц пропускаются)
+    """
+    min_deltas = min_deltas or REGRESSION_METRICS
+    regressions = []
+    for result in current:
+        previous = baseline.get(result.module)
+        if previous is None or not result.pages or not previous.pages:
+            continue
+        for metric, min_delta in min_deltas.items():
+            before, after = getattr(previous, metric), getattr(result, metric)
+            if after - before > min_delta and after > before * (1 + threshold):
+                regressions.append(Regression(result.module, metric, before, after))
+    return regressions
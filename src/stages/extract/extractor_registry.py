@@ -0,0 +1,299 @@
+"""
+Реестр экстракторов: индекс site name -> (модуль, класс, хеш исходника)
+
+Индекс генерируется один раз (без импорта модулей, через разбор AST) и хранится
+в небольшом JSON файле рядом с экстракторами. При старте воркера читается только индекс,
+сами модули импортируются лениво при первом обращении к сайту.
+
+Сайты без модуля могут описываться декларативной спецификацией extractor/specs/<site>.json
+(src/stages/extract/extractor_spec.py); если есть и модуль, и спецификация, используется модуль.
+
+Перегенерация индекса:
+    python src/stages/extract/extractor_registry.py
+"""
+
+import ast
+import os
+import sys
+import json
+import hashlib
+import logging
+import threading
+import importlib.util
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from typing import Any, Optional, Type
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from config.config import config
+from extractor.base import BaseRecipeExtractor
+from src.stages.extract.extractor_spec import SPEC_DIRNAME, spec_extractor_class
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_FILENAME = "registry.json"
+BASE_CLASS_NAME = "BaseRecipeExtractor"
+# файлы в папке экстракторов, которые не являются экстракторами сайтов
+NON_EXTRACTOR_MODULES = {"__init__", "base"}
+
+
+@dataclass
+class ExtractorEntry:
+    """Запись реестра для одного сайта"""
+    module: str
+    class_name: str
+    source_hash: str
+    # False - экстрактор читает узлы, удаляемые облегчением HTML (utils/html_slimming.py)
+    html_slimming: bool = True
+
+
+def get_source_hash(path: Path) -> str:
+    """sha256 исходника модуля экстрактора"""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def find_extractor_class_name(source: str) -> Optional[str]:
+    """
+    Находит имя класса экстрактора в исходнике модуля без его импорта
+
+    Сначала ищется класс, напрямую наследующийся от BaseRecipeExtractor,
+    затем (как в старой логике загрузки) любой публичный класс с "Extractor" в имени
+    """
+    tree = ast.parse(source)
+    classes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+
+    for node in classes:
+        for base in node.bases:
+            base_name = base.id if isinstance(base, ast.Name) else getattr(base, 'attr', None)
+            if base_name == BASE_CLASS_NAME:
+                return node.name
+
+    for node in classes:
+        if 'Extractor' in node.name and not node.name.startswith('_') and node.name != BASE_CLASS_NAME:
+            return node.name
+
+    # модули-алиасы: класс импортирован из другого экстрактора или присвоен новому имени
+    aliases = []
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom):
+            aliases.extend(alias.asname or alias.name for alias in node.names)
+        elif isinstance(node, ast.Assign):
+            aliases.extend(target.id for target in node.targets if isinstance(target, ast.Name))
+    aliases = [name for name in aliases
+               if 'Extractor' in name and not name.startswith('_') and name != BASE_CLASS_NAME]
+    # порядок как у dir(module), которым пользовалась старая загрузка
+    return min(aliases) if aliases else None
+
+
+def find_class_attribute(source: str, class_name: str, attribute: str) -> Any:
+    """Литеральное значение атрибута класса в исходнике (None, если не задан или не литерал)"""
+    for node in ast.parse(source).body:
+        if not (isinstance(node, ast.ClassDef) and node.name == class_name):
+            continue
+        for item in node.body:
+            if (isinstance(item, ast.Assign) and len(item.targets) == 1
+                    and isinstance(item.targets[0], ast.Name) and item.targets[0].id == attribute):
+                try:
+                    return ast.literal_eval(item.value)
+                except ValueError:
+                    return None
+    return None
+
+
+def scan_extractor_module(path: Path) -> Optional[ExtractorEntry]:
+    """Строит запись реестра для одного файла экстрактора"""
+    source = path.read_bytes()
+    try:
+        class_name = find_extractor_class_name(source.decode('utf-8'))
+    except (SyntaxError, UnicodeDecodeError) as e:
+        logger.error(f"Не удалось разобрать модуль экстрактора {path}: {e}")
+        return None
+
+    if class_name is None:
+        logger.warning(f"В модуле {path} не найден класс экстрактора")
+        return None
+
+    return ExtractorEntry(
+        module=path.stem,
+        class_name=class_name,
+        source_hash=hashlib.sha256(source).hexdigest(),
+        html_slimming=find_class_attribute(source.decode('utf-8'), class_name, 'html_slimming') is not False
+    )
+
+
+def build_registry(extractor_dir: str | Path) -> dict[str, ExtractorEntry]:
+    """
+    Сканирует папку экстракторов и строит реестр
+
+    Args:
+        extractor_dir: папка с модулями экстракторов
+
+    Returns:
+        Словарь site name -> ExtractorEntry (имя сайта совпадает с именем модуля)
+    """
+    extractor_dir = Path(extractor_dir)
+    entries: dict[str, ExtractorEntry] = {}
+    for path in sorted(extractor_dir.glob("*.py")):
+        if path.stem in NON_EXTRACTOR_MODULES:
+            continue
+        entry = scan_extractor_module(path)
+        if entry is not None:
+            entries[entry.module] = entry
+    return entries
+
+
+def save_registry(entries: dict[str, ExtractorEntry], registry_path: str | Path):
+    """Сохраняет реестр в JSON (одна компактная строка на сайт для читаемых диффов)"""
+    lines = [
+        f"  {json.dumps(name)}: {json.dumps(asdict(entry), ensure_ascii=False)}"
+        for name, entry in sorted(entries.items())
+    ]
+    with open(registry_path, 'w', encoding='utf-8') as f:
+        f.write("{\n" + ",\n".join(lines) + "\n}\n")
+
+
+def load_registry(registry_path: str | Path) -> dict[str, ExtractorEntry]:
+    """Загружает реестр из JSON файла"""
+    with open(registry_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {name: ExtractorEntry(**entry) for name, entry in data.items()}
+
+
+class ExtractorRegistry:
+    """Реестр экстракторов с ленивой загрузкой классов"""
+
+    def __init__(self, extractor_dir: Optional[str] = None, registry_path: Optional[str] = None,
+                 verify_hashes: bool = True):
+        """
+        Args:
+            extractor_dir: папка с экстракторами (по умолчанию config.EXTRACTOR_FOLDER)
+            registry_path: путь к файлу индекса (по умолчанию <extractor_dir>/registry.json)
+            verify_hashes: сверять хеш исходника с индексом при первой загрузке класса
+        """
+        self.extractor_dir = Path(extractor_dir or config.EXTRACTOR_FOLDER)
+        self.registry_path = Path(registry_path) if registry_path else self.extractor_dir / REGISTRY_FILENAME
+        self.verify_hashes = verify_hashes
+        self._classes: dict[str, Type[BaseRecipeExtractor]] = {}
+        self._lock = threading.Lock()
+
+        if self.registry_path.exists():
+            self.entries = load_registry(self.registry_path)
+        else:
+            logger.warning(f"Индекс экстракторов {self.registry_path} не найден, сканируем {self.extractor_dir}")
+            self.entries = build_registry(self.extractor_dir)
+
+        # модули, добавленные после генерации индекса, индексируем на лету
+        for path in self.extractor_dir.glob("*.py"):
+            if path.stem in NON_EXTRACTOR_MODULES or path.stem in self.entries:
+                continue
+            entry = scan_extractor_module(path)
+            if entry is not None:
+                logger.warning(f"Экстрактор {path.stem} отсутствует в индексе, перегенерируйте {self.registry_path}")
+                self.entries[entry.module] = entry
+
+        # декларативные спецификации сайтов без модуля (компилируются при первом обращении)
+        self.spec_paths: dict[str, Path] = {
+            path.stem: path for path in sorted((self.extractor_dir / SPEC_DIRNAME).glob("*.json"))
+            if path.stem not in self.entries
+        }
+
+    def __contains__(self, site_name: str) -> bool:
+        return site_name in self.entries or site_name in self.spec_paths
+
+    def __len__(self) -> int:
+        return len(self.entries) + len(self.spec_paths)
+
+    def names(self) -> list[str]:
+        """Отсортированный список сайтов, для которых есть экстрактор"""
+        return sorted([*self.entries, *self.spec_paths])
+
+    def get_entry(self, site_name: str) -> Optional[ExtractorEntry]:
+        return self.entries.get(site_name)
+
+    def html_slimming_enabled(self, site_name: str) -> bool:
+        """Можно ли облегчать HTML сайта (сайты без модуля и спецификации работают по JSON-LD и meta)"""
+        entry = self.entries.get(site_name)
+        return entry is None or entry.html_slimming
+
+    def _import_class(self, entry: ExtractorEntry) -> Type[BaseRecipeExtractor]:
+        """Импортирует модуль экстрактора и возвращает класс из индекса"""
+        extractor_path = self.extractor_dir / f"{entry.module}.py"
+        if not extractor_path.exists():
+            raise FileNotFoundError(f"Extractor module not found: {extractor_path}")
+
+        if self.verify_hashes and get_source_hash(extractor_path) != entry.source_hash:
+            logger.warning(f"Исходник {extractor_path} изменился после генерации индекса, обновляем запись")
+            fresh_entry = scan_extractor_module(extractor_path)
+            if fresh_entry is None:
+                raise ImportError(f"No Extractor class found in module: {entry.module}")
+            self.entries[entry.module] = fresh_entry
+            entry = fresh_entry
+
+        spec = importlib.util.spec_from_file_location(entry.module, extractor_path)
+        if spec is None or spec.loader is None:
+            raise ImportError(f"Cannot load module: {entry.module}")
+
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[entry.module] = module
+        spec.loader.exec_module(module)
+
+        extractor_class = getattr(module, entry.class_name, None)
+        if not isinstance(extractor_class, type):
+            raise ImportError(f"Extractor class {entry.class_name} not found in module: {entry.module}")
+        return extractor_class
+
+    def get_class(self, site_name: str) -> Type[BaseRecipeExtractor]:
+        """
+        Возвращает класс экстрактора для сайта, импортируя модуль при первом обращении
+
+        Raises:
+            ValueError: если экстрактора для сайта нет в реестре
+        """
+        extractor_class = self._classes.get(site_name)
+        if extractor_class is not None:
+            return extractor_class
+
+        entry = self.entries.get(site_name)
+        spec_path = self.spec_paths.get(site_name)
+        if entry is None and spec_path is None:
+            raise ValueError(f"No extractor registered for site: {site_name}")
+
+        # потоки парсера могут одновременно запросить один и тот же модуль
+        with self._lock:
+            extractor_class = self._classes.get(site_name)
+            if extractor_class is None:
+                if entry is not None:
+                    extractor_class = self._import_class(entry)
+                else:
+                    extractor_class = spec_extractor_class(site_name, spec_path)
+                self._classes[site_name] = extractor_class
+        return extractor_class
+
+
+_registry: Optional[ExtractorRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_extractor_registry() -> ExtractorRegistry:
+    """Общий реестр экстракторов процесса (индекс читается один раз)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ExtractorRegistry()
+    return _registry
+
+
+def main():
+    extractor_dir = Path(config.EXTRACTOR_FOLDER)
+    entries = build_registry(extractor_dir)
+    registry_path = extractor_dir / REGISTRY_FILENAME
+    save_registry(entries, registry_path)
+    print(f"✓ Индекс экстракторов сохранен: {registry_path} ({len(entries)} модулей)")
+
+
+if __name__ == "__main__":
+    os.chdir(Path(__file__).parent.parent.parent.parent)
+    main()
@@ -0,0 +1,238 @@
+"""
+Декларативные спецификации экстракторов, компилируемые в программы XPath
+
+Спецификация сайта - JSON файл extractor/specs/<site>.json. Для каждого поля задаются правила
+(селектор, источник значения, очистка), которые проверяются по порядку: первое непустое значение
+побеждает. Спецификация компилируется один раз: CSS переводится в XPath (utils/fast_html.css_to_xpath),
+выражения etree.XPath и регулярные выражения создаются при загрузке, а извлечение идет по дереву lxml
+без BeautifulSoup.
+
+Формат:
+    {
+      "fields": {
+        "dish_name": [
+          {"css": "h1.entry-title"},
+          {"css": "meta[property='og:title']", "attr": "content", "clean": [["sub", "\\\\s*\\\\|.*$", ""]]}
+        ],
+        "ingredients": {"rules": [{"css": "ul.ingredients li", "all": true}], "format": "ingredients"},
+        "instructions": {"rules": [{"xpath": "//ol[@class='steps']/li", "all": true}], "format": "steps"},
+        "tags": {"rules": [{"css": "a[rel~=tag]", "all": true}], "format": "join", "separator": ", "},
+        "total_time": [{"css": "meta[itemprop=totalTime]", "attr": "content", "clean": ["iso_minutes"]}],
+        "description": {"rules": [{"css": "div.intro p"}], "clean": ["lower"]}
+      }
+    }
+
+Правило: "css" или "xpath" (XPath может сразу выбирать значения: //meta/@content), "attr" - значение
+атрибута вместо текста, "all" - все совпадения вместо первого, "separator" - разделитель строк текста
+элемента (по умолчанию " "), "clean" - операции над каждым значением.
+Поле: "rules", "format" (text, ingredients, steps, join), "separator" для join, "clean" - операции
+над итоговым значением.
+Операции очистки: "lower", "upper", "strip", ["sub", шаблон, замена], ["extract", шаблон] (группа 1 или
+все совпадение), "iso_minutes" и "text_minutes" (время в минуты, необязательный стиль format_minutes).
+"""
+
+import re
+import json
+import logging
+from pathlib import Path
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional, Union
+
+from lxml import etree
+
+from extractor.base import BaseRecipeExtractor, REQUIRED_FIELDS
+from utils import recipe_parsing
+from utils.fast_html import LxmlDocument, css_to_xpath
+
+logger = logging.getLogger(__name__)
+
+SPEC_DIRNAME = "specs"
+# поля результата экстрактора (parser_prompt.md)
+OUTPUT_FIELDS = (
+    'dish_name', 'description', 'ingredients', 'instructions', 'nutrition_info', 'category',
+    'prep_time', 'cook_time', 'total_time', 'notes', 'tags', 'image_urls',
+)
+FIELD_FORMATS = ('text', 'ingredients', 'steps', 'join')
+_NUMBERED_STEP_RE = re.compile(r'^\d+\.')
+
+Operation = Callable[[str], Optional[str]]
+
+
+class ExtractorSpecError(ValueError):
+    """Ошибка в спецификации экстрактора"""
+
+
+def _compile_operation(operation: Union[str, list]) -> Operation:
+    """Операция очистки -> функция str -> str | None"""
+    name, *args = operation if isinstance(operation, list) else [operation]
+    if name == 'lower':
+        return str.lower
+    if name == 'upper':
+        return str.upper
+    if name == 'strip':
+        return str.strip
+    if name == 'sub' and len(args) == 2:
+        pattern, replacement = re.compile(args[0]), args[1]
+        return lambda value: pattern.sub(replacement, value)
+    if name == 'extract' and len(args) == 1:
+        pattern = re.compile(args[0])
+
+        def extract(value: str) -> Optional[str]:
+            match = pattern.search(value)
+            if not match:
+                return None
+            return match.group(1) if pattern.groups else match.group(0)
+        return extract
+    if name in ('iso_minutes', 'text_minutes') and len(args) <= 1:
+        to_minutes = (recipe_parsing.iso_duration_to_minutes if name == 'iso_minutes'
+                      else recipe_parsing.time_text_to_minutes)
+        style = args[0] if args else 'minutes'
+        return lambda value: recipe_parsing.format_minutes(to_minutes(value), style)
+    raise ExtractorSpecError(f"Неизвестная операция очистки: {operation}")
+
+
+def _apply(operations: list[Operation], value: Optional[str]) -> Optional[str]:
+    for operation in operations:
+        if not value:
+            return None
+        value = operation(value)
+    return value or None
+
+
+class CompiledRule:
+    """Одно правило поля: скомпилированный XPath, источник значения и очистка"""
+
+    def __init__(self, rule: dict):
+        if not isinstance(rule, dict) or ('css' in rule) == ('xpath' in rule):
+            raise ExtractorSpecError(f"Правило должно содержать ровно один из ключей css/xpath: {rule}")
+        try:
+            self.path = rule['xpath'] if 'xpath' in rule else css_to_xpath(rule['css'])
+            self.xpath = etree.XPath(self.path)
+        except (ValueError, etree.XPathSyntaxError) as e:
+            raise ExtractorSpecError(f"Неверный селектор в правиле {rule}: {e}") from e
+        self.attr: Optional[str] = rule.get('attr')
+        self.all: bool = bool(rule.get('all', False))
+        self.separator: str = rule.get('separator', ' ')
+        self.operations = [_compile_operation(operation) for operation in rule.get('clean', [])]
+
+    def _value(self, item) -> Optional[str]:
+        if isinstance(item, str):
+            text = item
+        elif self.attr:
+            text = item.get(self.attr)
+            if isinstance(text, list):
+                text = ' '.join(text)
+        else:
+            text = item.get_text(separator=self.separator, strip=True)
+        return _apply(self.operations, BaseRecipeExtractor.clean_text(text) if text else None)
+
+    def evaluate(self, document: LxmlDocument) -> list[str]:
+        values = []
+        for item in document.xpath(self.xpath):
+            value = self._value(item)
+            if value:
+                values.append(value)
+                if not self.all:
+                    break
+        return values
+
+
+class CompiledField:
+    """Поле спецификации: правила-фолбэки, формат и итоговая очистка"""
+
+    def __init__(self, name: str, definition: Union[list, dict]):
+        if isinstance(definition, list):
+            definition = {'rules': definition}
+        if not isinstance(definition, dict) or not definition.get('rules'):
+            raise ExtractorSpecError(f"Поле {name}: нужен непустой список правил")
+        self.name = name
+        self.rules = [CompiledRule(rule) for rule in definition['rules']]
+        self.format = definition.get('format', 'text')
+        if self.format not in FIELD_FORMATS:
+            raise ExtractorSpecError(f"Поле {name}: неизвестный формат {self.format}")
+        self.separator = definition.get('separator', ', ')
+        self.operations = [_compile_operation(operation) for operation in definition.get('clean', [])]
+
+    def _format(self, values: list[str]) -> Optional[str]:
+        if self.format == 'ingredients':
+            ingredients = [parsed for parsed in map(recipe_parsing.split_ingredient, values) if parsed]
+            return json.dumps(ingredients, ensure_ascii=False) if ingredients else None
+        if self.format == 'steps':
+            if not _NUMBERED_STEP_RE.match(values[0]):
+                values = [f"{idx}. {value}" for idx, value in enumerate(values, 1)]
+            return ' '.join(values)
+        if self.format == 'join':
+            return self.separator.join(values)
+        return ' '.join(values)
+
+    def extract(self, document: LxmlDocument) -> Optional[str]:
+        for rule in self.rules:
+            values = rule.evaluate(document)
+            if values:
+                return _apply(self.operations, self._format(values))
+        return None
+
+
+class CompiledSpec:
+    """Скомпилированная спецификация сайта"""
+
+    def __init__(self, spec: dict, name: str = ''):
+        fields = spec.get('fields') if isinstance(spec, dict) else None
+        if not isinstance(fields, dict) or not fields:
+            raise ExtractorSpecError(f"Спецификация {name}: нет раздела fields")
+        unknown = set(fields) - set(OUTPUT_FIELDS)
+        if unknown:
+            raise ExtractorSpecError(f"Спецификация {name}: неизвестные поля {sorted(unknown)}")
+        self.name = name
+        self.fields = {field: CompiledField(field, definition) for field, definition in fields.items()}
+
+    def extract(self, document: LxmlDocument, fields: Iterable[str] = OUTPUT_FIELDS) -> dict[str, Any]:
+        """Значения полей (None для полей без правил или без совпадений)"""
+        return {field: self.fields[field].extract(document) if field in self.fields else None
+                for field in fields}
+
+
+@lru_cache(maxsize=512)
+def _load_spec(path: str, mtime: float) -> CompiledSpec:
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            spec = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ExtractorSpecError(f"Спецификация {path} не является JSON: {e}") from e
+    return CompiledSpec(spec, name=Path(path).stem)
+
+
+def load_spec(path: Union[str, Path]) -> CompiledSpec:
+    """Загрузка и компиляция спецификации (кешируется до изменения файла)"""
+    path = Path(path)
+    return _load_spec(str(path), path.stat().st_mtime)
+
+
+class SpecExtractor(BaseRecipeExtractor):
+    """Экстрактор по скомпилированной спецификации (дерево всегда lxml)"""
+
+    compiled_spec: CompiledSpec = None
+
+    def __init__(self, html_path: str):
+        self.html_path = html_path
+        with open(html_path, 'r', encoding='utf-8') as f:
+            self.soup = LxmlDocument(self.prepare_markup(f.read()))
+        self._values: dict[str, Any] = {}
+
+    def _extract(self, fields: Iterable[str]) -> dict[str, Any]:
+        missing = [field for field in fields if field not in self._values]
+        if missing:
+            self._values.update(self.compiled_spec.extract(self.soup, missing))
+        return {field: self._values[field] for field in fields}
+
+    def extract_required(self) -> Optional[dict]:
+        return self._extract(REQUIRED_FIELDS)
+
+    def extract_all(self) -> dict:
+        return self._extract(OUTPUT_FIELDS)
+
+
+def spec_extractor_class(site_name: str, spec_path: Union[str, Path]) -> type[SpecExtractor]:
+    """Класс экстрактора сайта по файлу спецификации"""
+    class_name = ''.join(part.capitalize() for part in site_name.split('_')) + 'SpecExtractor'
+    return type(class_name, (SpecExtractor,), {'compiled_spec': load_spec(spec_path)})
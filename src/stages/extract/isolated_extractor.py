@@ -0,0 +1,217 @@
+"""
+Изолированное извлечение рецептов с бюджетом времени и памяти
+
+Экстрактор выполняется в отдельном процессе-воркере. Воркер ограничен по процессорному времени
+(RLIMIT_CPU на каждую задачу) и памяти (RLIMIT_AS), родитель дополнительно ждет ответ не дольше бюджета.
+При превышении воркер убивается и перезапускается при следующей задаче, страница и экстрактор
+записываются в журнал, а экстрактор, превысивший бюджет несколько раз подряд, уходит в карантин.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import multiprocessing
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Optional
+
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+BREACH_TIMEOUT = 'timeout'
+BREACH_MEMORY = 'memory'
+BREACH_CRASH = 'crash'
+# запас времени на запуск воркера (spawn и импорт зависимостей) для первой задачи после старта
+WORKER_STARTUP_SECONDS = 15
+
+
+class ExtractionError(Exception):
+    """Ошибка извлечения в воркере (исключение экстрактора или превышение бюджета)"""
+
+    def __init__(self, message: str, breach: Optional[str] = None):
+        super().__init__(message)
+        self.breach = breach
+
+
+def _apply_cpu_budget(resource, cpu_seconds: float):
+    """Мягкий лимит процессорного времени = уже израсходованное + бюджет задачи (SIGXCPU завершает воркер)"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime + cpu_seconds) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(conn, extractor_dir: str, memory_budget_mb: int):
+    """Цикл воркера: (module_name, html_path, cpu_budget) -> ('ok', data) | ('error', текст) | ('memory', текст)"""
+    try:
+        import resource
+    except ImportError:  # не POSIX: работает только ограничение по времени ожидания в родителе
+        resource = None
+
+    if resource is not None and memory_budget_mb:
+        limit = memory_budget_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    from src.stages.extract.extractor_registry import ExtractorRegistry
+    registry = ExtractorRegistry(extractor_dir=extractor_dir)
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+
+        module_name, html_path, cpu_budget = task
+        if resource is not None and cpu_budget:
+            _apply_cpu_budget(resource, cpu_budget)
+        try:
+            data = registry.get_class(module_name)(html_path).extract_staged()
+            conn.send(('ok', data))
+        except MemoryError:
+            conn.send((BREACH_MEMORY, f"превышен бюджет памяти {memory_budget_mb} МБ"))
+            break
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}"))
+    conn.close()
+
+
+class IsolatedExtractor:
+    """
+    Запуск экстракторов в отдельном процессе с бюджетом времени и памяти
+
+    Один экземпляр обслуживает один поток парсера (задачи выполняются последовательно).
+    """
+
+    def __init__(self, extractor_dir: Optional[str] = None, time_budget: Optional[float] = None,
+                 memory_budget_mb: Optional[int] = None, quarantine_after: Optional[int] = None,
+                 breach_log_path: Optional[str] = None):
+        """
+        Args:
+            extractor_dir: директория экстракторов (по умолчанию config.EXTRACTOR_FOLDER)
+            time_budget: бюджет на одну страницу в секундах (процессорное время и ожидание ответа)
+            memory_budget_mb: лимит адресного пространства воркера в МБ (0 - без лимита)
+            quarantine_after: после скольких превышений подряд экстрактор уходит в карантин
+            breach_log_path: JSONL журнал превышений (по умолчанию <PARSER_LOG_FOLDER>/extraction_breaches.jsonl)
+        """
+        self.extractor_dir = str(extractor_dir or config.EXTRACTOR_FOLDER)
+        self.time_budget = time_budget if time_budget is not None else config.PARSER_EXTRACT_TIME_BUDGET
+        self.memory_budget_mb = (memory_budget_mb if memory_budget_mb is not None
+                                 else config.PARSER_EXTRACT_MEMORY_BUDGET_MB)
+        self.quarantine_after = (quarantine_after if quarantine_after is not None
+                                 else config.PARSER_EXTRACT_QUARANTINE_AFTER)
+        self.breach_log_path = Path(breach_log_path or os.path.join(config.PARSER_LOG_FOLDER,
+                                                                    'extraction_breaches.jsonl'))
+        self.breach_counts: dict[str, int] = {}
+        self.quarantined: set[str] = set()
+        self._process: Optional[multiprocessing.Process] = None
+        self._conn = None
+        self._lock = threading.Lock()
+        # spawn: родительский процесс многопоточный (потоки парсера, selenium), fork небезопасен
+        self._context = multiprocessing.get_context('spawn')
+
+    def _start_worker(self):
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.extractor_dir, self.memory_budget_mb),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+    def _stop_worker(self, kill: bool = False):
+        """Останавливает воркер (kill - без ожидания, при превышении бюджета)"""
+        if self._process is None:
+            return
+        try:
+            if not kill and self._process.is_alive():
+                self._conn.send(None)
+                self._process.join(timeout=5)
+        except (OSError, BrokenPipeError):
+            pass
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join(timeout=5)
+        self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def _record_breach(self, module_name: str, html_path: str, breach: str, message: str):
+        """Запись превышения в журнал и учет для карантина"""
+        count = self.breach_counts.get(module_name, 0) + 1
+        self.breach_counts[module_name] = count
+        logger.warning(f"Экстрактор {module_name}: {message} на {html_path} (превышений подряд: {count})")
+        if self.quarantine_after and count >= self.quarantine_after:
+            self.quarantined.add(module_name)
+            logger.error(f"Экстрактор {module_name} помещен в карантин после {count} превышений бюджета подряд")
+
+        try:
+            self.breach_log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.breach_log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({
+                    'time': datetime.now().isoformat(timespec='seconds'),
+                    'module': module_name,
+                    'html_path': html_path,
+                    'breach': breach,
+                    'message': message,
+                    'quarantined': module_name in self.quarantined,
+                }, ensure_ascii=False) + '\n')
+        except OSError as e:
+            logger.error(f"Не удалось записать журнал превышений {self.breach_log_path}: {e}")
+
+    def is_quarantined(self, module_name: str) -> bool:
+        return module_name in self.quarantined
+
+    def extract(self, module_name: str, html_path: str) -> dict[str, Any]:
+        """
+        Извлечение данных рецепта в воркере
+
+        Raises:
+            ExtractionError: исключение в экстракторе, превышение бюджета или экстрактор в карантине
+        """
+        if module_name in self.quarantined:
+            raise ExtractionError(f"экстрактор {module_name} в карантине")
+
+        with self._lock:
+            timeout = self.time_budget or None
+            if self._process is None or not self._process.is_alive():
+                self._stop_worker(kill=True)
+                self._start_worker()
+                timeout = timeout and timeout + WORKER_STARTUP_SECONDS
+
+            start = time.monotonic()
+            try:
+                self._conn.send((module_name, html_path, self.time_budget))
+                ready = self._conn.poll(timeout)
+                status, payload = self._conn.recv() if ready else (BREACH_TIMEOUT, None)
+            except (EOFError, OSError, BrokenPipeError):
+                status, payload = BREACH_CRASH, None
+
+            if status == 'ok':
+                self.breach_counts.pop(module_name, None)
+                return payload
+            if status == 'error':
+                raise ExtractionError(payload)
+
+            elapsed = time.monotonic() - start
+            if status == BREACH_TIMEOUT:
+                message = f"превышен бюджет времени {self.time_budget} с"
+            elif status == BREACH_CRASH:
+                message = f"воркер завершился через {elapsed:.1f} с (лимит CPU {self.time_budget} с или падение)"
+            else:
+                message = payload
+            self._stop_worker(kill=True)
+            self._record_breach(module_name, html_path, status, message)
+            raise ExtractionError(message, breach=status)
+
+    def close(self):
+        with self._lock:
+            self._stop_worker()
@@ -1,24 +1,28 @@
 """Фабрика экстракторов для извлечения данных рецептов из HTML"""
 import os
-import sys
 import logging
 from pathlib import Path
-from typing import Optional, Dict, Any
-import importlib.util
+from contextlib import nullcontext
 
 from src.models.page import Page
-from src.models.site import SiteORM
 
 logger = logging.getLogger(__name__)
 from src.repositories.page import PageRepository
 from src.repositories.site import SiteRepository
+from src.stages.extract.extractor_registry import ExtractorRegistry, get_extractor_registry
+from src.stages.extract.isolated_extractor import IsolatedExtractor
+from src.stages.extract.schema_org_extractor import completeness_score, extract_schema_org, merge_recipe_data
+from config.config import config
 from typing import Optional, Dict, Any, Type
-from extractor.base import BaseRecipeExtractor
+from extractor.base import BaseRecipeExtractor, is_recipe_data
+from utils.stage_timing import SiteTimings
 
 class RecipeExtractor:
     """Выбирает и использует подходящий экстрактор для сайта"""
     
-    def __init__(self, page_repository: PageRepository = None, site_repository: SiteRepository = None):
+    def __init__(self, page_repository: PageRepository = None, site_repository: SiteRepository = None,
+                 registry: Optional[ExtractorRegistry] = None, isolated: Optional[bool] = None,
+                 generic_first: Optional[bool] = None):
         self.extractors_cache: Dict[int, Type[BaseRecipeExtractor]] = {}
         self.output_dir = "extracted_recipes"
         if not os.path.exists(self.output_dir):
@@ -31,12 +35,25 @@ class RecipeExtractor:
 
         self.page_repository = page_repository
         self.site_repository = site_repository
+        self.registry = registry or get_extractor_registry()
 
-        sites_orm: list[SiteORM] = self.site_repository.get_all()
-        # Маппинг site_id -> имя модуля экстрактора
+        # Маппинг site_id -> имя модуля экстрактора (заполняется лениво, по одному сайту)
         self.extractor_map: Dict[int, str] = {}
-        for site in sites_orm:
-            self.extractor_map[site.id] = site.name
+
+        # извлечение в отдельном процессе с бюджетом времени и памяти (воркер запускается при первой странице)
+        if isolated is None:
+            isolated = config.PARSER_EXTRACT_ISOLATION
+        self.isolated_extractor = IsolatedExtractor(extractor_dir=str(self.registry.extractor_dir)) if isolated else None
+
+        # первый проход универсальным экстрактором schema.org, экстрактор сайта - только если результат неполный
+        self.generic_first = config.PARSER_GENERIC_EXTRACTOR if generic_first is None else generic_first
+        self.min_completeness = config.PARSER_GENERIC_MIN_COMPLETENESS
+
+        # замеры этапов извлечения (задает исследователь сайта, utils/stage_timing.py)
+        self.timings: Optional[SiteTimings] = None
+
+    def _timer(self, stage: str):
+        return self.timings.time(stage) if self.timings is not None else nullcontext()
 
 
     def _get_output_filename(self, html_path: str) -> str:
@@ -52,33 +69,16 @@ class RecipeExtractor:
         if site_id in self.extractor_map:
             return self.extractor_map[site_id]
         
-        return None
+        site = self.site_repository.get_by_id(site_id)
+        if site is None or site.name not in self.registry:
+            return None
+        
+        self.extractor_map[site_id] = site.name
+        return site.name
     
     def _load_extractor_class(self, module_name: str) -> Type[BaseRecipeExtractor]:
-        """Динамически загружает класс экстрактора из модуля"""
-        # Путь к файлу экстрактора
-        extractor_path = os.path.join('extractor', f'{module_name}.py')
-        
-        if not os.path.exists(extractor_path):
-            raise FileNotFoundError(f"Extractor module not found: {extractor_path}")
-        
-        # Динамическая загрузка модуля
-        spec = importlib.util.spec_from_file_location(module_name, extractor_path)
-        if spec is None or spec.loader is None:
-            raise ImportError(f"Cannot load module: {module_name}")
-        
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[module_name] = module
-        spec.loader.exec_module(module)
-        
-        # Находим класс экстрактора (ищем класс с "Extractor" в имени)
-        for attr_name in dir(module):
-            if 'Extractor' in attr_name and not attr_name.startswith('_') and attr_name != 'BaseRecipeExtractor':
-                extractor_class = getattr(module, attr_name)
-                if isinstance(extractor_class, type):
-                    return extractor_class
-        
-        raise ImportError(f"No Extractor class found in module: {module_name}")
+        """Загружает класс экстрактора через реестр (модуль импортируется при первом обращении)"""
+        return self.registry.get_class(module_name)
     
     def _get_extractor(self, site_id: int) -> Type[BaseRecipeExtractor]:
         """Получает экземпляр экстрактора для сайта (с кешированием)"""
@@ -95,10 +95,23 @@ class RecipeExtractor:
         
         return extractor_class
     
+    def _extract_generic(self, html_path: str) -> Optional[Dict[str, Any]]:
+        """Универсальное извлечение из JSON-LD (без дерева HTML и экстрактора сайта)"""
+        try:
+            with open(html_path, 'r', encoding='utf-8') as f:
+                return extract_schema_org(f.read())
+        except Exception as e:
+            logger.debug(f"Универсальный экстрактор не справился с {html_path}: {e}")
+            return None
+
     def extract_from_html(self, html_path: str, site_id: int) -> Optional[Dict[str, Any]]:
         """
         Извлекает данные рецепта из HTML файла
         
+        Сначала (если включено) работает универсальный экстрактор schema.org: при достаточной полноте
+        его результат возвращается сразу. Иначе запускается экстрактор сайта, пустые поля которого
+        дополняются универсальным результатом; для сайта без экстрактора возвращается универсальный результат.
+        
         Args:
             html_path: путь к HTML файлу
             site_id: ID сайта в БД
@@ -106,14 +119,36 @@ class RecipeExtractor:
         Returns:
             Словарь с данными рецепта или None если извлечение не удалось
         """
-        
+        generic_data = None
+        if self.generic_first:
+            with self._timer('extract_generic'):
+                generic_data = self._extract_generic(html_path)
+            score = completeness_score(generic_data)
+            if generic_data is not None and score >= self.min_completeness:
+                logger.debug(f"Универсальный экстрактор: полнота {score:.2f}, экстрактор сайта не нужен ({html_path})")
+                return generic_data
+            if generic_data is not None and self._get_extractor_module_name(site_id) is None:
+                return generic_data
+
+        with self._timer('extract_site'):
+            site_data = self._extract_site_specific(html_path, site_id)
+        return merge_recipe_data(site_data, generic_data)
+
+    def _extract_site_specific(self, html_path: str, site_id: int) -> Optional[Dict[str, Any]]:
+        """Извлечение экстрактором сайта (в изолированном воркере, если включено)"""
         try:
+            if self.isolated_extractor is not None:
+                module_name = self._get_extractor_module_name(site_id)
+                if module_name is None:
+                    raise ValueError(f"No extractor available for site_id={site_id}")
+                return self.isolated_extractor.extract(module_name, html_path)
+
             # Получаем класс экстрактора
             extractor_class = self._get_extractor(site_id)
             
-            # Создаем экземпляр и извлекаем данные
+            # Создаем экземпляр и извлекаем данные (необязательные поля - только если страница рецепт)
             extractor = extractor_class(html_path)
-            recipe_data = extractor.extract_all()
+            recipe_data = extractor.extract_staged()
             
             return recipe_data
             
@@ -141,8 +176,7 @@ class RecipeExtractor:
         if recipe_data is None:
             return None
         # Если ключевые поля отсутствуют, помечаем как не рецепт
-        key_fields = ['dish_name', 'ingredients', 'instructions']
-        if not all(field in recipe_data and recipe_data[field] for field in key_fields):
+        if not is_recipe_data(recipe_data):
             page.confidence_score = 10
             page.is_recipe = False
             return page
@@ -152,4 +186,9 @@ class RecipeExtractor:
         page.confidence_score = 50
         page.is_recipe = True
         
-        return page
\ No newline at end of file
+        return page
+
+    def close(self):
+        """Останавливает воркер изолированного извлечения"""
+        if self.isolated_extractor is not None:
+            self.isolated_extractor.close()
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+Быстрая предварительная проверка сырого HTML на признаки рецепта
+
+Выполняется до построения дерева и запуска экстрактора: страницы категорий, тегов и списков,
+на которых нет ни одного признака рецепта, пропускаются без полного извлечения.
+
+Признаки (любой из них достаточен):
+- URL соответствует паттерну рецептов сайта;
+- JSON-LD/microdata/RDFa типа Recipe, microdata ингредиентов и шагов;
+- контейнеры популярных плагинов рецептов (WPRM, Tasty, Create и др.);
+- классы/id контейнеров ингредиентов и шагов, которые ищет экстрактор сайта (из его исходника).
+"""
+
+import re
+import ast
+import logging
+from pathlib import Path
+from functools import lru_cache
+from dataclasses import dataclass
+from typing import Iterable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+_GENERIC_MARKERS = [
+    # в том числе экранированный JSON внутри данных JS-фреймворков (\"@type\":\"Recipe\")
+    ('json_ld', rb'@type\\?"\s*:\s*\[?[^\]}]{0,200}?\\?"(?:https?:\\?/\\?/schema\.org\\?/|schema:)?Recipe\\?"'),
+    ('microdata', rb'itemtype\s*=\s*["\']?https?://schema\.org/Recipe\b'),
+    ('microdata', rb'itemprop\s*=\s*["\'][^"\']*\b(?:recipeIngredient|ingredients|recipeInstructions)\b'),
+    ('rdfa', rb'typeof\s*=\s*["\'][^"\']*\bRecipe\b'),
+    ('plugin', rb'wprm-recipe-ingredient|tasty-recipes-ingredients|mv-create-ingredients|easyrecipe'
+               rb'|zlrecipe|cooked-recipe-ingredients|wpzoom-recipe-card|recipe-card-ingredients'
+               rb'|wp-block-recipe-card|jetpack-recipe-ingredients|yumprint-recipe|ERSIngredients'),
+]
+# заголовок блока ингредиентов: элемент, весь текст которого - "Ingredients" на одном из языков
+_INGREDIENT_HEADINGS = [
+    'Ingredients', 'Ingredient', 'Zutaten', 'Ingrédients', 'Ingredienti', 'Ingredientes', 'Ingrediënten',
+    'Składniki', 'Ingredienser', 'Ainekset', 'Sastojci', 'Hozzávalók', 'Malzemeler', 'Ингредиенты', 'Інгредієнти',
+]
+_GENERIC_MARKERS.append((
+    'heading',
+    # IGNORECASE для bytes не действует на не-ASCII буквы, поэтому варианты регистра перечисляются явно
+    rb'>\s*(?:' + b'|'.join(
+        re.escape(variant.encode('utf-8'))
+        for word in _INGREDIENT_HEADINGS for variant in {word, word.lower(), word.upper()}
+    ) + rb')\s*:?\s*<'
+))
+_GENERIC_RE = [(reason, re.compile(pattern, re.IGNORECASE)) for reason, pattern in _GENERIC_MARKERS]
+
+# ключевые слова в классах/id контейнеров ингредиентов и шагов (общие "recipe-*" встречаются и на списках рецептов)
+_SITE_MARKER_KEYWORDS = re.compile(
+    r'ingredient|instruction|direction|preparation|zutat|zubereitung|ingredi|ingrédient|préparation'
+    r'|ингредиент|приготовлен|składnik|przygotowanie|method|step',
+    re.IGNORECASE
+)
+# именованные аргументы find/find_all/select, значения которых - классы или id
+_SELECTOR_KEYWORDS = {'class_', 'id'}
+_SELECTOR_ATTRS = {'class', 'id', 'itemprop'}
+_CSS_TOKEN_RE = re.compile(r'[.#]([\w-]+)')
+_MIN_MARKER_LENGTH = 6
+
+
+@dataclass
+class PrescreenResult:
+    """Результат предварительной проверки"""
+    has_signal: bool
+    reason: Optional[str] = None
+
+
+def _literal_strings(node: ast.AST) -> list[str]:
+    """Строковые литералы в значении аргумента (строка или список/кортеж строк)"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return [item.value for item in node.elts if isinstance(item, ast.Constant) and isinstance(item.value, str)]
+    return []
+
+
+def _compiled_patterns(node: ast.AST) -> list[str]:
+    """Простые шаблоны из re.compile(r'...') в аргументе class_/id (только буквы, цифры, дефисы и |)"""
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'compile'
+            and node.args and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+        pattern = node.args[0].value
+        if re.fullmatch(r'[\w|-]+', pattern):
+            return pattern.split('|')
+    return []
+
+
+def site_markers_from_source(source: str) -> list[str]:
+    """
+    Классы/id контейнеров рецепта, которые использует экстрактор
+
+    Берутся строковые значения class_/id/attrs={'class': ...} в вызовах find/find_all и токены
+    .class/#id из селекторов select, содержащие ключевые слова рецепта (ingredient, instruction, ...).
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return []
+
+    candidates = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        for keyword in node.keywords:
+            if keyword.arg in _SELECTOR_KEYWORDS:
+                candidates.update(_literal_strings(keyword.value) or _compiled_patterns(keyword.value))
+            elif keyword.arg == 'attrs' and isinstance(keyword.value, ast.Dict):
+                for key, value in zip(keyword.value.keys, keyword.value.values):
+                    if isinstance(key, ast.Constant) and key.value in _SELECTOR_ATTRS:
+                        candidates.update(_literal_strings(value))
+        if isinstance(node.func, ast.Attribute) and node.func.attr in ('select', 'select_one') and node.args:
+            for selector in _literal_strings(node.args[0]):
+                candidates.update(_CSS_TOKEN_RE.findall(selector))
+
+    markers = set()
+    for candidate in candidates:
+        for token in candidate.split():
+            if len(token) >= _MIN_MARKER_LENGTH and _SITE_MARKER_KEYWORDS.search(token):
+                markers.add(token)
+    return sorted(markers)
+
+
+@lru_cache(maxsize=512)
+def _site_markers_from_file(path: str, mtime: float) -> tuple[str, ...]:
+    return tuple(site_markers_from_source(Path(path).read_text(encoding='utf-8')))
+
+
+class RecipePrescreen:
+    """Проверка сырого HTML на признаки рецепта для одного сайта"""
+
+    def __init__(self, site_markers: Iterable[str] = (), url_regex: Optional[re.Pattern] = None):
+        """
+        Args:
+            site_markers: классы/id контейнеров рецепта на сайте
+            url_regex: паттерн URL рецептов сайта
+        """
+        self.site_markers = list(site_markers)
+        self.url_regex = url_regex
+        self._site_re = None
+        if self.site_markers:
+            alternation = b'|'.join(re.escape(marker.encode('utf-8')) for marker in self.site_markers)
+            self._site_re = re.compile(alternation, re.IGNORECASE)
+
+    @classmethod
+    def for_extractor(cls, extractor_path: Union[str, Path], url_regex: Optional[re.Pattern] = None) -> 'RecipePrescreen':
+        """Пре-скрин с признаками из исходника экстрактора сайта (без импорта модуля)"""
+        path = Path(extractor_path)
+        markers: tuple[str, ...] = ()
+        if path.exists():
+            markers = _site_markers_from_file(str(path), path.stat().st_mtime)
+        else:
+            logger.debug(f"Экстрактор {path} не найден, пре-скрин только по общим признакам")
+        return cls(markers, url_regex)
+
+    def check(self, html: Union[bytes, str], url: Optional[str] = None) -> PrescreenResult:
+        """
+        Args:
+            html: сырой HTML (bytes или str)
+            url: URL страницы (для проверки по паттерну рецептов)
+        """
+        if url and self.url_regex is not None and self.url_regex.search(url):
+            return PrescreenResult(True, 'url')
+
+        raw = html.encode('utf-8', errors='ignore') if isinstance(html, str) else html
+        for reason, pattern in _GENERIC_RE:
+            if pattern.search(raw):
+                return PrescreenResult(True, reason)
+        if self._site_re is not None and self._site_re.search(raw):
+            return PrescreenResult(True, 'site')
+        return PrescreenResult(False)
@@ -0,0 +1,168 @@
+"""
+Универсальный экстрактор рецептов по schema.org Recipe (JSON-LD)
+
+Первый проход извлечения: JSON-LD блоки находятся регулярным выражением в сыром HTML,
+без построения дерева и импорта экстрактора сайта. Результат в формате экстракторов проекта
+(см. parser_prompt.md) и оценка его полноты: если полнота ниже порога, запускается экстрактор сайта.
+"""
+
+import re
+import json
+import logging
+from typing import Any, Optional
+
+from extractor.base import BaseRecipeExtractor, REQUIRED_FIELDS
+from utils import recipe_parsing
+from utils.structured_data import RECIPE_TYPE, find_json_ld_node, parse_json_ld_markup
+
+logger = logging.getLogger(__name__)
+
+# вес поля в оценке полноты (notes в schema.org нет, поэтому не учитывается)
+FIELD_WEIGHTS = {
+    'dish_name': 3,
+    'ingredients': 3,
+    'instructions': 3,
+    'description': 1,
+    'category': 1,
+    'prep_time': 1,
+    'cook_time': 1,
+    'total_time': 1,
+    'tags': 1,
+    'image_urls': 1,
+    'nutrition_info': 1,
+}
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_NUMBER_RE = re.compile(r'(\d+)')
+
+
+def _clean(value: Any) -> Optional[str]:
+    """Текст без HTML тегов и лишних пробелов"""
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    text = BaseRecipeExtractor.clean_text(_TAG_RE.sub(' ', str(value)))
+    return text or None
+
+
+def _text_list(value: Any) -> list[str]:
+    """Строка, список строк или "a, b" -> список непустых строк"""
+    if isinstance(value, str):
+        items = value.split(',')
+    elif isinstance(value, list):
+        items = [item for item in value if isinstance(item, str)]
+    else:
+        return []
+    return [text for text in (_clean(item) for item in items) if text]
+
+
+def _instruction_texts(value: Any) -> list[str]:
+    """Тексты шагов из recipeInstructions (строка, список, HowToStep, HowToSection, ItemList)"""
+    if isinstance(value, str):
+        return [text for text in (_clean(line) for line in value.splitlines()) if text]
+    if isinstance(value, list):
+        return [text for item in value for text in _instruction_texts(item)]
+    if isinstance(value, dict):
+        if 'itemListElement' in value:
+            return _instruction_texts(value['itemListElement'])
+        text = _clean(value.get('text') or value.get('name'))
+        return [text] if text else []
+    return []
+
+
+def _image_urls(value: Any) -> list[str]:
+    """URL из image (строка, список, ImageObject)"""
+    if isinstance(value, str):
+        return [value.strip()] if value.strip() else []
+    if isinstance(value, list):
+        return [url for item in value for url in _image_urls(item)]
+    if isinstance(value, dict):
+        return _image_urls(value.get('url') or value.get('contentUrl'))
+    return []
+
+
+def _nutrition_info(value: Any) -> Optional[str]:
+    """Питательность в формате проекта: "202 kcal; 2/11/27" (белки/жиры/углеводы)"""
+    if not isinstance(value, dict):
+        return None
+
+    def first_number(key: str) -> Optional[str]:
+        match = _NUMBER_RE.search(str(value.get(key) or ''))
+        return match.group(1) if match else None
+
+    calories = first_number('calories')
+    macros = [first_number('proteinContent'), first_number('fatContent'), first_number('carbohydrateContent')]
+    if calories and all(macros):
+        return f"{calories} kcal; {'/'.join(macros)}"
+    return f"{calories} kcal" if calories else None
+
+
+def _time(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    return recipe_parsing.format_minutes(recipe_parsing.iso_duration_to_minutes(value))
+
+
+def recipe_node_to_data(node: dict) -> dict:
+    """Узел schema.org Recipe -> словарь в формате экстракторов проекта (все поля, None если нет)"""
+    ingredients = [
+        parsed for parsed in (recipe_parsing.split_ingredient(_clean(item))
+                              for item in (node.get('recipeIngredient') or node.get('ingredients') or [])
+                              if isinstance(item, str))
+        if parsed
+    ]
+    steps = _instruction_texts(node.get('recipeInstructions'))
+    images = list(dict.fromkeys(_image_urls(node.get('image'))))
+
+    return {
+        "dish_name": _clean(node.get('name')),
+        "description": _clean(node.get('description')),
+        "ingredients": json.dumps(ingredients, ensure_ascii=False) if ingredients else None,
+        "instructions": ' '.join(f"{idx}. {step}" for idx, step in enumerate(steps, 1)) if steps else None,
+        "nutrition_info": _nutrition_info(node.get('nutrition')),
+        "category": ', '.join(_text_list(node.get('recipeCategory'))) or None,
+        "prep_time": _time(node.get('prepTime')),
+        "cook_time": _time(node.get('cookTime')),
+        "total_time": _time(node.get('totalTime')),
+        "notes": None,
+        "tags": ', '.join(_text_list(node.get('keywords'))) or None,
+        "image_urls": ','.join(images) or None,
+    }
+
+
+def completeness_score(data: Optional[dict]) -> float:
+    """
+    Оценка полноты результата от 0 до 1 (взвешенная доля заполненных полей)
+
+    Без любого из обязательных полей (dish_name, ingredients, instructions) оценка 0.
+    """
+    if not data or not all(data.get(field) for field in REQUIRED_FIELDS):
+        return 0.0
+    filled = sum(weight for field, weight in FIELD_WEIGHTS.items() if data.get(field))
+    return filled / sum(FIELD_WEIGHTS.values())
+
+
+def extract_schema_org(markup: str) -> Optional[dict]:
+    """
+    Извлечение рецепта из JSON-LD сырого HTML
+
+    Returns:
+        Словарь в формате экстракторов проекта или None, если на странице нет JSON-LD Recipe
+    """
+    documents = parse_json_ld_markup(markup)
+    if not documents:
+        return None
+    node = find_json_ld_node(documents, RECIPE_TYPE)
+    return recipe_node_to_data(node) if node is not None else None
+
+
+def merge_recipe_data(primary: Optional[dict], fallback: Optional[dict]) -> Optional[dict]:
+    """Результат экстрактора сайта, пустые поля которого дополнены универсальным результатом"""
+    if not primary:
+        return fallback
+    if not fallback:
+        return primary
+    merged = dict(primary)
+    for field, value in fallback.items():
+        if not merged.get(field) and value:
+            merged[field] = value
+    return merged
@@ -0,0 +1,254 @@
+"""
+Черновая конвертация модулей экстракторов в декларативные спецификации и проверка эквивалентности
+
+Конвертер разбирает AST методов extract_<поле> и переводит вызовы find/find_all/select/select_one
+с литеральными аргументами (в том числе цепочки и контейнеры в переменных) в правила спецификации.
+Логика на Python (регулярные выражения в аргументах, циклы с условиями) не переносится, поэтому
+результат - черновик: поле попадает в спецификацию, только если на всех страницах preprocessed
+совпало с модулем (compare_results).
+"""
+
+import ast
+import json
+import re
+from typing import Any, Optional
+
+from src.stages.extract.extractor_spec import OUTPUT_FIELDS
+from utils.fast_html import css_to_xpath
+
+# методы существующих экстракторов для каждого поля (по порядку предпочтения)
+FIELD_METHODS = {
+    'dish_name': ('extract_dish_name', 'extract_title'),
+    'description': ('extract_description',),
+    'ingredients': ('extract_ingredients',),
+    'instructions': ('extract_instructions', 'extract_steps'),
+    'nutrition_info': ('extract_nutrition_info',),
+    'category': ('extract_category',),
+    'prep_time': ('extract_prep_time',),
+    'cook_time': ('extract_cook_time',),
+    'total_time': ('extract_total_time',),
+    'notes': ('extract_notes',),
+    'tags': ('extract_tags',),
+    'image_urls': ('extract_image_urls',),
+}
+LIST_FIELDS = {
+    'ingredients': {'format': 'ingredients'},
+    'instructions': {'format': 'steps'},
+    'tags': {'format': 'join', 'separator': ', '},
+    'image_urls': {'format': 'join', 'separator': ','},
+}
+_LOCATOR_METHODS = {'find', 'find_all', 'select', 'select_one'}
+_CSS_IDENTIFIER_RE = re.compile(r'^[\w-]+$')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _literal(node: ast.AST) -> Any:
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, SyntaxError, TypeError):
+        return None
+
+
+def _attribute_condition(key: str, value: Any) -> Optional[str]:
+    if value is True:
+        return f'[{key}]'
+    if not isinstance(value, str):
+        return None
+    if key == 'class':
+        classes = value.split()
+        if classes and all(_CSS_IDENTIFIER_RE.match(name) for name in classes):
+            return ''.join(f'.{name}' for name in classes)
+        return None
+    return f'[{key}={json.dumps(value)}]'
+
+
+def find_call_to_css(call: ast.Call) -> Optional[str]:
+    """find/find_all(name, class_=..., id=..., attrs={...}, prop=...) с литералами -> CSS, иначе None"""
+    if len(call.args) > 2:
+        return None
+    tag = '*'
+    conditions = []
+    if call.args:
+        name = _literal(call.args[0])
+        if not isinstance(name, str) or not _CSS_IDENTIFIER_RE.match(name):
+            return None
+        tag = name
+    attrs = {}
+    if len(call.args) == 2:
+        attrs = _literal(call.args[1])
+        if not isinstance(attrs, dict):
+            return None
+    for keyword in call.keywords:
+        if keyword.arg in ('recursive', 'limit'):
+            continue
+        if keyword.arg is None or keyword.arg in ('string', 'text'):
+            return None
+        value = _literal(keyword.value)
+        if keyword.arg == 'attrs':
+            if not isinstance(value, dict):
+                return None
+            attrs.update(value)
+        else:
+            attrs['class' if keyword.arg == 'class_' else keyword.arg.replace('_', '-')] = value
+    for key, value in attrs.items():
+        condition = _attribute_condition(key, value)
+        if condition is None:
+            return None
+        conditions.append(condition)
+    return (tag if tag != '*' or not conditions else '') + ''.join(conditions) or '*'
+
+
+class _Locator:
+    """Найденный в методе поиск элементов: CSS от корня документа, все совпадения или первое, атрибут"""
+
+    def __init__(self, css: str, all_matches: bool, attr: Optional[str] = None):
+        self.css = css
+        self.all = all_matches
+        self.attr = attr
+
+
+def _is_soup(node: ast.AST) -> bool:
+    return (isinstance(node, ast.Attribute) and node.attr == 'soup'
+            and isinstance(node.value, ast.Name) and node.value.id == 'self')
+
+
+class _MethodConverter:
+    """Разбор одного метода extract_<поле>"""
+
+    def __init__(self, method: ast.FunctionDef):
+        self.method = method
+        # переменная -> CSS контейнера (container = self.soup.find(...))
+        self.variables: dict[str, tuple[str, bool]] = {}
+
+    def _scope_css(self, receiver: ast.AST) -> Optional[str]:
+        """CSS области поиска: корень документа ('') или найденный ранее контейнер"""
+        if _is_soup(receiver):
+            return ''
+        if isinstance(receiver, ast.Name) and receiver.id in self.variables:
+            css, all_matches = self.variables[receiver.id]
+            return None if all_matches else css
+        if isinstance(receiver, ast.Call):
+            located = self.locate(receiver)
+            return located.css if located and not located.all else None
+        return None
+
+    def locate(self, call: ast.Call) -> Optional[_Locator]:
+        if not isinstance(call.func, ast.Attribute) or call.func.attr not in _LOCATOR_METHODS:
+            return None
+        scope = self._scope_css(call.func.value)
+        if scope is None:
+            return None
+        if call.func.attr in ('select', 'select_one'):
+            selector = _literal(call.args[0]) if call.args else None
+            if not isinstance(selector, str) or ',' in selector:
+                return None
+            css = selector.strip()
+        else:
+            css = find_call_to_css(call)
+            if css is None:
+                return None
+        try:
+            css_to_xpath(css)
+        except ValueError:
+            return None
+        return _Locator(f'{scope} {css}'.strip(), call.func.attr in ('find_all', 'select'))
+
+    def locators(self) -> list[_Locator]:
+        """Поиски в порядке исходника; контейнеры, внутри которых ищут дальше, пропускаются"""
+        for node in ast.walk(self.method):
+            if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                    and isinstance(node.targets[0], ast.Name) and isinstance(node.value, ast.Call)):
+                located = self.locate(node.value)
+                if located is not None:
+                    self.variables[node.targets[0].id] = (located.css, located.all)
+
+        calls = sorted((node for node in ast.walk(self.method) if isinstance(node, ast.Call)),
+                       key=lambda node: (node.lineno, node.col_offset))
+        located = [locator for locator in map(self.locate, calls) if locator is not None]
+        results = []
+        for locator in located:
+            if any(other.css.startswith(locator.css + ' ') for other in located):
+                continue
+            tag = re.split(r'[.#\[:]', locator.css.split()[-1])[0]
+            if tag in ('script', 'style'):
+                continue
+            if tag == 'meta':
+                locator.attr = 'content'
+            elif tag == 'img':
+                locator.attr = 'src'
+            results.append(locator)
+        return results
+
+
+def _lowered_fields(tree: ast.Module) -> set[str]:
+    """Поля, к которым extract_all применяет .lower()"""
+    lowered = set()
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.FunctionDef) and node.name == 'extract_all'):
+            continue
+        for item in ast.walk(node):
+            if not isinstance(item, ast.Dict):
+                continue
+            for key, value in zip(item.keys, item.values):
+                if (isinstance(key, ast.Constant) and key.value in OUTPUT_FIELDS and any(
+                        isinstance(part, ast.Attribute) and part.attr == 'lower' for part in ast.walk(value))):
+                    lowered.add(key.value)
+    return lowered
+
+
+def convert_extractor_source(source: str) -> dict:
+    """
+    Черновик спецификации по исходнику модуля экстрактора
+
+    Returns:
+        {"fields": {...}} только с полями, для которых удалось перевести хотя бы один поиск
+    """
+    tree = ast.parse(source)
+    methods = {node.name: node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)}
+    lowered = _lowered_fields(tree)
+    fields = {}
+    for field, method_names in FIELD_METHODS.items():
+        method = next((methods[name] for name in method_names if name in methods), None)
+        if method is None:
+            continue
+        list_field = field in LIST_FIELDS
+        rules = []
+        for locator in _MethodConverter(method).locators():
+            if list_field and not locator.all:
+                continue
+            rule = {'css': locator.css}
+            if locator.attr:
+                rule['attr'] = locator.attr
+            if list_field:
+                rule['all'] = True
+            if rule not in rules:
+                rules.append(rule)
+        if not rules:
+            continue
+        definition = {'rules': rules, **LIST_FIELDS.get(field, {})}
+        if field in lowered:
+            definition['clean'] = ['lower']
+        fields[field] = definition
+    return {'fields': fields}
+
+
+def _normalize(value: Any) -> Any:
+    """Значение поля для сравнения: JSON строки разбираются, пробелы схлопываются, пустое -> None"""
+    if isinstance(value, str):
+        stripped = value.strip()
+        if stripped[:1] in ('[', '{'):
+            try:
+                return _normalize(json.loads(stripped))
+            except ValueError:
+                pass
+        return _WHITESPACE_RE.sub(' ', stripped) or None
+    if isinstance(value, list):
+        return [_normalize(item) for item in value] or None
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    return value
+
+
+def compare_results(expected: dict, actual: dict, fields=OUTPUT_FIELDS) -> dict[str, bool]:
+    """Совпадение результатов модуля и спецификации по каждому полю"""
+    return {field: _normalize(expected.get(field)) == _normalize(actual.get(field)) for field in fields}
@@ -24,6 +24,8 @@ if __name__ == "__main__":
 
 from utils.languages import COOKIE_KEYWORDS, COOKIE_SELECTORS
 from src.common.gpt.client import GPTClient
+from src.stages.parse.consent_cache import (CMP_BANNERS, PROBE_SCRIPT, ConsentSelectorCache, consent_domain,
+                                            detect_vendor, get_consent_cache)
 
 # Настройка логирования
 logging.basicConfig(
@@ -51,15 +53,66 @@ class CoockieHandler:
         '[data-nosnippet]',  # Часто используется для cookie баннеров
     ]
     
-    def __init__(self, driver: webdriver.Chrome):
+    def __init__(self, driver: webdriver.Chrome, consent_cache: Optional[ConsentSelectorCache] = None):
         """
         Args:
             driver: Экземпляр Selenium WebDriver
-            gpt_client: Экземпляр GPTClient для взаимодействия с GPT
+            consent_cache: Кэш селекторов согласия (по умолчанию общий, None если PARSER_CONSENT_CACHE пуст)
         """
         self.driver = driver
         self.gpt_client = GPTClient()
         self.logger = logger
+        self.consent_cache = consent_cache if consent_cache is not None else get_consent_cache()
+        # последняя проба видела баннер платформы (неудача селектора уже учтена)
+        self.probe_banner_visible = False
+
+    def click_cached_consent(self, domain: str, html_content: str) -> bool:
+        """
+        Одна проба известных селекторов (выученный для домена, платформы баннера) до поиска кнопок в DOM
+        
+        Returns:
+            True если кнопка нажата
+        """
+        self.probe_banner_visible = False
+        if self.consent_cache is None or not domain:
+            return False
+        vendor = detect_vendor(html_content)
+        candidates = self.consent_cache.candidates(domain, vendor)
+        try:
+            result = self.driver.execute_script(
+                PROBE_SCRIPT, [{key: item[key] for key in ('type', 'selector', 'scope')} for item in candidates],
+                [{'type': selector_type, 'selector': selector, 'scope': scope}
+                 for selector_type, selector, scope in CMP_BANNERS]) or {}
+        except WebDriverException as e:
+            self.logger.debug(f"Ошибка пробы селекторов cookies: {e}")
+            result = {}
+        index = result.get('clicked', -1)
+
+        if index is None or index < 0:
+            # без видимого баннера (согласие уже сохранено в браузере) проба ничего не нажимает - это не неудача
+            # селектора, хотя скрипты платформы на странице есть; баннер без известной платформы ищется
+            # в find_and_click_cookie_button
+            if result.get('banner'):
+                self.probe_banner_visible = True
+                self._record_probe_failure(domain)
+            return False
+
+        candidate = candidates[index]
+        self.logger.info(f"✅ Cookies приняты по кэшу ({candidate['vendor'] or domain}): {candidate['selector']}")
+        self.consent_cache.record_success(domain, candidate['type'], candidate['selector'],
+                                          vendor=candidate['vendor'] or vendor, scope=candidate['scope'])
+        time.sleep(1.5)
+        return True
+
+    def _record_probe_failure(self, domain: str):
+        """Баннер на странице есть, а селектор домена из кэша его не нажал"""
+        if self.consent_cache is not None and domain in self.consent_cache.domains:
+            self.consent_cache.record_failure(domain)
+
+    def _remember_consent(self, domain: str, html_content: str, selector_type: str, selector: str):
+        """Сохранение селектора, найденного поиском кнопок или GPT"""
+        if self.consent_cache is not None and domain:
+            self.consent_cache.record_success(domain, selector_type, selector, vendor=detect_vendor(html_content))
 
     def build_css_selector(self, elem) -> List[str]:
         """
@@ -641,21 +694,28 @@ XPath: "//*[@data-action='accept' or contains(@class,'accept')]" """
             self.logger.error(f"Ошибка при создании селектора через GPT: {e}")
             return None
 
-    def find_and_click_cookie_button(self, html_content: str) -> bool:
+    def find_and_click_cookie_button(self, html_content: str, url: Optional[str] = None) -> bool:
         """
         Полный процесс поиска и клика по кнопке cookies - гибридный подход:
+        0. Проба селекторов из кэша (домен, CMP-платформа) одним скриптом
         1. Сначала ищем cookie-баннер
         2. Если найден - ищем кнопки внутри и ранжируем локально
         3. Строим селекторы через BS4
         4. Если не сработало - fallback на GPT
+        Сработавший селектор сохраняется в кэш домена.
         
         Args:
             html_content: HTML код страницы
+            url: URL страницы (по умолчанию текущий URL браузера)
             
         Returns:
             True если кнопка найдена и нажата, False иначе
         """
         try:
+            domain = consent_domain(url or self.driver.current_url)
+            if self.click_cached_consent(domain, html_content):
+                return True
+
             soup = BeautifulSoup(html_content, 'html.parser')
             
             # === ЭТАП 1: Поиск cookie-баннера ===
@@ -667,6 +727,8 @@ XPath: "//*[@data-action='accept' or contains(@class,'accept')]" """
             
             if banner:
                 self.logger.info("✅ Cookie-баннер найден, извлекаем кнопки из него")
+                if not self.probe_banner_visible:
+                    self._record_probe_failure(domain)
                 buttons = self.extract_buttons_from_banner(banner)
                 use_local_ranking = True
             
@@ -788,6 +850,7 @@ XPath: "//*[@data-action='accept' or contains(@class,'accept')]" """
                         # Кликаем
                         element.click()
                         self.logger.info(f"✅ Успешно кликнули используя {selector_type}: {selector}")
+                        self._remember_consent(domain, html_content, selector_type, selector)
                         
                         time.sleep(1.5)
                         return True
@@ -831,6 +894,7 @@ XPath: "//*[@data-action='accept' or contains(@class,'accept')]" """
                                 time.sleep(0.2)
                                 element.click()
                                 self.logger.info(f"✅ GPT селектор сработал: {selector_type}: {selector}")
+                                self._remember_consent(domain, html_content, selector_type, selector)
                                 
                                 time.sleep(1.5)
                                 return True
@@ -1165,7 +1229,7 @@ class CapchaAccepter:
         page_source = self.driver.page_source
         # Применяем двухэтапный подход для поиска кнопки cookies
         self.logger.info("🔍 Начинаем поиск кнопки принятия cookies...")
-        success = self.coockie_handler.find_and_click_cookie_button(page_source)
+        success = self.coockie_handler.find_and_click_cookie_button(page_source, url=current_url)
         
         if success:
             self.logger.info("✅ Cookies успешно приняты")
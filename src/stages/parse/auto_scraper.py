@@ -25,9 +25,15 @@ from src.models.site import Site, get_name_base_url_from_url
 from src.repositories.site import SiteRepository
 from src.repositories.search_query import SearchQueryRepository
 from src.stages.parse.site_preparation_pipeline import SitePreparationPipeline
+from src.stages.parse.site_prescreen import SitePrescreener
+from src.stages.parse.duckduckgo_search import DuckDuckGoHTTPSearch
+from src.stages.parse.query_dedupe import QueryIndex
 from pathlib import Path
 from utils.languages import POPULAR_LANGUAGES
 
+# во сколько раз больше кандидатов берется из БД для выбора запросов по новизне
+QUERY_CANDIDATES_FACTOR = 4
+
 class AutoScraper:
     """Автоматический сборщик рецептов через DuckDuckGo"""
     
@@ -92,7 +98,7 @@ class AutoScraper:
     
     def search_duckduckgo(self, query: str, max_results: int = 20) -> list[str]:
         """
-        Поиск по DuckDuckGo и сбор ссылок
+        Поиск по DuckDuckGo и сбор ссылок (PARSER_SEARCH_BACKEND=http - без браузера, Selenium - запасной вариант)
         
         Args:
             query: Поисковый запрос
@@ -101,6 +107,41 @@ class AutoScraper:
         Returns:
             Список найденных URL
         """
+        if config.PARSER_SEARCH_BACKEND == 'http':
+            urls = DuckDuckGoHTTPSearch().search(query, max_results=max_results)
+            if urls is not None:
+                self.logger.info(f"✓ DuckDuckGo (HTTP) '{query}': {len(urls)} URL")
+                return urls
+            self.logger.info("HTTP поиск не удался, повтор через Selenium")
+        return self._search_duckduckgo_selenium(query, max_results=max_results)
+
+    def search_duckduckgo_many(self, queries: list[str], max_results: int = 20) -> dict[str, list[str]]:
+        """
+        Поиск по нескольким запросам: через HTTP параллельно (с ограничением частоты),
+        запросы, не получившие выдачу, и режим selenium - по одному через браузер
+        
+        Returns:
+            Словарь {запрос: список URL}
+        """
+        results: dict[str, Optional[list[str]]] = {query: None for query in queries}
+        if config.PARSER_SEARCH_BACKEND == 'http' and queries:
+            results.update(DuckDuckGoHTTPSearch().search_many(queries, max_results=max_results))
+            found = sum(urls is not None for urls in results.values())
+            self.logger.info(f"✓ DuckDuckGo (HTTP): выдача получена для {found} из {len(queries)} запросов")
+        
+        browser_searches = 0
+        for query in queries:
+            if results[query] is not None:
+                continue
+            if browser_searches:
+                # Задержка между запросами в браузере
+                time.sleep(random.uniform(3, 6))
+            results[query] = self._search_duckduckgo_selenium(query, max_results=max_results)
+            browser_searches += 1
+        return results
+
+    def _search_duckduckgo_selenium(self, query: str, max_results: int = 20) -> list[str]:
+        """Поиск по DuckDuckGo в браузере (прокрутка выдачи и сбор ссылок)"""
         self.connect_to_chrome()
         
         self.logger.info(f"Поиск в DuckDuckGo: '{query}'")
@@ -273,6 +314,33 @@ class AutoScraper:
         # Шаг 2: Обновляем статистику в search_query
         self.search_query_repository.update_query_statistics(query_id, len(saved_urls), 0)
     
+    def prescreen_sites(self, sites: list[Site]) -> list[Site]:
+        """
+        Отбор сайтов по HTTP перед подготовкой в браузере (src/stages/parse/site_prescreen.py)
+
+        Сайты без признаков структурированных рецептов помечаются как прошедшие поиск и не возвращаются,
+        остальные возвращаются по убыванию оценки (не оцененные - после оцененных).
+
+        Args:
+            sites: необработанные сайты
+        """
+        if not config.PARSER_SITE_PRESCREEN or not sites:
+            return sites
+        self.logger.info(f"Отбор {len(sites)} сайтов по HTTP...")
+        results = SitePrescreener().screen([site.search_url or site.base_url for site in sites])
+
+        promising = []
+        for site, result in zip(sites, results):
+            if result.is_promising(config.PARSER_SITE_PRESCREEN_MIN_SCORE):
+                promising.append((result.score if result.score is not None else -1.0, site))
+                self.logger.info(f"  ✓ {result.summary()}")
+            else:
+                self.logger.info(f"  ✗ {result.summary()}")
+                self.site_repository.mark_site_as_searched(site.id)
+        promising.sort(key=lambda item: item[0], reverse=True)
+        self.logger.info(f"✓ В браузер отправляется {len(promising)} из {len(sites)} сайтов")
+        return [site for _, site in promising]
+
     def process_one_site(self, site: Site, max_pages: int = 60) -> bool:
         """
         
@@ -324,6 +392,9 @@ class AutoScraper:
             self.logger.info(f"  Найдено необработанных сайтов (без паттерна): {unprocessed_count}")
             self.logger.info(f"  Минимум требуется: {target_sites_count}")
             
+            # индекс похожих запросов и новизны выдачи (src/stages/parse/query_dedupe.py)
+            query_index = QueryIndex() if config.PARSER_QUERY_DEDUPE else None
+            
             while unprocessed_count < target_sites_count:
             
                 self.logger.info(f"→ Недостаточно необработанных сайтов ({unprocessed_count} < {target_sites_count})")
@@ -346,9 +417,16 @@ class AutoScraper:
                         self.logger.warning("Нет способа сгенерировать новые запросы (generate_from_recipes и generate_with_gpt отключены)")
                         new_queries = []
 
+                    # похожие на известные запросы не переводим и не сохраняем
+                    if query_index is not None:
+                        new_queries = query_index.filter_new(new_queries)
+
                     query_results = {}
                     for query in new_queries:
                         translated = generator.translate_query(query=query, target_languages=random.sample(POPULAR_LANGUAGES, k=5))
+                        if query_index is not None:
+                            added = set(query_index.add(query, translated.values()))
+                            translated = {lang: text for lang, text in translated.items() if text in added}
                         query_results[query] = translated
                     
                     generator.save_queries_to_db(query_results)
@@ -356,10 +434,20 @@ class AutoScraper:
                 
                 # 2. Получаем неиспользованные запросы
                 self.logger.info("\n[2/3] Получение неиспользованных запросов...")
-                search_queries = self.search_query_repository.get_unsearched_queries(limit=queries_to_process, random_order=True, unique_languages=True)
+                candidates_limit = queries_to_process * QUERY_CANDIDATES_FACTOR if query_index is not None else queries_to_process
+                search_queries = self.search_query_repository.get_unsearched_queries(limit=candidates_limit, random_order=True, unique_languages=True)
                 queries = [q.to_pydantic() for q in search_queries]
+                redundant = []
+                if query_index is not None:
+                    # запросы семейств с новыми доменами в выдаче - чаще, похожие на уже найденные - пропускаются
+                    queries, redundant = query_index.select(queries, queries_to_process, text=lambda q: q.query)
+                    if redundant:
+                        self.logger.info(f"Пропущено {len(redundant)} запросов, похожих на уже найденные")
+                        self.search_query_repository.mark_as_skipped([q.id for q in redundant])
                 
                 if not queries:
+                    if redundant:
+                        continue
                     self.logger.warning("Нет неиспользованных запросов")
                     return
                 
@@ -368,19 +456,23 @@ class AutoScraper:
                 # 3. Обрабатываем каждый запрос
                 self.logger.info("\n[3/3] Поиск в DuckDuckGo...")
                 
+                # Ищем в DuckDuckGo (через HTTP - все запросы параллельно)
+                search_results = self.search_duckduckgo_many([query.query for query in queries],
+                                                             max_results=results_per_query)
                 for idx, query in enumerate(queries, 1):
                     self.logger.info(f"\n--- Запрос {idx}/{len(queries)} ---")
                     self.logger.info(f"ID: {query.id}, Язык: {query.language}")
                     self.logger.info(f"Запрос: '{query.query}'")
                     
-                    # Ищем в DuckDuckGo
-                    urls = self.search_duckduckgo(query.query, max_results=results_per_query)
+                    urls = search_results.get(query.query) or []
                     
                     # Обрабатываем найденные URL, создаем сайты и проверяем страницы
                     self.process_urls(urls, query_language=query.language, query_id=query.id)
-                    
-                    # Задержка между запросами
-                    time.sleep(random.uniform(3, 6))
+                    if query_index is not None:
+                        query_index.record_results(query.query, urls)
+                
+                if query_index is not None:
+                    query_index.save()
 
                 # Обновляем количество необработанных сайтов, проверяем достаточно ли теперь необработанных сайтов
                 unprocessed_count = self.site_repository.count_sites_without_pattern()
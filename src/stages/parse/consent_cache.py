@@ -0,0 +1,263 @@
+"""
+Кэш селекторов кнопок согласия на cookies по доменам и CMP
+
+Для домена запоминается селектор кнопки, который сработал (CoockieHandler), и CMP-платформа
+баннера (OneTrust, Didomi, Quantcast, Cookiebot, ...). При следующем заходе на сайт один
+execute_script (PROBE_SCRIPT) пробует по порядку: селектор домена, селекторы, выученные для
+платформы на других сайтах, и известные кнопки платформ - и кликает первую видимую.
+Поиск кнопок в DOM, ранжирование и GPT запускаются только если проба ничего не нажала.
+
+Стратегия клика - тип селектора (css/xpath) и область поиска: документ или открытые shadow root
+(Usercentrics). Баннеры в iframe другого домена (Sourcepoint) пробой не находятся.
+Кэш хранится в JSON файле PARSER_CONSENT_CACHE; селектор домена удаляется после
+PARSER_CONSENT_MAX_FAILURES неудачных проб подряд на страницах, где баннер виден (проба нашла видимый
+контейнер баннера платформы или баннер найден поиском). Скрипты платформы на странице остаются и после
+согласия, поэтому признаки detect_vendor для этого не годятся: без баннера проба неудачей не считается.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+# платформа -> (признаки в HTML, известные кнопки "принять": (тип, селектор, область))
+CMP_VENDORS: dict[str, tuple[list[str], list[tuple[str, str, str]]]] = {
+    'onetrust': (['onetrust-banner-sdk', 'otSDKStub', 'cdn.cookielaw.org'],
+                 [('css', '#onetrust-accept-btn-handler', 'document'),
+                  ('css', '#accept-recommended-btn-handler', 'document')]),
+    'didomi': (['didomi-host', 'didomi-notice', 'sdk.privacy-center.org'],
+               [('css', '#didomi-notice-agree-button', 'document')]),
+    'quantcast': (['qc-cmp2-container', 'quantcast.mgr.consensu.org', 'cmp.inmobi.com'],
+                  [('css', '.qc-cmp2-summary-buttons button[mode="primary"]', 'document'),
+                   ('css', '#qc-cmp2-ui button[mode="primary"]', 'document')]),
+    'cookiebot': (['CybotCookiebotDialog', 'consent.cookiebot.com'],
+                  [('css', '#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll', 'document'),
+                   ('css', '#CybotCookiebotDialogBodyButtonAccept', 'document')]),
+    'usercentrics': (['usercentrics-root', 'app.usercentrics.eu', 'usercentrics-cmp'],
+                     [('css', '[data-testid="uc-accept-all-button"]', 'shadow')]),
+    'trustarc': (['truste-consent-track', 'consent.trustarc.com'],
+                 [('css', '#truste-consent-button', 'document')]),
+    'google_fc': (['fc-consent-root', 'fundingchoicesmessages.google.com'],
+                  [('css', '.fc-consent-root button.fc-cta-consent', 'document')]),
+    'cookieyes': (['cky-consent-container', 'cdn-cookieyes.com'],
+                  [('css', '.cky-consent-container .cky-btn-accept', 'document')]),
+    'complianz': (['cmplz-cookiebanner'],
+                  [('css', '.cmplz-cookiebanner .cmplz-accept', 'document')]),
+    'iubenda': (['iubenda-cs-banner'],
+                [('css', '#iubenda-cs-banner .iubenda-cs-accept-btn', 'document')]),
+    'osano': (['osano-cm-window', 'cmp.osano.com'],
+              [('css', '.osano-cm-accept-all', 'document')]),
+    'borlabs': (['BorlabsCookieBox'],
+                [('css', '#BorlabsCookieBox a[data-cookie-accept-all]', 'document'),
+                 ('css', '#BorlabsCookieBox a[data-cookie-accept]', 'document')]),
+    'cookie_law_info': (['cookie-law-info-bar', 'cli-bar-btn_container'],
+                        [('css', '#wt-cli-accept-all-btn', 'document'),
+                         ('css', '#cookie_action_close_header', 'document')]),
+    'cookie_notice': (['cookie-notice-container', 'cn-accept-cookie'],
+                      [('css', '#cn-accept-cookie', 'document')]),
+    'klaro': (['id="klaro"', 'klaro.js'],
+              [('css', '.klaro .cm-btn-success', 'document')]),
+}
+# контейнеры баннеров платформ (тип, селектор, область): проба считается неудачной, только если один из них виден
+CMP_BANNERS: list[tuple[str, str, str]] = [
+    ('css', '#onetrust-banner-sdk', 'document'),
+    ('css', '#didomi-notice', 'document'),
+    ('css', '#qc-cmp2-ui', 'document'),
+    ('css', '#CybotCookiebotDialog', 'document'),
+    ('css', '[data-testid="uc-default-banner"]', 'shadow'),
+    ('css', '#truste-consent-track', 'document'),
+    ('css', '.fc-consent-root', 'document'),
+    ('css', '.cky-consent-container', 'document'),
+    ('css', '.cmplz-cookiebanner', 'document'),
+    ('css', '#iubenda-cs-banner', 'document'),
+    ('css', '.osano-cm-window', 'document'),
+    ('css', '#BorlabsCookieBox', 'document'),
+    ('css', '#cookie-law-info-bar', 'document'),
+    ('css', '#cookie-notice', 'document'),
+    ('css', '.klaro .cookie-notice', 'document'),
+]
+# выученных селекторов на платформу
+MAX_VENDOR_SELECTORS = 5
+
+# Кандидаты [{type, selector, scope}] по порядку; кликает первый видимый.
+# Возвращает {clicked: индекс кандидата или -1, banner: виден ли один из контейнеров arguments[1]}
+PROBE_SCRIPT = """
+const candidates = arguments[0];
+const banners = arguments[1] || [];
+function visible(el) {
+  if (!el || !(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) return false;
+  const style = window.getComputedStyle(el);
+  return style.visibility !== 'hidden' && style.display !== 'none';
+}
+function shadowRoots() {
+  return Array.from(document.querySelectorAll('*')).filter(el => el.shadowRoot).map(el => el.shadowRoot);
+}
+function find(candidate, roots) {
+  for (const root of roots) {
+    try {
+      let el = null;
+      if (candidate.type === 'xpath') {
+        el = document.evaluate(candidate.selector, root, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+      } else {
+        el = root.querySelector(candidate.selector);
+      }
+      if (visible(el)) return el;
+    } catch (e) {}
+  }
+  return null;
+}
+let shadow = null;
+function rootsFor(candidate) {
+  if (candidate.scope !== 'shadow') return [document];
+  shadow = shadow || shadowRoots();
+  return [document].concat(shadow);
+}
+for (let i = 0; i < candidates.length; i++) {
+  const el = find(candidates[i], rootsFor(candidates[i]));
+  if (el) {
+    el.scrollIntoView({block: 'center'});
+    el.click();
+    return {clicked: i, banner: true};
+  }
+}
+return {clicked: -1, banner: banners.some(banner => find(banner, rootsFor(banner)) !== null)};
+"""
+
+_file_lock = threading.Lock()
+
+
+def consent_domain(url: str) -> str:
+    return urlparse(url).netloc.lower().removeprefix('www.')
+
+
+def detect_vendor(html: str) -> Optional[str]:
+    """CMP-платформа по признакам в HTML (id контейнеров, скрипты платформы) - для порядка кандидатов"""
+    if not html:
+        return None
+    for vendor, (markers, _) in CMP_VENDORS.items():
+        if any(marker in html for marker in markers):
+            return vendor
+    return None
+
+
+class ConsentSelectorCache:
+    """Выученные селекторы согласия по доменам и CMP-платформам"""
+
+    def __init__(self, path: Optional[str] = None, max_failures: Optional[int] = None):
+        self.path = Path(path or config.PARSER_CONSENT_CACHE)
+        self.max_failures = max_failures if max_failures is not None else config.PARSER_CONSENT_MAX_FAILURES
+        state = self._load()
+        # домен -> {"vendor", "type", "selector", "scope", "hits", "failures", "updated_at"}
+        self.domains: dict[str, dict] = state.get('domains', {})
+        # платформа -> [{"type", "selector", "scope", "hits"}]
+        self.vendors: dict[str, list[dict]] = state.get('vendors', {})
+
+    def _load(self) -> dict:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Кэш селекторов cookies {self.path} не прочитан, начинаем с пустого: {e}")
+            return {}
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'domains': self.domains, 'vendors': self.vendors}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _reload(self):
+        # другие потоки могли записать свои домены
+        state = self._load()
+        self.domains = state.get('domains', self.domains)
+        self.vendors = state.get('vendors', self.vendors)
+
+    def candidates(self, domain: str, vendor: Optional[str] = None) -> list[dict]:
+        """
+        Селекторы для пробы по порядку: домена, выученные для платформы, известные кнопки платформ
+
+        Args:
+            domain: домен сайта
+            vendor: платформа, если определена по HTML (ее селекторы идут первыми среди платформ)
+        """
+        result, seen = [], set()
+
+        def add(selector_type: str, selector: str, scope: str, vendor_name: Optional[str]):
+            if (selector_type, selector) not in seen:
+                seen.add((selector_type, selector))
+                result.append({'type': selector_type, 'selector': selector, 'scope': scope, 'vendor': vendor_name})
+
+        entry = self.domains.get(domain)
+        if entry:
+            add(entry['type'], entry['selector'], entry.get('scope', 'document'), entry.get('vendor'))
+            vendor = vendor or entry.get('vendor')
+        vendors = ([vendor] if vendor in CMP_VENDORS else []) + [name for name in CMP_VENDORS if name != vendor]
+        for name in vendors:
+            # выученные селекторы бывают общими (XPath по тексту) - только для сайтов той же платформы
+            if name == vendor:
+                for learned in sorted(self.vendors.get(name, []), key=lambda item: item.get('hits', 0), reverse=True):
+                    add(learned['type'], learned['selector'], learned.get('scope', 'document'), name)
+            for selector_type, selector, scope in CMP_VENDORS[name][1]:
+                add(selector_type, selector, scope, name)
+        return result
+
+    def record_success(self, domain: str, selector_type: str, selector: str, vendor: Optional[str] = None,
+                       scope: str = 'document'):
+        """Сохранение сработавшего селектора домена (и платформы, если она известна)"""
+        with _file_lock:
+            self._reload()
+            entry = self.domains.get(domain, {})
+            same = entry.get('type') == selector_type and entry.get('selector') == selector
+            self.domains[domain] = {'vendor': vendor, 'type': selector_type, 'selector': selector, 'scope': scope,
+                                    'hits': entry.get('hits', 0) + 1 if same else 1, 'failures': 0,
+                                    'updated_at': time.time()}
+            if vendor:
+                learned = self.vendors.setdefault(vendor, [])
+                for item in learned:
+                    if item['type'] == selector_type and item['selector'] == selector:
+                        item['hits'] = item.get('hits', 0) + 1
+                        break
+                else:
+                    learned.append({'type': selector_type, 'selector': selector, 'scope': scope, 'hits': 1})
+                learned.sort(key=lambda item: item.get('hits', 0), reverse=True)
+                del learned[MAX_VENDOR_SELECTORS:]
+            self._save()
+
+    def record_failure(self, domain: str):
+        """Проба не нажала селектор домена при видимом баннере; после max_failures подряд запись удаляется"""
+        with _file_lock:
+            self._reload()
+            entry = self.domains.get(domain)
+            if entry is None:
+                return
+            entry['failures'] = entry.get('failures', 0) + 1
+            if entry['failures'] >= self.max_failures:
+                logger.info(f"Селектор cookies для {domain} не срабатывает, удален из кэша")
+                del self.domains[domain]
+            self._save()
+
+
+_cache: Optional[ConsentSelectorCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_consent_cache() -> Optional[ConsentSelectorCache]:
+    """Общий кэш процесса (None - кэш выключен, PARSER_CONSENT_CACHE пуст)"""
+    global _cache
+    if not config.PARSER_CONSENT_CACHE:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ConsentSelectorCache()
+        return _cache
@@ -0,0 +1,163 @@
+"""
+Поиск DuckDuckGo через HTML-версию (без браузера)
+
+Запросы отправляются на html.duckduckgo.com/html/ (PARSER_SEARCH_URL) общим пулом соединений aiohttp,
+несколько запросов одновременно (PARSER_SEARCH_CONCURRENCY), но не чаще PARSER_SEARCH_QUERIES_PER_MINUTE
+запросов в минуту (учитываются и запросы следующих страниц выдачи). Ссылки результатов - редиректы
+//duckduckgo.com/l/?uddg=<url>, из них берется исходный URL; рекламные результаты пропускаются.
+
+Если DuckDuckGo отвечает страницей проверки (anomaly, HTTP 202/403/429) или запрос не удался,
+search() возвращает None, и AutoScraper повторяет запрос через Selenium.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Iterable, Optional
+from urllib.parse import parse_qs, urljoin, urlparse
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/124.0 Safari/537.36')
+# страниц выдачи на запрос (на странице HTML-версии ~10 результатов)
+MAX_PAGES = 5
+BLOCKED_STATUSES = {202, 403, 429}
+
+
+def result_url(href: str) -> Optional[str]:
+    """Исходный URL результата (ссылки выдачи - редиректы через duckduckgo.com/l/?uddg=...)"""
+    if not href:
+        return None
+    parsed = urlparse(urljoin('https://duckduckgo.com/', href))
+    if parsed.netloc.endswith('duckduckgo.com'):
+        if parsed.path.startswith('/l/'):
+            target = parse_qs(parsed.query).get('uddg')
+            return target[0] if target else None
+        return None
+    return parsed.geturl() if parsed.scheme in ('http', 'https') else None
+
+
+def parse_results(html: str) -> list[str]:
+    """URL результатов страницы выдачи (без рекламы)"""
+    soup = BeautifulSoup(html, 'lxml')
+    urls = []
+    for link in soup.select('a.result__a'):
+        result = link.find_parent(class_='result')
+        if result is not None and 'result--ad' in result.get('class', []):
+            continue
+        url = result_url(link.get('href', ''))
+        if url and 'duckduckgo.com' not in urlparse(url).netloc:
+            urls.append(url)
+    return list(dict.fromkeys(urls))
+
+
+def parse_next_page(html: str) -> Optional[dict]:
+    """Поля формы следующей страницы выдачи (None - страница последняя)"""
+    soup = BeautifulSoup(html, 'lxml')
+    for form in soup.select('.nav-link form'):
+        submit = form.find('input', attrs={'type': 'submit'})
+        if submit is None or submit.get('value', '').strip().lower() != 'next':
+            continue
+        return {field['name']: field.get('value', '') for field in form.find_all('input', attrs={'name': True})
+                if field.get('type') != 'submit'}
+    return None
+
+
+def is_blocked_page(html: str) -> bool:
+    """Страница проверки на бота вместо выдачи"""
+    lowered = html.lower()
+    return 'anomaly-modal' in lowered or 'challenge-form' in lowered
+
+
+class AsyncRateLimiter:
+    """Не чаще rate_per_minute запросов в минуту (равномерно)"""
+
+    def __init__(self, rate_per_minute: float):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class DuckDuckGoHTTPSearch:
+    """Поиск DuckDuckGo через HTML-версию"""
+
+    def __init__(self, search_url: Optional[str] = None, concurrency: Optional[int] = None,
+                 queries_per_minute: Optional[float] = None, timeout: Optional[float] = None):
+        self.search_url = search_url or config.PARSER_SEARCH_URL
+        self.concurrency = concurrency or config.PARSER_SEARCH_CONCURRENCY
+        self.queries_per_minute = (queries_per_minute if queries_per_minute is not None
+                                   else config.PARSER_SEARCH_QUERIES_PER_MINUTE)
+        self.timeout = timeout or config.PARSER_SEARCH_TIMEOUT
+
+    async def _request(self, session: aiohttp.ClientSession, limiter: AsyncRateLimiter,
+                       form: dict) -> Optional[str]:
+        await limiter.wait()
+        try:
+            async with session.post(self.search_url, data=form) as response:
+                html = await response.text(errors='ignore')
+                if response.status in BLOCKED_STATUSES or is_blocked_page(html):
+                    logger.warning(f"DuckDuckGo вернул страницу проверки (HTTP {response.status})")
+                    return None
+                if response.status != 200:
+                    logger.warning(f"DuckDuckGo вернул HTTP {response.status}")
+                    return None
+                return html
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Ошибка запроса к DuckDuckGo: {e}")
+            return None
+
+    async def _search(self, session: aiohttp.ClientSession, limiter: AsyncRateLimiter,
+                      semaphore: asyncio.Semaphore, query: str, max_results: int) -> Optional[list[str]]:
+        urls: list[str] = []
+        form: Optional[dict] = {'q': query, 'b': '', 'kl': ''}
+        async with semaphore:
+            for _ in range(MAX_PAGES):
+                html = await self._request(session, limiter, form)
+                if html is None:
+                    # первая страница не получена - пусть повторит Selenium, иначе отдаем собранное
+                    return urls[:max_results] if urls else None
+                urls.extend(url for url in parse_results(html) if url not in urls)
+                form = parse_next_page(html)
+                if len(urls) >= max_results or form is None:
+                    break
+        return urls[:max_results]
+
+    async def search_many_async(self, queries: Iterable[str], max_results: int = 20) -> dict[str, Optional[list[str]]]:
+        queries = list(dict.fromkeys(queries))
+        limiter = AsyncRateLimiter(self.queries_per_minute)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector,
+                                         headers={'User-Agent': USER_AGENT}) as session:
+            results = await asyncio.gather(*(self._search(session, limiter, semaphore, query, max_results)
+                                             for query in queries))
+        return dict(zip(queries, results))
+
+    def search_many(self, queries: Iterable[str], max_results: int = 20) -> dict[str, Optional[list[str]]]:
+        """
+        Параллельный поиск по нескольким запросам
+
+        Returns:
+            {запрос: список URL или None, если DuckDuckGo не ответил выдачей}
+        """
+        return asyncio.run(self.search_many_async(queries, max_results))
+
+    def search(self, query: str, max_results: int = 20) -> Optional[list[str]]:
+        return self.search_many([query], max_results)[query]
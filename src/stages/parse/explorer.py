@@ -9,6 +9,7 @@ import re
 import random
 import socket
 import threading
+from dataclasses import dataclass
 from pathlib import Path
 from urllib.parse import urlparse, urljoin
 from typing import Set, Dict, List, Optional
@@ -25,12 +26,18 @@ if __name__ == "__main__":
 
 from config.config import config
 from src.stages.extract.recipe_extractor import RecipeExtractor
+from src.stages.extract.recipe_prescreen import RecipePrescreen
 from src.stages.analyse.analyse import RecipeAnalyzer
 from src.stages.parse.sitemap_scanner import SitemapScanner
+from src.stages.parse.recrawl_scheduler import RecrawlScheduler
 from src.repositories.site import SiteRepository
 from src.repositories.page import PageRepository
 from src.models.site import Site
 from src.models.page import Page
+from utils.html_slimming import slim_html
+from utils.async_logging import page_record
+from utils.stage_timing import site_timings
+from utils.content_hash import ChangeStats, content_hash, file_hash
 # Настройка логирования
 logging.basicConfig(
     level=logging.INFO,
@@ -38,6 +45,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class ExploreResult:
+    """Итог прохода explore_site (для планировщика run_parallel)"""
+    urls_explored: int = 0
+    captcha_pages: int = 0  # страницы с непройденной защитой от ботов
+    preempted: bool = False  # проход остановлен по кванту времени, очередь сохранена для продолжения
+
+
 class SiteExplorer:
     """Исследователь структуры сайта с поддержкой многоязычных рецептов"""
     
@@ -116,8 +132,23 @@ class SiteExplorer:
 
         # Инициализация экстрактора для проверки и извлечения рецептов
         self.recipe_extractor = RecipeExtractor()
+        # время этапов обработки страниц и счетчики сайта (utils/stage_timing.py)
+        self.timings = site_timings(self.site.name)
+        self.recipe_extractor.timings = self.timings
+        self.recipe_prescreen: Optional[RecipePrescreen] = None  # создается при первой проверке и смене паттерна
+        # пре-скрин исходного HTML последней облегченной страницы: (путь файла, есть признак рецепта)
+        self.raw_prescreen: Optional[tuple[str, bool]] = None
         self.max_no_recipe_pages: Optional[int] = max_no_recipe_pages 
         self.no_recipe_page_count: int = 0  # Счетчик страниц без рецепта подряд
+        self.change_stats = ChangeStats()  # изменения повторно обойденных страниц за проход
+        self.captcha_pages: int = 0  # страницы с непройденной защитой от ботов за проход
+        self.preempted: bool = False  # проход прерван по кванту времени
+        self.pattern_change_stats: Dict[str, ChangeStats] = {}  # те же счетчики по паттернам URL
+        self.recrawl_scheduler: Optional[RecrawlScheduler] = None
+        self.deferred_patterns: Set[str] = set()  # паттерны, время повторного обхода которых не наступило
+        if config.PARSER_RECRAWL_SCHEDULING:
+            self.recrawl_scheduler = RecrawlScheduler()
+            self.deferred_patterns = self.recrawl_scheduler.deferred_patterns(self.site.name)
         self.sitemap_parser = SitemapScanner(base_url=self.site.base_url, active_driver=self.driver, custom_logger=self.logger)
 
     def set_pattern(self, pattern: str):
@@ -338,10 +369,35 @@ class SiteExplorer:
                     title=self.driver.title,
                     language=language)
 
+        # повторный обход: страница с тем же HTML уже извлечена и сохранена
+        existing = None
+        if config.PARSER_CHANGE_DETECTION:
+            page.html_hash = file_hash(page.html_path)
+            with self.timings.time('db'):
+                existing = self.page_repository.get_by_url(self.site.id, url)
+            if existing is not None and existing.html_hash == page.html_hash:
+                self._count_change(pattern, 'unchanged_html')
+                self.logger.debug(f"  = HTML не изменился {url}, извлечение пропущено")
+                if existing.is_recipe:
+                    self.no_recipe_page_count = 0
+                    return True
+                self.no_recipe_page_count += 1
+                return False
+
+        # дешевая проверка сырого HTML: страницы без признаков рецепта не отдаем экстрактору
+        has_signal = True
+        if config.PARSER_RECIPE_PRESCREEN:
+            with self.timings.time('prescreen'):
+                has_signal = self.has_recipe_signal(page.html_path, url)
+        if not has_signal:
+            self.logger.debug(f"  ✗ Нет признаков рецепта в HTML {url}, извлечение пропущено")
+            self.no_recipe_page_count += 1
+            return False
+
         # Извлекаем полные данные рецепта
         recipe_data: Optional[Page] = self.recipe_extractor.extract_and_update_page(page)
         if not recipe_data:
-            self.logger.info(f"  ✗ Рецепт не найден на {url}")
+            self.logger.debug(f"  ✗ Рецепт не найден на {url}")
             self.no_recipe_page_count += 1
             return False
 
@@ -353,13 +409,26 @@ class SiteExplorer:
                 self.logger.error(f"Ошибка обновления языка сайта в БД: {e}")
         
         if recipe_data.is_recipe is False:
-            self.logger.info(f"  ✗ Рецепт не найден на {url}")
+            self.logger.debug(f"  ✗ Рецепт не найден на {url}")
             self.no_recipe_page_count += 1
             return False
 
+        if config.PARSER_CHANGE_DETECTION:
+            recipe_data.content_hash = content_hash(recipe_data)
+            if existing is not None and existing.content_hash == recipe_data.content_hash:
+                # изменилась только разметка: колонки рецепта (и перевод/векторы) не трогаем
+                self._count_change(pattern, 'unchanged_content')
+                with self.timings.time('db'):
+                    self.page_repository.update_html_hash(existing.id, recipe_data.html_hash, recipe_data.html_path)
+                self.logger.debug(f"  = Рецепт не изменился {url}, обновлен только хеш HTML")
+                self.no_recipe_page_count = 0
+                return True
+            self._count_change(pattern, 'new' if existing is None else 'changed')
+
         try:
             image_urls = recipe_data.image_urls.split(",") if recipe_data.image_urls else []
-            self.page_repository.create_or_update_with_images(recipe_data, image_urls=image_urls)
+            with self.timings.time('db'):
+                self.page_repository.create_or_update_with_images(recipe_data, image_urls=image_urls)
         except Exception as e:
             self.logger.error(f"Ошибка сохранения страницы в БД: {e}")
             self.no_recipe_page_count += 1
@@ -367,9 +436,43 @@ class SiteExplorer:
         
         dish_name = recipe_data.dish_name or "Без названия"
         self.logger.info(f"  ✓ Рецепт '{dish_name}' сохранен в БД")
+        if existing is None:  # без PARSER_CHANGE_DETECTION новой считается каждая сохраненная страница
+            self.timings.count('new_recipes')
         self.no_recipe_page_count = 0 # сброс счетчика страниц без рецепта
         return True
     
+    def _stage_done(self, stage: str, started: float) -> float:
+        """Учет этапа обработки страницы, возвращает начало следующего этапа"""
+        now = time.perf_counter()
+        self.timings.add(stage, now - started)
+        return now
+
+    def _count_change(self, pattern: str, field: str):
+        """Учет результата повторного обхода страницы для сайта и паттерна URL"""
+        for stats in (self.change_stats, self.pattern_change_stats.setdefault(pattern, ChangeStats())):
+            setattr(stats, field, getattr(stats, field) + 1)
+
+    def get_recipe_prescreen(self) -> RecipePrescreen:
+        if self.recipe_prescreen is None or self.recipe_prescreen.url_regex is not self.recipe_regex:
+            extractor_path = Path(self.recipe_extractor.registry.extractor_dir) / f"{self.site.name}.py"
+            self.recipe_prescreen = RecipePrescreen.for_extractor(extractor_path, url_regex=self.recipe_regex)
+        return self.recipe_prescreen
+
+    def has_recipe_signal(self, html_path: str, url: str) -> bool:
+        """Пре-скрин сырого HTML (JSON-LD/microdata Recipe, контейнеры экстрактора сайта, паттерн URL)"""
+        if self.raw_prescreen is not None and self.raw_prescreen[0] == html_path and self.raw_prescreen[1]:
+            self.logger.debug(f"  Признак рецепта в исходном HTML (до облегчения) на {url}")
+            return True
+        try:
+            with open(html_path, 'rb') as f:
+                result = self.get_recipe_prescreen().check(f.read(), url)
+        except OSError as e:
+            self.logger.warning(f"Не удалось прочитать {html_path} для пре-скрина: {e}")
+            return True
+        if result.has_signal:
+            self.logger.debug(f"  Признак рецепта ({result.reason}) на {url}")
+        return result.has_signal
+
     def should_explore_url(self, url: str, ignore_visited: bool = False) -> bool:
         """
         Проверка, нужно ли исследовать данный URL
@@ -458,17 +561,23 @@ class SiteExplorer:
         Returns:
             Приоритет (меньше = выше приоритет)
         """
+        referrer = self.referrer_map.get(url)
         # Приоритет 0 (наивысший): URL с паттерном рецепта
         if self.is_recipe_url(url):
-            return 0
+            priority = 0
         
         # Приоритет 1: URL со страниц, которые привели к рецептам
-        referrer = self.referrer_map.get(url)
-        if referrer and referrer in self.successful_referrers:
-            return 1
+        elif referrer and referrer in self.successful_referrers:
+            priority = 1
         
         # Приоритет 2: остальные URL
-        return 2
+        else:
+            priority = 2
+        
+        # паттерны, повторный обход которых по расписанию еще не нужен, - после всех остальных
+        if self.deferred_patterns and self.get_url_pattern(url) in self.deferred_patterns:
+            priority += 3
+        return priority
     
     def slow_scroll_page(self, quick_mode: bool = False):
         """Прокрутка страницы для загрузки контента
@@ -521,8 +630,10 @@ class SiteExplorer:
             Путь к сохраненному файлу HTML
         """
 
+        started = time.perf_counter()
         html_content = self.driver.page_source
-            
+        self.timings.count('bytes', len(html_content.encode('utf-8')))
+
         # Создание имени файла из паттерна
         safe_pattern = pattern.replace('/', '_').replace('#', 'N').replace('{', '').replace('}', '').strip('_')
         if not safe_pattern:
@@ -530,11 +641,26 @@ class SiteExplorer:
         
         filename = f"{safe_pattern}_{page_index}.html"
         filepath = os.path.join(self.save_dir,filename)
+
+        # облегчение HTML до записи (если экстрактор сайта не читает удаляемые узлы)
+        self.raw_prescreen = None
+        prescreen_seconds = 0.0
+        if config.PARSER_HTML_SLIMMING and self.recipe_extractor.registry.html_slimming_enabled(self.site.name):
+            if config.PARSER_RECIPE_PRESCREEN:
+                # облегчение удаляет встроенные скрипты, а в них бывает экранированный JSON рецепта
+                # (self.__next_f.push в Next.js) - пре-скрин по исходной разметке
+                prescreen_started = time.perf_counter()
+                self.raw_prescreen = (filepath, self.get_recipe_prescreen().check(html_content).has_signal)
+                prescreen_seconds = time.perf_counter() - prescreen_started
+                self.timings.add('prescreen', prescreen_seconds)
+            html_content = slim_html(html_content)
         
         # Сохранение HTML
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(html_content)
 
+        # пре-скрин учтен отдельной стадией - в save_html без него, иначе total_seconds считает его дважды
+        self.timings.add('save_html', time.perf_counter() - started - prescreen_seconds)
         return filepath
 
     
@@ -553,15 +679,16 @@ class SiteExplorer:
         language = self.driver.execute_script("return document.documentElement.lang") or 'unknown'
         filepath = self.save_page_as_file(pattern, page_index)
         filename = os.path.basename(filepath)
-        page_orm = self.page_repository.create_or_update(
-            Page(
-                site_id=self.site.id,
-                url=url,
-                pattern=pattern,
-                title=title,
-                language=language,
-                html_path=os.path.relpath(filepath)
-            ))
+        with self.timings.time('db'):
+            page_orm = self.page_repository.create_or_update(
+                Page(
+                    site_id=self.site.id,
+                    url=url,
+                    pattern=pattern,
+                    title=title,
+                    language=language,
+                    html_path=os.path.relpath(filepath)
+                ))
     
         if page_orm.id:
             self.logger.info(f"  ✓ Сохранено: {filename} (DB ID: {page_orm.id})")
@@ -879,7 +1006,8 @@ class SiteExplorer:
         return True
     
     def explore(self, max_urls: int = 100, max_depth: int = 3, session_urls: bool = True, 
-                check_pages_with_extractor:bool = False, check_url: bool = False) -> int:
+                check_pages_with_extractor:bool = False, check_url: bool = False,
+                max_seconds: Optional[float] = None) -> int:
         """
         Исследование структуры сайта
         
@@ -889,6 +1017,7 @@ class SiteExplorer:
             session_urls: Если True, то не учитывает старые посещенные URL при подсчтее max urls
             check_pages_with_extractor: Если True, проверяет каждую страницу экстрактором рецептов
             check_url: Если True, проверяет каждый на реджекс паттерн перед экстракцией (парамтер касается только экстракции)
+            max_seconds: Квант времени прохода (None = без ограничения), по истечении очередь сохраняется для продолжения
         Returns:
             urls_explored: Количество успешно посещенных URL в этой сессии
         """
@@ -921,9 +1050,15 @@ class SiteExplorer:
 
         err_count = 0  # Счетчик ошибок подряд
         last_strategy = self.recipe_regex is not None  # Для отслеживания переключений
+        started_at = time.time()
 
         while queue and urls_explored < max_urls:
             
+            if max_seconds is not None and time.time() - started_at >= max_seconds:
+                self.logger.info(f"⏸ Квант времени {max_seconds:.0f}с исчерпан, очередь сохранена для продолжения")
+                self.preempted = True
+                break
+            
             # Проверка лимита страниц без рецепта подряд
             if self.max_no_recipe_pages and self.no_recipe_page_count >= self.max_no_recipe_pages:
                 self.logger.info(f"🚫 Превышен лимит {self.max_no_recipe_pages} страниц без рецепта подряд, остановка исследования")
@@ -954,14 +1089,18 @@ class SiteExplorer:
                 continue
             
             try:
-                self.logger.info(f"[{urls_explored + 1}/{max_urls}] Переход на: {current_url}")
-                self.logger.info(f"  Паттерн: {pattern}, Глубина: {depth}")
+                # итог по странице пишет page_record, пошаговые сообщения - отладочные
+                self.logger.debug(f"[{urls_explored + 1}/{max_urls}] Переход на: {current_url}")
+                found_recipe = None
                 
                 # Засекаем время начала загрузки
                 page_load_start = time.time()
+                stage_start = time.perf_counter()
                 
                 # Используем новый метод с гарантированным timeout
-                if not self._navigate_with_timeout(current_url, timeout=90):
+                loaded = self._navigate_with_timeout(current_url, timeout=90)
+                stage_start = self._stage_done('navigation', stage_start)
+                if not loaded:
                     self.logger.error("Не удалось загрузить страницу, пропускаем")
                     self.failed_urls.add(current_url)
                     err_count += 1
@@ -984,6 +1123,7 @@ class SiteExplorer:
                         self.logger.error("Страница не загрузилась, пропускаем")
                         self.failed_urls.add(current_url)
                         continue
+                stage_start = self._stage_done('readiness', stage_start)
                      
                 # Проверка на Cloudflare/Captcha
                 try:
@@ -1005,11 +1145,14 @@ class SiteExplorer:
                         # Проверяем еще раз
                         if any(indicator in self.driver.title.lower() for indicator in protection_indicators):
                             self.logger.error("Защита не пройдена, пропускаем URL")
+                            self.captcha_pages += 1
+                            self._stage_done('protection', stage_start)
                             self.failed_urls.add(current_url)
                             err_count += 1
                             continue
                 except Exception as e:
                     self.logger.debug(f"Ошибка проверки защиты: {e}")
+                stage_start = self._stage_done('protection', stage_start)
                 
                 # Логирование времени загрузки
                 total_load_time = time.time() - page_load_start
@@ -1025,14 +1168,17 @@ class SiteExplorer:
                     # Обычная короткая пауза
                     delay = random.uniform(0.5, 1)
                 time.sleep(delay)
+                stage_start = self._stage_done('sleep', stage_start)
                 
                 # Прокрутка для загрузки контента (быстрый режим для ускорения)
                 use_quick_scroll = self.request_count % 3 != 0  # Каждый 3-й - обычная прокрутка
                 self.slow_scroll_page(quick_mode=use_quick_scroll)
+                self._stage_done('scroll', stage_start)
                 
                 # Добавление в посещенные
                 self.visited_urls.add(current_url)
                 urls_explored += 1
+                self.timings.count('pages')
                 
                 # Добавление в паттерн
                 if pattern not in self.url_patterns:
@@ -1044,7 +1190,9 @@ class SiteExplorer:
                 
                 # Если задан режим проверки с экстрактором, дополнительно может быть задан режим провекри по паттерну
                 if check_pages_with_extractor and (check_url is False or self.should_extract_recipe(current_url)):   
-                    if self.check_and_extract_recipe(current_url, pattern, page_index):
+                    found_recipe = self.check_and_extract_recipe(current_url, pattern, page_index)
+                    if found_recipe:
+                        self.timings.count('recipes')
                         # Если URL не соответствует паттерну, но рецепт найден - обновляем паттерн
                         if self.recipe_regex and not self.is_recipe_url(current_url):
                             self.logger.info("  Обновление паттерна URL, так как найден рецепт на странице")
@@ -1058,8 +1206,8 @@ class SiteExplorer:
                     self.save_page_html(current_url, pattern, page_index)
 
                 # Извлечение новых ссылок
-                new_links = self.extract_links_with_priority()
-                self.logger.info(f"  Найдено ссылок: {len(new_links)}")
+                with self.timings.time('links'):
+                    new_links = self.extract_links_with_priority()
                 
                 # Добавление новых ссылок в очередь с отслеживанием источника
                 # Если паттерн рецептов не найден - приоритизируем глубину (DFS)
@@ -1082,6 +1230,9 @@ class SiteExplorer:
                 # Сортируем очередь по приоритету только если паттерн найден
                 if has_recipe_pattern:
                     queue.sort(key=lambda x: self.get_url_priority(x[0]))
+
+                page_record(self.logger, n=urls_explored, depth=depth, load=total_load_time, links=len(new_links),
+                            queue=len(queue), recipe=found_recipe, pattern=pattern, url=current_url)
                 
                 # Периодическое сохранение
                 if urls_explored % 10 == 0:
@@ -1114,6 +1265,12 @@ class SiteExplorer:
         self.logger.info(f"  - {self.state_file} - состояние")
         self.logger.info(f"  - {self.patterns_file} - найденные паттерны")
         self.logger.info(f"  - *.html - сохраненные страницы ({sum(len(urls) for urls in self.url_patterns.values())} файлов)")
+        if config.PARSER_CHANGE_DETECTION and check_pages_with_extractor:
+            self.logger.info(f"Изменения страниц сайта {self.site.name}: {self.change_stats.summary()}")
+            if self.recrawl_scheduler is not None:
+                self.recrawl_scheduler.record_run(self.site.name, self.change_stats, self.pattern_change_stats,
+                                                  sitemap_lastmod=self.sitemap_parser.latest_lastmod)
+        self.logger.info(f"Время этапов: {self.timings.summary()}")
         self.logger.info("Для продолжения используйте: explorer.load_state() или explorer.import_state(state)")
         self.logger.info(f"{'='*60}")
         return urls_explored
@@ -1124,6 +1281,7 @@ class SiteExplorer:
         if self.driver and not self.debug_mode:
             self.driver.quit()
         
+        self.recipe_extractor.close()
         self.site_repository.close()
         self.page_repository.close()
         self.logger.info("Готово")
@@ -1136,7 +1294,8 @@ def explore_site(url: str, max_urls: int = 1000, max_depth: int = 4, recipe_patt
                  helper_links: List[str] = None,
                  custom_logger: Optional[logging.Logger] = None,
                  max_no_recipe_pages: Optional[int] = None,
-                 debug_host: str = None) -> int:
+                 debug_host: str = None,
+                 max_seconds: Optional[float] = None) -> ExploreResult:
     """
     Функция для исследования сайта с обработкой ошибок и прерываний
     
@@ -1152,9 +1311,10 @@ def explore_site(url: str, max_urls: int = 1000, max_depth: int = 4, recipe_patt
         helper_links: Список вспомогательных ссылок для начала исследования
         max_no_recipe_pages: Максимальное количество страниц без рецепта подряд (None = без ограничений)
         custom_logger: Пользовательский логгер (если None, используется стандартный)
+        max_seconds: Квант времени (None = без ограничения), прерванный проход продолжается со следующего вызова
     
     Returns:
-        Количество исследованных URL
+        ExploreResult: количество исследованных URL, страницы с защитой от ботов, прерван ли проход
     """
     explorer = None  # Инициализация перед try
     if custom_logger is None:
@@ -1182,11 +1342,13 @@ def explore_site(url: str, max_urls: int = 1000, max_depth: int = 4, recipe_patt
             max_urls=max_urls, 
             max_depth=max_depth, 
             check_url=check_url, 
-            check_pages_with_extractor=check_pages_with_extractor
+            check_pages_with_extractor=check_pages_with_extractor,
+            max_seconds=max_seconds
         )
         
         custom_logger.info(f"✓ Исследование завершено: {urls_explored} URL")
-        return urls_explored
+        return ExploreResult(urls_explored=urls_explored, captcha_pages=explorer.captcha_pages,
+                             preempted=explorer.preempted)
         
     except KeyboardInterrupt:
         custom_logger.warning("\nПрервано пользователем")
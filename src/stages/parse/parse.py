@@ -3,6 +3,7 @@
 """
 import random
 import logging
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 from selenium.common.exceptions import WebDriverException
@@ -14,10 +15,21 @@ if __name__ == "__main__":
 from src.stages.parse.explorer import explore_site
 from src.repositories.site import SiteRepository
 from src.repositories.page import PageRepository
+from src.stages.extract.extractor_registry import ExtractorRegistry
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class ParseRunResult:
+    """Результат запуска парсера сайта"""
+    new_recipes: int = 0
+    is_fatal: bool = False  # ошибка подключения к Chrome: порт больше не используется
+    urls_explored: int = 0
+    captcha_pages: int = 0
+    preempted: bool = False  # остановлен по кванту времени, продолжение - из сохраненного состояния исследования
+
+
 class RecipeParserRunner:
     """Класс для запуска парсинга рецептов с выбором модуля экстрактора"""
     
@@ -27,13 +39,14 @@ class RecipeParserRunner:
             extractor_dir: Путь к директории с экстракторами
         """
         self.extractor_dir = Path(extractor_dir)
+        self.registry: Optional[ExtractorRegistry] = None
         self.available_extractors = self._get_available_extractors()
         self.site_repository = SiteRepository()
         self.page_repository = PageRepository()
     
     def _get_available_extractors(self) -> list[str]:
         """
-        Получение списка доступных модулей экстракторов
+        Получение списка доступных модулей экстракторов из индекса (без импорта модулей)
         
         Returns:
             Список названий модулей (без расширения .py)
@@ -42,14 +55,11 @@ class RecipeParserRunner:
             logger.error(f"Директория экстракторов не найдена: {self.extractor_dir}")
             return []
         
-        extractors = []
-        for file in self.extractor_dir.glob("*.py"):
-            # Пропускаем __init__.py и base.py
-            if file.stem not in ["__init__", "base"]:
-                extractors.append(file.stem)
+        self.registry = ExtractorRegistry(extractor_dir=str(self.extractor_dir))
+        extractors = self.registry.names()
         
         logger.info(f"Найдено {len(extractors)} доступных экстракторов")
-        return sorted(extractors)
+        return extractors
     
     def get_random_extractor(self) -> Optional[str]:
         """
@@ -66,6 +76,20 @@ class RecipeParserRunner:
         logger.info(f"Выбран случайный экстрактор: {selected}")
         return selected
         
+    def check_success_threshold(self, site_id: int, new_recipes: int, success_page_count_threshold: Optional[int],
+                                custom_logger: Optional[logging.Logger] = None) -> bool:
+        """
+        Проверка порога успешного завершения парсинга сайта, ниже порога увеличивается счетчик неудач сайта
+
+        Returns:
+            True если порог не указан или достигнут
+        """
+        if success_page_count_threshold is None or new_recipes >= success_page_count_threshold:
+            return True
+        (custom_logger or logger).warning(f"Количество новых рецептов ({new_recipes}) меньше порога успешного завершения ({success_page_count_threshold})")
+        self.site_repository.increment_parsing_fail_count(site_id)
+        return False
+
     def run_parser(
         self,
         module_name: Optional[str] = None,
@@ -75,8 +99,9 @@ class RecipeParserRunner:
         custom_logger: Optional[logging.Logger] = None,
         max_no_recipe_pages: Optional[int] = None,
         success_page_count_threshold: Optional[int] = 20,
-        debug_host: str = "localhost"
-    ) -> tuple[bool, bool]:
+        debug_host: str = "localhost",
+        max_seconds: Optional[float] = None
+    ) -> ParseRunResult:
         """
         Запуск парсинга с указанным или случайным модулем
         
@@ -88,16 +113,17 @@ class RecipeParserRunner:
             max_depth: Максимальная глубина исследования
             helper_links: Дополнительные URL для добавления в очередь
             success_page_count_threshold: минимальное количество успешно распарсенных страниц рецептов для успешного завершения парсинга (если указано)
+            max_seconds: квант времени (None = без ограничения); прерванный по кванту проход порогом не оценивается (см. run_parallel)
             
         Returns:
-            tuple[int, bool]: (сколько новых рецептов доабвлено, фатальная ли это ошибка)
+            ParseRunResult: сколько новых рецептов добавлено, фатальная ли это ошибка, статистика прохода
         """
         new_recipes_added: int = 0
         # Выбор модуля
         if module_name is None:
             module_name = self.get_random_extractor()
             if module_name is None:
-                return False, False
+                return ParseRunResult()
         else:
             # Проверка существования модуля
             if module_name not in self.available_extractors:
@@ -105,13 +131,13 @@ class RecipeParserRunner:
                     f"Модуль '{module_name}' не найден. "
                     f"Доступные модули: {', '.join(self.available_extractors)}"
                 )
-                return False, False
+                return ParseRunResult()
         
         # Получение URL сайта
         site_orm = self.site_repository.get_by_name(module_name)
         if site_orm is None:
             custom_logger.error(f"URL для модуля '{module_name}' не найден в БД сайтов")
-            return False, False
+            return ParseRunResult()
         
         current_pages_count = self.page_repository.get_recipes_count_by_site(site_orm.id)
         
@@ -131,7 +157,7 @@ class RecipeParserRunner:
         
         try:
             # Запуск парсинга через explore_site
-            explore_site(
+            explore_result = explore_site(
                 url=site_orm.base_url,
                 max_urls=max_urls,
                 max_depth=max_depth,
@@ -142,30 +168,37 @@ class RecipeParserRunner:
                 helper_links=helper_links,
                 custom_logger=custom_logger,
                 max_no_recipe_pages=max_no_recipe_pages,
-                debug_host=debug_host
+                debug_host=debug_host,
+                max_seconds=max_seconds
             )
             
             custom_logger.info(f"Парсинг {module_name} завершен успешно")
             new_pages_count = self.page_repository.get_recipes_count_by_site(site_orm.id)
             new_recipes_added = new_pages_count - current_pages_count
             custom_logger.info(f"Новых рецептов добавлено: {new_recipes_added}")
-            if success_page_count_threshold is not None and new_recipes_added < success_page_count_threshold:
-                custom_logger.warning(f"Количество новых рецептов ({new_recipes_added}) меньше порога успешного завершения ({success_page_count_threshold})")
-                self.site_repository.increment_parsing_fail_count(site_orm.id)
-                return new_recipes_added, False  # Фатальная ошибка - парсер работает, но не приносит результаты
-
-            return new_recipes_added, False
+            result = ParseRunResult(
+                new_recipes=new_recipes_added,
+                urls_explored=explore_result.urls_explored,
+                captcha_pages=explore_result.captcha_pages,
+                preempted=explore_result.preempted
+            )
+            # прерванный по кванту проход оценивает run_parallel, когда планировщик завершит сайт
+            if not explore_result.preempted:
+                # Фатальная ошибка, если парсер работает, но не приносит результаты
+                self.check_success_threshold(site_orm.id, new_recipes_added, success_page_count_threshold,
+                                             custom_logger)
+            return result
 
         except WebDriverException as wde:
             if "Chrome не запущен на порту" in str(wde):
                 custom_logger.error(f"Ошибка подключения к Chrome на порту {port}: {wde}")
-                return 0, True # Возвращаем флаг для перезапуска потока с новым портом
+                return ParseRunResult(is_fatal=True) # Возвращаем флаг для перезапуска потока с новым портом
             else:
                 custom_logger.error(f"WebDriverException при парсинге {module_name}: {wde}", exc_info=True)
-                return 0, True
+                return ParseRunResult(is_fatal=True)
             
         except Exception as e:
             custom_logger.error(f"Ошибка при парсинге {module_name}: {e}", exc_info=True)
-            return 0, False
+            return ParseRunResult()
 
 
@@ -0,0 +1,262 @@
+"""
+Отсев похожих поисковых запросов и учет новизны их выдачи
+
+Запросы (и их переводы) переводятся в эмбеддинги локальной многоязычной моделью
+(PARSER_QUERY_EMBEDDING_MODEL; без sentence-transformers - хешированные символьные n-граммы, которые
+находят только почти одинаковые запросы на одном языке). Запрос с косинусной близостью к уже известному
+не ниже PARSER_QUERY_SIMILARITY_THRESHOLD считается избыточным: новый запрос GPT не переводится и не
+сохраняется, а сохраненный не отправляется в поиск. Близость ко всем известным запросам считается
+одним умножением матрицы векторов (numpy).
+
+Запросы одного исходного запроса (переводы) образуют семейство. После поиска для семейства считается
+новизна выдачи - доля доменов, которых не было в выдаче других запросов (экспоненциальное сглаживание).
+Запросы для поиска выбираются взвешенно по новизне семейства, так что семейства, возвращающие уже
+известные домены, ищутся реже. Состояние хранится в JSON файле PARSER_QUERY_INDEX.
+"""
+
+import os
+import json
+import math
+import random
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+EmbedFunction = Callable[[list[str]], list[list[float]]]
+
+NGRAM_SIZE = 3
+NGRAM_DIMENSION = 512
+# вес последнего поиска в новизне семейства; новизна нового семейства
+NOVELTY_SMOOTHING = 0.5
+PRIOR_NOVELTY = 1.0
+# семейство с нулевой новизной все же иногда выбирается
+MIN_WEIGHT = 0.05
+
+_file_lock = threading.Lock()
+
+
+def ngram_embedding(texts: list[str]) -> list[list[float]]:
+    """Хешированные символьные n-граммы (запасной вариант без модели)"""
+    vectors = []
+    for text in texts:
+        padded = f" {' '.join(text.lower().split())} "
+        vector = [0.0] * NGRAM_DIMENSION
+        for index in range(max(len(padded) - NGRAM_SIZE + 1, 1)):
+            digest = hashlib.md5(padded[index:index + NGRAM_SIZE].encode('utf-8')).digest()
+            vector[int.from_bytes(digest[:4], 'little') % NGRAM_DIMENSION] += 1.0
+        vectors.append(normalize(vector))
+    return vectors
+
+
+def normalize(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(value * value for value in vector))
+    return [value / norm for value in vector] if norm else vector
+
+
+def cosine(a: list[float], b: list[float]) -> float:
+    """Косинусная близость нормированных векторов"""
+    return sum(x * y for x, y in zip(a, b))
+
+
+def load_embedding_function(model_name: Optional[str] = None) -> EmbedFunction:
+    """Локальная модель эмбеддингов (src/common/embedding.py) или n-граммы, если модель недоступна"""
+    model_name = model_name if model_name is not None else config.PARSER_QUERY_EMBEDDING_MODEL
+    if not model_name:
+        return ngram_embedding
+    try:
+        from src.common.embedding import get_embedding_function
+        embed, _ = get_embedding_function(model_name=model_name, batch_size=32)
+        return lambda texts: embed(texts)
+    except Exception as e:  # нет sentence-transformers/torch или модель не скачана
+        logger.warning(f"Модель эмбеддингов {model_name} недоступна ({e}), сравнение запросов по n-граммам")
+        return ngram_embedding
+
+
+def result_domain(url: str) -> str:
+    return urlparse(url).netloc.lower().removeprefix('www.')
+
+
+class QueryIndex:
+    """Эмбеддинги известных запросов, семейства запросов и новизна их выдачи"""
+
+    def __init__(self, path: Optional[str] = None, threshold: Optional[float] = None,
+                 embed: Optional[EmbedFunction] = None):
+        self.path = Path(path or config.PARSER_QUERY_INDEX)
+        self.threshold = threshold if threshold is not None else config.PARSER_QUERY_SIMILARITY_THRESHOLD
+        self._embed = embed
+        state = self._load()
+        # текст запроса -> {"family", "vector", "searched"}
+        self.queries: dict[str, dict] = state.get('queries', {})
+        # семейство -> {"searches", "domains", "new_domains", "novelty"}
+        self.families: dict[str, dict] = state.get('families', {})
+        self.domains: set[str] = set(state.get('domains', []))
+        # матрица векторов запросов для поиска ближайших (строится заново после добавления векторов)
+        self._matrix: Optional[tuple[list[str], np.ndarray]] = None
+
+    def _load(self) -> dict:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Индекс запросов {self.path} не прочитан, начинаем с пустого: {e}")
+            return {}
+
+    def save(self):
+        with _file_lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'queries': self.queries, 'families': self.families, 'domains': sorted(self.domains)},
+                          f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        if self._embed is None:
+            self._embed = load_embedding_function()
+        return [[round(value, 5) for value in normalize(list(vector))] for vector in self._embed(texts)]
+
+    def _vectors(self, texts: list[str]) -> dict[str, list[float]]:
+        """Векторы запросов (известные - из индекса, новые считаются одним батчем)"""
+        missing = [text for text in dict.fromkeys(texts) if 'vector' not in self.queries.get(text, {})]
+        vectors = dict(zip(missing, self.embed(missing))) if missing else {}
+        return {text: self.queries[text]['vector'] if text not in vectors else vectors[text] for text in texts}
+
+    def _set_vector(self, text: str, entry: dict, vector: list[float]):
+        entry['vector'] = vector
+        self.queries[text] = entry
+        self._matrix = None
+
+    def _similarities(self, vector: list[float]) -> tuple[list[str], np.ndarray]:
+        """Близость вектора ко всем известным запросам одним умножением матрицы на вектор"""
+        if self._matrix is None:
+            texts = [text for text, entry in self.queries.items() if 'vector' in entry]
+            self._matrix = (texts, np.array([self.queries[text]['vector'] for text in texts], dtype=np.float32))
+        texts, matrix = self._matrix
+        if not texts:
+            return texts, np.empty(0, dtype=np.float32)
+        return texts, matrix @ np.asarray(vector, dtype=np.float32)
+
+    def nearest(self, vector: list[float]) -> tuple[Optional[str], float]:
+        """Самый близкий известный запрос и его близость"""
+        texts, similarities = self._similarities(vector)
+        if not texts:
+            return None, -1.0
+        best = int(np.argmax(similarities))
+        return texts[best], float(similarities[best])
+
+    def filter_new(self, queries: Iterable[str]) -> list[str]:
+        """Новые запросы без близких среди известных и между собой (до перевода и сохранения)"""
+        queries = [query for query in dict.fromkeys(queries) if query not in self.queries]
+        accepted: list[tuple[str, list[float]]] = []
+        for query, vector in self._vectors(queries).items():
+            known, similarity = self.nearest(vector)
+            if known is not None and similarity >= self.threshold:
+                logger.info(f"Запрос '{query}' пропущен: похож на '{known}' ({similarity:.2f})")
+                continue
+            if any(cosine(vector, other) >= self.threshold for _, other in accepted):
+                logger.info(f"Запрос '{query}' пропущен: похож на другой новый запрос")
+                continue
+            accepted.append((query, vector))
+        return [query for query, _ in accepted]
+
+    def add(self, family: str, queries: Iterable[str]) -> list[str]:
+        """
+        Добавление запросов семейства (исходный запрос и его переводы)
+
+        Args:
+            family: исходный запрос (ключ семейства)
+            queries: переводы, которые сохраняются для поиска
+
+        Returns:
+            Добавленные запросы (без близких к уже известным запросам других семейств)
+        """
+        queries = list(queries)
+        vectors = self._vectors([family] + queries)
+        added = []
+        for query in queries:
+            if query in self.queries:
+                continue
+            known, similarity = self.nearest(vectors[query])
+            if known is not None and similarity >= self.threshold and self.queries[known]['family'] != family:
+                logger.debug(f"Перевод '{query}' пропущен: похож на '{known}' ({similarity:.2f})")
+                continue
+            self._set_vector(query, {'family': family, 'searched': False}, vectors[query])
+            added.append(query)
+        if family not in self.queries:
+            # исходный запрос сам в поиск не идет, но отсекает близкие к нему новые запросы
+            self._set_vector(family, {'family': family, 'searched': False, 'source': True}, vectors[family])
+        self.families.setdefault(family, {'searches': 0, 'domains': 0, 'new_domains': 0, 'novelty': PRIOR_NOVELTY})
+        return added
+
+    def family_of(self, query: str) -> str:
+        return self.queries.get(query, {}).get('family', query)
+
+    def weight(self, query: str) -> float:
+        """Вес запроса при выборе: новизна выдачи его семейства"""
+        family = self.families.get(self.family_of(query))
+        novelty = family['novelty'] if family else PRIOR_NOVELTY
+        return max(novelty, MIN_WEIGHT)
+
+    def is_redundant(self, query: str) -> bool:
+        """Близкий запрос уже искали (или он выбран раньше в этом же раунде)"""
+        texts, similarities = self._similarities(self._vectors([query])[query])
+        return any(texts[index] != query and self.queries[texts[index]].get('searched')
+                   for index in np.flatnonzero(similarities >= self.threshold))
+
+    def select(self, queries: list, limit: int, text: Callable = lambda query: query) -> tuple[list, list]:
+        """
+        Выбор запросов для поиска: взвешенно по новизне семейства, без близких к уже найденным
+
+        Args:
+            queries: кандидаты (строки или объекты запросов)
+            limit: сколько выбрать
+            text: текст запроса кандидата
+
+        Returns:
+            (выбранные, избыточные)
+        """
+        texts = [text(query) for query in queries]
+        for query_text, vector in self._vectors(texts).items():
+            if 'vector' not in self.queries.get(query_text, {}):
+                self._set_vector(query_text, self.queries.get(query_text, {'family': query_text, 'searched': False}),
+                                 vector)
+
+        # взвешенный случайный порядок (Efraimidis-Spirakis): u^(1/w) по убыванию
+        keyed = sorted(queries, key=lambda query: random.random() ** (1 / self.weight(text(query))), reverse=True)
+        selected, redundant = [], []
+        for query in keyed:
+            if len(selected) >= limit:
+                break
+            if self.is_redundant(text(query)):
+                redundant.append(query)
+                continue
+            selected.append(query)
+            # выбранные в этом раунде тоже отсекают близкие
+            self.queries[text(query)]['searched'] = True
+        return selected, redundant
+
+    def record_results(self, query: str, urls: Iterable[str]):
+        """Учет выдачи запроса: доля новых доменов обновляет новизну семейства"""
+        domains = {result_domain(url) for url in urls if result_domain(url)}
+        new_domains = domains - self.domains
+        self.domains.update(domains)
+        entry = self.queries.setdefault(query, {'family': query})
+        entry['searched'] = True
+        family = self.families.setdefault(entry['family'], {'searches': 0, 'domains': 0, 'new_domains': 0,
+                                                             'novelty': PRIOR_NOVELTY})
+        family['searches'] += 1
+        family['domains'] += len(domains)
+        family['new_domains'] += len(new_domains)
+        novelty = len(new_domains) / len(domains) if domains else 0.0
+        family['novelty'] = NOVELTY_SMOOTHING * novelty + (1 - NOVELTY_SMOOTHING) * family['novelty']
@@ -0,0 +1,202 @@
+"""
+Планировщик повторного обхода сайтов
+
+История каждого сайта (JSON файл PARSER_RECRAWL_SCHEDULE) пополняется исследователем в конце прохода:
+число новых рецептов, доля измененных повторно обойденных страниц (utils/content_hash.py), самый
+поздний <lastmod> из sitemap и те же счетчики по паттернам URL. По истории оценивается скорость
+появления новых рецептов (рецептов в день, экспоненциальное сглаживание по проходам), и следующий
+визит назначается через время, за которое ожидается PARSER_RECRAWL_TARGET_RECIPES новых рецептов
+(в пределах PARSER_RECRAWL_MIN_HOURS..PARSER_RECRAWL_MAX_DAYS). Если sitemap показывает более частые
+публикации, интервал не превышает интервал между обновлениями sitemap.
+
+prioritize() выдает сайты для parse в порядке очереди с приоритетом: сначала не обходившиеся,
+затем просроченные по времени следующего визита (при равенстве - с большей скоростью), сайты,
+время которых не наступило, пропускаются. Паттерны URL, время которых не наступило, исследователь
+обходит в последнюю очередь.
+"""
+
+import os
+import json
+import time
+import heapq
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable, Mapping, Optional
+
+from config.config import config
+from utils.content_hash import ChangeStats
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 60 * 60
+# вес сглаживания последнего прохода в оценке скорости
+YIELD_SMOOTHING = 0.5
+# измененная страница считается за долю нового рецепта (изменения говорят об активности сайта)
+CHANGE_WEIGHT = 0.5
+
+# все потоки run_parallel пишут в один файл
+_file_lock = threading.Lock()
+
+
+def discovery_rate(runs: list[dict], min_interval: float) -> float:
+    """
+    Сглаженная скорость появления новых рецептов (в день) по истории проходов
+
+    Args:
+        runs: проходы по порядку: {"finished_at", "new", "changed"}
+        min_interval: минимальный интервал (секунды), с ним считается первый проход и слишком частые проходы
+    """
+    rate = None
+    previous = None
+    for run in runs:
+        gap = run['finished_at'] - previous if previous is not None else min_interval
+        found = run.get('new', 0) + CHANGE_WEIGHT * run.get('changed', 0)
+        run_rate = found * DAY / max(gap, min_interval)
+        rate = run_rate if rate is None else YIELD_SMOOTHING * run_rate + (1 - YIELD_SMOOTHING) * rate
+        previous = run['finished_at']
+    return rate or 0.0
+
+
+def next_interval(rate: float, target: float, min_interval: float, max_interval: float,
+                  sitemap_cadence: Optional[float] = None) -> float:
+    """
+    Интервал до следующего визита (секунды)
+
+    Args:
+        rate: скорость появления новых рецептов в день
+        target: сколько новых рецептов должно накопиться к визиту
+        sitemap_cadence: интервал между обновлениями sitemap (секунды), если известен
+    """
+    interval = target / rate * DAY if rate > 0 else max_interval
+    if sitemap_cadence is not None and sitemap_cadence > 0:
+        interval = min(interval, sitemap_cadence)
+    return min(max(interval, min_interval), max_interval)
+
+
+class RecrawlScheduler:
+    """История обходов и время следующего визита по сайтам и паттернам URL"""
+
+    def __init__(self, path: Optional[str] = None, min_interval: Optional[float] = None,
+                 max_interval: Optional[float] = None, target_recipes: Optional[float] = None,
+                 history_size: int = 10):
+        self.path = Path(path or config.PARSER_RECRAWL_SCHEDULE)
+        self.min_interval = min_interval if min_interval is not None else config.PARSER_RECRAWL_MIN_HOURS * 60 * 60
+        self.max_interval = max_interval if max_interval is not None else config.PARSER_RECRAWL_MAX_DAYS * DAY
+        self.target_recipes = target_recipes if target_recipes is not None else config.PARSER_RECRAWL_TARGET_RECIPES
+        self.history_size = history_size
+        self.sites: dict[str, dict] = self._load()
+
+    def _load(self) -> dict[str, dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('sites', {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Расписание обхода {self.path} не прочитано, начинаем с пустого: {e}")
+            return {}
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'sites': self.sites}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _schedule(self, runs: list[dict], sitemap_cadence: Optional[float] = None) -> tuple[float, float]:
+        """(скорость в день, время следующего визита) по истории проходов"""
+        rate = discovery_rate(runs, self.min_interval)
+        interval = next_interval(rate, self.target_recipes, self.min_interval, self.max_interval, sitemap_cadence)
+        return rate, runs[-1]['finished_at'] + interval
+
+    def _append_run(self, entry: dict, run: dict, sitemap_cadence: Optional[float] = None):
+        runs = entry.get('runs', [])
+        if runs and run['finished_at'] - runs[-1]['finished_at'] < self.min_interval:
+            # кванты одного запуска parse (и частые перезапуски) считаются одним проходом
+            previous = runs[-1]
+            merged = {key: previous.get(key, 0) + value for key, value in run.items() if key != 'finished_at'}
+            merged['finished_at'] = run['finished_at']
+            run, runs = merged, runs[:-1]
+        entry['runs'] = (runs + [run])[-self.history_size:]
+        entry['rate'], entry['next_visit'] = self._schedule(entry['runs'], sitemap_cadence)
+
+    def record_run(self, site_name: str, stats: ChangeStats,
+                   pattern_stats: Optional[Mapping[str, ChangeStats]] = None,
+                   sitemap_lastmod: Optional[float] = None, finished_at: Optional[float] = None) -> dict:
+        """
+        Запись результатов прохода по сайту и пересчет времени следующего визита
+
+        Args:
+            site_name: имя сайта (модуль экстрактора)
+            stats: счетчики изменений за проход (new - новые рецепты)
+            pattern_stats: те же счетчики по паттернам URL
+            sitemap_lastmod: самый поздний <lastmod> sitemap (секунды epoch), если sitemap сканировался
+            finished_at: время окончания прохода (по умолчанию - сейчас)
+
+        Returns:
+            Запись сайта в расписании
+        """
+        finished_at = finished_at if finished_at is not None else time.time()
+        with _file_lock:
+            # перечитываем файл: другие потоки могли записать свои сайты
+            self.sites = self._load()
+            entry = self.sites.setdefault(site_name, {})
+
+            sitemap_cadence = None
+            previous_lastmod = entry.get('sitemap_lastmod')
+            if sitemap_lastmod is not None:
+                if previous_lastmod is not None and sitemap_lastmod > previous_lastmod:
+                    sitemap_cadence = sitemap_lastmod - previous_lastmod
+                entry['sitemap_lastmod'] = max(sitemap_lastmod, previous_lastmod or sitemap_lastmod)
+
+            self._append_run(entry, self._run(stats, finished_at), sitemap_cadence)
+
+            patterns = entry.setdefault('patterns', {})
+            for pattern, pattern_stat in (pattern_stats or {}).items():
+                self._append_run(patterns.setdefault(pattern, {}), self._run(pattern_stat, finished_at))
+
+            self._save()
+        logger.info(f"Расписание {site_name}: {entry['rate']:.1f} рецептов/день, "
+                    f"следующий визит через {(entry['next_visit'] - finished_at) / DAY:.1f} дн.")
+        return entry
+
+    @staticmethod
+    def _run(stats: ChangeStats, finished_at: float) -> dict:
+        return {'finished_at': finished_at, 'new': stats.new, 'changed': stats.changed, 'recrawled': stats.recrawled}
+
+    def next_visit(self, site_name: str) -> Optional[float]:
+        """Время следующего визита (None - сайт еще не обходился)"""
+        return self.sites.get(site_name, {}).get('next_visit')
+
+    def deferred_patterns(self, site_name: str, now: Optional[float] = None) -> set[str]:
+        """Паттерны URL сайта, время следующего визита которых еще не наступило"""
+        now = now if now is not None else time.time()
+        patterns = self.sites.get(site_name, {}).get('patterns', {})
+        return {pattern for pattern, entry in patterns.items() if entry.get('next_visit', 0) > now}
+
+    def prioritize(self, site_names: Iterable[str], now: Optional[float] = None,
+                   include_not_due: bool = False) -> list[str]:
+        """
+        Сайты в порядке обхода
+
+        Args:
+            site_names: кандидаты (порядок сохраняется среди не обходившихся сайтов)
+            include_not_due: добавить в конец сайты, время которых не наступило
+        """
+        now = now if now is not None else time.time()
+        due, not_due = [], []
+        for index, name in enumerate(site_names):
+            entry = self.sites.get(name)
+            if entry is None or 'next_visit' not in entry:
+                heapq.heappush(due, (0.0, 0.0, index, name))
+            elif entry['next_visit'] <= now:
+                heapq.heappush(due, (entry['next_visit'], -entry.get('rate', 0.0), index, name))
+            else:
+                heapq.heappush(not_due, (entry['next_visit'], -entry.get('rate', 0.0), index, name))
+        ordered = [heapq.heappop(due)[-1] for _ in range(len(due))]
+        if include_not_due:
+            ordered.extend(heapq.heappop(not_due)[-1] for _ in range(len(not_due)))
+        elif not_due:
+            logger.info(f"Отложено до следующего визита: {len(not_due)} сайтов")
+        return ordered
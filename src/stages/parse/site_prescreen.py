@@ -0,0 +1,218 @@
+"""
+Быстрый отбор сайтов-кандидатов по HTTP перед подготовкой в браузере
+
+Для каждого домена (параллельно, PARSER_SITE_PRESCREEN_CONCURRENCY запросов) загружаются главная страница,
+robots.txt и sitemap (из robots.txt или стандартных путей; из индекса - вложенные sitemap, похожие на
+рецепты или записи). Из URL sitemap (если sitemap нет - из ссылок главной) выбираются несколько страниц,
+похожих на рецепты, и в них ищется JSON-LD (или microdata/RDFa) типа Recipe. Оценка домена:
+
+    0.7 * доля выборки со структурированным рецептом + 0.2 * признаки рецепта на главной + 0.1 * есть sitemap
+
+Сайты с оценкой ниже PARSER_SITE_PRESCREEN_MIN_SCORE в браузер не отправляются. Сайты, которые по HTTP
+не ответили или закрыты защитой от ботов (403/429/503), не оцениваются и остаются для браузера.
+"""
+
+import re
+import gzip
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Iterable, Optional
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+
+from config.config import config
+from src.stages.extract.recipe_prescreen import RecipePrescreen
+from utils.structured_data import find_json_ld_node, parse_json_ld_markup
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/124.0 Safari/537.36')
+# страница читается не целиком: JSON-LD обычно в <head> или в начале <body>
+MAX_PAGE_BYTES = 1_500_000
+MAX_SITEMAP_BYTES = 5_000_000
+# коды, при которых сайт, вероятно, закрыт защитой от ботов (в браузере может открыться)
+BLOCKED_STATUSES = {401, 403, 429, 503}
+SITEMAP_PATHS = ('/sitemap.xml', '/sitemap_index.xml', '/wp-sitemap.xml')
+# слова в URL, по которым страница или вложенный sitemap похожи на рецепты
+RECIPE_URL_HINTS = re.compile(
+    r'recipe|recept|rezept|recette|ricett|receta|receita|przepis|opskrift|oppskrift|resep|tarif|resept'
+    r'|рецепт|рецепти',
+    re.IGNORECASE
+)
+POST_SITEMAP_HINTS = re.compile(r'post|article|page-sitemap|content', re.IGNORECASE)
+STRUCTURED_REASONS = {'json_ld', 'microdata', 'rdfa'}
+
+_LOC_RE = re.compile(r'<loc>\s*(?:<!\[CDATA\[)?\s*(.*?)\s*(?:\]\]>)?\s*</loc>', re.IGNORECASE | re.DOTALL)
+_HREF_RE = re.compile(r'<a\b[^>]*\bhref\s*=\s*["\']([^"\'#]+)', re.IGNORECASE)
+
+_prescreen = RecipePrescreen()
+
+
+@dataclass
+class SiteScreenResult:
+    """Результат отбора домена"""
+    url: str
+    score: Optional[float] = None  # None - сайт не оценен (недоступен по HTTP или закрыт защитой)
+    homepage_signal: bool = False
+    has_sitemap: bool = False
+    sampled: int = 0
+    recipe_pages: int = 0
+    reason: str = ''
+
+    def is_promising(self, min_score: float) -> bool:
+        """Отправлять ли сайт на подготовку в браузере"""
+        return self.score is None or self.score >= min_score
+
+    def summary(self) -> str:
+        score = f"{self.score:.2f}" if self.score is not None else "не оценен"
+        return (f"{self.url}: {score}, рецептов в выборке {self.recipe_pages}/{self.sampled}, "
+                f"sitemap {'есть' if self.has_sitemap else 'нет'}{', ' + self.reason if self.reason else ''}")
+
+
+def has_structured_recipe(html: str) -> bool:
+    """JSON-LD типа Recipe (или microdata/RDFa рецепта) в HTML"""
+    if find_json_ld_node(parse_json_ld_markup(html)) is not None:
+        return True
+    return _prescreen.check(html).reason in STRUCTURED_REASONS
+
+
+def sitemap_locations(xml: str) -> list[str]:
+    """Содержимое <loc> sitemap или индекса sitemap (без разбора XML: sitemap часто невалидны)"""
+    return [loc.strip() for loc in _LOC_RE.findall(xml) if loc.strip()]
+
+
+def is_sitemap_index(xml: str) -> bool:
+    return '<sitemapindex' in xml[:2000].lower()
+
+
+def sitemaps_from_robots(robots_text: str) -> list[str]:
+    return [line.split(':', 1)[1].strip() for line in robots_text.splitlines()
+            if line.strip().lower().startswith('sitemap:')]
+
+
+def homepage_links(html: str, base_url: str) -> list[str]:
+    """Ссылки главной страницы на тот же домен"""
+    domain = urlparse(base_url).netloc.removeprefix('www.')
+    links = []
+    for href in _HREF_RE.findall(html):
+        url = urljoin(base_url, href.strip())
+        parsed = urlparse(url)
+        if parsed.scheme in ('http', 'https') and parsed.netloc.removeprefix('www.') == domain and parsed.path not in ('', '/'):
+            links.append(url)
+    return list(dict.fromkeys(links))
+
+
+def sample_urls(urls: Iterable[str], size: int) -> list[str]:
+    """Выборка страниц для проверки: сначала похожие на рецепты, равномерно по списку"""
+    urls = list(dict.fromkeys(urls))
+    hinted = [url for url in urls if RECIPE_URL_HINTS.search(urlparse(url).path)]
+    hinted_set = set(hinted)
+    pool = hinted if len(hinted) >= size else hinted + [url for url in urls if url not in hinted_set]
+    if len(pool) <= size:
+        return pool
+    step = len(pool) / size
+    return [pool[int(index * step)] for index in range(size)]
+
+
+def score_site(result: SiteScreenResult) -> float:
+    recipe_ratio = result.recipe_pages / result.sampled if result.sampled else 0.0
+    return round(0.7 * recipe_ratio + 0.2 * result.homepage_signal + 0.1 * result.has_sitemap, 3)
+
+
+class SitePrescreener:
+    """Параллельный отбор доменов по HTTP"""
+
+    def __init__(self, concurrency: Optional[int] = None, sample_pages: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        self.concurrency = concurrency or config.PARSER_SITE_PRESCREEN_CONCURRENCY
+        self.sample_pages = sample_pages or config.PARSER_SITE_PRESCREEN_SAMPLE_PAGES
+        self.timeout = timeout or config.PARSER_SITE_PRESCREEN_TIMEOUT
+
+    async def _fetch(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, url: str,
+                     max_bytes: int = MAX_PAGE_BYTES) -> tuple[Optional[int], str]:
+        """(HTTP статус или None при ошибке сети, текст)"""
+        async with semaphore:
+            try:
+                async with session.get(url, allow_redirects=True) as response:
+                    body = bytearray()
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        body += chunk
+                        if len(body) >= max_bytes:
+                            break
+                    body = bytes(body)
+                    if body[:2] == b'\x1f\x8b':  # sitemap.xml.gz без Content-Encoding
+                        try:
+                            body = gzip.decompress(body)
+                        except (OSError, EOFError):
+                            pass
+                    return response.status, body.decode(response.charset or 'utf-8', errors='ignore')
+            except (aiohttp.ClientError, asyncio.TimeoutError, LookupError, ValueError) as e:
+                logger.debug(f"Не удалось загрузить {url}: {e}")
+                return None, ''
+
+    async def _sitemap_urls(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                            base_url: str, robots_text: str) -> list[str]:
+        """URL страниц из первого найденного sitemap (из индекса - до двух вложенных)"""
+        candidates = sitemaps_from_robots(robots_text) + [urljoin(base_url, path) for path in SITEMAP_PATHS]
+        for sitemap_url in dict.fromkeys(candidates):
+            status, xml = await self._fetch(session, semaphore, sitemap_url, MAX_SITEMAP_BYTES)
+            if status != 200 or '<loc' not in xml.lower():
+                continue
+            locations = sitemap_locations(xml)
+            if not is_sitemap_index(xml):
+                return locations
+            children = sorted(locations, key=lambda url: (not RECIPE_URL_HINTS.search(url),
+                                                          not POST_SITEMAP_HINTS.search(url)))[:2]
+            responses = await asyncio.gather(*(self._fetch(session, semaphore, child, MAX_SITEMAP_BYTES)
+                                               for child in children))
+            urls = [url for child_status, child_xml in responses if child_status == 200
+                    for url in sitemap_locations(child_xml)]
+            if urls:
+                return urls
+        return []
+
+    async def screen_site(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                          url: str) -> SiteScreenResult:
+        result = SiteScreenResult(url=url)
+        parsed = urlparse(url if '://' in url else f"https://{url}")
+        base_url = f"{parsed.scheme}://{parsed.netloc}/"
+
+        (status, homepage), (robots_status, robots_text) = await asyncio.gather(
+            self._fetch(session, semaphore, base_url),
+            self._fetch(session, semaphore, urljoin(base_url, '/robots.txt')))
+        if status is None:
+            result.reason = 'нет ответа по HTTP'
+            return result
+        if status in BLOCKED_STATUSES:
+            result.reason = f'HTTP {status}, проверка в браузере'
+            return result
+        result.homepage_signal = _prescreen.check(homepage).has_signal
+
+        page_urls = await self._sitemap_urls(session, semaphore, base_url,
+                                             robots_text if robots_status == 200 else '')
+        result.has_sitemap = bool(page_urls)
+        if not page_urls:
+            page_urls = homepage_links(homepage, base_url)
+
+        pages = await asyncio.gather(*(self._fetch(session, semaphore, page_url)
+                                       for page_url in sample_urls(page_urls, self.sample_pages)))
+        pages = [html for page_status, html in pages if page_status == 200]
+        result.sampled = len(pages)
+        result.recipe_pages = sum(has_structured_recipe(html) for html in pages)
+        result.score = score_site(result)
+        return result
+
+    async def screen_async(self, urls: Iterable[str]) -> list[SiteScreenResult]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector,
+                                         headers={'User-Agent': USER_AGENT}) as session:
+            return await asyncio.gather(*(self.screen_site(session, semaphore, url) for url in urls))
+
+    def screen(self, urls: Iterable[str]) -> list[SiteScreenResult]:
+        """Отбор доменов (синхронная обертка, результаты в порядке urls)"""
+        return asyncio.run(self.screen_async(list(urls)))
@@ -5,6 +5,7 @@ import gzip
 import logging
 import xml.etree.ElementTree as ET
 import time
+from datetime import datetime, timezone
 from typing import Optional
 from urllib.parse import urljoin, urlparse
 from selenium import webdriver
@@ -15,6 +16,19 @@ from bs4 import BeautifulSoup
 logger = logging.getLogger(__name__)
 
 
+def parse_lastmod(value: Optional[str]) -> Optional[float]:
+    """Время <lastmod> (W3C datetime или дата) в секундах epoch, None если не разобрано"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
 class SitemapScanner:
     """Сканер карт сайта (XML и HTML) для сбора URL"""
     
@@ -60,6 +74,16 @@ class SitemapScanner:
         self.logger = custom_logger or logger
 
         self.visited_sitemaps = set()
+        self.latest_lastmod: Optional[float] = None  # самый поздний <lastmod> последнего сканирования
+    
+    def _track_lastmod(self, element: ET.Element):
+        """Учет <lastmod> записи sitemap (для планировщика повторного обхода)"""
+        lastmod = element.find('sitemap:lastmod', self.NAMESPACES)
+        if lastmod is None:
+            lastmod = element.find('lastmod')
+        timestamp = parse_lastmod(lastmod.text if lastmod is not None else None)
+        if timestamp is not None and (self.latest_lastmod is None or timestamp > self.latest_lastmod):
+            self.latest_lastmod = timestamp
     
     def fetch_sitemap(self, sitemap_url: str) -> Optional[str]:
         """
@@ -127,6 +151,7 @@ class SitemapScanner:
                 loc = sitemap.find('sitemap:loc', self.NAMESPACES)
                 if loc is not None and loc.text:
                     sitemap_urls.append(loc.text.strip())
+                    self._track_lastmod(sitemap)
             
             # Fallback: поиск без namespace
             if not sitemap_urls:
@@ -134,6 +159,7 @@ class SitemapScanner:
                     loc = sitemap.find('loc')
                     if loc is not None and loc.text:
                         sitemap_urls.append(loc.text.strip())
+                        self._track_lastmod(sitemap)
             
             self.logger.info(f"Найдено {len(sitemap_urls)} sitemap в индексе")
             
@@ -162,6 +188,7 @@ class SitemapScanner:
                 loc = url_elem.find('sitemap:loc', self.NAMESPACES)
                 if loc is not None and loc.text:
                     urls.add(loc.text.strip())
+                    self._track_lastmod(url_elem)
             
             # Fallback: поиск без namespace
             if not urls:
@@ -169,6 +196,7 @@ class SitemapScanner:
                     loc = url_elem.find('loc')
                     if loc is not None and loc.text:
                         urls.add(loc.text.strip())
+                        self._track_lastmod(url_elem)
             
             self.logger.info(f"Извлечено {len(urls)} URL из sitemap")
             
@@ -348,6 +376,7 @@ class SitemapScanner:
         """
         # Сбрасываем visited_sitemaps для нового сканирования
         self.visited_sitemaps.clear()
+        self.latest_lastmod = None
         
         all_urls = set()
         paths_to_try = self.COMMON_SITEMAP_PATHS.copy()
@@ -449,4 +478,5 @@ class SitemapScanner:
     def reset(self):
         """Сброс состояния сканера (очистка посещенных sitemap)"""
         self.visited_sitemaps.clear()
+        self.latest_lastmod = None
         self.logger.info("Состояние сканера сброшено")
@@ -0,0 +1,142 @@
+"""
+Распределение портов Chrome между сайтами по ожидаемой отдаче (run_parallel)
+
+Каждый сайт получает порт на квант времени (PARSER_SCHEDULER_SLICE_MINUTES). По окончании кванта
+исследователь сохраняет очередь (exploration_state.json), а планировщик обновляет статистику сайта:
+новые рецепты в минуту, долю фатальных ошибок и долю страниц с защитой от ботов. Освободившийся порт
+получает сайт с наибольшей ожидаемой отдачей:
+
+    (рецепты + PRIOR_RECIPES) / (минуты + PRIOR_MINUTES) * (1 - доля фатальных ошибок) * (1 - доля капчи)
+
+Априорная оценка (PARSER_SCHEDULER_PRIOR_YIELD рецептов в минуту) дает каждому сайту хотя бы один квант,
+после чего сайты без рецептов уступают порты продуктивным. Сайт завершается, когда его проход
+закончился сам (очередь пуста, лимит URL или страниц без рецептов), или когда ожидаемая отдача
+после первого кванта ниже PARSER_SCHEDULER_MIN_YIELD.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from config.config import config
+from src.stages.parse.parse import ParseRunResult
+
+logger = logging.getLogger(__name__)
+
+# вес априорной оценки: столько минут работы "стоит" априорная скорость
+PRIOR_MINUTES = 5.0
+
+
+@dataclass
+class SiteYieldStats:
+    """Статистика сайта за запуск run_parallel"""
+    name: str
+    order: int  # порядок во входном списке (при равной отдаче)
+    slices: int = 0
+    minutes: float = 0.0
+    new_recipes: int = 0
+    urls_explored: int = 0
+    captcha_pages: int = 0
+    fatal_errors: int = 0
+    finished: bool = False
+    running: bool = False
+
+    @property
+    def recipes_per_minute(self) -> float:
+        return self.new_recipes / self.minutes if self.minutes else 0.0
+
+    @property
+    def fatal_rate(self) -> float:
+        return self.fatal_errors / self.slices if self.slices else 0.0
+
+    @property
+    def captcha_rate(self) -> float:
+        return self.captcha_pages / self.urls_explored if self.urls_explored else 0.0
+
+    def expected_yield(self, prior_yield: float) -> float:
+        """Ожидаемые новые рецепты в минуту следующего кванта"""
+        rate = (self.new_recipes + prior_yield * PRIOR_MINUTES) / (self.minutes + PRIOR_MINUTES)
+        return rate * (1 - self.fatal_rate) * (1 - self.captcha_rate)
+
+
+class YieldScheduler:
+    """Выбор следующего сайта для освободившегося порта"""
+
+    def __init__(self, site_names: Iterable[str], slice_minutes: Optional[float] = None,
+                 min_yield: Optional[float] = None, prior_yield: Optional[float] = None,
+                 max_urls: Optional[int] = None, max_fatal_errors: int = 3):
+        """
+        Args:
+            site_names: сайты в порядке исходной приоритизации
+            slice_minutes: квант времени (0 - без вытеснения, каждый сайт обходится за один запуск)
+            min_yield: ожидаемая отдача (рецептов в минуту), ниже которой сайт снимается после первого кванта
+            prior_yield: априорная отдача еще не запускавшегося сайта
+            max_urls: лимит URL на сайт за весь запуск (суммарно по квантам)
+            max_fatal_errors: после стольких фатальных ошибок сайт снимается
+        """
+        self.slice_minutes = slice_minutes if slice_minutes is not None else config.PARSER_SCHEDULER_SLICE_MINUTES
+        self.min_yield = min_yield if min_yield is not None else config.PARSER_SCHEDULER_MIN_YIELD
+        self.prior_yield = prior_yield if prior_yield is not None else config.PARSER_SCHEDULER_PRIOR_YIELD
+        self.max_urls = max_urls
+        self.max_fatal_errors = max_fatal_errors
+        self.sites = {name: SiteYieldStats(name=name, order=order) for order, name in enumerate(site_names)}
+
+    @property
+    def slice_seconds(self) -> Optional[float]:
+        """Квант для run_parser (None - без ограничения)"""
+        return self.slice_minutes * 60 if self.slice_minutes else None
+
+    def has_pending(self) -> bool:
+        return any(not stats.finished and not stats.running for stats in self.sites.values())
+
+    def next_site(self) -> Optional[str]:
+        """Сайт с наибольшей ожидаемой отдачей среди не запущенных и не завершенных"""
+        candidates = [stats for stats in self.sites.values() if not stats.finished and not stats.running]
+        if not candidates:
+            return None
+        best = max(candidates, key=lambda stats: (stats.expected_yield(self.prior_yield), -stats.order))
+        best.running = True
+        return best.name
+
+    def remaining_urls(self, site_name: str) -> Optional[int]:
+        """Остаток лимита URL сайта на следующий квант"""
+        if self.max_urls is None:
+            return None
+        return max(self.max_urls - self.sites[site_name].urls_explored, 0)
+
+    def record(self, site_name: str, result: ParseRunResult, elapsed_seconds: float) -> SiteYieldStats:
+        """
+        Учет завершенного кванта
+
+        Args:
+            site_name: сайт
+            result: результат run_parser
+            elapsed_seconds: фактическое время кванта
+        """
+        stats = self.sites[site_name]
+        stats.running = False
+        stats.slices += 1
+        stats.minutes += elapsed_seconds / 60
+        stats.new_recipes += max(result.new_recipes, 0)
+        stats.urls_explored += result.urls_explored
+        stats.captcha_pages += result.captcha_pages
+        if result.is_fatal:
+            # ошибка порта, а не сайта: сайт продолжится на другом порту
+            stats.fatal_errors += 1
+            stats.finished = stats.fatal_errors >= self.max_fatal_errors
+        elif not result.preempted:
+            stats.finished = True
+        elif self.remaining_urls(site_name) == 0:
+            stats.finished = True
+        elif stats.expected_yield(self.prior_yield) < self.min_yield:
+            logger.info(f"Сайт {site_name} снят: {stats.recipes_per_minute:.2f} рецептов/мин, "
+                        f"капча {stats.captcha_rate:.0%}, ошибки {stats.fatal_rate:.0%}")
+            stats.finished = True
+        return stats
+
+    def summary(self) -> list[str]:
+        """Строки отчета по сайтам (по убыванию отдачи)"""
+        ordered = sorted(self.sites.values(), key=lambda stats: stats.recipes_per_minute, reverse=True)
+        return [f"{stats.name}: {stats.new_recipes} рецептов за {stats.minutes:.1f} мин "
+                f"({stats.recipes_per_minute:.2f}/мин, квантов {stats.slices}, капча {stats.captcha_rate:.0%}, "
+                f"ошибки {stats.fatal_rate:.0%})" for stats in ordered if stats.slices]
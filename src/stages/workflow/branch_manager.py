@@ -136,15 +136,16 @@ class BranchManager:
                 logger.info(f"В ветке {branch} нет добавленных файлов парсеров.")
                 return []
 
-            for file in added_files:
-                logger.info(f"Проверяем файл: {file}")
-                module_name = os.path.basename(file).replace('.py', '')
-                result = self.validator.validate(
-                    module_name=module_name,
-                    use_gpt=chck_all_with_gpt,
-                    required_fields=['dish_name', 'ingredients', 'instructions'],
-                    use_gpt_on_missing_fields=True
-                )
+            # все добавленные парсеры извлекаются одним пулом процессов
+            logger.info(f"Проверяем файлы: {', '.join(added_files)}")
+            module_names = [os.path.basename(file).replace('.py', '') for file in added_files]
+            results = self.validator.validate_many(
+                module_names,
+                use_gpt=chck_all_with_gpt,
+                required_fields=['dish_name', 'ingredients', 'instructions'],
+                use_gpt_on_missing_fields=True
+            )
+            for result in results.values():
                 if result.failed > 0 or result.passed == 0:
                     branch_errors.append(result)
         
@@ -10,6 +10,7 @@ from src.stages.workflow.generate_prompt import PromptGenerator
 from src.common.github.client import GitHubClient
 from src.stages.workflow.branch_manager import BranchManager
 from src.stages.workflow.validation_models import ValidationReport
+from src.stages.extract.extractor_registry import build_registry, save_registry, REGISTRY_FILENAME
 import tempfile
 import json
 from datetime import datetime
@@ -255,6 +256,9 @@ class CopilotWorkflow:
             logger.info("Новые файлы не были добавлены, пропуск автокоммита.")
             return
         
+        # индекс экстракторов должен включать новые модули до коммита
+        save_registry(build_registry(config.EXTRACTOR_FOLDER), os.path.join(config.EXTRACTOR_FOLDER, REGISTRY_FILENAME))
+
         try:
             self.branch_manager.commit_specific_directory(config.EXTRACTOR_FOLDER, "Автокоммит после проверки парсеров", push=False)
         except Exception as e:
@@ -1,61 +1,116 @@
 """модуль для валидации скриптов, созданных chatgpt, для парсинга рецептов с сохранением"""
 
 import os
-import importlib
 import json
 import logging
-from typing import Optional
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional
 
 if __name__ == "__main__":
-    from pathlib import Path
     import sys
     sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
 
 from src.stages.workflow.gpt_recipe_validator import GPTRecipeValidator
+from src.stages.workflow.validation_cache import MODE_HTML, MODE_REFERENCE, ValidationCache, verdict_key
 from utils.html import extract_text_from_html
 from src.stages.workflow.validation_models import ValidationReport, FileValidationResult
 from config.config import config
 logger = logging.getLogger(__name__)
 
+# реестр экстракторов процесса-воркера (создается в инициализаторе пула)
+_worker_registry = None
+
+
+def _init_extraction_worker(extractor_dir: str):
+    global _worker_registry
+    from src.stages.extract.extractor_registry import ExtractorRegistry
+    _worker_registry = ExtractorRegistry(extractor_dir=extractor_dir)
+
+
+def _extract_file(task: tuple[str, str]) -> tuple[str, str, Optional[dict], Optional[str]]:
+    """(module_name, html_path) -> (module_name, html_path, данные, текст ошибки)"""
+    module_name, html_path = task
+    try:
+        data = _worker_registry.get_class(module_name)(html_path).extract_all()
+        return module_name, html_path, data, None
+    except Exception as e:
+        return module_name, html_path, None, f"{type(e).__name__}: {e}"
+
+
 class ValidateParser:
     """Класс для валидации парсеров рецептов, созданных ChatGPT"""
-    def __init__(self, extractor_folder: Optional[str] = None, extracted_json_extension: Optional[str] = None):
+    def __init__(self, extractor_folder: Optional[str] = None, extracted_json_extension: Optional[str] = None,
+                 workers: Optional[int] = None, cache_path: Optional[str] = None,
+                 gpt_validator: Optional[GPTRecipeValidator] = None):
+        """
+        Args:
+            extractor_folder: папка с экстракторами
+            extracted_json_extension: суффикс файлов с результатами экстрактора (сохраняются для review)
+            workers: число процессов извлечения (по умолчанию config.PARSER_VALIDATION_WORKERS, 0 - по числу CPU,
+                1 - в текущем процессе)
+            cache_path: файл кеша вердиктов GPT (по умолчанию config.PARSER_VALIDATION_CACHE, пустой - без кеша)
+            gpt_validator: валидатор GPT
+        """
         if not extractor_folder:
             extractor_folder = config.EXTRACTOR_FOLDER
         if not extracted_json_extension:
             extracted_json_extension = config.EXTRACT_JSON_EXTENSION
-        self.gpt_validator = GPTRecipeValidator()
+        if workers is None:
+            workers = config.PARSER_VALIDATION_WORKERS
+        if cache_path is None:
+            cache_path = config.PARSER_VALIDATION_CACHE
+        self.gpt_validator = gpt_validator or GPTRecipeValidator()
         self.extractor_folder = extractor_folder
         self.extracted_json_extension = extracted_json_extension
+        self.workers = workers or os.cpu_count() or 1
+        self.verdict_cache = ValidationCache(cache_path or None)
 
-    def _import_extractor_module(self, module_name: str):
-        """Динамически импортирует модуль экстрактора по имени"""
-        extractor_path = os.path.join(self.extractor_folder, f'{module_name}.py')
-        if not os.path.exists(extractor_path):
-            logger.error(f"Модуль экстрактора {module_name} не найден по пути {extractor_path}")
-            return None
-        
-        module = importlib.import_module(f"{config.EXTRACTOR_FOLDER}.{module_name}")
-        return module
-    
+    def _extract_modules(self, tasks: list[tuple[str, str]]) -> dict[str, tuple[Optional[dict], Optional[str]]]:
+        """
+        Извлечение всех страниц всех модулей: html_path -> (данные, текст ошибки)
 
-    def _run_extractor_main(self, module_name: str):
-        """Запускает функцию main экстрактора и возвращает результат"""
-        module = self._import_extractor_module(module_name)
-        if module is None:
-            logger.error(f"Не удалось импортировать модуль экстрактора {module_name}")
-            return
-        
-        if not hasattr(module, "main"):
-            logger.error(f"Модуль экстрактора {module_name} не содержит функцию main")
-            return
-
-        main_func = getattr(module, "main")
-        logger.info(f"Запуск экстрактора {module_name}")
-        result = main_func()
-        return result
+        Экстракторы вызываются напрямую (extract_all) в пуле процессов spawn: каждый воркер импортирует
+        модули текущей ветки заново, а зависший или тяжелый экстрактор одного сайта не блокирует остальные.
+        """
+        results = {}
+        if self.workers <= 1 or len(tasks) <= 1:
+            _init_extraction_worker(self.extractor_folder)
+            extracted = map(_extract_file, tasks)
+        else:
+            executor = ProcessPoolExecutor(
+                max_workers=min(self.workers, len(tasks)),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_extraction_worker,
+                initargs=(self.extractor_folder,),
+            )
+            with executor:
+                extracted = list(executor.map(_extract_file, tasks, chunksize=4))
+        for module_name, html_path, data, error in extracted:
+            if error:
+                logger.error(f"Экстрактор {module_name} упал на {html_path}: {error}")
+            results[html_path] = (data, error)
+        return results
+
+    def _save_extracted(self, extracted_path: str, data: dict):
+        """Результат экстрактора рядом с HTML (для review и обратной связи копилоту)"""
+        try:
+            with open(extracted_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить {extracted_path}: {e}")
 
+    def _cached_gpt_validation(self, key: str, filepath: str, validate) -> FileValidationResult:
+        """Вердикт из кеша или новый запрос к GPT (сохраняется в кеш)"""
+        cached = self.verdict_cache.get(key, filepath)
+        if cached is not None:
+            logger.info(f"Вердикт GPT для {filepath} взят из кеша")
+            return cached
+        result = validate()
+        self.verdict_cache.put(key, result)
+        return result
 
     def _validate_required_fields(self, parsed_data: dict, required_fields: list[str]) -> bool:
         """Проверяет наличие обязательных полей в распарсеных данных"""
@@ -64,7 +119,144 @@ class ValidateParser:
                 logger.error(f"Отсутствует обязательное поле: {field}")
                 return False
         return True
-    
+
+    def _test_data_error(self, module_name: str) -> Optional[ValidationReport]:
+        """Отчет с системной ошибкой, если тестовых данных модуля нет"""
+        test_data_dir = os.path.join(config.PARSER_PREPROCESSED_FOLDER, module_name)
+        if not os.path.exists(test_data_dir) or not os.path.isdir(test_data_dir):
+            logger.error(f"Директория с тестовыми данными не найдена: {test_data_dir}")
+            reason = "test_data_directory_not_found"
+        elif len(os.listdir(test_data_dir)) == 0:
+            logger.error(f"В директории с тестовыми данными нет файлов: {test_data_dir}")
+            reason = "test_data_directory_empty"
+        else:
+            return None
+        validation_report = ValidationReport(module=module_name, total_files=0, failed=0, details=[])
+        validation_report.details.append(FileValidationResult.system_error_fail(filepath=test_data_dir, reason=reason))
+        validation_report.system_errors += 1
+        return validation_report
+
+    def _validate_file(self, module_name: str, html_path: str, parsed_data: dict, validation_report: ValidationReport,
+                       use_gpt: bool, required_fields: Optional[list[str]], use_gpt_on_missing_fields: bool):
+        filepath = html_path[:-len('.html')] + self.extracted_json_extension
+        html_bytes = None
+
+        # Проверка обязательных полей
+        if required_fields:
+            if not self._validate_required_fields(parsed_data, required_fields):
+                if use_gpt_on_missing_fields:
+                    html_content = extract_text_from_html(html_path, max_chars=30000)
+                    if html_content:
+                        html_bytes = Path(html_path).read_bytes()
+                        gpt_result = self._cached_gpt_validation(
+                            verdict_key(MODE_HTML, html_bytes, parsed_data), filepath,
+                            lambda: self.gpt_validator.validate_with_html(parsed_data, html_content, module_name,
+                                                                          filename=filepath))
+
+                        if gpt_result.is_valid:
+                            logger.info(f"✓ Валидация пройдена для {filepath} с помощью GPT")
+                            validation_report.passed += 1
+                        else:
+                            # в реузльтаты записываем только если валидация не пройдена
+                            logger.warning(f"✗ Валидация не пройдена для {filepath} с помощью GPT: {gpt_result.feedback}")
+                            validation_report.add_result(gpt_result)
+                        return
+
+                logger.error(f"Валидация не пройдена для файла {filepath}")
+                validation_report.add_result(FileValidationResult(
+                    file=filepath,
+                    status='failed',
+                    is_valid=False,
+                    reason='missing_required_fields',
+                    feedback='Missing required fields'
+                ))
+                return
+
+        # GPT валидация
+        if use_gpt:
+            # Находим эталонный JSON файл (без _extracted)
+            reference_filepath = html_path[:-len('.html')] + '.json'
+
+            if not os.path.exists(reference_filepath):
+                logger.warning(f"Эталонный JSON файл не найден: {reference_filepath}")
+                validation_report.add_result(FileValidationResult(
+                    file=filepath,
+                    status='skipped',
+                    reason='reference_json_not_found',
+                    feedback='Skipped: reference JSON file not found'
+                ))
+                return
+
+            # Читаем эталонный JSON
+            with open(reference_filepath, "r", encoding="utf-8") as f:
+                reference_data = json.load(f)
+
+            # Валидируем через GPT (вердикт по неизменившимся HTML и результату берется из кеша)
+            html_bytes = html_bytes or Path(html_path).read_bytes()
+            gpt_result = self._cached_gpt_validation(
+                verdict_key(MODE_REFERENCE, html_bytes, parsed_data, reference_data), filepath,
+                lambda: self.gpt_validator.validate_with_reference(parsed_data, reference_data, module_name,
+                                                                   filename=filepath))
+
+            if gpt_result.is_valid and gpt_result.is_recipe:
+                logger.info(f"✓ Валидация пройдена для {filepath}")
+                validation_report.passed += 1
+            else:
+                logger.warning(f"✗ Валидация не пройдена для {filepath}: {gpt_result.feedback}")
+                validation_report.add_result(gpt_result)
+        else:
+            # Без GPT просто считаем как пройденную
+            logger.info(f"✓ Валидация пройдена для {filepath} (без GPT)")
+            validation_report.passed += 1
+
+    def validate_many(self, module_names: Iterable[str], use_gpt: bool = False, required_fields: list[str] = None,
+                      use_gpt_on_missing_fields: bool = True) -> dict[str, ValidationReport]:
+        """
+        Валидировать несколько парсеров: страницы всех модулей извлекаются одним пулом процессов
+
+        Args: как у validate
+
+        Returns:
+            module_name -> ValidationReport
+        """
+        reports: dict[str, ValidationReport] = {}
+        html_files: dict[str, list[str]] = {}
+        for module_name in module_names:
+            error_report = self._test_data_error(module_name)
+            if error_report is not None:
+                reports[module_name] = error_report
+                continue
+            test_data_dir = Path(config.PARSER_PREPROCESSED_FOLDER, module_name)
+            html_files[module_name] = sorted(str(path) for path in test_data_dir.glob('*.html'))
+
+        tasks = [(module_name, html_path) for module_name, paths in html_files.items() for html_path in paths]
+        logger.info(f"Извлечение {len(tasks)} страниц {len(html_files)} парсеров, процессов: {self.workers}")
+        extracted = self._extract_modules(tasks)
+
+        try:
+            for module_name, paths in html_files.items():
+                validation_report = ValidationReport(module=module_name, total_files=len(paths), failed=0, details=[])
+                for html_path in paths:
+                    parsed_data, error = extracted[html_path]
+                    if error is not None:
+                        validation_report.add_result(FileValidationResult(
+                            file=html_path,
+                            status='failed',
+                            is_valid=False,
+                            reason='extraction_error',
+                            feedback=f'Extractor raised an exception: {error}'
+                        ))
+                        continue
+                    self._save_extracted(html_path[:-len('.html')] + self.extracted_json_extension, parsed_data)
+                    self._validate_file(module_name, html_path, parsed_data, validation_report,
+                                        use_gpt, required_fields, use_gpt_on_missing_fields)
+
+                logger.info(f"Валидация {module_name} завершена: {validation_report.passed}/{len(paths)} файлов прошли проверку")
+                reports[module_name] = validation_report
+        finally:
+            self.verdict_cache.save()
+        return reports
+
     def validate(self, module_name: str, use_gpt: bool = False, required_fields: list[str] = None, use_gpt_on_missing_fields: bool = True) -> ValidationReport:
         """
         Валидировать скрипт парсера рецептов
@@ -77,106 +269,8 @@ class ValidateParser:
         Returns:
             ValidationReport с результатами валидации
         """
-        test_data_dir = os.path.join("preprocessed", module_name)
-        validation_report = ValidationReport(module=module_name, total_files=0, failed=0, details=[])
-        if not os.path.exists(test_data_dir) or not os.path.isdir(test_data_dir):
-            logger.error(f"Директория с тестовыми данными не найдена: {test_data_dir}")
-            system_error_result = FileValidationResult.system_error_fail(
-                filepath=test_data_dir,
-                reason="test_data_directory_not_found"
-            )
-            validation_report.details.append(system_error_result)
-            validation_report.system_errors += 1
-            return validation_report
-        
-        if len(os.listdir(test_data_dir)) == 0:
-            logger.error(f"В директории с тестовыми данными нет файлов: {test_data_dir}")
-            sys_error = FileValidationResult.system_error_fail(
-                filepath=test_data_dir,
-                reason="test_data_directory_empty"
-            )
-            validation_report.details.append(sys_error)
-            validation_report.system_errors += 1
-            return validation_report
-        
-        # запуск экстрактора для получения распарсеных данных
-        self._run_extractor_main(module_name)
-
-        extracted = [i for i in os.listdir(test_data_dir) if i.endswith(self.extracted_json_extension)]
-        
-        for filename in extracted:
-            filepath = os.path.join(test_data_dir, filename)
-            with open(filepath, "r", encoding="utf-8") as f:
-                parsed_data = json.load(f)
-            
-            # Проверка обязательных полей
-            if required_fields:
-                if not self._validate_required_fields(parsed_data, required_fields):
-                    if use_gpt_on_missing_fields:
-                        html_filepath = filepath.replace(self.extracted_json_extension, '.html')
-                        html_content = extract_text_from_html(html_filepath, max_chars=30000)
-                        if html_content:
-                    
-                            gpt_result = self.gpt_validator.validate_with_html(parsed_data, html_content, module_name, filename=filepath)
-                            
-                            if gpt_result.is_valid:
-                                logger.info(f"✓ Валидация пройдена для {filepath} с помощью GPT")
-                                validation_report.passed += 1
-                            else:
-                                # в реузльтаты записываем только если валидация не пройдена
-                                logger.warning(f"✗ Валидация не пройдена для {filepath} с помощью GPT: {gpt_result.feedback}")
-                                validation_report.add_result(gpt_result)
-                            continue
-
-                    logger.error(f"Валидация не пройдена для файла {filepath}")
-                    validation_report.add_result(FileValidationResult(
-                        file=filepath,
-                        status='failed',
-                        is_valid=False,
-                        reason='missing_required_fields',
-                        feedback='Missing required fields'
-                    ))
-                    continue
-            
-            # GPT валидация
-            if use_gpt:
-                # Находим эталонный JSON файл (без _extracted)
-                reference_filename = filename.replace(self.extracted_json_extension, '.json')
-                reference_filepath = os.path.join(test_data_dir, reference_filename)
-                
-                if not os.path.exists(reference_filepath):
-                    logger.warning(f"Эталонный JSON файл не найден: {reference_filepath}")
-                    validation_report.add_result(FileValidationResult(
-                        file=filepath,
-                        status='skipped',
-                        reason='reference_json_not_found',
-                        feedback='Skipped: reference JSON file not found'
-                    ))
-                    continue
-                
-                # Читаем эталонный JSON
-                with open(reference_filepath, "r", encoding="utf-8") as f:
-                    reference_data = json.load(f)
-                
-                # Валидируем через GPT
-                gpt_result = self.gpt_validator.validate_with_reference(parsed_data, reference_data, module_name, filename=filepath)
-                
-                if gpt_result.is_valid and gpt_result.is_recipe:
-                    logger.info(f"✓ Валидация пройдена для {filepath}")
-                    validation_report.passed += 1
-                else:
-                    logger.warning(f"✗ Валидация не пройдена для {filepath}: {gpt_result.feedback}")
-                    validation_report.add_result(gpt_result)
-            else:
-                # Без GPT просто считаем как пройденную
-                logger.info(f"✓ Валидация пройдена для {filepath} (без GPT)")
-                validation_report.passed += 1
-        # Итоговый результат
-        total = len(extracted)
-        
-        logger.info(f"Валидация завершена: {validation_report.passed}/{total} файлов прошли проверку")
-        
-        return validation_report
+        return self.validate_many([module_name], use_gpt=use_gpt, required_fields=required_fields,
+                                  use_gpt_on_missing_fields=use_gpt_on_missing_fields)[module_name]
     
 if __name__ == '__main__':    
     import shutil
@@ -185,14 +279,14 @@ if __name__ == '__main__':
     folders = os.listdir("preprocessed")
     folders = sorted([f for f in folders if os.path.isdir(os.path.join("preprocessed", f))])
 
-    for folder in folders:
+    results = vp.validate_many(
+        folders,
+        use_gpt=True,
+        required_fields=['dish_name', 'ingredients', 'instructions'],
+        use_gpt_on_missing_fields=True
+    )
+    for folder, result in results.items():
         logger.info(f"\n\n=== ВАЛИДАЦИЯ ПАРСЕРА: {folder} ===")
-        result = vp.validate(
-            module_name=folder,
-            use_gpt=True,
-            required_fields=['dish_name', 'ingredients', 'instructions'],
-            use_gpt_on_missing_fields=True
-        )
         if result.failed == 0 and result.passed > 0:
             logger.info(f"ВСЕ ТЕСТЫ ПРОЙДЕНЫ УСПЕШНО ДЛЯ {folder}!\n")
             shutil.rmtree(os.path.join("preprocessed", folder))
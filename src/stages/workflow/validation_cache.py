@@ -0,0 +1,79 @@
+"""
+Кеш вердиктов GPT валидации экстракторов
+
+Ключ - sha256 от (режим проверки, HTML страницы, результат экстрактора, эталон), поэтому страница,
+результат которой не изменился с прошлого запуска, повторно в GPT не отправляется. Системные ошибки
+(сбой запроса к GPT) не кешируются.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Optional
+
+from src.stages.workflow.validation_models import FileValidationResult
+
+logger = logging.getLogger(__name__)
+
+MODE_HTML = 'html'
+MODE_REFERENCE = 'reference'
+
+
+def _canonical_json(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def verdict_key(mode: str, html: bytes, extracted: dict, reference: Optional[dict] = None) -> str:
+    """Хеш входных данных вердикта"""
+    digest = hashlib.sha256()
+    for part in (mode.encode('utf-8'), html, _canonical_json(extracted), _canonical_json(reference)):
+        # длина перед каждой частью, чтобы границы частей не смещались
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class ValidationCache:
+    """Вердикты GPT в JSON файле: ключ -> FileValidationResult.to_dict() без имени файла"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else None
+        self.entries: dict[str, dict] = {}
+        self._dirty = False
+        if self.path is not None and self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Кеш вердиктов {self.path} не прочитан, начинаем с пустого: {e}")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str, filepath: str) -> Optional[FileValidationResult]:
+        """Сохраненный вердикт для файла или None"""
+        cached = self.entries.get(key)
+        if cached is None:
+            return None
+        return FileValidationResult.from_gpt_result(filepath, cached)
+
+    def put(self, key: str, result: FileValidationResult):
+        if result.system_error:
+            return
+        verdict = result.to_dict()
+        verdict.pop('file', None)
+        self.entries[key] = verdict
+        self._dirty = True
+
+    def save(self):
+        """Запись кеша на диск (через временный файл), если были новые вердикты"""
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
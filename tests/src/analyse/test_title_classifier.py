@@ -0,0 +1,104 @@
+import asyncio
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.stages.analyse.analyse import RecipeAnalyzer
+from src.stages.analyse.title_classifier import (TitleNaiveBayes, TitlePrefilter, keyword_decision, pack_batches,
+                                                 page_tokens)
+
+
+class FakeGPTClient:
+    """Отвечает рецептами для заголовков со словом soup и считает одновременные запросы"""
+
+    def __init__(self):
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def async_request(self, system_prompt, user_prompt, **kwargs):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        pages = json.loads(user_prompt.split('СТРАНИЦЫ ДЛЯ АНАЛИЗА:\n', 1)[1].split('\n\nКРИТЕРИИ', 1)[0])
+        return {"recipe_ids": [page_id for page_id, page in pages.items() if 'soup' in page['title']]}
+
+
+class FakePageRepository:
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.chunks = []
+
+    def get_for_title_analysis(self, last_id, site_id=None, limit=500):
+        chunk = [page for page in self.pages if page.id > last_id][:limit]
+        self.chunks.append(len(chunk))
+        return chunk
+
+
+class TestTitleClassifier(unittest.TestCase):
+
+    def test_pack_batches_by_tokens(self):
+        pages = [(index, 'x' * 40, f'https://site.com/{index}') for index in range(10)]
+        per_page = page_tokens(pages[0][1], pages[0][2])
+        batches = pack_batches(pages, max_tokens=per_page * 3, max_items=100)
+        self.assertEqual([len(batch) for batch in batches], [3, 3, 3, 1])
+        self.assertEqual([len(batch) for batch in pack_batches(pages, max_tokens=10 ** 6, max_items=4)], [4, 4, 2])
+
+    def test_keyword_decision(self):
+        self.assertFalse(keyword_decision('Desserts', 'https://site.com/category/desserts/'))
+        self.assertFalse(keyword_decision('Blog', 'https://site.com/blog/page/3/'))
+        self.assertFalse(keyword_decision('10 Best Dessert Recipes', 'https://site.com/best-desserts'))
+        self.assertFalse(keyword_decision('25 рецептов из кабачков', 'https://site.com/kabachki'))
+        # число в начале заголовка рецепта - не подборка
+        for title in ('15 Minute Garlic Noodles Recipe', '5 Minute Chocolate Mug Cake',
+                      '3 Ingredient Peanut Butter Cookies'):
+            self.assertIsNot(keyword_decision(title, 'https://site.com/dish'), False, title)
+        self.assertTrue(keyword_decision('Борщ - рецепт', 'https://site.com/borsch'))
+        self.assertIsNone(keyword_decision('Dessert Recipes', 'https://site.com/desserts'))
+        self.assertIsNone(keyword_decision('Chicken soup', 'https://site.com/chicken-soup'))
+
+    def test_naive_bayes_prefilter(self):
+        examples = [(f'{dish} {index}', f'https://a.com/dish/{dish}-{index}', True)
+                    for index in range(30) for dish in ('soup', 'stew')]
+        examples += [(f'news {index}', f'https://a.com/news/item-{index}', False) for index in range(60)]
+        classifier = TitleNaiveBayes(min_examples=50).fit(examples)
+        self.assertTrue(classifier.is_trained)
+        prefilter = TitlePrefilter(classifier, confidence=0.95)
+        recipes, not_recipes, undecided = prefilter.split([
+            (1, 'soup 99', 'https://a.com/dish/soup-99'),
+            (2, 'news 99', 'https://a.com/news/item-99'),
+            (3, 'Gallery', 'https://a.com/gallery'),
+        ])
+        self.assertEqual((recipes, not_recipes), ([1], [2]))
+        self.assertEqual([page[0] for page in undecided], [3])
+
+    @patch('src.stages.analyse.analyse.config')
+    def test_filter_pages_by_titles_streams_and_bounds_concurrency(self, config):
+        config.PARSER_ANALYSE_PREFILTER = True
+        config.PARSER_ANALYSE_CONCURRENCY = 2
+        config.PARSER_ANALYSE_CHUNK_SIZE = 25
+        config.PARSER_ANALYSE_TITLE_BATCH_TOKENS = 10 ** 6
+        config.PARSER_ANALYSE_TITLE_BATCH_SIZE = 5
+        pages = [SimpleNamespace(id=index, title=f"{'soup' if index % 2 else 'stew'} {index}",
+                                 url=f'https://site.com/dish-{index}') for index in range(1, 51)]
+        pages.append(SimpleNamespace(id=51, title='Contact', url='https://site.com/contact'))
+
+        analyzer = RecipeAnalyzer.__new__(RecipeAnalyzer)
+        analyzer.gpt_client = FakeGPTClient()
+        analyzer.page_repository = FakePageRepository(pages)
+        analyzer._title_classifier = TitleNaiveBayes()
+        recipe_ids, not_recipe_ids = analyzer.filter_pages_by_titles(limit=100)
+
+        self.assertEqual(sorted(recipe_ids), list(range(1, 51, 2)))
+        self.assertEqual(sorted(not_recipe_ids), list(range(2, 51, 2)) + [51])
+        self.assertEqual(analyzer.page_repository.chunks, [25, 25, 1, 0])
+        self.assertEqual(analyzer.gpt_client.calls, 10)
+        self.assertEqual(analyzer.gpt_client.max_active, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import re
+import unittest
+
+from src.stages.analyse.url_pattern_induction import generalize_segment, induce_pattern
+
+SLUGS = ['chicken-soup', 'beef-stew', 'apple-pie', 'tomato-soup', 'pumpkin-soup', 'fish-pie', 'greek-salad',
+         'lemon-cake', 'pea-soup', 'plov', 'ragu', 'borsch']
+
+
+class TestUrlPatternInduction(unittest.TestCase):
+
+    def test_generalize_segment(self):
+        self.assertEqual(generalize_segment(['recipes', 'recipes', 'recipes']), 'recipes')
+        # значение двух рецептов - еще не раздел сайта
+        self.assertEqual(generalize_segment(['recipes', 'recipes']), r'[a-z0-9-]+')
+        self.assertEqual(generalize_segment(['12', '345']), r'\d+')
+        self.assertEqual(generalize_segment([f'{slug}-recipe-{index}.html' for index, slug in enumerate(SLUGS[:5])]),
+                         r'[a-z0-9-]+-recipe-\d+\.html')
+        # общее слово трех значений не сохраняется
+        self.assertEqual(generalize_segment(['chicken-soup', 'tomato-soup', 'pumpkin-soup']), r'[a-z0-9-]+')
+        self.assertEqual(generalize_segment(['борщ', 'щи']), r'[\w-]+')
+
+    def test_two_structures_separated_from_non_recipes(self):
+        recipes = [f"https://site.com/recipes/{slug}/" for slug in SLUGS]
+        recipes += [f"https://site.com/recipe/{100 + index}/{slug}?ref=home" for index, slug in enumerate(SLUGS[:8])]
+        non_recipes = ['https://site.com/recipes/', 'https://site.com/about-us', 'https://site.com/tag/soups',
+                       'https://site.com/blog/2024/news']
+        result = induce_pattern(recipes, non_recipes, min_precision=0.95, max_patterns=5, min_urls=12)
+
+        self.assertEqual(result.patterns, [r'^/recipes/[a-z0-9-]+/?$', r'^/recipe/\d+/[a-z0-9-]+/?$'])
+        # оценка на отложенной четверти URL
+        self.assertEqual(result.holdout, 5)
+        self.assertEqual((result.precision, result.recall), (1.0, 1.0))
+        self.assertTrue(result.is_reliable(min_precision=0.95, min_recall=0.9))
+        self.assertTrue(re.search(result.pattern, '/recipes/new-dish'))
+        self.assertFalse(re.search(result.pattern, '/tag/soups'))
+
+    def test_too_few_recipes_are_not_reliable(self):
+        recipes = [f"https://site.com/recipes/{slug}" for slug in ('chicken-soup', 'tomato-soup', 'pea-soup')]
+        result = induce_pattern(recipes, min_precision=0.95, max_patterns=5, min_urls=12)
+
+        self.assertEqual(result.pattern, '')
+        self.assertFalse(result.is_reliable(min_precision=0.95, min_recall=0.9))
+
+    def test_flat_urls_without_separating_pattern_are_not_reliable(self):
+        recipes = [f'https://site.com/{slug}' for slug in SLUGS]
+        non_recipes = ['https://site.com/about-us', 'https://site.com/contact', 'https://site.com/privacy']
+        result = induce_pattern(recipes, non_recipes, min_precision=0.95, max_patterns=5, min_urls=12)
+
+        self.assertFalse(result.is_reliable(min_precision=0.95, min_recall=0.9))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import sqlalchemy
+
+from src.common.db.mysql import MySQlManager
+
+
+class TestAddMissingColumns(unittest.TestCase):
+
+    def test_adds_hash_columns_to_existing_pages_table(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = MySQlManager()
+            manager.engine = sqlalchemy.create_engine(f"sqlite:///{Path(tmp) / 'db.sqlite'}")
+            with manager.engine.connect() as conn:
+                conn.execute(sqlalchemy.text("CREATE TABLE pages (id INTEGER PRIMARY KEY, url TEXT)"))
+                conn.commit()
+
+            self.assertTrue(manager.add_missing_columns())
+            self.assertTrue(manager.add_missing_columns())  # повторный запуск ничего не меняет
+
+            columns = [column['name'] for column in sqlalchemy.inspect(manager.engine).get_columns('pages')]
+            self.assertEqual(columns, ['id', 'url', 'html_hash', 'content_hash'])
+            manager.engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
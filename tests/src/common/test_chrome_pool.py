@@ -0,0 +1,76 @@
+import os
+import socket
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+from src.common.chrome_pool import ChromePool
+
+# вместо Chrome - HTTP сервер с отладочным endpoint /json/version на порту из --remote-debugging-port
+FAKE_CHROME = textwrap.dedent(f"""\
+    #!{sys.executable}
+    import sys
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    port = int(next(arg for arg in sys.argv if arg.startswith('--remote-debugging-port=')).split('=')[1])
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200 if self.path == '/json/version' else 404)
+            self.end_headers()
+            self.wfile.write(b'{{}}')
+
+        def log_message(self, *args):
+            pass
+
+    HTTPServer(('localhost', port), Handler).serve_forever()
+""")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+
+class TestChromePool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        binary = Path(self.tmp.name) / 'fake-chrome'
+        binary.write_text(FAKE_CHROME)
+        os.chmod(binary, 0o755)
+        self.pool = ChromePool([free_port()], chrome_binary=str(binary), max_rss_mb=0, health_interval=0,
+                               max_restarts=1, user_data_root=self.tmp.name)
+        self.pool.start()
+
+    def tearDown(self):
+        self.pool.close()
+        self.tmp.cleanup()
+
+    def test_lease_and_restart_after_failure(self):
+        port = self.pool.acquire(timeout=0)
+        self.assertIsNotNone(port)
+        self.assertIsNone(self.pool.acquire(timeout=0))
+        first_pid = self.pool.instances[port].process.pid
+
+        self.pool.release(port, failed=True)
+        instance = self.pool.instances[port]
+        self.assertNotEqual(instance.process.pid, first_pid)
+        self.assertTrue(self.pool.is_healthy(port))
+        self.assertEqual(self.pool.available(), 1)
+
+    def test_crashed_instance_restarted_on_acquire(self):
+        port = next(iter(self.pool.instances))
+        self.pool.instances[port].process.kill()
+        self.pool.instances[port].process.wait()
+        with self.pool.lease(timeout=0) as leased:
+            self.assertEqual(leased, port)
+            self.assertTrue(self.pool.is_healthy(port))
+        self.assertEqual(self.pool.instances[port].restarts, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import socket
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.stages.extract.extractor_benchmark import (
+    ExtractorBenchmark,
+    find_regressions,
+    load_results,
+    network_disabled,
+    percentile,
+    save_results,
+)
+
+
+class TestExtractorBenchmark(unittest.TestCase):
+    def test_percentile(self):
+        values = [5.0, 1.0, 3.0, 2.0, 4.0]
+        self.assertEqual(percentile(values, 50), 3.0)
+        self.assertAlmostEqual(percentile(values, 95), 4.8)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_find_regressions(self):
+        baseline = {
+            'slow_com': ExtractorBenchmark('slow_com', pages=2, p50_ms=10, p95_ms=20, peak_memory_kb=1000),
+            'noise_com': ExtractorBenchmark('noise_com', pages=2, p50_ms=1, p95_ms=1.5, peak_memory_kb=1000),
+        }
+        current = [
+            ExtractorBenchmark('slow_com', pages=2, p50_ms=11, p95_ms=40, peak_memory_kb=1100),
+            # +100% но меньше минимального абсолютного изменения
+            ExtractorBenchmark('noise_com', pages=2, p50_ms=1.9, p95_ms=3.0, peak_memory_kb=1000),
+            ExtractorBenchmark('new_com', pages=1, p50_ms=100, p95_ms=100),
+        ]
+        regressions = find_regressions(current, baseline, threshold=0.25)
+        self.assertEqual([(r.module, r.metric) for r in regressions], [('slow_com', 'p95_ms')])
+        self.assertEqual(regressions[0].ratio, 2.0)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'results' / 'latest.json'
+            save_results([ExtractorBenchmark('site_com', pages=1, p50_ms=3.5, errors=['x'])], path, repeat=3)
+            loaded = load_results(path)
+            self.assertEqual(loaded['site_com'].p50_ms, 3.5)
+            self.assertEqual(loaded['site_com'].errors, ['x'])
+            self.assertEqual(load_results(Path(tmp) / 'missing.json'), {})
+
+    def test_network_disabled(self):
+        original = socket.create_connection
+        with network_disabled():
+            with self.assertRaises(OSError):
+                socket.create_connection(('example.com', 80), timeout=1)
+        self.assertIs(socket.create_connection, original)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.stages.extract.extractor_registry import (
+    ExtractorRegistry,
+    build_registry,
+    find_class_attribute,
+    find_extractor_class_name,
+    load_registry,
+    save_registry,
+)
+
+EXTRACTOR_SOURCE = '''
+from extractor.base import BaseRecipeExtractor
+
+class Helper:
+    pass
+
+class DemoSiteExtractor(BaseRecipeExtractor):
+    def extract_all(self) -> dict:
+        return {"dish_name": "demo"}
+'''
+
+ALIAS_SOURCE = '''
+from extractor.base import BaseRecipeExtractor
+
+class OtherExtractor(BaseRecipeExtractor):
+    def extract_all(self) -> dict:
+        return {}
+
+AliasExtractor = OtherExtractor
+'''
+
+
+class TestExtractorRegistry(unittest.TestCase):
+    def test_find_class_by_base(self):
+        self.assertEqual(find_extractor_class_name(EXTRACTOR_SOURCE), "DemoSiteExtractor")
+
+    def test_find_alias_class(self):
+        source = "from extractor.some_site import SomeSiteExtractor\nAnotherExtractor = SomeSiteExtractor\n"
+        self.assertEqual(find_extractor_class_name(source), "AnotherExtractor")
+
+    def test_no_extractor_class(self):
+        self.assertIsNone(find_extractor_class_name("def main():\n    pass\n"))
+
+    def test_html_slimming_opt_out(self):
+        source = EXTRACTOR_SOURCE.replace('    def extract_all', '    html_slimming = False\n\n    def extract_all')
+        self.assertIs(find_class_attribute(source, "DemoSiteExtractor", "html_slimming"), False)
+        self.assertIsNone(find_class_attribute(EXTRACTOR_SOURCE, "DemoSiteExtractor", "html_slimming"))
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "demo_site.py").write_text(source, encoding="utf-8")
+            Path(tmp, "other_site.py").write_text(EXTRACTOR_SOURCE, encoding="utf-8")
+            registry = ExtractorRegistry(extractor_dir=tmp)
+            self.assertFalse(registry.html_slimming_enabled("demo_site"))
+            self.assertTrue(registry.html_slimming_enabled("other_site"))
+            self.assertTrue(registry.html_slimming_enabled("unknown_site"))
+
+    def test_build_save_load_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "demo_site.py").write_text(EXTRACTOR_SOURCE, encoding="utf-8")
+            Path(tmp, "base.py").write_text("", encoding="utf-8")
+            entries = build_registry(tmp)
+            self.assertEqual(list(entries), ["demo_site"])
+
+            registry_path = Path(tmp, "registry.json")
+            save_registry(entries, registry_path)
+            self.assertEqual(load_registry(registry_path), entries)
+
+    def test_lazy_class_loading(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "demo_site.py").write_text(EXTRACTOR_SOURCE, encoding="utf-8")
+            save_registry(build_registry(tmp), Path(tmp, "registry.json"))
+
+            registry = ExtractorRegistry(extractor_dir=tmp)
+            self.assertIn("demo_site", registry)
+            self.assertEqual(registry._classes, {})
+
+            extractor_class = registry.get_class("demo_site")
+            self.assertEqual(extractor_class.__name__, "DemoSiteExtractor")
+            self.assertIs(registry.get_class("demo_site"), extractor_class)
+
+    def test_stale_hash_rescans_module(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            module_path = Path(tmp, "demo_site.py")
+            module_path.write_text(EXTRACTOR_SOURCE, encoding="utf-8")
+            save_registry(build_registry(tmp), Path(tmp, "registry.json"))
+            module_path.write_text(ALIAS_SOURCE, encoding="utf-8")
+
+            registry = ExtractorRegistry(extractor_dir=tmp)
+            self.assertEqual(registry.get_class("demo_site").__name__, "OtherExtractor")
+
+    def test_unknown_site(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            registry = ExtractorRegistry(extractor_dir=tmp)
+            with self.assertRaises(ValueError):
+                registry.get_class("missing_site")
+
+
+if __name__ == "__main__":
+    unittest.main()
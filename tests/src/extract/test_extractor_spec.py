@@ -0,0 +1,104 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.stages.extract.extractor_registry import ExtractorRegistry
+from src.stages.extract.extractor_spec import CompiledSpec, ExtractorSpecError, SpecExtractor
+from src.stages.extract.spec_converter import compare_results, convert_extractor_source
+
+HTML = '''<html><head><meta property="og:title" content="Pie | Site"></head><body>
+<h1 class="entry-title">Apple  Pie</h1>
+<div class="recipe"><ul class="ingredients"><li>1 cup flour</li><li>2 eggs</li></ul>
+<ol class="steps"><li>Mix.</li><li>Bake <b>40</b> min.</li></ol>
+<span class="total">PT1H10M</span><a rel="tag" href="/t/pie">Pie</a><a rel="tag" href="/t/apple">Apple</a></div>
+</body></html>'''
+
+SPEC = {
+    'fields': {
+        'dish_name': [
+            {'css': 'h2.missing'},
+            {'css': 'meta[property="og:title"]', 'attr': 'content', 'clean': [['sub', r'\s*\|.*$', '']]},
+        ],
+        'description': [{'css': 'h1.entry-title', 'clean': ['lower']}],
+        'ingredients': {'rules': [{'css': 'ul.ingredients li', 'all': True}], 'format': 'ingredients'},
+        'instructions': {'rules': [{'xpath': '//ol[@class="steps"]/li', 'all': True}], 'format': 'steps'},
+        'total_time': [{'css': 'span.total', 'clean': ['iso_minutes']}],
+        'tags': {'rules': [{'css': 'a[rel~=tag]', 'all': True}], 'format': 'join', 'separator': ', '},
+    }
+}
+
+MODULE_SOURCE = '''
+import json
+from extractor.base import BaseRecipeExtractor
+
+class DemoSiteExtractor(BaseRecipeExtractor):
+    def extract_dish_name(self):
+        title = self.soup.find('h1', class_='entry-title')
+        return self.clean_text(title.get_text()) if title else None
+
+    def extract_ingredients(self):
+        container = self.soup.find('ul', class_='ingredients')
+        items = [self.split_ingredient(li.get_text(strip=True)) for li in container.find_all('li')] if container else []
+        return json.dumps(items, ensure_ascii=False) if items else None
+
+    def extract_all(self):
+        dish_name = self.extract_dish_name()
+        return {"dish_name": dish_name.lower() if dish_name else None, "ingredients": self.extract_ingredients()}
+'''
+
+
+class TestExtractorSpec(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.html_path = str(self.root / 'page.html')
+        Path(self.html_path).write_text(HTML, encoding='utf-8')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compiled_spec_extraction(self):
+        extractor_class = type('DemoSpecExtractor', (SpecExtractor,), {'compiled_spec': CompiledSpec(SPEC)})
+        data = extractor_class(self.html_path).extract_all()
+        self.assertEqual(data['dish_name'], 'Pie')
+        self.assertEqual(data['description'], 'apple pie')
+        self.assertEqual(json.loads(data['ingredients']), [{"name": "flour", "amount": "1", "unit": "cup"},
+                                                           {"name": "eggs", "amount": "2", "unit": None}])
+        self.assertEqual(data['instructions'], '1. Mix. 2. Bake 40 min.')
+        self.assertEqual(data['total_time'], '70 minutes')
+        self.assertEqual(data['tags'], 'Pie, Apple')
+        self.assertIsNone(data['notes'])
+
+    def test_invalid_spec(self):
+        for spec in ({}, {'fields': {'title': [{'css': 'h1'}]}}, {'fields': {'dish_name': [{'css': 'h1:first'}]}},
+                     {'fields': {'dish_name': [{'css': 'h1', 'clean': ['shout']}]}}):
+            with self.subTest(spec=spec), self.assertRaises(ExtractorSpecError):
+                CompiledSpec(spec)
+
+    def test_converter_and_equivalence(self):
+        spec = convert_extractor_source(MODULE_SOURCE)
+        self.assertEqual(spec['fields']['dish_name'], {'rules': [{'css': 'h1.entry-title'}], 'clean': ['lower']})
+        self.assertEqual(spec['fields']['ingredients']['rules'], [{'css': 'ul.ingredients li', 'all': True}])
+
+        (self.root / 'demo_site.py').write_text(MODULE_SOURCE, encoding='utf-8')
+        registry = ExtractorRegistry(extractor_dir=str(self.root))
+        expected = registry.get_class('demo_site')(self.html_path).extract_all()
+        spec_class = type('DemoSpecExtractor', (SpecExtractor,), {'compiled_spec': CompiledSpec(spec)})
+        actual = spec_class(self.html_path).extract_all()
+        self.assertEqual(compare_results(expected, actual, fields=spec['fields']),
+                         {'dish_name': True, 'ingredients': True})
+
+    def test_registry_loads_spec_for_site_without_module(self):
+        spec_dir = self.root / 'specs'
+        spec_dir.mkdir()
+        (spec_dir / 'spec_site.json').write_text(json.dumps(SPEC), encoding='utf-8')
+        registry = ExtractorRegistry(extractor_dir=str(self.root))
+        self.assertIn('spec_site', registry)
+        extractor_class = registry.get_class('spec_site')
+        self.assertEqual(extractor_class.__name__, 'SpecSiteSpecExtractor')
+        self.assertEqual(extractor_class(self.html_path).extract_required()['dish_name'], 'Pie')
+
+
+if __name__ == "__main__":
+    unittest.main()
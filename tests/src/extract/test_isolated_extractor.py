@@ -0,0 +1,86 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.stages.extract.isolated_extractor import BREACH_TIMEOUT, ExtractionError, IsolatedExtractor
+
+EXTRACTORS = {
+    'good_com': '''
+from extractor.base import BaseRecipeExtractor
+
+class GoodComExtractor(BaseRecipeExtractor):
+    def extract_all(self):
+        return {"dish_name": self.soup.find("h1").get_text()}
+''',
+    'broken_com': '''
+from extractor.base import BaseRecipeExtractor
+
+class BrokenComExtractor(BaseRecipeExtractor):
+    def extract_all(self):
+        raise ValueError("no recipe")
+''',
+    'hang_com': '''
+from extractor.base import BaseRecipeExtractor
+
+class HangComExtractor(BaseRecipeExtractor):
+    def extract_all(self):
+        while True:
+            pass
+''',
+}
+
+
+class TestIsolatedExtractor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.extractor_dir = root / 'extractor'
+        self.extractor_dir.mkdir()
+        for module_name, source in EXTRACTORS.items():
+            (self.extractor_dir / f'{module_name}.py').write_text(source, encoding='utf-8')
+        self.html_path = str(root / 'page.html')
+        Path(self.html_path).write_text('<html><body><h1>Soup</h1></body></html>', encoding='utf-8')
+        self.breach_log = root / 'breaches.jsonl'
+        self.isolated = IsolatedExtractor(extractor_dir=str(self.extractor_dir), time_budget=1,
+                                          memory_budget_mb=0, quarantine_after=2,
+                                          breach_log_path=str(self.breach_log))
+
+    def tearDown(self):
+        self.isolated.close()
+        self.tmp.cleanup()
+
+    def test_extract_and_errors(self):
+        self.assertEqual(self.isolated.extract('good_com', self.html_path), {"dish_name": "Soup"})
+        with self.assertRaises(ExtractionError) as ctx:
+            self.isolated.extract('broken_com', self.html_path)
+        self.assertIsNone(ctx.exception.breach)
+        # исключение экстрактора не считается превышением бюджета
+        self.assertEqual(self.isolated.breach_counts, {})
+
+    def test_budget_breach_recycles_worker_and_quarantines(self):
+        self.isolated.extract('good_com', self.html_path)
+
+        with self.assertRaises(ExtractionError) as ctx:
+            self.isolated.extract('hang_com', self.html_path)
+        self.assertEqual(ctx.exception.breach, BREACH_TIMEOUT)
+
+        # воркер перезапущен и обслуживает следующие страницы
+        self.assertEqual(self.isolated.extract('good_com', self.html_path), {"dish_name": "Soup"})
+
+        with self.assertRaises(ExtractionError) as ctx:
+            self.isolated.extract('hang_com', self.html_path)
+        self.assertIsNotNone(ctx.exception.breach)
+        self.assertTrue(self.isolated.is_quarantined('hang_com'))
+
+        records = [json.loads(line) for line in self.breach_log.read_text(encoding='utf-8').splitlines()]
+        self.assertEqual([record['module'] for record in records], ['hang_com', 'hang_com'])
+        self.assertEqual(records[0]['html_path'], self.html_path)
+        self.assertTrue(records[1]['quarantined'])
+
+        with self.assertRaises(ExtractionError):
+            self.isolated.extract('hang_com', self.html_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.stages.extract.recipe_prescreen import RecipePrescreen, site_markers_from_source
+
+EXTRACTOR_SOURCE = '''
+import re
+from extractor.base import BaseRecipeExtractor
+
+class SiteComExtractor(BaseRecipeExtractor):
+    def extract_ingredients(self):
+        container = self.soup.find('div', class_='recipe-ingredients-list')
+        steps = self.soup.select('ol.method-steps li')
+        notes = self.soup.find('section', attrs={'id': 'cooking-notes'})
+        title = self.soup.find('h1', class_='entry-title')
+        alt = self.soup.find_all('ul', class_=re.compile(r'zutaten-liste|ingredient-group'))
+'''
+
+
+class TestRecipePrescreen(unittest.TestCase):
+    def test_site_markers_from_source(self):
+        markers = site_markers_from_source(EXTRACTOR_SOURCE)
+        self.assertIn('recipe-ingredients-list', markers)
+        self.assertIn('method-steps', markers)
+        self.assertIn('zutaten-liste', markers)
+        self.assertIn('ingredient-group', markers)
+        # классы без ключевых слов рецепта не являются признаками
+        self.assertNotIn('entry-title', markers)
+        self.assertNotIn('cooking-notes', markers)
+        self.assertEqual(site_markers_from_source('def broken(:'), [])
+
+    def test_generic_markers(self):
+        prescreen = RecipePrescreen()
+        pages = {
+            'json_ld': b'<script type="application/ld+json">{"@context":"https://schema.org","@type": ["Recipe"]}',
+            'microdata': b'<div itemscope itemtype="http://schema.org/Recipe">',
+            'plugin': b'<ul class="wprm-recipe-ingredients">',
+            'heading': '<h2> Ингредиенты: </h2>'.encode('utf-8'),
+        }
+        for reason, html in pages.items():
+            with self.subTest(reason=reason):
+                self.assertEqual(prescreen.check(html).reason, reason)
+        # экранированный JSON внутри данных JS-фреймворка
+        self.assertTrue(prescreen.check(b'{\\"@type\\":\\"Recipe\\"}').has_signal)
+        listing = b'<html><body><h1>Desserts</h1><a href="/recipe/cake">Cake</a><div class="recipe-card">x</div></body>'
+        self.assertFalse(prescreen.check(listing).has_signal)
+
+    def test_site_markers_and_url(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            extractor_path = Path(tmp) / 'site_com.py'
+            extractor_path.write_text(EXTRACTOR_SOURCE, encoding='utf-8')
+            prescreen = RecipePrescreen.for_extractor(extractor_path, url_regex=re.compile(r'/recipes/[\w-]+$'))
+
+        self.assertEqual(prescreen.check('<div class="Recipe-Ingredients-List">').reason, 'site')
+        self.assertEqual(prescreen.check(b'<html></html>', 'https://site.com/recipes/soup').reason, 'url')
+        self.assertFalse(prescreen.check(b'<html></html>', 'https://site.com/category/soups').has_signal)
+        # без исходника экстрактора остаются общие признаки
+        self.assertEqual(RecipePrescreen.for_extractor(Path('missing_site.py')).site_markers, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import json
+import unittest
+
+from src.stages.extract.schema_org_extractor import completeness_score, extract_schema_org, merge_recipe_data
+
+RECIPE_PAGE = '''<html><head>
+<script type="application/ld+json">{"@context": "https://schema.org", "@graph": [
+  {"@type": "WebPage", "@id": "https://site.com/soup#page"},
+  {"@type": "ImageObject", "@id": "https://site.com/soup#image", "url": "https://site.com/soup.jpg"},
+  {"@type": "Recipe", "name": "Tomato &amp; Basil Soup", "description": "<p>A quick soup</p>",
+   "image": {"@id": "https://site.com/soup#image"},
+   "recipeIngredient": ["2 cups tomatoes", "1 tsp salt"],
+   "recipeInstructions": [{"@type": "HowToSection", "name": "Soup", "itemListElement": [
+       {"@type": "HowToStep", "text": "Chop tomatoes."}, {"@type": "HowToStep", "text": "Boil 10 minutes."}]}],
+   "prepTime": "PT10M", "cookTime": "PT20M", "totalTime": "PT30M",
+   "recipeCategory": ["Soup", "Starter"], "keywords": "tomato, basil",
+   "nutrition": {"calories": "120 kcal", "proteinContent": "3 g", "fatContent": "5 g", "carbohydrateContent": "15 g"}}
+]}</script></head><body><h1>Soup</h1></body></html>'''
+
+
+class TestSchemaOrgExtractor(unittest.TestCase):
+    def test_extract_recipe(self):
+        data = extract_schema_org(RECIPE_PAGE)
+        self.assertEqual(data['dish_name'], 'Tomato & Basil Soup')
+        self.assertEqual(data['description'], 'A quick soup')
+        self.assertEqual(json.loads(data['ingredients']), [
+            {"name": "tomatoes", "amount": "2", "unit": "cups"},
+            {"name": "salt", "amount": "1", "unit": "tsp"},
+        ])
+        self.assertEqual(data['instructions'], '1. Chop tomatoes. 2. Boil 10 minutes.')
+        self.assertEqual(data['total_time'], '30 minutes')
+        self.assertEqual(data['category'], 'Soup, Starter')
+        self.assertEqual(data['tags'], 'tomato, basil')
+        self.assertEqual(data['nutrition_info'], '120 kcal; 3/5/15')
+        self.assertEqual(data['image_urls'], 'https://site.com/soup.jpg')
+        self.assertIsNone(data['notes'])
+        self.assertEqual(completeness_score(data), 1.0)
+
+    def test_no_recipe(self):
+        self.assertIsNone(extract_schema_org('<html><body><h1>Soups</h1></body></html>'))
+        self.assertIsNone(extract_schema_org(
+            '<script type="application/ld+json">{"@type": "BreadcrumbList"}</script>'))
+
+    def test_completeness_and_merge(self):
+        partial = {'dish_name': 'Soup', 'ingredients': '[]', 'instructions': None, 'tags': 'soup'}
+        self.assertEqual(completeness_score(partial), 0.0)
+        self.assertEqual(completeness_score(None), 0.0)
+
+        site_data = {'dish_name': 'soup', 'ingredients': None, 'instructions': '1. Boil.', 'tags': None}
+        merged = merge_recipe_data(site_data, partial)
+        self.assertEqual(merged, {'dish_name': 'soup', 'ingredients': '[]', 'instructions': '1. Boil.',
+                                  'tags': 'soup'})
+        self.assertIs(merge_recipe_data(None, partial), partial)
+
+
+if __name__ == "__main__":
+    unittest.main()
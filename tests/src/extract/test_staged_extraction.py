@@ -0,0 +1,104 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from extractor.base import BaseRecipeExtractor, is_recipe_data
+from src.stages.extract.extractor_registry import ExtractorRegistry
+
+RECIPE_HTML = '<html><body><h1>Soup</h1><ul><li>water</li></ul><ol><li>boil</li></ol><p>tasty</p></body></html>'
+LISTING_HTML = '<html><body><h1>Soups</h1><a href="/soup">Soup</a></body></html>'
+JSON_LD_HTML = '''<html><head><script type="application/ld+json">{"@context": "https://schema.org",
+"@type": "Recipe", "name": "Erwtensoep", "recipeIngredient": ["500 g spliterwten", "1 ui"],
+"recipeInstructions": [{"@type": "HowToStep", "text": "Kook de erwten."}]}</script></head>
+<body><h1>Erwtensoep</h1></body></html>'''
+
+
+class CountingExtractor(BaseRecipeExtractor):
+    def __init__(self, html_path: str):
+        super().__init__(html_path)
+        self.calls = []
+
+    def _text(self, name: str, tag: str):
+        self.calls.append(name)
+        element = self.soup.select_one(tag)
+        return element.get_text() if element else None
+
+    def extract_dish_name(self):
+        return self._text('dish_name', 'h1')
+
+    def extract_ingredients(self):
+        return self._text('ingredients', 'ul')
+
+    def extract_steps(self):
+        return self._text('instructions', 'ol')
+
+    def extract_description(self):
+        return self._text('description', 'p')
+
+    def extract_all(self) -> dict:
+        return {
+            "dish_name": self.extract_dish_name(),
+            "ingredients": self.extract_ingredients(),
+            "instructions": self.extract_steps(),
+            "description": self.extract_description(),
+        }
+
+
+class InlineExtractor(CountingExtractor):
+    """Обязательные поля извлекаются не отдельными методами - адаптер не применяется"""
+
+    def extract_all(self) -> dict:
+        return {"dish_name": self._text('dish_name', 'h1'), "description": self.extract_description()}
+
+
+class TestStagedExtraction(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.recipe_path = str(Path(self.tmp.name) / 'recipe.html')
+        self.listing_path = str(Path(self.tmp.name) / 'listing.html')
+        Path(self.recipe_path).write_text(RECIPE_HTML, encoding='utf-8')
+        Path(self.listing_path).write_text(LISTING_HTML, encoding='utf-8')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_recipe_page_fields_extracted_once(self):
+        extractor = CountingExtractor(self.recipe_path)
+        data = extractor.extract_staged()
+        self.assertEqual(data, CountingExtractor(self.recipe_path).extract_all())
+        self.assertTrue(is_recipe_data(data))
+        self.assertEqual(sorted(extractor.calls), ['description', 'dish_name', 'ingredients', 'instructions'])
+
+    def test_non_recipe_page_skips_optional_fields(self):
+        extractor = CountingExtractor(self.listing_path)
+        data = extractor.extract_staged()
+        self.assertFalse(is_recipe_data(data))
+        self.assertNotIn('description', extractor.calls)
+
+    def test_without_adapter_falls_back_to_extract_all(self):
+        extractor = InlineExtractor(self.listing_path)
+        self.assertIsNone(extractor.extract_required())
+        self.assertEqual(extractor.extract_staged(), {"dish_name": "Soups", "description": None})
+
+    def test_parameterized_getters_fall_back_to_extract_all(self):
+        # extract_all передает JSON-LD в extract_ingredients(recipe_data=None): без аргументов метод ничего не находит
+        extractor_class = ExtractorRegistry().get_class('receptenpret_nl')
+        path = Path(self.tmp.name) / 'erwtensoep.html'
+        path.write_text(JSON_LD_HTML, encoding='utf-8')
+        self.assertIsNone(extractor_class(str(path)).extract_required())
+        data = extractor_class(str(path)).extract_staged()
+        self.assertTrue(is_recipe_data(data))
+        self.assertEqual(data, extractor_class(str(path)).extract_all())
+
+    def test_memoized_getter_calls_method_with_arguments(self):
+        extractor = CountingExtractor(self.recipe_path)
+        extractor.extract_required()
+        self.assertEqual(extractor.extract_dish_name(), 'Soup')
+        self.assertEqual(extractor.calls.count('dish_name'), 1)
+        # переданный аргумент не подменяется запомненным значением
+        with self.assertRaises(TypeError):
+            extractor.extract_dish_name('other')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Локальный сервер, отвечающий как HTML-версия DuckDuckGo (для тестов поиска без сети)"""
+
+import threading
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote
+
+
+class FakeSearchServer:
+    """
+    POST /html/ с полями q и s (смещение): по RESULTS_PER_PAGE результатов https://<запрос>-<n>.example/
+    и форма следующей страницы, пока не выдано total_results. Запрос "blocked" - страница проверки (HTTP 202).
+    """
+    RESULTS_PER_PAGE = 10
+
+    def __init__(self, total_results: int = 25):
+        self.total_results = total_results
+        self.requests: list[dict] = []
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}/html/"
+
+    def start(self) -> 'FakeSearchServer':
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def render(self, query: str, offset: int) -> str:
+        results = [
+            '<div class="result results_links results_links_deep result--ad"><a class="result__a" '
+            'href="https://duckduckgo.com/y.js?ad_domain=ads.example">Ad</a></div>'
+        ]
+        for index in range(offset, min(offset + self.RESULTS_PER_PAGE, self.total_results)):
+            target = quote(f"https://{query}-{index}.example/", safe='')
+            results.append(f'<div class="result results_links results_links_deep web-result">'
+                           f'<a class="result__a" href="//duckduckgo.com/l/?uddg={target}&amp;rut=x">{index}</a></div>')
+        next_form = ''
+        if offset + self.RESULTS_PER_PAGE < self.total_results:
+            next_form = (f'<div class="nav-link"><form action="/html/" method="post">'
+                         f'<input type="submit" class="btn btn--alt" value="Next" />'
+                         f'<input type="hidden" name="q" value="{escape(query)}" />'
+                         f'<input type="hidden" name="s" value="{offset + self.RESULTS_PER_PAGE}" />'
+                         f'<input type="hidden" name="vqd" value="4-123" /></form></div>')
+        return f"<html><body><div class=\"results\">{''.join(results)}</div>{next_form}</body></html>"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                form = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode('utf-8'),
+                                                                   keep_blank_values=True).items()}
+                with fake._lock:
+                    fake.requests.append(form)
+                query = form.get('q', '')
+                if query == 'blocked':
+                    status, body = 202, '<html><body><div class="anomaly-modal__title">bots</div></body></html>'
+                else:
+                    status, body = 200, fake.render(query, int(form.get('s') or 0))
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.end_headers()
+                self.wfile.write(body.encode('utf-8'))
+
+            def log_message(self, *args):
+                pass
+        return Handler
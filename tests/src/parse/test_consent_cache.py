@@ -0,0 +1,91 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.stages.parse.accept_cookies import CoockieHandler
+from src.stages.parse.consent_cache import ConsentSelectorCache, detect_vendor
+
+
+class FakeDriver:
+    """execute_script нажимает кандидата с нужным селектором (кнопка есть на странице) и сообщает о видимом баннере"""
+
+    def __init__(self, present_selector=None, banner_visible=False):
+        self.present_selector = present_selector
+        self.banner_visible = banner_visible
+        self.current_url = 'https://www.site.com/recipe/1'
+        self.probes = []
+
+    def execute_script(self, script, candidates, banners):
+        self.probes.append(candidates)
+        for index, candidate in enumerate(candidates):
+            if candidate['selector'] == self.present_selector:
+                return {'clicked': index, 'banner': True}
+        return {'clicked': -1, 'banner': self.banner_visible}
+
+
+class TestConsentSelectorCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = str(Path(self.tmp.name) / 'consent.json')
+
+    def test_detect_vendor(self):
+        self.assertEqual(detect_vendor('<div id="onetrust-banner-sdk"></div>'), 'onetrust')
+        self.assertEqual(detect_vendor('<div id="didomi-host"></div>'), 'didomi')
+        self.assertIsNone(detect_vendor('<div class="banner"></div>'))
+
+    def test_candidates_order_and_persistence(self):
+        cache = ConsentSelectorCache(path=self.path, max_failures=2)
+        cache.record_success('a.com', 'xpath', "//button[normalize-space()='OK']", vendor='didomi')
+
+        cache = ConsentSelectorCache(path=self.path, max_failures=2)
+        selectors = [item['selector'] for item in cache.candidates('a.com')]
+        self.assertEqual(selectors[:2], ["//button[normalize-space()='OK']", '#didomi-notice-agree-button'])
+        # выученный селектор платформы пробуется на другом сайте той же платформы, но не на остальных
+        self.assertIn("//button[normalize-space()='OK']", [item['selector'] for item in cache.candidates('b.com', 'didomi')])
+        other = [item['selector'] for item in cache.candidates('c.com')]
+        self.assertNotIn("//button[normalize-space()='OK']", other)
+        self.assertEqual(other[0], '#onetrust-accept-btn-handler')
+
+        cache.record_failure('a.com')
+        self.assertIn('a.com', ConsentSelectorCache(path=self.path).domains)
+        cache.record_failure('a.com')
+        self.assertNotIn('a.com', ConsentSelectorCache(path=self.path).domains)
+
+    @patch('src.stages.parse.accept_cookies.GPTClient')
+    def test_handler_uses_single_probe_before_dom_search(self, _):
+        cache = ConsentSelectorCache(path=self.path)
+        driver = FakeDriver(present_selector='#didomi-notice-agree-button')
+        handler = CoockieHandler(driver=driver, consent_cache=cache)
+
+        with patch.object(handler, 'find_cookie_banner') as find_banner, patch('time.sleep'):
+            self.assertTrue(handler.find_and_click_cookie_button('<div id="didomi-host"></div>'))
+        find_banner.assert_not_called()
+        self.assertEqual(len(driver.probes), 1)
+        self.assertEqual(driver.probes[0][0]['selector'], '#didomi-notice-agree-button')
+        self.assertEqual(cache.domains['site.com']['vendor'], 'didomi')
+
+    @patch('src.stages.parse.accept_cookies.GPTClient')
+    def test_probe_without_banner_is_not_a_failure(self, _):
+        cache = ConsentSelectorCache(path=self.path, max_failures=1)
+        cache.record_success('site.com', 'css', '#accept', vendor='didomi')
+        handler = CoockieHandler(driver=FakeDriver(), consent_cache=cache)
+
+        # согласие уже сохранено: баннера нет, проба ничего не нажала
+        with patch('time.sleep'):
+            self.assertFalse(handler.find_and_click_cookie_button('<div class="content"></div>'))
+        self.assertIn('site.com', cache.domains)
+        # скрипты и хост платформы остаются на странице и после согласия
+        page = '<script src="https://cdn.cookielaw.org/scripttemplates/otSDKStub.js"></script><div id="didomi-host"></div>'
+        self.assertFalse(handler.click_cached_consent('site.com', page))
+        self.assertIn('site.com', cache.domains)
+        # баннер платформы виден, а селектор не сработал
+        handler.driver.banner_visible = True
+        self.assertFalse(handler.click_cached_consent('site.com', page))
+        self.assertNotIn('site.com', cache.domains)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import time
+import unittest
+
+from src.stages.parse.duckduckgo_search import DuckDuckGoHTTPSearch, result_url
+from tests.src.parse.fake_search_server import FakeSearchServer
+
+
+class TestDuckDuckGoHTTPSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeSearchServer(total_results=25).start()
+        self.addCleanup(self.server.stop)
+
+    def test_result_url(self):
+        self.assertEqual(result_url('//duckduckgo.com/l/?uddg=https%3A%2F%2Fa.com%2Fx%3Fy%3D1&rut=z'), 'https://a.com/x?y=1')
+        self.assertIsNone(result_url('https://duckduckgo.com/y.js?ad_domain=a.com'))
+        self.assertEqual(result_url('https://b.com/'), 'https://b.com/')
+
+    def test_pagination_and_ads(self):
+        search = DuckDuckGoHTTPSearch(search_url=self.server.url, concurrency=2, queries_per_minute=0, timeout=5)
+        urls = search.search('pie', max_results=20)
+        self.assertEqual(urls, [f"https://pie-{index}.example/" for index in range(20)])
+        self.assertEqual([request.get('s', '') for request in self.server.requests], ['', '10'])
+        self.assertEqual(self.server.requests[1]['vqd'], '4-123')
+
+    def test_concurrent_queries_rate_limited_and_blocked(self):
+        search = DuckDuckGoHTTPSearch(search_url=self.server.url, concurrency=4, queries_per_minute=600, timeout=5)
+        start = time.monotonic()
+        results = search.search_many(['soup', 'cake', 'blocked'], max_results=5)
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(results['soup'], [f"https://soup-{index}.example/" for index in range(5)])
+        self.assertEqual(len(results['cake']), 5)
+        self.assertIsNone(results['blocked'])
+        # три запроса при 600 в минуту: не быстрее двух интервалов по 0.1 с
+        self.assertGreaterEqual(elapsed, 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
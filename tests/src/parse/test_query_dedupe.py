@@ -0,0 +1,57 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.stages.parse.query_dedupe import QueryIndex, ngram_embedding
+
+
+class TestQueryIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / 'query_index.json'
+
+    def make_index(self) -> QueryIndex:
+        return QueryIndex(path=str(self.path), threshold=0.8, embed=ngram_embedding)
+
+    def test_filter_new_and_add(self):
+        index = self.make_index()
+        index.add('korean kimchi jjigae recipe', ['korean kimchi jjigae recipe', 'receta de kimchi jjigae coreano'])
+        new = index.filter_new(['Korean kimchi jjigae recipe ', 'peruvian ceviche', 'thai green curry',
+                                'peruvian  ceviche'])
+        self.assertEqual(new, ['peruvian ceviche', 'thai green curry'])
+        # перевод, совпадающий с запросом другого семейства, не добавляется
+        self.assertEqual(index.add('kimchi stew', ['kimchi stew', 'receta de kimchi jjigae coreano!']), ['kimchi stew'])
+
+    def test_source_query_filters_near_duplicates_but_is_not_searched(self):
+        index = self.make_index()
+        self.assertEqual(index.add('best chocolate cake recipe', ['receta de pastel de chocolate']),
+                         ['receta de pastel de chocolate'])
+        self.assertEqual(index.filter_new(['best chocolate cake recipe!', 'lemon tart']), ['lemon tart'])
+        self.assertFalse(index.queries['best chocolate cake recipe']['searched'])
+        # исходный запрос не делает избыточными запросы для поиска
+        self.assertFalse(index.is_redundant('best chocolate cake recipe!'))
+
+    def test_select_skips_redundant_and_prefers_novel_families(self):
+        index = self.make_index()
+        index.add('stale', ['stale family query one'])
+        index.add('fresh', ['fresh family query two'])
+        index.record_results('stale family query one', ['https://a.com/1', 'https://b.com/2'])
+        index.record_results('stale family query one', ['https://www.a.com/3', 'https://b.com/4'])
+        index.record_results('fresh family query two', ['https://c.com/1'])
+        self.assertLess(index.weight('stale family query one'), index.weight('fresh family query two'))
+        index.save()
+
+        index = self.make_index()
+        self.assertEqual(index.domains, {'a.com', 'b.com', 'c.com'})
+        random.seed(1)
+        candidates = ['stale family query one.', 'brand new query', 'another different search']
+        selected, redundant = index.select(candidates, limit=5)
+        self.assertEqual(redundant, ['stale family query one.'])
+        self.assertCountEqual(selected, ['brand new query', 'another different search'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.stages.parse.recrawl_scheduler import DAY, RecrawlScheduler, discovery_rate, next_interval
+from src.stages.parse.sitemap_scanner import parse_lastmod
+from utils.content_hash import ChangeStats
+
+
+class TestRecrawlScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'schedule.json'
+        self.scheduler = RecrawlScheduler(self.path, min_interval=DAY, max_interval=30 * DAY, target_recipes=20)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_interval_follows_yield(self):
+        self.assertEqual(next_interval(0, 20, DAY, 30 * DAY), 30 * DAY)
+        self.assertEqual(next_interval(100, 20, DAY, 30 * DAY), DAY)
+        self.assertAlmostEqual(next_interval(4, 20, DAY, 30 * DAY), 5 * DAY)
+        # sitemap обновляется чаще, чем оценка по рецептам
+        self.assertAlmostEqual(next_interval(1, 20, DAY, 30 * DAY, sitemap_cadence=2 * DAY), 2 * DAY)
+
+    def test_discovery_rate_smoothing(self):
+        runs = [{'finished_at': 0, 'new': 10}, {'finished_at': 10 * DAY, 'new': 0}]
+        self.assertAlmostEqual(discovery_rate(runs, DAY), 5.0)
+
+    def test_prioritize_and_persist(self):
+        now = 100 * DAY
+        self.scheduler.record_run('busy', ChangeStats(new=200), finished_at=now - 2 * DAY)
+        self.scheduler.record_run('quiet', ChangeStats(new=0), finished_at=now - 2 * DAY,
+                                  pattern_stats={'/recipe/{slug}': ChangeStats(unchanged_html=5)})
+        reloaded = RecrawlScheduler(self.path, min_interval=DAY, max_interval=30 * DAY, target_recipes=20)
+        self.assertEqual(reloaded.prioritize(['quiet', 'fresh', 'busy'], now=now), ['fresh', 'busy'])
+        self.assertEqual(reloaded.prioritize(['quiet', 'busy'], now=now, include_not_due=True), ['busy', 'quiet'])
+        self.assertEqual(reloaded.deferred_patterns('quiet', now=now), {'/recipe/{slug}'})
+
+    def test_parse_lastmod(self):
+        self.assertEqual(parse_lastmod('1970-01-02'), DAY)
+        self.assertEqual(parse_lastmod('1970-01-02T00:00:00+01:00'), DAY - 3600)
+        self.assertIsNone(parse_lastmod('yesterday'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.stages.parse.site_prescreen import (SitePrescreener, has_structured_recipe, sample_urls,
+                                             sitemap_locations)
+
+RECIPE_HTML = ('<html><head><script type="application/ld+json">'
+               '{"@context": "https://schema.org", "@graph": [{"@type": "Recipe", "name": "Pie"}]}'
+               '</script></head><body></body></html>')
+ARTICLE_HTML = '<html><body><h1>News</h1><a href="/about">About</a></body></html>'
+
+
+def make_handler(pages: dict):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = pages.get(self.path)
+            self.send_response(200 if body is not None else 404)
+            self.end_headers()
+            base = f"http://127.0.0.1:{self.server.server_port}"
+            self.wfile.write((body or '').replace('{base}', base).encode('utf-8'))
+
+        def log_message(self, *args):
+            pass
+    return Handler
+
+
+class TestSitePrescreen(unittest.TestCase):
+
+    def serve(self, pages: dict) -> str:
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(pages))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    def test_helpers(self):
+        self.assertTrue(has_structured_recipe(RECIPE_HTML))
+        self.assertFalse(has_structured_recipe(ARTICLE_HTML))
+        xml = '<urlset><url><loc> https://a.com/x </loc></url><url><loc><![CDATA[https://a.com/y]]></loc></url></urlset>'
+        self.assertEqual(sitemap_locations(xml), ['https://a.com/x', 'https://a.com/y'])
+        urls = [f'https://a.com/news/{i}' for i in range(10)] + ['https://a.com/recipes/pie']
+        self.assertEqual(sample_urls(urls, 3)[0], 'https://a.com/recipes/pie')
+        self.assertEqual(len(sample_urls(urls, 3)), 3)
+
+    def test_screen_sites(self):
+        recipe_base = self.serve({
+            '/': '<html><body class="wprm-recipe-ingredient"></body></html>',
+            '/robots.txt': 'User-agent: *\nSitemap: {base}/sitemap_index.xml',
+            '/sitemap_index.xml': '<sitemapindex><sitemap><loc>{base}/post-sitemap.xml</loc></sitemap>'
+                                  '<sitemap><loc>{base}/recipe-sitemap.xml</loc></sitemap></sitemapindex>',
+            '/recipe-sitemap.xml': '<urlset><url><loc>{base}/recipe/pie</loc></url>'
+                                   '<url><loc>{base}/recipe/cake</loc></url></urlset>',
+            '/recipe/pie': RECIPE_HTML,
+            '/recipe/cake': RECIPE_HTML,
+        })
+        news_base = self.serve({'/': ARTICLE_HTML, '/about': ARTICLE_HTML})
+
+        results = SitePrescreener(concurrency=4, sample_pages=3, timeout=5).screen(
+            [f"{recipe_base}/start", news_base, 'http://127.0.0.1:9/'])
+        recipe, news, dead = results
+        self.assertTrue(recipe.has_sitemap)
+        self.assertEqual((recipe.recipe_pages, recipe.sampled), (2, 2))
+        self.assertAlmostEqual(recipe.score, 1.0)
+        self.assertEqual((news.recipe_pages, news.sampled), (0, 1))
+        self.assertEqual(news.score, 0.0)
+        self.assertFalse(news.is_promising(0.2))
+        self.assertIsNone(dead.score)
+        self.assertTrue(dead.is_promising(0.2))
+
+
+if __name__ == '__main__':
+    unittest.main()
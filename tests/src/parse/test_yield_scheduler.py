@@ -0,0 +1,43 @@
+import unittest
+
+from src.stages.parse.parse import ParseRunResult
+from src.stages.parse.yield_scheduler import YieldScheduler
+
+
+class TestYieldScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = YieldScheduler(['a', 'b', 'c'], slice_minutes=10, min_yield=0.05, prior_yield=1.0,
+                                        max_urls=100)
+
+    def test_untried_sites_first_then_by_yield(self):
+        self.assertEqual(self.scheduler.next_site(), 'a')
+        self.assertEqual(self.scheduler.next_site(), 'b')
+        self.scheduler.record('a', ParseRunResult(new_recipes=50, urls_explored=40, preempted=True), 600)
+        self.scheduler.record('b', ParseRunResult(new_recipes=1, urls_explored=40, preempted=True), 600)
+        # c еще не запускался (априорно 1/мин), a дает 3.7/мин, b - меньше
+        self.assertEqual(self.scheduler.next_site(), 'a')
+        self.assertEqual(self.scheduler.next_site(), 'c')
+        self.assertEqual(self.scheduler.next_site(), 'b')
+        self.assertIsNone(self.scheduler.next_site())
+
+    def test_finish_rules(self):
+        for name in ('a', 'b', 'c'):
+            self.scheduler.next_site()
+        # проход закончился сам
+        self.assertTrue(self.scheduler.record('a', ParseRunResult(new_recipes=5, urls_explored=10), 60).finished)
+        # нет рецептов и сплошная капча - сайт снимается
+        stats = self.scheduler.record('b', ParseRunResult(urls_explored=10, captcha_pages=10, preempted=True), 600)
+        self.assertTrue(stats.finished)
+        self.assertEqual(stats.captcha_rate, 1.0)
+        # ошибка порта - сайт продолжится, лимит URL делится между квантами
+        stats = self.scheduler.record('c', ParseRunResult(is_fatal=True), 5)
+        self.assertFalse(stats.finished)
+        self.scheduler.next_site()
+        self.scheduler.record('c', ParseRunResult(new_recipes=30, urls_explored=60, preempted=True), 600)
+        self.assertEqual(self.scheduler.remaining_urls('c'), 40)
+        self.assertTrue(self.scheduler.has_pending())
+
+
+if __name__ == '__main__':
+    unittest.main()
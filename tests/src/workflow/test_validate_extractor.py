@@ -0,0 +1,117 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from config.config import config
+from src.stages.workflow.validate_extractor import ValidateParser
+from src.stages.workflow.validation_models import FileValidationResult
+
+EXTRACTORS = {
+    'good_com': '''
+from extractor.base import BaseRecipeExtractor
+
+class GoodComExtractor(BaseRecipeExtractor):
+    def extract_all(self):
+        title = self.soup.find("h1")
+        return {
+            "dish_name": title.get_text() if title else None,
+            "ingredients": "[]",
+            "instructions": "1. Mix.",
+        }
+''',
+    'broken_com': '''
+from extractor.base import BaseRecipeExtractor
+
+class BrokenComExtractor(BaseRecipeExtractor):
+    def extract_all(self):
+        raise ValueError("no recipe")
+''',
+}
+REQUIRED = ['dish_name', 'ingredients', 'instructions']
+
+
+class FakeGPTValidator:
+    def __init__(self):
+        self.calls = []
+
+    def validate_with_reference(self, extracted_data, reference_data, site_name, filename):
+        self.calls.append(('reference', filename))
+        is_valid = extracted_data['dish_name'] == reference_data['dish_name']
+        return FileValidationResult.from_gpt_result(filename, {'is_valid': is_valid, 'feedback': 'ok'})
+
+    def validate_with_html(self, extracted_data, html_content, site_name, filename):
+        self.calls.append(('html', filename))
+        return FileValidationResult.from_gpt_result(filename, {'is_valid': False, 'feedback': 'no title'})
+
+
+class TestValidateParser(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.extractor_dir = root / 'extractor'
+        self.extractor_dir.mkdir()
+        for module_name, source in EXTRACTORS.items():
+            (self.extractor_dir / f'{module_name}.py').write_text(source, encoding='utf-8')
+
+        self.preprocessed = root / 'preprocessed'
+        for module_name in EXTRACTORS:
+            pages = self.preprocessed / module_name
+            pages.mkdir(parents=True)
+            (pages / 'soup.html').write_text('<html><body><h1>Soup</h1></body></html>', encoding='utf-8')
+            (pages / 'soup.json').write_text(json.dumps({'dish_name': 'Soup'}), encoding='utf-8')
+            (pages / 'empty.html').write_text('<html><body><p>About us</p></body></html>', encoding='utf-8')
+        self.cache_path = root / 'cache.json'
+
+        patcher = mock.patch.object(config, 'PARSER_PREPROCESSED_FOLDER', str(self.preprocessed))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _validator(self, gpt, workers=1):
+        return ValidateParser(extractor_folder=str(self.extractor_dir), workers=workers,
+                              cache_path=str(self.cache_path), gpt_validator=gpt)
+
+    def test_validate_many_reports_each_module(self):
+        gpt = FakeGPTValidator()
+        reports = self._validator(gpt).validate_many(
+            ['good_com', 'broken_com', 'missing_com'], use_gpt=True, required_fields=REQUIRED)
+
+        good = reports['good_com']
+        self.assertEqual(good.total_files, 2)
+        self.assertEqual(good.passed, 1)
+        self.assertEqual(good.failed, 1)
+        self.assertEqual(sorted(kind for kind, _ in gpt.calls), ['html', 'reference'])
+        extracted = json.loads((self.preprocessed / 'good_com' / 'soup_extracted.json').read_text(encoding='utf-8'))
+        self.assertEqual(extracted['dish_name'], 'Soup')
+
+        self.assertEqual(reports['broken_com'].failed, 2)
+        self.assertEqual({detail.reason for detail in reports['broken_com'].details}, {'extraction_error'})
+        self.assertEqual(reports['missing_com'].system_errors, 1)
+
+    def test_unchanged_outputs_are_not_resent_to_gpt(self):
+        self._validator(FakeGPTValidator()).validate('good_com', use_gpt=True, required_fields=REQUIRED)
+
+        gpt = FakeGPTValidator()
+        report = self._validator(gpt).validate('good_com', use_gpt=True, required_fields=REQUIRED)
+        self.assertEqual(gpt.calls, [])
+        self.assertEqual((report.passed, report.failed), (1, 1))
+
+        # изменившийся HTML отправляется заново
+        (self.preprocessed / 'good_com' / 'soup.html').write_text(
+            '<html><body><h1>Soup</h1><p>new</p></body></html>', encoding='utf-8')
+        self._validator(gpt).validate('good_com', use_gpt=True, required_fields=REQUIRED)
+        self.assertEqual(gpt.calls, [('reference', str(self.preprocessed / 'good_com' / 'soup_extracted.json'))])
+
+    def test_process_pool_matches_in_process(self):
+        in_process = self._validator(FakeGPTValidator()).validate('good_com', required_fields=REQUIRED)
+        self.cache_path.unlink(missing_ok=True)
+        pooled = self._validator(FakeGPTValidator(), workers=2).validate('good_com', required_fields=REQUIRED)
+        self.assertEqual(in_process.to_dict(), pooled.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import logging
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from utils import async_logging
+from utils.async_logging import attach_handlers, flush, page_record, release_handlers
+
+
+class TestAsyncLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(async_logging.stop_listener)
+
+    def make_logger(self, name: str, path: Path, level=logging.INFO) -> logging.Logger:
+        logger = logging.getLogger(f"test_async_logging.{name}")
+        logger.setLevel(level)
+        logger.propagate = False
+        handler = logging.FileHandler(path, mode='w', encoding='utf-8', delay=True)
+        handler.setFormatter(logging.Formatter('%(threadName)s %(levelname)s %(message)s'))
+        attach_handlers(logger, [handler], use_queue=True, debug_per_second=2)
+        self.addCleanup(release_handlers, logger)
+        return logger
+
+    def test_threads_write_own_files(self):
+        paths = [Path(self.tmp.name) / f"port_{i}.log" for i in range(3)]
+
+        def work(index):
+            logger = self.make_logger(f"port{index}", paths[index])
+            for line in range(50):
+                logger.info(f"port {index} line {line}")
+            release_handlers(logger)
+
+        threads = [threading.Thread(target=work, args=(i,), name=f"worker{i}") for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(flush())
+
+        for index, path in enumerate(paths):
+            lines = path.read_text(encoding='utf-8').splitlines()
+            self.assertEqual(len(lines), 50)
+            self.assertTrue(all(line.startswith(f"worker{index} INFO port {index} ") for line in lines))
+
+    def test_debug_rate_limit_and_page_record(self):
+        path = Path(self.tmp.name) / "site.log"
+        logger = self.make_logger("site", path, level=logging.DEBUG)
+        for i in range(10):
+            logger.debug(f"url {i}")
+        logger.info("info is not limited")
+        page_record(logger, n=3, load=1.234, recipe=True, links=None, url='https://example.com/a b')
+        self.assertTrue(flush())
+
+        lines = path.read_text(encoding='utf-8').splitlines()
+        self.assertEqual(sum('DEBUG url' in line for line in lines), 2)
+        self.assertIn('info is not limited', lines[2])
+        self.assertTrue(lines[3].endswith('PAGE n=3 load=1.23 recipe=1 url="https://example.com/a b"'))
+
+
+if __name__ == '__main__':
+    unittest.main()
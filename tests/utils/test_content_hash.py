@@ -0,0 +1,34 @@
+import unittest
+
+from src.models.page import Page
+from utils.content_hash import ChangeStats, content_hash, html_hash
+
+
+class TestContentHash(unittest.TestCase):
+
+    def test_page_and_dict_hash_equal(self):
+        data = {'dish_name': 'Pie', 'ingredients': '[{"name": "flour"}]', 'instructions': 'Bake.'}
+        page = Page(site_id=1, url='https://example.com/pie', html_path='pie.html', title='Pie', **data)
+        self.assertEqual(content_hash(page), content_hash(data))
+
+    def test_metadata_does_not_change_hash(self):
+        page = Page(site_id=1, url='https://example.com/pie', dish_name='Pie')
+        moved = page.model_copy(update={'html_path': 'other.html', 'confidence_score': 50, 'html_hash': 'x'})
+        self.assertEqual(content_hash(page), content_hash(moved))
+        self.assertNotEqual(content_hash(page), content_hash(page.model_copy(update={'image_urls': 'https://a/1.jpg'})))
+
+    def test_html_hash(self):
+        self.assertEqual(html_hash(b'<html></html>'), html_hash(b'<html></html>'))
+        self.assertNotEqual(html_hash(b'<html></html>'), html_hash(b'<html> </html>'))
+
+    def test_change_ratio(self):
+        stats = ChangeStats(new=5)
+        self.assertIsNone(stats.change_ratio)
+        stats = ChangeStats(new=5, unchanged_html=6, unchanged_content=2, changed=2)
+        self.assertEqual(stats.recrawled, 10)
+        self.assertAlmostEqual(stats.change_ratio, 0.2)
+        self.assertIn('20.0%', stats.summary())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import re
+import unittest
+
+from utils.fast_html import LxmlDocument, css_to_xpath, parse_html
+
+HTML = '''<!DOCTYPE html>
+<html><head><title>Pie &amp; More</title>
+<meta property="og:title" content="Pie">
+<script type="application/ld+json">{"@type": "Recipe", "name": "Pie"}</script>
+</head>
+<body>
+<!-- comment -->
+<div id="main" class="recipe-card wprm-recipe">
+  <h1 class="title">Best   Pie</h1>
+  <p>Intro <b>bold</b> text<br>line two</p>
+  <div class="meta"><span class="label">Prep Time:</span> <span class="value">20 mins</span></div>
+  <h2>Ingredients</h2>
+  <ul class="ingredients">
+    <li itemprop="recipeIngredient"><span class="amount">1</span> cup flour</li>
+    <li itemprop="recipeIngredient">2 eggs <!-- x --></li>
+    <li>salt</li>
+  </ul>
+  <script>var a = 1;</script>
+  <a href="/tag/pie" rel="tag nofollow">pie</a>
+</div>
+<footer><p>Notes: enjoy</p>
+<div class="box"><div><section><div><span class="deep">deep</span></div></section></div></div></footer>
+</body></html>'''
+
+# операции, которые используют экстракторы; результат должен совпадать с BeautifulSoup
+OPERATIONS = {
+    'title': lambda s: s.title.string,
+    'meta': lambda s: s.find('meta', property='og:title')['content'],
+    'all_tags': lambda s: [tag.name for tag in s.find_all(True)],
+    'class_list': lambda s: s.find('div', class_='recipe-card').get('class'),
+    'class_regex': lambda s: s.find(class_=re.compile('wprm')).get('id'),
+    'class_callable': lambda s: s.find('li', class_=lambda c: c is None).get_text(),
+    'attrs': lambda s: [li.get_text(strip=True) for li in s.find_all('li', attrs={'itemprop': 'recipeIngredient'})],
+    'get_text': lambda s: s.find('div', id='main').get_text(),
+    'get_text_strip': lambda s: s.get_text(' ', strip=True),
+    'string_search': lambda s: s.find(string=re.compile('Ingredients')).find_parent('div').get('id'),
+    'string_filter': lambda s: s.find('span', string='Prep Time:').find_next_sibling('span').get_text(),
+    'children': lambda s: [child if child.name is None else child.name for child in s.find('ul').children],
+    'recursive': lambda s: len(s.find('ul').find_all('li', recursive=False)),
+    'limit': lambda s: [li.get_text() for li in s.find_all('li', limit=2)],
+    'find_next': lambda s: s.find('h2').find_next('li').get_text(' ', strip=True),
+    'find_previous': lambda s: s.find('footer').find_previous('h2').get_text(),
+    'siblings': lambda s: repr(s.find('b').previous_sibling),
+    'parents': lambda s: [parent.name for parent in s.find('b').find_parents()],
+    'multi_valued': lambda s: s.find('a')['rel'],
+    'json_ld': lambda s: s.find('script', type='application/ld+json').string,
+    'select': lambda s: [li.get_text() for li in s.select('ul.ingredients > li[itemprop]')],
+    'select_one': lambda s: s.select_one('#main h1').get_text(),
+    # ближайший div над span не дочерний для .box - нужен возврат к следующему предку
+    'select_backtracking': lambda s: [span.get_text() for span in s.select('.box > div span')],
+}
+
+
+class TestLxmlBackendConformance(unittest.TestCase):
+    def test_operations_match_beautifulsoup(self):
+        for name, operation in OPERATIONS.items():
+            with self.subTest(operation=name):
+                expected = operation(parse_html(HTML, 'bs4'))
+                actual = operation(parse_html(HTML, 'lxml'))
+                self.assertEqual(str(actual), str(expected))
+
+    def test_decompose(self):
+        results = []
+        for backend in ('bs4', 'lxml'):
+            soup = parse_html(HTML, backend)
+            soup.find('p').decompose()
+            results.append(soup.find('div', id='main').get_text(' ', strip=True))
+        self.assertEqual(results[1], results[0])
+
+    def test_tag_identity(self):
+        soup = LxmlDocument(HTML)
+        li = soup.find('li')
+        self.assertEqual(li.parent, soup.find('ul'))
+        self.assertIn(li, set(soup.find_all('li')))
+
+    def test_empty_document(self):
+        soup = LxmlDocument('')
+        self.assertIsNone(soup.find('div'))
+        self.assertEqual(soup.get_text(), '')
+
+    def test_css_to_xpath_matches_select(self):
+        bs4_soup = parse_html(HTML, 'bs4')
+        document = LxmlDocument(HTML)
+        for selector in ('ul.ingredients > li[itemprop]', '#main h1', 'a[rel~=tag]', 'a[href^="/tag"]',
+                         '.recipe-card span.value, footer p', 'li[itemprop$=Ingredient]', '.box > div span'):
+            with self.subTest(selector=selector):
+                expected = [tag.get_text() for tag in bs4_soup.select(selector)]
+                self.assertEqual([tag.get_text() for tag in document.xpath(css_to_xpath(selector))], expected)
+        self.assertEqual(document.xpath('//meta[@property="og:title"]/@content'), ['Pie'])
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            parse_html(HTML, 'html5lib')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import unittest
+
+from bs4 import BeautifulSoup, Comment, NavigableString
+
+from src.stages.extract.recipe_prescreen import RecipePrescreen
+from utils.html_slimming import slim_html
+
+PAGE = '''<!DOCTYPE html>
+<html lang="en"><head>
+<meta charset="utf-8"><title>Apple Pie</title>
+<meta property="og:image" content="https://example.com/pie.jpg">
+<link rel="stylesheet" href="/main.css"><link rel="canonical" href="https://example.com/pie">
+<style>body { color: red; }</style>
+<script>window.dataLayer = [];</script>
+<script type="application/ld+json">{"@type": "Recipe", "name": "Apple Pie"}</script>
+<script id="__NEXT_DATA__" type="application/json">{"props": {}}</script>
+</head><body>
+<!-- tracking comment -->
+<h1 class="title">Apple <svg class="icon"><path d="M0 0L10 10"/></svg>Pie</h1>
+<ins class="adsbygoogle" data-ad-slot="1">ad text</ins>
+<div id="div-gpt-ad-123">another ad</div>
+<ul class="ingredients"><li>2 apples</li><li>1 cup sugar<script>track()</script> (fine)</li></ul>
+<noscript><img src="https://example.com/lazy.jpg"></noscript>
+</body></html>'''
+
+
+class TestSlimHtml(unittest.TestCase):
+    def setUp(self):
+        self.slim = slim_html(PAGE)
+        self.soup = BeautifulSoup(self.slim, 'lxml')
+
+    def test_keeps_data(self):
+        json_ld = self.soup.find('script', type='application/ld+json')
+        self.assertEqual(json.loads(json_ld.string)['name'], 'Apple Pie')
+        self.assertIsNotNone(self.soup.find('script', id='__NEXT_DATA__'))
+        self.assertEqual(self.soup.find('meta', property='og:image')['content'], 'https://example.com/pie.jpg')
+        self.assertIsNotNone(self.soup.find('link', rel='canonical'))
+        self.assertIsNotNone(self.soup.find('noscript'))
+        self.assertIsNotNone(self.soup.find('svg', class_='icon'))
+
+    def test_drops_heavy_nodes(self):
+        self.assertIsNone(self.soup.find('style'))
+        self.assertIsNone(self.soup.find('link', rel='stylesheet'))
+        self.assertEqual(len(self.soup.find_all('script')), 2)
+        self.assertIsNone(self.soup.find('path'))
+        self.assertNotIn('ad text', self.slim)
+        self.assertNotIn('another ad', self.slim)
+        self.assertLess(len(self.slim), len(PAGE))
+
+    def test_keeps_comments_between_text_nodes(self):
+        # React: <!-- --> разделяет текстовые узлы, экстракторы разбирают поля по этим границам
+        li = BeautifulSoup(slim_html('<ul><li><strong>200 g</strong> <!-- -->smør<!-- -->, romtemperert</li></ul>'),
+                           'lxml').li
+        texts = [str(node) for node in li.children if isinstance(node, NavigableString) and not isinstance(node, Comment)]
+        self.assertEqual(texts, [' ', 'smør', ', romtemperert'])
+        self.assertIn('tracking comment', self.slim)
+
+    def test_text_around_removed_nodes(self):
+        self.assertEqual(self.soup.find('h1').get_text(), 'Apple Pie')
+        items = [li.get_text() for li in self.soup.select('ul.ingredients li')]
+        self.assertEqual(items, ['2 apples', '1 cup sugar (fine)'])
+
+    def test_min_size_and_empty(self):
+        self.assertEqual(slim_html(PAGE, min_size=len(PAGE) + 1), PAGE)
+        self.assertEqual(slim_html(''), '')
+
+    def test_escaped_recipe_json_only_in_raw_html(self):
+        # данные Next.js (self.__next_f.push) - обычный скрипт: облегчение его удаляет,
+        # поэтому explorer делает пре-скрин по исходной разметке
+        page = PAGE.replace('"@type": "Recipe"', '"@type": "Thing"').replace(
+            '<script>window.dataLayer = [];</script>',
+            '<script>self.__next_f.push([1,"{\\"@type\\":\\"Recipe\\"}"])</script>')
+        prescreen = RecipePrescreen()
+        self.assertTrue(prescreen.check(page).has_signal)
+        self.assertFalse(prescreen.check(slim_html(page)).has_signal)
+
+    def test_idempotent(self):
+        self.assertEqual(slim_html(self.slim), self.slim)
+
+
+if __name__ == '__main__':
+    unittest.main()
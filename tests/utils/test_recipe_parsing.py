@@ -0,0 +1,148 @@
+import random
+import unittest
+
+from utils.recipe_parsing import (
+    format_minutes,
+    iso_duration_to_minutes,
+    normalize_unit,
+    quantity_to_float,
+    split_ingredient,
+    time_text_to_minutes,
+)
+
+# фиксированный seed - случайные примеры воспроизводимы между запусками
+SEED = 20240601
+EXAMPLES = 300
+
+
+class TestRecipeParsingExamples(unittest.TestCase):
+    def test_iso_duration(self):
+        self.assertEqual(iso_duration_to_minutes("PT20M"), 20)
+        self.assertEqual(iso_duration_to_minutes("PT1H30M"), 90)
+        self.assertEqual(iso_duration_to_minutes("P1DT2H"), 1560)
+        self.assertEqual(iso_duration_to_minutes("PT1.5H"), 90)
+        self.assertEqual(iso_duration_to_minutes("P0Y0M0DT0H35M0S"), 35)
+        self.assertEqual(iso_duration_to_minutes("P1W"), 10080)
+        self.assertEqual(iso_duration_to_minutes("P0Y0M1DT0H0M0.000S"), 1440)
+        self.assertIsNone(iso_duration_to_minutes("PT0M"))
+        self.assertIsNone(iso_duration_to_minutes("20 minutes"))
+        self.assertIsNone(iso_duration_to_minutes(None))
+
+    def test_time_text(self):
+        self.assertEqual(time_text_to_minutes("1 hr 30 mins"), 90)
+        self.assertEqual(time_text_to_minutes("1h30"), 90)
+        self.assertEqual(time_text_to_minutes("1½ hours"), 90)
+        self.assertEqual(time_text_to_minutes("45 Minuten"), 45)
+        self.assertEqual(time_text_to_minutes("1 час 20 мин"), 80)
+        self.assertEqual(time_text_to_minutes("PT15M"), 15)
+        self.assertEqual(time_text_to_minutes("25"), 25)
+        self.assertIsNone(time_text_to_minutes("overnight"))
+
+    def test_time_range_is_mean(self):
+        # та же политика диапазонов, что у quantity_to_float
+        self.assertEqual(time_text_to_minutes("10-20 min"), 15)
+        self.assertEqual(time_text_to_minutes("1 to 2 hours"), 90)
+        self.assertEqual(time_text_to_minutes("1-2 hours 30 min"), 120)
+        self.assertEqual(time_text_to_minutes("30 - 40"), 35)
+        self.assertEqual(time_text_to_minutes("10-20 min"), quantity_to_float("10-20"))
+
+    def test_format_minutes(self):
+        self.assertEqual(format_minutes(90, 'number'), "90")
+        self.assertEqual(format_minutes(90), "90 minutes")
+        self.assertEqual(format_minutes(90, 'human'), "1 hour 30 minutes")
+        self.assertEqual(format_minutes(120, 'human'), "2 hours")
+        self.assertIsNone(format_minutes(None))
+
+    def test_quantity(self):
+        self.assertEqual(quantity_to_float("1,5"), 1.5)
+        self.assertEqual(quantity_to_float("1 1/2"), 1.5)
+        self.assertEqual(quantity_to_float("1 1 / 2"), 1.5)
+        self.assertEqual(quantity_to_float("3 / 4"), 0.75)
+        self.assertEqual(quantity_to_float("1½"), 1.5)
+        self.assertEqual(quantity_to_float("2-3"), 2.5)
+        self.assertEqual(quantity_to_float("2 to 4"), 3.0)
+        self.assertIsNone(quantity_to_float("a few"))
+
+    def test_units(self):
+        self.assertEqual(normalize_unit("Tablespoons"), "tbsp")
+        self.assertEqual(normalize_unit("ст. л."), "tbsp")
+        self.assertEqual(normalize_unit("EL"), "tbsp")
+        self.assertEqual(normalize_unit("гр"), "g")
+        self.assertIsNone(normalize_unit("large"))
+
+    def test_split_ingredient(self):
+        self.assertEqual(split_ingredient("1 1/2 cups flour"), {"name": "flour", "amount": "1.5", "unit": "cups"})
+        self.assertEqual(split_ingredient("1 1 / 2 cups flour"), {"name": "flour", "amount": "1.5", "unit": "cups"})
+        self.assertEqual(split_ingredient("2-3 cloves garlic", canonical_units=True),
+                         {"name": "garlic", "amount": "2-3", "unit": "clove"})
+        self.assertEqual(split_ingredient("1 can of tomatoes"), {"name": "tomatoes", "amount": "1", "unit": "can"})
+        self.assertEqual(split_ingredient("1 large onion"), {"name": "large onion", "amount": "1", "unit": None})
+        self.assertEqual(split_ingredient("salt to taste"), {"name": "salt to taste", "amount": None, "unit": None})
+        self.assertIsNone(split_ingredient("   "))
+
+    def test_split_ingredient_returns_new_dict(self):
+        """результат кешируется, но изменение возвращенного dict не портит кеш"""
+        first = split_ingredient("200 g sugar")
+        first["name"] = "changed"
+        self.assertEqual(split_ingredient("200 g sugar")["name"], "sugar")
+
+
+class TestRecipeParsingProperties(unittest.TestCase):
+    """Свойства на случайно сгенерированных входных данных"""
+
+    def setUp(self):
+        self.rng = random.Random(SEED)
+
+    def test_iso_duration_roundtrip(self):
+        for _ in range(EXAMPLES):
+            days, hours, minutes = self.rng.randint(0, 2), self.rng.randint(0, 23), self.rng.randint(0, 59)
+            expected = days * 1440 + hours * 60 + minutes
+            duration = "P" + (f"{days}D" if days else "") + "T" + (f"{hours}H" if hours else "") + f"{minutes}M"
+            self.assertEqual(iso_duration_to_minutes(duration), expected or None, duration)
+            self.assertEqual(time_text_to_minutes(duration), expected or None, duration)
+
+    def test_human_format_roundtrip(self):
+        for _ in range(EXAMPLES):
+            minutes = self.rng.randint(1, 2000)
+            for style in ('number', 'minutes', 'human'):
+                text = format_minutes(minutes, style)
+                self.assertEqual(time_text_to_minutes(text), minutes, text)
+
+    def test_quantity_mixed_fraction(self):
+        for _ in range(EXAMPLES):
+            whole, denominator = self.rng.randint(0, 20), self.rng.randint(2, 16)
+            numerator = self.rng.randint(1, denominator - 1)
+            text = f"{whole} {numerator}/{denominator}" if whole else f"{numerator}/{denominator}"
+            self.assertAlmostEqual(quantity_to_float(text), whole + numerator / denominator, msg=text)
+
+    def test_quantity_range_is_mean(self):
+        for _ in range(EXAMPLES):
+            low = self.rng.randint(1, 50)
+            high = low + self.rng.randint(1, 50)
+            separator = self.rng.choice(['-', ' - ', '–', ' to '])
+            self.assertEqual(quantity_to_float(f"{low}{separator}{high}"), (low + high) / 2)
+
+    def test_split_ingredient_amount_unit_name(self):
+        units = ['g', 'kg', 'ml', 'cups', 'tbsp', 'tsp', 'oz', 'cloves']
+        names = ['flour', 'sugar', 'olive oil', 'garlic', 'chicken breast']
+        for _ in range(EXAMPLES):
+            amount = self.rng.randint(1, 1000)
+            unit = self.rng.choice(units)
+            name = self.rng.choice(names)
+            parsed = split_ingredient(f"{amount} {unit} {name}")
+            self.assertEqual(parsed, {"name": name, "amount": str(amount), "unit": unit})
+
+    def test_never_raises_on_noise(self):
+        alphabet = "0123456789 /-,.½¼¾⅓ abcghlmPTHMS" + "чмин"
+        for _ in range(EXAMPLES):
+            text = ''.join(self.rng.choice(alphabet) for _ in range(self.rng.randint(0, 20)))
+            iso_duration_to_minutes(text)
+            time_text_to_minutes(text)
+            quantity_to_float(text)
+            result = split_ingredient(text)
+            if result is not None:
+                self.assertTrue(result["name"])
+
+
+if __name__ == "__main__":
+    unittest.main()
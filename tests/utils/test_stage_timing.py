@@ -0,0 +1,52 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils import stage_timing
+from utils.stage_timing import StageHistogram, efficiency_report, site_timings
+
+
+class TestStageTiming(unittest.TestCase):
+
+    def setUp(self):
+        stage_timing.reset()
+        self.addCleanup(stage_timing.reset)
+
+    def test_histogram_percentiles(self):
+        histogram = StageHistogram()
+        for seconds in [0.2] * 9 + [12.0]:
+            histogram.observe(seconds)
+        self.assertEqual(histogram.count, 10)
+        self.assertAlmostEqual(histogram.total, 13.8)
+        self.assertEqual(histogram.percentile(0.5), 0.25)
+        self.assertEqual(histogram.percentile(0.95), 30.0)
+        self.assertEqual(histogram.max, 12.0)
+
+    def test_report_ranks_by_cost_per_new_recipe(self):
+        cheap = site_timings('cheap')
+        cheap.add('navigation', 10)
+        cheap.count('new_recipes', 10)
+        costly = site_timings('costly')
+        costly.add('navigation', 10)
+        costly.add('sleep', 50)
+        costly.count('new_recipes', 2)
+        empty = site_timings('empty')
+        with empty.time('scroll'):
+            pass
+        self.assertIs(site_timings('cheap'), cheap)
+        self.assertIsNone(empty.cost_per_recipe)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'timing.json'
+            lines = efficiency_report(str(path))
+            report = json.loads(path.read_text(encoding='utf-8'))
+
+        self.assertEqual([line.split(':')[0] for line in lines[:3]], ['empty', 'costly', 'cheap'])
+        self.assertIn('узкое место: sleep', lines[1])
+        self.assertTrue(lines[-1].startswith('Этапы всего: sleep'))
+        self.assertEqual(report['costly']['cost_per_recipe'], 30.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
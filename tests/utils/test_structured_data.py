@@ -0,0 +1,91 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from utils.structured_data import (
+    find_json_ld_node,
+    is_type,
+    loads_json,
+    parse_json_ld,
+    parse_microdata_item,
+    parse_rdfa_item,
+)
+
+JSON_LD_GRAPH = '''
+<script type="application/ld+json">{"@context": "https://schema.org", "@type": "WebSite", "name": "site"}</script>
+<script type="application/ld+json">
+{"@context": "https://schema.org", "@graph": [
+    {"@type": "ImageObject", "@id": "#image", "url": "https://example.com/pie.jpg"},
+    {"@type": ["Recipe", "NewsArticle"], "name": "Pie", "image": {"@id": "#image"},
+     "recipeIngredient": ["1 cup flour"]}
+]}
+</script>
+<script type="application/ld+json">{broken json</script>
+'''
+
+MICRODATA = '''
+<div itemscope itemtype="https://schema.org/Recipe">
+    <h1 itemprop="name">Soup</h1>
+    <meta itemprop="totalTime" content="PT30M">
+    <ul><li itemprop="recipeIngredient">1 l water</li></ul>
+    <div itemprop="nutrition" itemscope itemtype="https://schema.org/NutritionInformation">
+        <span itemprop="calories">120 kcal</span>
+    </div>
+    <img itemprop="image" src="https://example.com/soup.jpg">
+</div>
+'''
+
+RDFA = '''
+<div vocab="https://schema.org/" typeof="Recipe">
+    <span property="name">Salad</span>
+    <span property="recipeIngredient">tomato</span>
+    <span property="recipeIngredient">cucumber</span>
+</div>
+'''
+
+
+class TestStructuredData(unittest.TestCase):
+    def test_loads_json_control_characters(self):
+        self.assertEqual(loads_json('{"name": "line\tbreak"}'), {"name": "line\tbreak"})
+
+    def test_is_type_variants(self):
+        self.assertTrue(is_type({"@type": "Recipe"}))
+        self.assertTrue(is_type({"@type": ["NewsArticle", "Recipe"]}))
+        self.assertTrue(is_type({"@type": "http://schema.org/Recipe"}))
+        self.assertFalse(is_type({"@type": "RecipeCollection"}))
+        self.assertFalse(is_type(["Recipe"]))
+
+    def test_json_ld_recipe_in_graph_with_refs(self):
+        soup = BeautifulSoup(JSON_LD_GRAPH, 'lxml')
+        documents = parse_json_ld(soup)
+        self.assertEqual(len(documents), 2)
+
+        recipe = find_json_ld_node(documents)
+        self.assertEqual(recipe["name"], "Pie")
+        self.assertEqual(recipe["image"]["url"], "https://example.com/pie.jpg")
+        # исходный документ не изменяется при нормализации
+        self.assertEqual(documents[1]["@graph"][1]["image"], {"@id": "#image"})
+
+    def test_microdata_recipe(self):
+        recipe = parse_microdata_item(BeautifulSoup(MICRODATA, 'lxml'))
+        self.assertEqual(recipe["@type"], "Recipe")
+        self.assertEqual(recipe["name"], "Soup")
+        self.assertEqual(recipe["totalTime"], "PT30M")
+        self.assertEqual(recipe["recipeIngredient"], ["1 l water"])
+        self.assertEqual(recipe["nutrition"], {"@type": "NutritionInformation", "calories": "120 kcal"})
+        self.assertEqual(recipe["image"], "https://example.com/soup.jpg")
+
+    def test_rdfa_recipe(self):
+        recipe = parse_rdfa_item(BeautifulSoup(RDFA, 'lxml'))
+        self.assertEqual(recipe["name"], "Salad")
+        self.assertEqual(recipe["recipeIngredient"], ["tomato", "cucumber"])
+
+    def test_no_recipe(self):
+        soup = BeautifulSoup("<html><body><p>nothing</p></body></html>", 'lxml')
+        self.assertIsNone(find_json_ld_node(parse_json_ld(soup)))
+        self.assertIsNone(parse_microdata_item(soup))
+        self.assertIsNone(parse_rdfa_item(soup))
+
+
+if __name__ == "__main__":
+    unittest.main()
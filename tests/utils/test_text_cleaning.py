@@ -0,0 +1,82 @@
+import html
+import random
+import re
+import sys
+import unittest
+
+from utils.text_cleaning import clean_text, clean_texts
+
+# фиксированный seed - случайные примеры воспроизводимы между запусками
+SEED = 20240601
+EXAMPLES = 500
+
+# типичные строки со страниц рецептов и ожидаемый результат (прежняя реализация BaseRecipeExtractor.clean_text)
+GOLDEN = [
+    ('▢ 2 cups all-purpose flour', '2 cups all-purpose flour'),
+    ('Grandma&#039;s   Apple\n\tPie', "Grandma's Apple Pie"),
+    ('Salt &amp; pepper to taste', 'Salt & pepper to taste'),
+    ('  ✓ Preheat the oven to 180&nbsp;°C.  ', 'Preheat the oven to 180 °C.'),
+    ('&lt;b&gt;bold&lt;/b&gt;', '<b>bold</b>'),
+    ('● ■ □', ''),
+    ('AT&T fish &chips', 'AT&T fish &chips'),
+    ('&#9632; marker from entity', 'marker from entity'),
+    ('½ ст. л. сахара', '½ ст. л. сахара'),
+]
+ALPHABET = ['a', 'Б', ' ', '\n', '\t', ' ', ' ', '　', '\x1c', '\x00', '&', 'amp;', '&#39;',
+            '&lt', '#', ';', '▢', '✓', '■', '½', '°']
+
+
+def legacy_clean_text(text):
+    if not text:
+        return text
+    text = html.unescape(text)
+    text = re.sub(r'[▢□✓✔▪▫●○■]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+class TestCleanText(unittest.TestCase):
+    def test_golden(self):
+        for raw, expected in GOLDEN:
+            with self.subTest(raw=raw):
+                self.assertEqual(clean_text(raw), expected)
+
+    def test_empty_values_pass_through(self):
+        self.assertIsNone(clean_text(None))
+        self.assertEqual(clean_text(''), '')
+
+    def test_whitespace_matches_regex(self):
+        # str.split и \s в re считают пробелами одни и те же символы
+        spaces = ''.join(chr(code) for code in range(sys.maxunicode + 1) if re.match(r'\s', chr(code)))
+        text = f'{spaces}a{spaces}b{spaces}'
+        self.assertEqual(clean_text(text), legacy_clean_text(text))
+
+    def test_random_matches_legacy(self):
+        rng = random.Random(SEED)
+        for _ in range(EXAMPLES):
+            text = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 12)))
+            with self.subTest(text=text):
+                self.assertEqual(clean_text(text), legacy_clean_text(text))
+
+
+class TestCleanTexts(unittest.TestCase):
+    def test_batch_matches_single(self):
+        rng = random.Random(SEED)
+        for _ in range(EXAMPLES // 10):
+            texts = [''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 8))) for _ in range(rng.randint(0, 6))]
+            with self.subTest(texts=texts):
+                self.assertEqual(clean_texts(texts, drop_empty=False), [clean_text(text) for text in texts])
+                self.assertEqual(clean_texts(texts), [clean_text(text) for text in texts if clean_text(text)])
+
+    def test_entities_do_not_cross_items(self):
+        self.assertEqual(clean_texts(['fish &', '#38; chips', 'salt &amp', 'pepper']),
+                         ['fish &', '#38; chips', 'salt &', 'pepper'])
+
+    def test_none_and_empty(self):
+        self.assertEqual(clean_texts([]), [])
+        self.assertEqual(clean_texts([None, ' ▢ ', 'egg']), ['egg'])
+        self.assertEqual(clean_texts([None, 'egg'], drop_empty=False), ['', 'egg'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+"""
+Асинхронное логирование потоков парсера
+
+Потоки run_parallel (и prepare_site) пишут в логгер только QueueHandler: запись кладется в общую очередь,
+а в файл и консоль ее пишет один поток QueueListener. Поток обхода не ждет диск и не конкурирует с другими
+потоками за блокировки handlers. Handlers каждого логгера подключаются и закрываются управляющими записями
+через ту же очередь, поэтому записи не теряются и не попадают в чужой файл, даже если следующий квант
+сайта открывает тот же файл до того, как писатель дописал предыдущий.
+
+Отладочные сообщения (по URL) ограничиваются по месту вызова: не больше PARSER_LOG_DEBUG_PER_SECOND
+в секунду, число пропущенных добавляется к следующему сообщению. page_record() пишет одну компактную
+строку на страницу вместо нескольких.
+"""
+
+import time
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Iterable, Optional
+
+from config.config import config
+
+# атрибут управляющей записи: список handlers логгера (подключение) или None (закрытие)
+ROUTE_ATTR = 'route_handlers'
+# атрибут отметки в очереди: событие, которое писатель выставляет, дойдя до нее
+FLUSH_ATTR = 'flush_event'
+
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_listener: Optional[QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+class LogRouter(logging.Handler):
+    """Handler потока-писателя: передает запись handlers логгера, от которого она пришла"""
+
+    def __init__(self):
+        super().__init__()
+        self.routes: dict[str, list[logging.Handler]] = {}
+
+    def _close_route(self, name: str):
+        for handler in self.routes.pop(name, []):
+            handler.close()
+
+    def emit(self, record: logging.LogRecord):
+        if hasattr(record, FLUSH_ATTR):
+            getattr(record, FLUSH_ATTR).set()
+            return
+        if hasattr(record, ROUTE_ATTR):
+            # управляющая запись: меняется только в потоке-писателе, блокировки не нужны
+            self._close_route(record.name)
+            handlers = getattr(record, ROUTE_ATTR)
+            if handlers:
+                self.routes[record.name] = handlers
+            return
+        for handler in self.routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def close(self):
+        for name in list(self.routes):
+            self._close_route(name)
+        super().close()
+
+
+class DebugRateLimit(logging.Filter):
+    """Не больше max_per_second отладочных записей в секунду с одного места вызова"""
+
+    def __init__(self, max_per_second: float):
+        super().__init__()
+        self.max_per_second = max_per_second
+        # (файл, строка) -> [начало окна, записей в окне, пропущено]
+        self.windows: dict[tuple[str, int], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.max_per_second <= 0:
+            return True
+        now = time.monotonic()
+        window = self.windows.setdefault((record.pathname, record.lineno), [now, 0, 0])
+        if now - window[0] >= 1.0:
+            window[0], window[1] = now, 0
+        if window[1] >= self.max_per_second:
+            window[2] += 1
+            return False
+        window[1] += 1
+        if window[2]:
+            record.msg = f"{record.msg} (пропущено похожих: {window[2]})"
+            window[2] = 0
+        return True
+
+
+def _control_record(name: str, handlers: Optional[list[logging.Handler]]) -> logging.LogRecord:
+    record = logging.LogRecord(name, logging.CRITICAL, __file__, 0, '', None, None)
+    setattr(record, ROUTE_ATTR, handlers)
+    return record
+
+
+def start_listener() -> QueueListener:
+    """Запуск потока-писателя (один на процесс)"""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = QueueListener(_queue, LogRouter())
+            _listener.start()
+            atexit.register(stop_listener)
+        return _listener
+
+
+def stop_listener():
+    """Дописать очередь и остановить поток-писатель"""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def attach_handlers(logger: logging.Logger, handlers: Iterable[logging.Handler],
+                    use_queue: Optional[bool] = None, debug_per_second: Optional[float] = None) -> logging.Logger:
+    """
+    Подключить handlers к логгеру потока
+
+    Args:
+        logger: логгер потока (propagate=False)
+        handlers: handlers логгера (файл, консоль)
+        use_queue: писать через очередь (по умолчанию PARSER_ASYNC_LOGGING), иначе handlers подключаются напрямую
+        debug_per_second: лимит отладочных записей с одного места вызова (по умолчанию PARSER_LOG_DEBUG_PER_SECOND)
+    """
+    handlers = list(handlers)
+    use_queue = use_queue if use_queue is not None else config.PARSER_ASYNC_LOGGING
+    debug_per_second = debug_per_second if debug_per_second is not None else config.PARSER_LOG_DEBUG_PER_SECOND
+    for existing in logger.filters[:]:
+        if isinstance(existing, DebugRateLimit):
+            logger.removeFilter(existing)
+    logger.addFilter(DebugRateLimit(debug_per_second))
+    if not use_queue:
+        for handler in handlers:
+            logger.addHandler(handler)
+        return logger
+
+    start_listener()
+    _queue.put_nowait(_control_record(logger.name, handlers))
+    logger.addHandler(QueueHandler(_queue))
+    return logger
+
+
+def release_handlers(logger: logging.Logger):
+    """Отключить handlers логгера потока (файл закроется после записи уже поставленных в очередь записей)"""
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        if isinstance(handler, QueueHandler):
+            handler.queue.put_nowait(_control_record(logger.name, None))
+        else:
+            handler.close()
+    for existing in logger.filters[:]:
+        if isinstance(existing, DebugRateLimit):
+            logger.removeFilter(existing)
+
+
+def flush(timeout: float = 10) -> bool:
+    """Дождаться записи всего, что уже в очереди (завершение запуска, тесты)"""
+    if _listener is None:
+        return True
+    done = threading.Event()
+    record = logging.LogRecord('', logging.CRITICAL, __file__, 0, '', None, None)
+    setattr(record, FLUSH_ATTR, done)
+    _queue.put_nowait(record)
+    return done.wait(timeout)
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    text = str(value)
+    return f'"{text}"' if not text or any(char.isspace() for char in text) else text
+
+
+def page_record(logger: logging.Logger, **fields: Any):
+    """
+    Компактная запись о странице: "PAGE key=value ..." (поля с None пропускаются)
+
+    Поля также доступны handlers как record.page.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    fields = {key: value for key, value in fields.items() if value is not None}
+    logger.info("PAGE %s", ' '.join(f"{key}={_format_value(value)}" for key, value in fields.items()),
+                extra={'page': fields})
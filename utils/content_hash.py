@@ -0,0 +1,72 @@
+"""
+Хеши содержимого страниц для обнаружения изменений при повторном обходе
+
+html_hash - sha256 сохраненного HTML: совпал - страница не изменилась, извлечение и запись в БД не нужны.
+content_hash - sha256 канонического JSON полей рецепта и изображений: HTML мог измениться (реклама, счетчики,
+nonce), а извлеченный рецепт нет - тогда обновляется только html_hash, остальные колонки (и зависящие от них
+перевод и векторизация) не трогаются.
+"""
+
+import json
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
+
+# поля, от которых зависят перевод, векторизация и объединение рецептов
+CONTENT_FIELDS = (
+    'dish_name', 'description', 'ingredients', 'instructions', 'category',
+    'prep_time', 'cook_time', 'total_time', 'notes', 'tags', 'image_urls',
+)
+
+
+def html_hash(html: bytes) -> str:
+    """Хеш HTML страницы (байты файла)"""
+    return hashlib.sha256(html).hexdigest()
+
+
+def file_hash(path: str) -> str:
+    """Хеш HTML файла"""
+    with open(path, 'rb') as f:
+        return html_hash(f.read())
+
+
+def content_hash(data: Any) -> str:
+    """
+    Хеш извлеченного рецепта
+
+    Args:
+        data: dict результата экстрактора или объект с атрибутами CONTENT_FIELDS (Page)
+    """
+    if isinstance(data, Mapping):
+        fields = {field: data.get(field) for field in CONTENT_FIELDS}
+    else:
+        fields = {field: getattr(data, field, None) for field in CONTENT_FIELDS}
+    canonical = json.dumps(fields, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class ChangeStats:
+    """Счетчики изменений страниц сайта за проход"""
+    new: int = 0  # страницы, которых не было в БД
+    unchanged_html: int = 0  # HTML не изменился: извлечение пропущено
+    unchanged_content: int = 0  # HTML изменился, рецепт нет: обновлен только html_hash
+    changed: int = 0  # рецепт изменился: полная запись
+
+    @property
+    def recrawled(self) -> int:
+        return self.unchanged_html + self.unchanged_content + self.changed
+
+    @property
+    def change_ratio(self) -> Optional[float]:
+        """Доля измененных среди повторно обойденных страниц (None, если таких не было)"""
+        if not self.recrawled:
+            return None
+        return self.changed / self.recrawled
+
+    def summary(self) -> str:
+        ratio = self.change_ratio
+        ratio_text = f"{ratio:.1%}" if ratio is not None else "нет повторных страниц"
+        return (f"новых {self.new}, без изменений HTML {self.unchanged_html}, "
+                f"без изменений рецепта {self.unchanged_content}, изменено {self.changed}, "
+                f"доля изменений {ratio_text}")
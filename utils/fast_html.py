@@ -0,0 +1,777 @@
+"""
+Быстрый бэкенд HTML для экстракторов на lxml.html с BeautifulSoup-совместимым подмножеством API
+
+Построение дерева BeautifulSoup в разы дороже самого разбора lxml и занимает больше памяти.
+Здесь обертки создаются только для узлов, к которым обращается экстрактор.
+
+Поддерживается то, что используют экстракторы: find/find_all (name, class_, id, attrs, string,
+recursive, limit), select/select_one (теги, #id, .class, [attr], [attr=value], ^= $= *=, потомок и >),
+find_parent(s), find_next/find_previous, find_next_sibling(s)/find_previous_sibling(s),
+get_text/text/string/strings/stripped_strings, parent/children/contents/descendants,
+next_sibling/previous_sibling, атрибуты (get, [], attrs, has_attr), decompose/extract.
+Совместимость экстрактора проверяется scripts/check_html_backend.py перед включением.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Iterator, Optional, Union
+
+import lxml.html
+from lxml import etree
+
+BS4_BACKEND = 'bs4'
+LXML_BACKEND = 'lxml'
+HTML_BACKENDS = (BS4_BACKEND, LXML_BACKEND)
+
+# атрибуты, значения которых BeautifulSoup разбивает на списки
+_MULTI_VALUED_ATTRIBUTES = {
+    '*': {'class', 'accesskey', 'dropzone'},
+    'a': {'rel', 'rev'},
+    'link': {'rel', 'rev'},
+    'td': {'headers'},
+    'th': {'headers'},
+    'form': {'accept-charset'},
+    'object': {'archive'},
+    'area': {'rel'},
+    'icon': {'sizes'},
+    'iframe': {'sandbox'},
+    'output': {'for'},
+}
+# строки внутри этих тегов не входят в get_text() родителя (как в BeautifulSoup)
+_NON_TEXT_TAGS = {'script', 'style', 'template'}
+# внутри этих тегов пробельные строки сохраняются как есть
+_PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+_ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+_NON_WHITESPACE_RE = re.compile(r'\S+')
+
+Filter = Union[None, bool, str, re.Pattern, Callable, list, tuple, set]
+
+
+def parse_html(markup: str, backend: str = BS4_BACKEND):
+    """
+    Разбор HTML выбранным бэкендом
+
+    Args:
+        markup: HTML строка
+        backend: "bs4" - BeautifulSoup(markup, 'lxml'), "lxml" - LxmlDocument
+    """
+    if backend == LXML_BACKEND:
+        return LxmlDocument(markup)
+    if backend != BS4_BACKEND:
+        raise ValueError(f"Неизвестный HTML бэкенд: {backend}")
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(markup, 'lxml')
+
+
+def _is_element(node) -> bool:
+    """Элемент, а не комментарий/инструкция обработки"""
+    return isinstance(node.tag, str)
+
+
+def _collapse_whitespace(value: str, element) -> str:
+    """
+    Пробельная строка сворачивается в "\\n" или " ", как при построении дерева BeautifulSoup
+    (element - элемент, внутри которого находится строка)
+    """
+    if value.strip(_ASCII_SPACES) or element is None:
+        return value
+    if element.tag in _PRESERVE_WHITESPACE_TAGS or any(
+            ancestor.tag in _PRESERVE_WHITESPACE_TAGS for ancestor in element.iterancestors()):
+        return value
+    return '\n' if '\n' in value else ' '
+
+
+def _match(value: Any, rule: Filter) -> bool:
+    """Сравнение значения (строка, список значений или None) с фильтром по правилам BeautifulSoup"""
+    if rule is True:
+        return value is not None
+    if rule is False or rule is None:
+        return value is None
+    if isinstance(value, list):
+        return any(_match(item, rule) for item in value) or _match(' '.join(value), rule)
+    if isinstance(rule, re.Pattern):
+        return value is not None and rule.search(value) is not None
+    if callable(rule):
+        return bool(rule(value))
+    if isinstance(rule, (list, tuple, set)):
+        return any(_match(value, item) for item in rule)
+    return value is not None and value == str(rule)
+
+
+class LxmlString(str):
+    """Текстовый узел (аналог NavigableString): строка с ссылкой на родительский тег"""
+
+    name = None
+
+    def __new__(cls, value: str, parent: 'LxmlNode'):
+        node = super().__new__(cls, _collapse_whitespace(value, getattr(parent, '_el', None)))
+        node.parent = parent
+        return node
+
+    @property
+    def string(self) -> 'LxmlString':
+        return self
+
+    @property
+    def text(self) -> str:
+        return str(self)
+
+    def get_text(self, separator: str = '', strip: bool = False) -> str:
+        return self.strip() if strip else str(self)
+
+    def find_parents(self, name: Filter = None, attrs: Optional[dict] = None, limit: Optional[int] = None,
+                     **kwargs) -> list['LxmlNode']:
+        if self.parent is None:
+            return []
+        parents = [self.parent] if self.parent._matches(name, attrs, None, kwargs) else []
+        if isinstance(self.parent, LxmlTag):
+            parents += self.parent.find_parents(name, attrs, **kwargs)
+        return parents[:limit] if limit else parents
+
+    def find_parent(self, name: Filter = None, attrs: Optional[dict] = None, **kwargs) -> Optional['LxmlNode']:
+        results = self.find_parents(name, attrs, 1, **kwargs)
+        return results[0] if results else None
+
+
+class LxmlNode(ABC):
+    """Общая часть документа и тега: поиск по потомкам и извлечение текста"""
+
+    __slots__ = ()
+
+    def _wrap(self, element) -> 'LxmlTag':
+        return LxmlTag(element, self._document)
+
+    @abstractmethod
+    def _child_elements(self) -> Iterator:
+        """Дочерние элементы lxml"""
+        pass
+
+    @abstractmethod
+    def _iter_descendant_elements(self, tag: Optional[str] = None) -> Iterator:
+        """Элементы-потомки lxml в порядке документа (только с именем tag, если задано)"""
+        pass
+
+    @abstractmethod
+    def _iter_nodes(self) -> Iterator[Union['LxmlTag', LxmlString]]:
+        """Потомки в порядке документа: теги и текстовые узлы (комментарии только как строки)"""
+        pass
+
+    # --- поиск ---
+
+    def find_all(self, name: Filter = None, attrs: Optional[dict] = None, recursive: bool = True,
+                 string: Filter = None, limit: Optional[int] = None, text: Filter = None, **kwargs) -> list:
+        if string is None:
+            string = text
+        results = []
+        if string is not None and name is None and not attrs and not kwargs:
+            candidates = (node for node in self._iter_nodes() if isinstance(node, LxmlString))
+            for node in candidates:
+                if _match(str(node), string):
+                    results.append(node)
+                    if limit and len(results) >= limit:
+                        break
+            return results
+
+        if recursive:
+            tag = name if isinstance(name, str) else None
+            elements = self._iter_descendant_elements(tag)
+        else:
+            elements = self._child_elements()
+        for element in elements:
+            candidate = self._wrap(element)
+            if candidate._matches(name, attrs, string, kwargs):
+                results.append(candidate)
+                if limit and len(results) >= limit:
+                    break
+        return results
+
+    findAll = find_all
+
+    def find(self, name: Filter = None, attrs: Optional[dict] = None, recursive: bool = True,
+             string: Filter = None, text: Filter = None, **kwargs):
+        results = self.find_all(name, attrs, recursive, string, 1, text, **kwargs)
+        return results[0] if results else None
+
+    def select(self, selector: str, limit: Optional[int] = None) -> list['LxmlTag']:
+        groups = _parse_selector(selector)
+        results = []
+        for element in self._iter_descendant_elements():
+            tag = self._wrap(element)
+            if any(_matches_selector(tag, group) for group in groups):
+                results.append(tag)
+                if limit and len(results) >= limit:
+                    break
+        return results
+
+    def select_one(self, selector: str) -> Optional['LxmlTag']:
+        results = self.select(selector, limit=1)
+        return results[0] if results else None
+
+    def xpath(self, path: Union[str, etree.XPath]) -> list[Union['LxmlTag', str]]:
+        """XPath (строка или скомпилированный etree.XPath): элементы оборачиваются в LxmlTag, значения - str"""
+        results = path(self._el) if isinstance(path, etree.XPath) else self._el.xpath(path)
+        if not isinstance(results, list):
+            return [str(results)]
+        return [self._wrap(item) if isinstance(item, etree._Element) else str(item) for item in results
+                if not isinstance(item, etree._Element) or _is_element(item)]
+
+    # --- текст ---
+
+    def _all_strings(self, strip: bool = False) -> Iterator[str]:
+        for node in self._iter_text():
+            if strip:
+                node = node.strip()
+                if not node:
+                    continue
+            yield node
+
+    @abstractmethod
+    def _iter_text(self) -> Iterator[str]:
+        """Строки для get_text() в порядке документа"""
+        pass
+
+    def get_text(self, separator: str = '', strip: bool = False) -> str:
+        return separator.join(self._all_strings(strip))
+
+    getText = get_text
+
+    @property
+    def text(self) -> str:
+        return self.get_text()
+
+    @property
+    def strings(self) -> Iterator[str]:
+        return self._all_strings()
+
+    @property
+    def stripped_strings(self) -> Iterator[str]:
+        return self._all_strings(strip=True)
+
+    @property
+    def descendants(self) -> Iterator[Union['LxmlTag', LxmlString]]:
+        return self._iter_nodes()
+
+    @property
+    def children(self) -> Iterator[Union['LxmlTag', LxmlString]]:
+        return iter(self.contents)
+
+    def __iter__(self):
+        return iter(self.contents)
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __getattr__(self, name: str):
+        # soup.title, tag.div - первый потомок с таким именем
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self.find(name)
+
+
+def _iter_element_text(element, inside_non_text: bool = False) -> Iterator[str]:
+    """Текст элемента и потомков для get_text (без комментариев и содержимого script/style/template)"""
+    if element.text and not inside_non_text:
+        yield _collapse_whitespace(element.text, element)
+    for child in element:
+        if _is_element(child):
+            yield from _iter_element_text(child, inside_non_text or child.tag in _NON_TEXT_TAGS)
+        if child.tail and not inside_non_text:
+            yield _collapse_whitespace(child.tail, element)
+
+
+class LxmlTag(LxmlNode):
+    """Обертка над элементом lxml с API тега BeautifulSoup"""
+
+    __slots__ = ('_el', '_document', '_attrs')
+
+    def __init__(self, element, document: 'LxmlDocument'):
+        self._el = element
+        self._document = document
+        self._attrs = None
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, LxmlTag) and other._el is self._el
+
+    def __hash__(self) -> int:
+        return id(self._el)
+
+    def __repr__(self) -> str:
+        return self.decode()
+
+    __str__ = __repr__
+
+    def decode(self) -> str:
+        return lxml.html.tostring(self._el, encoding='unicode', with_tail=False)
+
+    def __copy__(self) -> 'LxmlTag':
+        return LxmlTag(lxml.html.fromstring(self.decode()), self._document)
+
+    copy = __copy__
+
+    # --- имя и атрибуты ---
+
+    @property
+    def name(self) -> str:
+        return self._el.tag
+
+    @property
+    def attrs(self) -> dict:
+        if self._attrs is None:
+            tag_name = self._el.tag
+            multi_valued = _MULTI_VALUED_ATTRIBUTES['*'] | _MULTI_VALUED_ATTRIBUTES.get(tag_name, set())
+            self._attrs = {
+                key: (_NON_WHITESPACE_RE.findall(value) if key in multi_valued else value)
+                for key, value in self._el.attrib.items()
+            }
+        return self._attrs
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.attrs.get(key, default)
+
+    def get_attribute_list(self, key: str, default: Any = None) -> list:
+        value = self.get(key, default)
+        return value if isinstance(value, list) else [value]
+
+    def has_attr(self, key: str) -> bool:
+        return key in self._el.attrib
+
+    def __getitem__(self, key: str) -> Any:
+        return self.attrs[key]
+
+    def __contains__(self, item) -> bool:
+        return item in self.contents
+
+    def _matches(self, name: Filter, attrs: Optional[dict], string: Filter, kwargs: dict) -> bool:
+        """Проверка тега по фильтрам find/find_all"""
+        if name is not None and name is not True:
+            if isinstance(name, str):
+                if self._el.tag != name:
+                    return False
+            elif isinstance(name, re.Pattern):
+                if not name.search(self._el.tag):
+                    return False
+            elif callable(name):
+                if not name(self):
+                    return False
+            elif isinstance(name, (list, tuple, set)):
+                if self._el.tag not in name:
+                    return False
+        conditions = dict(attrs or {}) if isinstance(attrs, dict) else ({'class': attrs} if attrs else {})
+        conditions.update(kwargs)
+        if conditions:
+            own = self.attrs
+            for key, rule in conditions.items():
+                if not _match(own.get('class' if key == 'class_' else key), rule):
+                    return False
+        if string is not None:
+            value = self.string
+            if not _match(str(value) if value is not None else None, string):
+                return False
+        return True
+
+    # --- навигация ---
+
+    @property
+    def parent(self) -> Optional[LxmlNode]:
+        parent = self._el.getparent()
+        if parent is None:
+            return self._document if self._el is self._document._el else None
+        return self._wrap(parent)
+
+    @property
+    def contents(self) -> list[Union['LxmlTag', LxmlString]]:
+        contents = []
+        if self._el.text:
+            contents.append(LxmlString(self._el.text, self))
+        for child in self._el:
+            if _is_element(child):
+                contents.append(self._wrap(child))
+            elif child.text is not None and isinstance(child, etree._Comment):
+                contents.append(LxmlString(child.text, self))
+            if child.tail:
+                contents.append(LxmlString(child.tail, self))
+        return contents
+
+    @property
+    def string(self) -> Optional[LxmlString]:
+        contents = self.contents
+        if len(contents) != 1:
+            return None
+        child = contents[0]
+        return child if isinstance(child, LxmlString) else child.string
+
+    def _child_elements(self) -> Iterator:
+        return (child for child in self._el if _is_element(child))
+
+    def _iter_descendant_elements(self, tag: Optional[str] = None) -> Iterator:
+        if tag is not None:
+            return self._el.iterdescendants(tag)
+        return (element for element in self._el.iterdescendants() if _is_element(element))
+
+    def _iter_nodes(self) -> Iterator[Union['LxmlTag', LxmlString]]:
+        element = self._el
+        if element.text:
+            yield LxmlString(element.text, self)
+        for child in element:
+            if _is_element(child):
+                tag = self._wrap(child)
+                yield tag
+                yield from tag._iter_nodes()
+            elif isinstance(child, etree._Comment) and child.text:
+                yield LxmlString(child.text, self)
+            if child.tail:
+                yield LxmlString(child.tail, self)
+
+    def _iter_text(self) -> Iterator[str]:
+        return _iter_element_text(self._el)
+
+    def _parents(self) -> Iterator[LxmlNode]:
+        yield from (self._wrap(ancestor) for ancestor in self._el.iterancestors())
+        yield self._document
+
+    def find_parent(self, name: Filter = None, attrs: Optional[dict] = None, **kwargs) -> Optional[LxmlNode]:
+        results = self.find_parents(name, attrs, 1, **kwargs)
+        return results[0] if results else None
+
+    def find_parents(self, name: Filter = None, attrs: Optional[dict] = None, limit: Optional[int] = None,
+                     **kwargs) -> list[LxmlNode]:
+        return self._filter(self._parents(), name, attrs, None, limit, kwargs)
+
+    def _sibling_nodes(self, following: bool) -> Iterator[Union['LxmlTag', LxmlString]]:
+        element = self._el
+        parent = element.getparent()
+        parent_tag = self._wrap(parent) if parent is not None else None
+        if following:
+            if element.tail:
+                yield LxmlString(element.tail, parent_tag)
+            for sibling in element.itersiblings():
+                if _is_element(sibling):
+                    yield self._wrap(sibling)
+                if sibling.tail:
+                    yield LxmlString(sibling.tail, parent_tag)
+        else:
+            for sibling in element.itersiblings(preceding=True):
+                if sibling.tail:
+                    yield LxmlString(sibling.tail, parent_tag)
+                if _is_element(sibling):
+                    yield self._wrap(sibling)
+            if parent is not None and parent.text:
+                yield LxmlString(parent.text, parent_tag)
+
+    @property
+    def next_sibling(self) -> Optional[Union['LxmlTag', LxmlString]]:
+        return next(self._sibling_nodes(following=True), None)
+
+    @property
+    def previous_sibling(self) -> Optional[Union['LxmlTag', LxmlString]]:
+        return next(self._sibling_nodes(following=False), None)
+
+    @property
+    def next_siblings(self) -> Iterator[Union['LxmlTag', LxmlString]]:
+        return self._sibling_nodes(following=True)
+
+    @property
+    def previous_siblings(self) -> Iterator[Union['LxmlTag', LxmlString]]:
+        return self._sibling_nodes(following=False)
+
+    def _filter(self, nodes: Iterator, name: Filter, attrs: Optional[dict], string: Filter,
+                limit: Optional[int], kwargs: dict) -> list:
+        """Фильтр последовательности узлов по правилам find_all"""
+        if string is None:
+            string = kwargs.pop('text', None)
+        only_strings = string is not None and name is None and not attrs and not kwargs
+        results = []
+        for node in nodes:
+            if only_strings:
+                if not isinstance(node, LxmlString) or not _match(str(node), string):
+                    continue
+            elif isinstance(node, LxmlString) or not node._matches(name, attrs, string, kwargs):
+                continue
+            results.append(node)
+            if limit and len(results) >= limit:
+                break
+        return results
+
+    def find_next_siblings(self, name: Filter = None, attrs: Optional[dict] = None, string: Filter = None,
+                           limit: Optional[int] = None, **kwargs) -> list:
+        return self._filter(self._sibling_nodes(True), name, attrs, string, limit, kwargs)
+
+    def find_next_sibling(self, name: Filter = None, attrs: Optional[dict] = None, string: Filter = None,
+                          **kwargs):
+        results = self.find_next_siblings(name, attrs, string, 1, **kwargs)
+        return results[0] if results else None
+
+    def find_previous_siblings(self, name: Filter = None, attrs: Optional[dict] = None, string: Filter = None,
+                               limit: Optional[int] = None, **kwargs) -> list:
+        return self._filter(self._sibling_nodes(False), name, attrs, string, limit, kwargs)
+
+    def find_previous_sibling(self, name: Filter = None, attrs: Optional[dict] = None, string: Filter = None,
+                              **kwargs):
+        results = self.find_previous_siblings(name, attrs, string, 1, **kwargs)
+        return results[0] if results else None
+
+    def _following_nodes(self) -> Iterator[Union['LxmlTag', LxmlString]]:
+        """Все узлы после открывающего тега в порядке документа (включая потомков, как next_elements)"""
+        yield from self._iter_nodes()
+        element = self._el
+        while element is not None:
+            parent = element.getparent()
+            parent_tag = self._wrap(parent) if parent is not None else None
+            if element.tail:
+                yield LxmlString(element.tail, parent_tag)
+            for sibling in element.itersiblings():
+                if _is_element(sibling):
+                    tag = self._wrap(sibling)
+                    yield tag
+                    yield from tag._iter_nodes()
+                if sibling.tail:
+                    yield LxmlString(sibling.tail, parent_tag)
+            element = parent
+
+    def _preceding_nodes(self) -> Iterator[Union['LxmlTag', LxmlString]]:
+        """Все узлы до тега в обратном порядке документа (как previous_elements)"""
+        nodes = list(self._document._iter_nodes())
+        for index, node in enumerate(nodes):
+            if isinstance(node, LxmlTag) and node._el is self._el:
+                return reversed(nodes[:index])
+        return iter(())
+
+    def find_all_next(self, name: Filter = None, attrs: Optional[dict] = None, string: Filter = None,
+                      limit: Optional[int] = None, **kwargs) -> list:
+        return self._filter(self._following_nodes(), name, attrs, string, limit, kwargs)
+
+    def find_next(self, name: Filter = None, attrs: Optional[dict] = None, string: Filter = None, **kwargs):
+        results = self.find_all_next(name, attrs, string, 1, **kwargs)
+        return results[0] if results else None
+
+    def find_all_previous(self, name: Filter = None, attrs: Optional[dict] = None, string: Filter = None,
+                          limit: Optional[int] = None, **kwargs) -> list:
+        return self._filter(self._preceding_nodes(), name, attrs, string, limit, kwargs)
+
+    def find_previous(self, name: Filter = None, attrs: Optional[dict] = None, string: Filter = None, **kwargs):
+        results = self.find_all_previous(name, attrs, string, 1, **kwargs)
+        return results[0] if results else None
+
+    # --- изменение дерева ---
+
+    def extract(self) -> 'LxmlTag':
+        """Удаляет тег из дерева (хвостовой текст остается на месте)"""
+        if self._el.getparent() is not None:
+            self._el.drop_tree()
+        return self
+
+    def decompose(self):
+        self.extract()
+
+
+class LxmlDocument(LxmlNode):
+    """Корень документа (аналог объекта BeautifulSoup)"""
+
+    __slots__ = ('_el', '_document')
+
+    name = '[document]'
+    parent = None
+
+    def __init__(self, markup: str):
+        try:
+            self._el = lxml.html.document_fromstring(markup) if markup and markup.strip() else None
+        except (etree.ParserError, ValueError):
+            self._el = None
+        if self._el is None:
+            self._el = lxml.html.document_fromstring('<html></html>')
+        self._document = self
+
+    def __repr__(self) -> str:
+        return lxml.html.tostring(self._el, encoding='unicode')
+
+    __str__ = __repr__
+
+    @property
+    def contents(self) -> list['LxmlTag']:
+        return [self._wrap(self._el)]
+
+    @property
+    def string(self) -> Optional[LxmlString]:
+        return self._wrap(self._el).string
+
+    def _matches(self, name: Filter, attrs: Optional[dict], string: Filter, kwargs: dict) -> bool:
+        # документ подходит только под фильтр без условий (find_parents())
+        return name is None and not attrs and string is None and not kwargs
+
+    def _child_elements(self) -> Iterator:
+        return iter([self._el])
+
+    def _iter_descendant_elements(self, tag: Optional[str] = None) -> Iterator:
+        if tag is not None:
+            return self._el.iter(tag)
+        return (element for element in self._el.iter() if _is_element(element))
+
+    def _iter_nodes(self) -> Iterator[Union['LxmlTag', LxmlString]]:
+        root = self._wrap(self._el)
+        yield root
+        yield from root._iter_nodes()
+
+    def _iter_text(self) -> Iterator[str]:
+        return _iter_element_text(self._el)
+
+
+# --- минимальный CSS селектор для select/select_one ---
+
+_SELECTOR_TOKEN_RE = re.compile(
+    r'\s*(?P<combinator>>)\s*'
+    r'|(?P<space>\s+)'
+    r'|(?P<tag>[\w-]+|\*)'
+    r'|#(?P<id>[\w-]+)'
+    r'|\.(?P<class>[\w-]+)'
+    r'|\[\s*(?P<attr>[\w:-]+)\s*(?:(?P<op>[~^$*|]?=)\s*(?P<quote>["\']?)(?P<value>.*?)(?P=quote))?\s*\]'
+)
+
+
+def _parse_selector(selector: str) -> list[list[tuple[str, list[tuple]]]]:
+    """
+    Разбор селектора в список групп (через запятую);
+    группа - список (комбинатор, условия) слева направо, комбинатор " " или ">"
+    """
+    groups = []
+    for group_text in selector.split(','):
+        group_text = group_text.strip()
+        steps: list[tuple[str, list[tuple]]] = []
+        conditions: list[tuple] = []
+        combinator = ' '
+        pending = None
+        position = 0
+        while position < len(group_text):
+            match = _SELECTOR_TOKEN_RE.match(group_text, position)
+            if not match or match.end() == position:
+                raise ValueError(f"Неподдерживаемый CSS селектор: {selector}")
+            position = match.end()
+            if match.group('combinator'):
+                pending = '>'
+                continue
+            if match.group('space'):
+                pending = pending or ' '
+                continue
+            if pending and conditions:
+                steps.append((combinator, conditions))
+                conditions = []
+                combinator = pending
+            pending = None
+            if match.group('tag'):
+                conditions.append(('tag', match.group('tag')))
+            elif match.group('id'):
+                conditions.append(('attr', 'id', '=', match.group('id')))
+            elif match.group('class'):
+                conditions.append(('attr', 'class', '~=', match.group('class')))
+            else:
+                conditions.append(('attr', match.group('attr'), match.group('op'), match.group('value')))
+        if conditions:
+            steps.append((combinator, conditions))
+        if steps:
+            groups.append(steps)
+    return groups
+
+
+def _xpath_literal(value: str) -> str:
+    if '"' not in value:
+        return f'"{value}"'
+    if "'" not in value:
+        return f"'{value}'"
+    return 'concat(' + ', \'"\', '.join(f'"{part}"' for part in value.split('"')) + ')'
+
+
+def _xpath_condition(condition: tuple) -> str:
+    _, key, op, expected = condition
+    attribute = f'@{key}'
+    if op is None:
+        return attribute
+    literal = _xpath_literal(expected)
+    if op == '=':
+        return f'{attribute}={literal}'
+    if op == '~=':
+        return f'contains(concat(" ", normalize-space({attribute}), " "), concat(" ", {literal}, " "))'
+    if op == '^=':
+        return f'starts-with({attribute}, {literal})'
+    if op == '$=':
+        return (f'substring({attribute}, string-length({attribute}) - string-length({literal}) + 1)'
+                f'={literal}')
+    if op == '*=':
+        return f'contains({attribute}, {literal})'
+    return f'({attribute}={literal} or starts-with({attribute}, concat({literal}, "-")))'
+
+
+def css_to_xpath(selector: str) -> str:
+    """
+    Перевод селектора из поддерживаемого подмножества CSS (см. select) в XPath
+
+    Результат выбирает те же элементы в том же (документном) порядке, что и select
+    """
+    paths = []
+    for steps in _parse_selector(selector):
+        path = ''
+        for combinator, conditions in steps:
+            tag = next((condition[1] for condition in conditions if condition[0] == 'tag'), '*')
+            predicates = ''.join(f'[{_xpath_condition(condition)}]'
+                                 for condition in conditions if condition[0] == 'attr')
+            path += ('/' if combinator == '>' and path else '//') + tag + predicates
+        paths.append(path)
+    return ' | '.join(paths)
+
+
+def _matches_compound(tag: LxmlTag, conditions: list[tuple]) -> bool:
+    for condition in conditions:
+        if condition[0] == 'tag':
+            if condition[1] != '*' and tag.name != condition[1]:
+                return False
+            continue
+        _, key, op, expected = condition
+        raw = tag._el.attrib.get(key)
+        if raw is None:
+            return False
+        if op is None:
+            continue
+        if op == '=' and raw != expected:
+            return False
+        if op == '~=' and expected not in raw.split():
+            return False
+        if op == '^=' and not raw.startswith(expected):
+            return False
+        if op == '$=' and not raw.endswith(expected):
+            return False
+        if op == '*=' and expected not in raw:
+            return False
+        if op == '|=' and raw != expected and not raw.startswith(expected + '-'):
+            return False
+    return True
+
+
+def _matches_selector(tag: LxmlTag, steps: list[tuple[str, list[tuple]]]) -> bool:
+    """Проверка селектора справа налево (предки ищутся по всему документу, как в soupsieve)"""
+    if not _matches_compound(tag, steps[-1][1]):
+        return False
+    return _matches_ancestors(tag._el, steps, len(steps) - 1, tag._document)
+
+
+def _matches_ancestors(element, steps: list[tuple[str, list[tuple]]], index: int, document: 'LxmlDocument') -> bool:
+    """
+    Левая часть селектора steps[:index] для предков element (element подошел под steps[index])
+
+    С возвратом: если дальше по цепочке не подошел ближайший подходящий предок, пробуется следующий
+    ("div > p span": span может лежать в нескольких p, и под "div >" подходит не ближайший)
+    """
+    if index == 0:
+        return True
+    combinator = steps[index][0]
+    conditions = steps[index - 1][1]
+    if combinator == '>':
+        parent = element.getparent()
+        ancestors = [parent] if parent is not None else []
+    else:
+        ancestors = element.iterancestors()
+    for ancestor in ancestors:
+        if (_matches_compound(LxmlTag(ancestor, document), conditions)
+                and _matches_ancestors(ancestor, steps, index - 1, document)):
+            return True
+    return False
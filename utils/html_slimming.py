@@ -0,0 +1,109 @@
+"""
+Облегчение HTML перед сохранением и извлечением
+
+page_source современных сайтов рецептов занимает 0.5-2 МБ, большая часть - встроенные скрипты, стили,
+SVG и рекламная разметка. slim_html разбирает страницу потоково (etree.HTMLPullParser, куски по 64 КБ)
+и удаляет узлы сразу по их закрытию: скрипты (кроме JSON: ld+json, __NEXT_DATA__ и т.п.), стили,
+содержимое SVG, подключения стилей и предзагрузки и известные рекламные контейнеры.
+JSON-LD, meta, noscript (ленивые изображения), атрибуты и текст сохраняются. Комментарии тоже остаются:
+React разделяет ими соседние текстовые узлы (<!-- -->), и экстракторы (godt_no, tine_no) разбирают
+поля по этим границам - без комментариев текстовые узлы сливаются.
+
+Экстрактор, которому нужны удаляемые узлы (например, данные во встроенном JS), отключает облегчение
+атрибутом класса html_slimming = False (см. extractor/base.py и реестр экстракторов).
+"""
+
+import logging
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# страницы меньше этого размера (уже облегченные или простые) при извлечении не обрабатываются
+MIN_SLIM_SIZE = 50_000
+# удаляются целиком
+DROPPED_TAGS = {'style'}
+# содержимое удаляется, сам тег (с атрибутами) остается
+EMPTIED_TAGS = {'svg'}
+# link с такими rel не несут данных страницы
+DROPPED_LINK_RELS = {'stylesheet', 'preload', 'prefetch', 'preconnect', 'dns-prefetch', 'modulepreload'}
+# рекламные контейнеры: классы и префиксы id
+AD_CLASSES = {
+    'adsbygoogle', 'adthrive-ad', 'adthrive-content', 'mv-ad-box', 'ad-slot', 'ad-container',
+    'ad-wrapper', 'advertisement', 'ezoic-ad', 'dfp-ad', 'google-auto-placed',
+}
+AD_ID_PREFIXES = ('div-gpt-ad', 'google_ads_', 'ezoic-pub-ad', 'AdThrive_', 'gpt-ad-')
+
+
+def _is_data_script(element) -> bool:
+    """script с данными (JSON), а не с кодом"""
+    return 'json' in (element.get('type') or '').lower()
+
+
+def _is_dropped(element) -> bool:
+    tag = element.tag
+    if not isinstance(tag, str):
+        return False  # комментарии (инструкции обработки удаляет парсер)
+    if tag == 'script':
+        return not _is_data_script(element)
+    if tag in DROPPED_TAGS:
+        return True
+    if tag == 'link':
+        return bool(DROPPED_LINK_RELS.intersection((element.get('rel') or '').lower().split()))
+    element_id = element.get('id')
+    if element_id and element_id.startswith(AD_ID_PREFIXES):
+        return True
+    classes = element.get('class')
+    return bool(classes) and not AD_CLASSES.isdisjoint(classes.split())
+
+
+def _remove(element):
+    """Удаление узла с сохранением текста после него (tail)"""
+    parent = element.getparent()
+    if parent is None:
+        return
+    tail = element.tail
+    if tail:
+        previous = element.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or '') + tail
+        else:
+            parent.text = (parent.text or '') + tail
+    parent.remove(element)
+
+
+def _process_events(parser: etree.HTMLPullParser):
+    """Обработка закрытых с прошлого вызова элементов"""
+    for _, element in parser.read_events():
+        if element.tag in EMPTIED_TAGS:
+            for child in list(element):
+                element.remove(child)
+            element.text = None
+        elif _is_dropped(element):
+            _remove(element)
+
+
+def slim_html(markup: str, min_size: int = 0) -> str:
+    """
+    Облегченный HTML (при ошибке разбора возвращается исходная разметка)
+
+    Args:
+        markup: HTML страницы (driver.page_source или содержимое файла)
+        min_size: разметка короче этого числа символов возвращается без изменений
+    """
+    if not markup or len(markup) < min_size:
+        return markup
+    parser = etree.HTMLPullParser(events=('end',), remove_comments=False, remove_pis=True)
+    try:
+        for start in range(0, len(markup), CHUNK_SIZE):
+            parser.feed(markup[start:start + CHUNK_SIZE])
+            _process_events(parser)
+        root = parser.close()
+        _process_events(parser)
+    except (etree.LxmlError, ValueError) as e:
+        logger.debug(f"Облегчение HTML не удалось, сохраняется исходная разметка: {e}")
+        return markup
+    if root is None:
+        return markup
+    return etree.tostring(root.getroottree(), method='html', encoding='unicode')
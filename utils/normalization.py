@@ -22,6 +22,12 @@ NUMBER_PATTERN = re.compile(
     r'\s*',
     re.IGNORECASE
 )
+_RANGE_SPLIT_PATTERN = re.compile(r'[-–—]')
+# количество с единицей в скобках в названии: "flour (100g)" (единицы в порядке UNIT_PATTERNS)
+_BRACKET_PATTERN = re.compile(
+    r'\s*\(\s*(\d+(?:[.,]\d+)?\s*(?:' + '|'.join(re.escape(u) for u in UNIT_PATTERNS) + r'))\s*\)\s*',
+    re.IGNORECASE
+)
 
 def amount_to_float(amount) -> Optional[float]:
     """Преобразует количество в float, если возможно"""
@@ -78,7 +84,7 @@ def normalize_ingredient(ingredient: dict) -> dict:
                         amount = float(frac_parts[0]) / float(frac_parts[1])
                 elif '-' in num_str or '–' in num_str or '—' in num_str:
                     # Диапазон - берём среднее
-                    parts = re.split(r'[-–—]', num_str)
+                    parts = _RANGE_SPLIT_PATTERN.split(num_str)
                     amount = (float(parts[0]) + float(parts[1])) / 2
                 else:
                     amount = float(num_str)
@@ -118,7 +124,7 @@ def normalize_ingredient(ingredient: dict) -> dict:
                             frac_parts = num_str.split('/')
                             extracted_amount = float(frac_parts[0]) / float(frac_parts[1])
                     elif '-' in num_str or '–' in num_str or '—' in num_str:
-                        parts = re.split(r'[-–—]', num_str)
+                        parts = _RANGE_SPLIT_PATTERN.split(num_str)
                         extracted_amount = (float(parts[0]) + float(parts[1])) / 2
                     else:
                         extracted_amount = float(num_str)
@@ -146,8 +152,7 @@ def normalize_ingredient(ingredient: dict) -> dict:
                     name = ' '.join(words[1:]).strip()
     
     # Очищаем name от возможных остатков в скобках типа "(100g)"
-    bracket_pattern = re.compile(r'\s*\(\s*(\d+(?:[.,]\d+)?\s*(?:' + '|'.join(re.escape(u) for u in UNIT_PATTERNS) + r'))\s*\)\s*', re.IGNORECASE)
-    bracket_match = bracket_pattern.search(name)
+    bracket_match = _BRACKET_PATTERN.search(name)
     if bracket_match:
         bracket_content = bracket_match.group(1)
         inner_match = NUMBER_PATTERN.match(bracket_content)
@@ -0,0 +1,318 @@
+"""
+Общие скомпилированные функции разбора для экстракторов:
+ISO 8601 длительности, время в тексте, количества, единицы измерения и строки ингредиентов
+
+Все регулярные выражения компилируются один раз при импорте,
+результаты разбора кешируются (одни и те же строки повторяются на страницах одного сайта).
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Literal, Optional
+
+CACHE_SIZE = 8192
+
+# Unicode дроби -> " n/d" (пробел перед дробью, чтобы "1½" разбиралось как "1 1/2")
+VULGAR_FRACTIONS = '½⅓⅔¼¾⅕⅖⅗⅘⅙⅚⅐⅛⅜⅝⅞⅑⅒↉'
+_FRACTION_TABLE = {
+    ord(char): ' ' + unicodedata.normalize('NFKD', char).replace('⁄', '/')
+    for char in VULGAR_FRACTIONS
+}
+_FRACTION_TABLE[ord('⁄')] = '/'  # FRACTION SLASH
+
+# PnYnMnWnDTnHnMnS, любое значение может быть дробным; год и месяц переводятся как 365 и 30 дней
+_ISO_VALUE = r'\d+(?:[.,]\d+)?'
+_ISO_DURATION_RE = re.compile(
+    rf'^P(?:(?P<years>{_ISO_VALUE})Y)?(?:(?P<months>{_ISO_VALUE})M)?(?:(?P<weeks>{_ISO_VALUE})W)?'
+    rf'(?:(?P<days>{_ISO_VALUE})D)?'
+    rf'(?:T(?:(?P<hours>{_ISO_VALUE})H)?(?:(?P<minutes>{_ISO_VALUE})M)?(?:(?P<seconds>{_ISO_VALUE})S)?)?$',
+    re.IGNORECASE
+)
+_ISO_FACTORS = (('years', 525600), ('months', 43200), ('weeks', 10080), ('days', 1440), ('hours', 60),
+                ('minutes', 1), ('seconds', 1 / 60))
+
+# число: смешанная дробь, простая дробь, десятичное или целое
+_NUMBER = r'(?:\d+\s+\d+\s*/\s*\d+|\d+\s*/\s*\d+|\d+(?:[.,]\d+)?)'
+_RANGE_SEPARATOR = r'(?:\s*[-–—]\s*|\s+(?:to|or|bis|à|a|до|или|do|tot)\s+)'
+_QUANTITY_RE = re.compile(rf'^(?P<first>{_NUMBER})(?:{_RANGE_SEPARATOR}(?P<second>{_NUMBER}))?$', re.IGNORECASE)
+
+# единица времени -> множитель в минутах
+_TIME_UNITS = {
+    'days': 1440, 'day': 1440, 'd': 1440, 'tage': 1440, 'tag': 1440, 'jours': 1440, 'jour': 1440,
+    'giorni': 1440, 'giorno': 1440, 'días': 1440, 'día': 1440, 'dni': 1440, 'dzień': 1440,
+    'дней': 1440, 'дня': 1440, 'день': 1440, 'дн': 1440,
+    'hours': 60, 'hour': 60, 'hrs': 60, 'hr': 60, 'h': 60, 'stunden': 60, 'stunde': 60, 'std': 60,
+    'heures': 60, 'heure': 60, 'ore': 60, 'ora': 60, 'horas': 60, 'hora': 60, 'uur': 60, 'timmar': 60,
+    'timme': 60, 'tim': 60, 'godzin': 60, 'godziny': 60, 'godzina': 60, 'godz': 60, 'óra': 60,
+    'часов': 60, 'часа': 60, 'час': 60, 'ч': 60, 'sati': 60, 'sat': 60,
+    'minutes': 1, 'minute': 1, 'mins': 1, 'min': 1, 'm': 1, 'minuten': 1, 'minuti': 1, 'minuto': 1,
+    'minutos': 1, 'minuter': 1, 'minut': 1, 'minuty': 1, 'perc': 1, 'минут': 1, 'минуты': 1,
+    'минута': 1, 'мин': 1, 'minuta': 1,
+    'seconds': 1 / 60, 'second': 1 / 60, 'secs': 1 / 60, 'sec': 1 / 60, 's': 1 / 60, 'sekunden': 1 / 60,
+    'secondes': 1 / 60, 'secondi': 1 / 60, 'секунд': 1 / 60, 'сек': 1 / 60,
+}
+_TIME_PART_RE = re.compile(
+    rf'(?P<value>{_NUMBER})(?:{_RANGE_SEPARATOR}(?P<upper>{_NUMBER}))?\s*(?P<unit>'
+    + '|'.join(sorted((re.escape(unit) for unit in _TIME_UNITS), key=len, reverse=True))
+    + r')\.?(?![^\W\d_])',
+    re.IGNORECASE
+)
+_PLAIN_NUMBER_RE = re.compile(rf'^\s*({_NUMBER})\s*$')
+_PLAIN_RANGE_RE = re.compile(rf'^\s*(?P<first>{_NUMBER})(?:{_RANGE_SEPARATOR}(?P<second>{_NUMBER}))?\s*$',
+                             re.IGNORECASE)
+
+# написание единицы -> каноническая единица
+UNIT_ALIASES = {
+    # масса
+    'g': 'g', 'gr': 'g', 'grs': 'g', 'gram': 'g', 'grams': 'g', 'gramm': 'g', 'gramos': 'g', 'grammi': 'g',
+    'grammes': 'g', 'gramme': 'g', 'г': 'g', 'гр': 'g', 'грамм': 'g',
+    'kg': 'kg', 'kgs': 'kg', 'kilogram': 'kg', 'kilograms': 'kg', 'кг': 'kg',
+    'mg': 'mg', 'milligram': 'mg', 'milligrams': 'mg', 'мг': 'mg',
+    'oz': 'oz', 'ounce': 'oz', 'ounces': 'oz',
+    'lb': 'lb', 'lbs': 'lb', 'pound': 'lb', 'pounds': 'lb',
+    # объем
+    'ml': 'ml', 'milliliter': 'ml', 'milliliters': 'ml', 'millilitre': 'ml', 'millilitres': 'ml', 'мл': 'ml',
+    'cl': 'cl', 'dl': 'dl',
+    'l': 'l', 'liter': 'l', 'liters': 'l', 'litre': 'l', 'litres': 'l', 'litro': 'l', 'litri': 'l', 'л': 'l',
+    'cup': 'cup', 'cups': 'cup', 'c': 'cup',
+    'tbsp': 'tbsp', 'tbsps': 'tbsp', 'tbs': 'tbsp', 'tablespoon': 'tbsp', 'tablespoons': 'tbsp', 'el': 'tbsp',
+    'cs': 'tbsp', 'c.à.s': 'tbsp', 'ст.л': 'tbsp', 'ст. л': 'tbsp', 'łyżka': 'tbsp', 'łyżki': 'tbsp',
+    'tsp': 'tsp', 'tsps': 'tsp', 'teaspoon': 'tsp', 'teaspoons': 'tsp', 'tl': 'tsp', 'cc': 'tsp',
+    'c.à.c': 'tsp', 'ч.л': 'tsp', 'ч. л': 'tsp', 'łyżeczka': 'tsp', 'łyżeczki': 'tsp',
+    'fl oz': 'fl oz', 'pint': 'pint', 'pints': 'pint', 'quart': 'quart', 'quarts': 'quart',
+    'gallon': 'gallon', 'gallons': 'gallon',
+    # штучные
+    'pinch': 'pinch', 'pinches': 'pinch', 'prise': 'pinch', 'щепотка': 'pinch',
+    'dash': 'dash', 'dashes': 'dash',
+    'clove': 'clove', 'cloves': 'clove', 'зубчик': 'clove', 'зубчика': 'clove',
+    'can': 'can', 'cans': 'can', 'tin': 'can', 'tins': 'can',
+    'package': 'package', 'packages': 'package', 'pkg': 'package', 'packet': 'package', 'packets': 'package',
+    'slice': 'slice', 'slices': 'slice',
+    'piece': 'piece', 'pieces': 'piece', 'pcs': 'piece', 'pc': 'piece', 'stk': 'piece', 'stück': 'piece',
+    'szt': 'piece', 'шт': 'piece', 'pz': 'piece',
+    'stick': 'stick', 'sticks': 'stick',
+    'bunch': 'bunch', 'bunches': 'bunch', 'bund': 'bunch', 'пучок': 'bunch',
+    'sprig': 'sprig', 'sprigs': 'sprig',
+    'handful': 'handful', 'handfuls': 'handful',
+    'head': 'head', 'heads': 'head',
+    'stalk': 'stalk', 'stalks': 'stalk',
+    'jar': 'jar', 'jars': 'jar', 'bottle': 'bottle', 'bottles': 'bottle',
+    'inch': 'inch', 'inches': 'inch', 'cm': 'cm',
+}
+_UNIT_ALTERNATION = '|'.join(
+    sorted((re.escape(unit).replace(r'\ ', r'\s*') for unit in UNIT_ALIASES), key=len, reverse=True)
+)
+_INGREDIENT_RE = re.compile(
+    rf'^(?P<amount>{_NUMBER}(?:{_RANGE_SEPARATOR}{_NUMBER})?)?\s*'
+    rf'(?:(?P<unit>{_UNIT_ALTERNATION})\.?(?![^\W\d_]))?\s*'
+    r'(?:of\s+)?(?P<name>.*)$',
+    re.IGNORECASE
+)
+_UNIT_RE = re.compile(rf'^(?:{_UNIT_ALTERNATION})$', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+_FRACTION_SLASH_RE = re.compile(r'\s*/\s*')
+_NAME_STRIP = ' \t,;:-–—'
+
+
+def _normalize_fractions(text: str) -> str:
+    """Заменяет Unicode дроби на n/d и схлопывает пробелы"""
+    return _WHITESPACE_RE.sub(' ', text.translate(_FRACTION_TABLE)).strip()
+
+
+def _number_to_float(number: str) -> float:
+    """"1 1/2" -> 1.5, "1 1 / 2" -> 1.5, "3/4" -> 0.75, "1,5" -> 1.5"""
+    number = _FRACTION_SLASH_RE.sub('/', number.replace(',', '.'))
+    if '/' not in number:
+        return float(number)
+    parts = number.split()
+    whole = float(parts[0]) if len(parts) == 2 else 0.0
+    numerator, denominator = parts[-1].split('/') if len(parts) == 2 else number.split('/')
+    return whole + float(numerator) / float(denominator)
+
+
+def _range_to_float(first: str, second: Optional[str]) -> float:
+    """Число или диапазон -> число; для диапазона ("2-3", "10 to 15") берется среднее"""
+    value = _number_to_float(first)
+    return (value + _number_to_float(second)) / 2 if second else value
+
+
+def format_number(value: float) -> str:
+    """Компактное строковое представление числа: 2.0 -> "2", 0.3333 -> "0.333\""""
+    return f"{value:.3f}".rstrip('0').rstrip('.')
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def iso_duration_to_minutes(duration: Optional[str]) -> Optional[int]:
+    """
+    ISO 8601 длительность -> минуты
+
+    Args:
+        duration: строка вида "PT20M", "PT1H30M", "P1DT2H", "PT1.5H", "PT90S", "P0Y0M0DT0H35M0S"
+
+    Returns:
+        Количество минут (округление до целого) или None, если строка не разобрана или равна нулю
+    """
+    if not duration or not isinstance(duration, str):
+        return None
+    match = _ISO_DURATION_RE.match(duration.strip())
+    if not match or not any(match.groupdict().values()):
+        return None
+    total = 0.0
+    for group, factor in _ISO_FACTORS:
+        value = match.group(group)
+        if value:
+            total += float(value.replace(',', '.')) * factor
+    minutes = round(total)
+    return minutes if minutes > 0 else None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def time_text_to_minutes(text: Optional[str]) -> Optional[int]:
+    """
+    Время в свободной форме -> минуты
+
+    Понимает ISO 8601, "1 hr 30 mins", "1h30", "1½ hours", "45 Minuten", "1 час 20 мин",
+    а также число без единиц (считается минутами). Для диапазона ("10-15 min", "1 to 2 hours")
+    берется среднее, как в quantity_to_float.
+
+    Returns:
+        Количество минут или None
+    """
+    if not text or not isinstance(text, str):
+        return None
+    text = text.strip()
+    if text[:1] in ('P', 'p'):
+        minutes = iso_duration_to_minutes(text)
+        if minutes is not None:
+            return minutes
+
+    try:
+        return _time_text_to_minutes(_normalize_fractions(text))
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def _time_text_to_minutes(text: str) -> Optional[int]:
+    plain = _PLAIN_RANGE_RE.match(text)
+    if plain:
+        minutes = round(_range_to_float(plain.group('first'), plain.group('second')))
+        return minutes if minutes > 0 else None
+
+    total = 0.0
+    last_factor = None
+    last_end = 0
+    for match in _TIME_PART_RE.finditer(text):
+        last_factor = _TIME_UNITS[match.group('unit').lower()]
+        total += _range_to_float(match.group('value'), match.group('upper')) * last_factor
+        last_end = match.end()
+
+    if last_factor is None:
+        return None
+    # "1h30", "2 Std. 15" - число после часов без единиц считается минутами
+    if last_factor == 60:
+        tail = _PLAIN_NUMBER_RE.match(text[last_end:])
+        if tail:
+            total += _number_to_float(tail.group(1))
+    minutes = round(total)
+    return minutes if minutes > 0 else None
+
+
+def format_minutes(minutes: Optional[int], style: Literal['number', 'minutes', 'human'] = 'minutes') -> Optional[str]:
+    """
+    Форматирование минут в строку для полей prep_time/cook_time/total_time
+
+    Args:
+        minutes: количество минут
+        style: "number" -> "90", "minutes" -> "90 minutes", "human" -> "1 hour 30 minutes"
+    """
+    if not minutes:
+        return None
+    if style == 'number':
+        return str(minutes)
+    if style == 'minutes':
+        return f"{minutes} minutes"
+
+    hours, rest = divmod(minutes, 60)
+    parts = []
+    if hours:
+        parts.append(f"{hours} hour{'s' if hours > 1 else ''}")
+    if rest:
+        parts.append(f"{rest} minute{'s' if rest > 1 else ''}")
+    return ' '.join(parts)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def quantity_to_float(text: Optional[str]) -> Optional[float]:
+    """
+    Количество -> число
+
+    "2" -> 2.0, "1,5" -> 1.5, "1 1/2" -> 1.5, "1½" -> 1.5, "½" -> 0.5, "2-3" -> 2.5 (среднее диапазона)
+    """
+    if not text or not isinstance(text, str):
+        return None
+    match = _QUANTITY_RE.match(_normalize_fractions(text))
+    if not match:
+        return None
+    try:
+        return _range_to_float(match.group('first'), match.group('second'))
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def normalize_unit(unit: Optional[str]) -> Optional[str]:
+    """Каноническое имя единицы ("tablespoons" -> "tbsp", "гр" -> "g") или None для неизвестных"""
+    if not unit:
+        return None
+    key = _WHITESPACE_RE.sub(' ', unit.strip().lower().rstrip('.'))
+    return UNIT_ALIASES.get(key)
+
+
+def is_unit(text: Optional[str]) -> bool:
+    """Является ли строка известной единицей измерения"""
+    return bool(text) and _UNIT_RE.match(text.strip().rstrip('.')) is not None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _split_ingredient(text: str, canonical_units: bool) -> Optional[tuple[str, Optional[str], Optional[str]]]:
+    text = _normalize_fractions(text)
+    if not text:
+        return None
+    match = _INGREDIENT_RE.match(text)
+    amount_text, unit, name = match.group('amount'), match.group('unit'), match.group('name')
+
+    amount = None
+    if amount_text:
+        numbers = re.split(_RANGE_SEPARATOR, amount_text, maxsplit=1)
+        try:
+            amount = '-'.join(format_number(_number_to_float(number)) for number in numbers)
+        except (ValueError, ZeroDivisionError):
+            amount = amount_text
+
+    if unit:
+        unit = normalize_unit(unit) if canonical_units else _WHITESPACE_RE.sub(' ', unit.lower())
+    name = name.strip(_NAME_STRIP)
+    if not name:
+        return None
+    return name, amount, unit
+
+
+def split_ingredient(text: Optional[str], canonical_units: bool = False) -> Optional[dict]:
+    """
+    Разбор строки ингредиента в формат проекта
+
+    Args:
+        text: строка вида "1 1/2 cups flour", "200 g sugar", "½ tsp salt", "2-3 cloves garlic"
+        canonical_units: приводить единицу к каноническому имени (UNIT_ALIASES), иначе как в тексте
+
+    Returns:
+        {"name": "flour", "amount": "1.5", "unit": "cups"} или None для пустой строки.
+        Количество - строка с числом ("1.5") или диапазоном ("2-3").
+    """
+    if not text or not isinstance(text, str):
+        return None
+    parsed = _split_ingredient(text, canonical_units)
+    if parsed is None:
+        return None
+    name, amount, unit = parsed
+    return {"name": name, "amount": amount, "unit": unit}
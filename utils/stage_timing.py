@@ -0,0 +1,166 @@
+"""
+Время этапов обхода по сайтам
+
+SiteExplorer и RecipeExtractor замеряют этапы обработки страницы (переход, ожидание готовности, проверка
+защиты, паузы, прокрутка, сохранение HTML, поиск ссылок, извлечение, запись в БД) и пишут их в гистограммы
+сайта. Счетчики сайта: страницы, байты HTML, рецепты и новые рецепты. Данные копятся за весь процесс
+(кванты run_parallel одного сайта складываются), efficiency_report() ранжирует сайты по стоимости
+нового рецепта (секунды обхода на новый рецепт) и показывает самый дорогой этап каждого сайта.
+"""
+
+import json
+import time
+import bisect
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# верхние границы корзин гистограммы (секунды), последняя корзина - все, что дольше
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class StageHistogram:
+    """Гистограмма длительностей одного этапа"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Верхняя граница корзины, в которую попадает q-й перцентиль (для последней корзины - максимум)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank:
+                return BUCKETS[index] if index < len(BUCKETS) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'total': round(self.total, 3), 'max': round(self.max, 3),
+                'p50': self.percentile(0.5), 'p95': self.percentile(0.95), 'buckets': self.buckets}
+
+
+class SiteTimings:
+    """Этапы и счетчики одного сайта"""
+
+    def __init__(self, site_name: str):
+        self.site_name = site_name
+        self.stages: dict[str, StageHistogram] = {}
+        self.counters: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self.stages.setdefault(stage, StageHistogram()).observe(seconds)
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Замер этапа (время пишется и при исключении)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def count(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(histogram.total for histogram in self.stages.values())
+
+    @property
+    def cost_per_recipe(self) -> Optional[float]:
+        """Секунды этапов на новый рецепт (None - новых рецептов нет)"""
+        new_recipes = self.counters.get('new_recipes', 0)
+        return self.total_seconds / new_recipes if new_recipes else None
+
+    def bottleneck(self) -> Optional[str]:
+        """Этап с наибольшим суммарным временем"""
+        if not self.stages:
+            return None
+        return max(self.stages, key=lambda stage: self.stages[stage].total)
+
+    def summary(self) -> str:
+        pages = self.counters.get('pages', 0)
+        recipes = self.counters.get('recipes', 0)
+        stages = sorted(self.stages.items(), key=lambda item: item[1].total, reverse=True)
+        stage_text = ', '.join(f"{stage} {histogram.total:.0f}s (p50 {histogram.percentile(0.5):g}s, "
+                               f"p95 {histogram.percentile(0.95):g}s)" for stage, histogram in stages)
+        cost = self.cost_per_recipe
+        cost_text = f"{cost:.1f}s" if cost is not None else "нет новых рецептов"
+        recipes_per_page = f"{recipes / pages:.2f}" if pages else "-"
+        return (f"{self.site_name}: {self.total_seconds:.0f}s, страниц {pages:.0f}, "
+                f"{self.counters.get('bytes', 0) / 1024 / 1024:.1f} МБ HTML, рецептов на страницу {recipes_per_page}, "
+                f"новый рецепт {cost_text}; {stage_text}")
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {'total_seconds': round(self.total_seconds, 3), 'cost_per_recipe': self.cost_per_recipe,
+                    'counters': dict(self.counters),
+                    'stages': {stage: histogram.to_dict() for stage, histogram in self.stages.items()}}
+
+
+_sites: dict[str, SiteTimings] = {}
+_sites_lock = threading.Lock()
+
+
+def site_timings(site_name: str) -> SiteTimings:
+    """Общий для процесса объект замеров сайта"""
+    with _sites_lock:
+        return _sites.setdefault(site_name, SiteTimings(site_name))
+
+
+def reset():
+    with _sites_lock:
+        _sites.clear()
+
+
+def _cost_key(timings: SiteTimings) -> tuple:
+    # сайты без новых рецептов - первыми (по затраченному времени), затем по убыванию стоимости рецепта
+    cost = timings.cost_per_recipe
+    return (cost is None, cost if cost is not None else timings.total_seconds)
+
+
+def efficiency_report(path: Optional[str] = None) -> list[str]:
+    """
+    Отчет по сайтам процесса: от самых дорогих новых рецептов к самым дешевым
+
+    Args:
+        path: JSON файл для полного отчета (гистограммы по сайтам и этапам)
+
+    Returns:
+        Строки отчета: по сайту и итог по этапам
+    """
+    with _sites_lock:
+        sites = [timings for timings in _sites.values() if timings.stages]
+    sites.sort(key=_cost_key, reverse=True)
+
+    lines = [f"{timings.summary()}; узкое место: {timings.bottleneck()}" for timings in sites]
+    totals: dict[str, float] = {}
+    for timings in sites:
+        for stage, histogram in timings.stages.items():
+            totals[stage] = totals.get(stage, 0) + histogram.total
+    overall = sum(totals.values())
+    if overall:
+        lines.append("Этапы всего: " + ', '.join(
+            f"{stage} {seconds / overall:.0%}" for stage, seconds in sorted(totals.items(), key=lambda item: -item[1])))
+
+    if path:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({timings.site_name: timings.to_dict() for timings in sites}, f, ensure_ascii=False, indent=2)
+    return lines
@@ -0,0 +1,218 @@
+"""
+Извлечение структурированных данных schema.org (JSON-LD, microdata, RDFa) из HTML
+и поиск нормализованного узла Recipe
+"""
+
+import json
+import re
+import logging
+from collections import deque
+from typing import Any, Iterator, Optional
+
+import orjson
+from bs4 import BeautifulSoup, Tag
+
+logger = logging.getLogger(__name__)
+
+RECIPE_TYPE = "Recipe"
+# свойства, которые в JSON-LD всегда списки, а в microdata/RDFa могут встретиться один раз
+LIST_PROPERTIES = {"recipeIngredient", "ingredients", "recipeInstructions"}
+# максимальная глубина обхода JSON при поиске узла Recipe (защита от патологических документов)
+MAX_JSON_DEPTH = 8
+
+_CDATA_RE = re.compile(r'^\s*(?://\s*)?<!\[CDATA\[|(?://\s*)?\]\]>\s*$')
+# блоки JSON-LD в сыром HTML (без построения дерева)
+_JSON_LD_SCRIPT_RE = re.compile(
+    r'<script\b[^>]*\btype\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+_TYPE_PREFIX_RE = re.compile(r'^(?:.*[/#]|[a-z]+:)', re.IGNORECASE)
+
+
+def loads_json(text: str) -> Any:
+    """
+    Быстрый разбор JSON через orjson с fallback на нестрогий json
+    (управляющие символы внутри строк, которые встречаются в JSON-LD некоторых сайтов)
+    """
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        cleaned = _CDATA_RE.sub('', text).strip().rstrip(';')
+        return json.loads(cleaned, strict=False)
+
+
+def short_type(type_value: str) -> str:
+    """Короткое имя типа: https://schema.org/Recipe, schema:Recipe -> Recipe"""
+    return _TYPE_PREFIX_RE.sub('', type_value.strip())
+
+
+def is_type(node: Any, type_name: str = RECIPE_TYPE) -> bool:
+    """Проверяет @type узла (строка, список, с префиксом schema: или полным URL)"""
+    if not isinstance(node, dict):
+        return False
+    node_type = node.get('@type')
+    if isinstance(node_type, str):
+        return short_type(node_type) == type_name
+    if isinstance(node_type, list):
+        return any(isinstance(t, str) and short_type(t) == type_name for t in node_type)
+    return False
+
+
+def parse_json_ld(soup: BeautifulSoup) -> list[Any]:
+    """
+    Разбирает все блоки <script type="application/ld+json"> страницы
+
+    Returns:
+        Список разобранных JSON документов (невалидные блоки пропускаются)
+    """
+    documents = []
+    for script in soup.find_all('script', type='application/ld+json'):
+        text = script.string
+        if not text or not text.strip():
+            continue
+        try:
+            documents.append(loads_json(text))
+        except (ValueError, TypeError) as e:
+            logger.debug(f"Невалидный JSON-LD блок: {e}")
+    return documents
+
+
+def parse_json_ld_markup(markup: str) -> list[Any]:
+    """
+    Разбирает блоки JSON-LD прямо из текста HTML, без BeautifulSoup (для быстрого первого прохода)
+
+    Returns:
+        Список разобранных JSON документов (невалидные блоки пропускаются)
+    """
+    documents = []
+    for match in _JSON_LD_SCRIPT_RE.finditer(markup):
+        text = match.group(1)
+        if not text.strip():
+            continue
+        try:
+            documents.append(loads_json(text))
+        except (ValueError, TypeError) as e:
+            logger.debug(f"Невалидный JSON-LD блок: {e}")
+    return documents
+
+
+def iter_json_nodes(data: Any, depth: int = 0) -> Iterator[dict]:
+    """Обход всех dict-узлов JSON документа в ширину (верхний уровень, затем @graph и вложенные)"""
+    queue = deque([(data, depth)])
+    while queue:
+        item, level = queue.popleft()
+        if level > MAX_JSON_DEPTH:
+            continue
+        if isinstance(item, list):
+            queue.extend((child, level + 1) for child in item)
+        elif isinstance(item, dict):
+            yield item
+            queue.extend((child, level + 1) for child in item.values() if isinstance(child, (dict, list)))
+
+
+def _build_id_index(documents: list[Any]) -> dict[str, dict]:
+    """Индекс узлов по @id для разрешения ссылок вида {"@id": "...#primaryimage"}"""
+    index = {}
+    for document in documents:
+        for node in iter_json_nodes(document):
+            node_id = node.get('@id')
+            if isinstance(node_id, str) and len(node) > 1:
+                index.setdefault(node_id, node)
+    return index
+
+
+def _resolve_refs(value: Any, id_index: dict[str, dict]) -> Any:
+    """Заменяет узлы-ссылки {"@id": ...} на полные узлы (на один уровень)"""
+    if isinstance(value, dict) and set(value) == {'@id'}:
+        return id_index.get(value['@id'], value)
+    if isinstance(value, list):
+        return [_resolve_refs(item, id_index) for item in value]
+    return value
+
+
+def find_json_ld_node(documents: list[Any], type_name: str = RECIPE_TYPE) -> Optional[dict]:
+    """
+    Находит первый узел заданного типа среди JSON-LD документов и нормализует его:
+    ссылки по @id на другие узлы @graph заменяются самими узлами
+
+    Returns:
+        Новый dict (исходные документы не изменяются) или None
+    """
+    for document in documents:
+        for node in iter_json_nodes(document):
+            if is_type(node, type_name):
+                id_index = _build_id_index(documents)
+                return {key: _resolve_refs(value, id_index) for key, value in node.items()}
+    return None
+
+
+def _property_value(element: Tag, prop_attr: str) -> Optional[str]:
+    """Значение свойства microdata/RDFa по правилам спецификаций"""
+    for attr in ('content', 'datetime', 'value'):
+        if element.has_attr(attr):
+            return element[attr]
+    if prop_attr == 'property' and element.has_attr('resource'):
+        return element['resource']
+    if element.name in ('a', 'link', 'area') and element.has_attr('href'):
+        return element['href']
+    if element.name in ('img', 'audio', 'video', 'source', 'embed', 'iframe') and element.has_attr('src'):
+        return element['src']
+    return element.get_text(separator=' ', strip=True)
+
+
+def _add_property(item: dict, name: str, value: Any):
+    if name in item:
+        if not isinstance(item[name], list):
+            item[name] = [item[name]]
+        item[name].append(value)
+    elif name in LIST_PROPERTIES:
+        item[name] = [value]
+    else:
+        item[name] = value
+
+
+def _collect_item(scope: Tag, scope_attr: str, prop_attr: str, type_attr: str) -> dict:
+    """Собирает свойства элемента-области (itemscope/typeof) в dict в формате JSON-LD"""
+    item: dict[str, Any] = {}
+    item_type = scope.get(type_attr)
+    if item_type:
+        types = [short_type(t) for t in item_type.split()]
+        item['@type'] = types[0] if len(types) == 1 else types
+
+    # у текстовых узлов name=None (и в BeautifulSoup, и в utils.fast_html)
+    stack = list(reversed([child for child in scope.children if child.name is not None]))
+    while stack:
+        element = stack.pop()
+        names = element.get(prop_attr)
+        is_scope = element.has_attr(scope_attr)
+        if names:
+            value = (_collect_item(element, scope_attr, prop_attr, type_attr) if is_scope
+                     else _property_value(element, prop_attr))
+            for name in names.split():
+                _add_property(item, short_type(name), value)
+        if is_scope:
+            # вложенная область принадлежит своему свойству, не родителю
+            continue
+        stack.extend(reversed([child for child in element.children if child.name is not None]))
+    return item
+
+
+def _find_scoped_item(soup: BeautifulSoup, scope_attr: str, prop_attr: str, type_attr: str,
+                      type_name: str) -> Optional[dict]:
+    for scope in soup.find_all(attrs={type_attr: True}):
+        if scope_attr != type_attr and not scope.has_attr(scope_attr):
+            continue
+        types = [short_type(t) for t in scope[type_attr].split()]
+        if type_name in types:
+            return _collect_item(scope, scope_attr, prop_attr, type_attr)
+    return None
+
+
+def parse_microdata_item(soup: BeautifulSoup, type_name: str = RECIPE_TYPE) -> Optional[dict]:
+    """Первый microdata элемент itemtype=schema.org/<type_name> в формате JSON-LD"""
+    return _find_scoped_item(soup, 'itemscope', 'itemprop', 'itemtype', type_name)
+
+
+def parse_rdfa_item(soup: BeautifulSoup, type_name: str = RECIPE_TYPE) -> Optional[dict]:
+    """Первый RDFa элемент typeof=<type_name> в формате JSON-LD"""
+    return _find_scoped_item(soup, 'typeof', 'property', 'typeof', type_name)
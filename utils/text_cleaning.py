@@ -0,0 +1,46 @@
+"""
+Общее ядро очистки текста для экстракторов
+
+clean_text вызывается тысячи раз на страницу (ингредиенты, шаги, теги), поэтому работа сведена
+к встроенным операциям строк: html.unescape только при наличии "&", удаление служебных символов
+скомпилированным классом символов только для не-ASCII текста (str.translate с удалением не-ASCII
+символов медленнее в несколько раз), схлопывание пробелов через str.split/join (те же пробельные
+символы, что и \\s в re). clean_texts очищает список значений поля одним вызовом.
+"""
+
+import re
+import html
+from typing import Iterable, Optional
+
+# маркеры списков и чекбоксов, которые сайты вставляют перед ингредиентами и шагами
+REMOVED_SYMBOLS = '▢□✓✔▪▫●○■'
+_REMOVED_SYMBOLS_RE = re.compile(f'[{REMOVED_SYMBOLS}]')
+
+
+def clean_text(text: Optional[str]) -> Optional[str]:
+    """Очистка текста от HTML сущностей, служебных символов и лишних пробелов (пустое значение возвращается как есть)"""
+    if not text:
+        return text
+    if '&' in text:
+        # Декодируем HTML entities (&#039; -> ', &quot; -> ", etc.)
+        text = html.unescape(text)
+    if not text.isascii():
+        text = _REMOVED_SYMBOLS_RE.sub('', text)
+    return ' '.join(text.split())
+
+
+def clean_texts(texts: Iterable[Optional[str]], drop_empty: bool = True) -> list[str]:
+    """
+    Очистка списка значений поля (ингредиенты, шаги, теги) одним вызовом
+
+    Элементы очищаются по отдельности: проверки "&" и ASCII на коротких строках пропускают
+    большую часть работы, а обработка склеенного списка платит за самый "грязный" элемент.
+
+    Args:
+        texts: строки (None и пустые строки допустимы)
+        drop_empty: не включать в результат значения, пустые после очистки
+    """
+    cleaned = [clean_text(text) or '' for text in texts]
+    if drop_empty:
+        return [text for text in cleaned if text]
+    return cleaned